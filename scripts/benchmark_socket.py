@@ -0,0 +1,102 @@
+"""Compare raw-socket SCPI (SocketResource) against the pyvisa path.
+
+Measures small-query round-trip latency (*IDN?) and binary trace throughput
+(:TRAC? as REAL,32) through both transports. Without --resource it runs
+against a local emulated spectrum analyzer; the emulator adds its own
+per-message cost, so absolute numbers from real hardware will differ.
+
+    python scripts/benchmark_socket.py
+    python scripts/benchmark_socket.py --resource TCPIP::192.168.1.20::5025::SOCKET --backend ""
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pyvisa
+
+from instrumation.emulator import EmulatorFarm
+from instrumation.transport import SocketResource
+
+
+def open_visa(resource, backend):
+    rm = pyvisa.ResourceManager(backend) if backend else pyvisa.ResourceManager()
+    inst = rm.open_resource(resource)
+    inst.read_termination = "\n"
+    inst.write_termination = "\n"
+    inst.timeout = 10000
+    return inst
+
+
+def measure(inst, queries, traces, points):
+    latencies = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        inst.query("*IDN?")
+        latencies.append(time.perf_counter() - start)
+
+    inst.write(f":SWE:POIN {points};:FORM:DATA REAL,32;:FORM:BORD SWAP")
+    inst.query("*OPC?")
+    start = time.perf_counter()
+    for _ in range(traces):
+        values = inst.query_binary_values(":TRAC? TRACE1", datatype="f", container=np.ndarray)
+    elapsed = time.perf_counter() - start
+    assert len(values) == points
+    latencies.sort()
+    return {
+        "median_ms": statistics.median(latencies) * 1e3,
+        "p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1e3,
+        "trace_ms": elapsed / traces * 1e3,
+        "mb_per_s": traces * points * 4 / elapsed / 1e6,
+    }
+
+
+def report(name, result):
+    print(f"{name:<8} *IDN? median {result['median_ms']:7.3f} ms  p99 {result['p99_ms']:7.3f} ms  "
+          f"trace {result['trace_ms']:8.2f} ms  {result['mb_per_s']:7.1f} MB/s")
+
+
+def run(resource, backend, queries, traces, points):
+    results = {}
+    try:
+        inst = open_visa(resource, backend)
+    except Exception as e:
+        print(f"pyvisa   skipped ({type(e).__name__}: {e})")
+    else:
+        try:
+            results["pyvisa"] = measure(inst, queries, traces, points)
+        finally:
+            inst.close()
+        report("pyvisa", results["pyvisa"])
+
+    with SocketResource.from_resource(resource, timeout=10000) as inst:
+        results["socket"] = measure(inst, queries, traces, points)
+    report("socket", results["socket"])
+
+    if "pyvisa" in results:
+        visa, raw = results["pyvisa"], results["socket"]
+        print(f"speed-up: latency x{visa['median_ms'] / raw['median_ms']:.2f}, "
+              f"throughput x{raw['mb_per_s'] / visa['mb_per_s']:.2f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resource", help="TCPIP::host::port::SOCKET of a real instrument")
+    parser.add_argument("--backend", default="@py", help='pyvisa backend ("" for the system VISA)')
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--traces", type=int, default=20)
+    parser.add_argument("--points", type=int, default=100001)
+    args = parser.parse_args()
+
+    if args.resource:
+        run(args.resource, args.backend, args.queries, args.traces, args.points)
+        return
+    with EmulatorFarm({"SA": 1}) as farm:
+        print(f"Emulated N9030B at {farm.resources[0]}")
+        run(farm.resources[0], args.backend, args.queries, args.traces, args.points)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Double-buffered single-sweep trace acquisition for spectrum analyzers.
+
+``get_trace_data()`` is self-contained: it selects the binary format, drops to
+single-sweep mode, triggers, polls ``*OPC?``, fetches and returns to continuous
+sweep - around five extra round trips per trace. A :class:`TraceAcquisition`
+session does the setup once and then keeps the analyzer one sweep ahead::
+
+    with sa.acquisition() as acq:
+        for trace in acq:          # or acq.take(100)
+            monitor(trace.value)
+
+Each step is a single write plus a single binary fetch. The write waits for the
+running sweep in the instrument (``*WAI``), copies it into a held buffer trace
+and immediately triggers the next sweep. The fetch then reads the buffer
+while the analyzer is already sweeping again.
+
+Drivers opt in by declaring ``ACQ_*`` class attributes; other analyzers
+(including the simulated ones) fall back to repeated ``get_trace_data()``.
+"""
+
+import logging
+from typing import Any, Iterator, List, Optional
+
+from .results import MeasurementResult
+
+logger = logging.getLogger(__name__)
+
+
+class TraceAcquisition:
+    """Context manager yielding successive sweeps from ``driver``.
+
+    Args:
+        driver: Connected spectrum analyzer driver.
+        count: Number of traces the iterator yields; ``None`` runs until the
+            loop is broken.
+
+    Driver attributes:
+        ACQ_SETUP: Commands sent once on entry (format, single sweep, buffer hold).
+        ACQ_TRIGGER: Starts one sweep.
+        ACQ_WAIT: Makes the instrument wait for the running sweep.
+        ACQ_SNAPSHOT: Copies the finished sweep into the buffer trace.
+        ACQ_FETCH: Binary query returning the buffer trace.
+        ACQ_TEARDOWN: Commands sent on exit (abort, restore continuous sweep).
+    """
+
+    def __init__(self, driver: Any, count: Optional[int] = None) -> None:
+        if count is not None and count < 1:
+            raise ValueError("count must be at least 1")
+        self.driver = driver
+        self.count = count
+        self.traces = 0
+        self.buffered = hasattr(driver, "ACQ_FETCH")
+        self.axis = None
+        self._active = False
+
+    def __enter__(self) -> "TraceAcquisition":
+        self._active = True
+        if not self.buffered:
+            return self
+        for command in self.driver.ACQ_SETUP:
+            self.driver.write(command)
+        self.driver.check_errors()
+        # Read once; the sweep setup is expected to stay fixed for the session
+        self.axis = self.driver.get_trace_axis()
+        self.driver.write(self.driver.ACQ_TRIGGER)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._active = False
+        if not self.buffered:
+            return
+        try:
+            for command in self.driver.ACQ_TEARDOWN:
+                self.driver.write(command)
+        except Exception as e:
+            if exc_type is None:
+                raise
+            logger.warning(f"Acquisition teardown failed on {self.driver.resource}: {e}")
+        # The session changed the sweep mode behind any applied profile
+        self.driver.applied_profile.pop("continuous", None)
+
+    def __iter__(self) -> Iterator[MeasurementResult]:
+        while self.count is None or self.traces < self.count:
+            yield self.next_trace()
+
+    def take(self, count: int) -> List[MeasurementResult]:
+        """Acquires ``count`` traces and returns them as a list."""
+        return [self.next_trace() for _ in range(count)]
+
+    def next_trace(self) -> MeasurementResult:
+        """Returns the sweep in progress and starts the following one."""
+        if not self._active:
+            raise RuntimeError("TraceAcquisition must be used as a context manager")
+        self.traces += 1
+        if not self.buffered:
+            trace = self.driver.get_trace_data()
+            trace.metadata["sweep"] = self.traces
+            return trace
+
+        # Do not leave an extra sweep running after the last requested trace
+        last = self.count is not None and self.traces >= self.count
+        advance = [self.driver.ACQ_WAIT, self.driver.ACQ_SNAPSHOT]
+        if not last:
+            advance.append(self.driver.ACQ_TRIGGER)
+        self.driver.write(";".join(advance))
+        data = self.driver.query_binary_values(self.driver.ACQ_FETCH, datatype='f', is_big_endian=False)
+        return MeasurementResult(list(data), "dBm", metadata={"sweep": self.traces}, axis=self.axis)
@@ -0,0 +1,249 @@
+"""Per-instrument I/O actor: one worker thread owns each driver.
+
+A pyvisa resource is not safe to share: two threads (or two ``async_*``
+calls, which run in ``asyncio.to_thread``) can interleave a write from one
+caller with the read of another. An :class:`InstrumentActor` gives the driver
+a dedicated worker thread fed by a priority queue. Every caller, whether a
+thread or a coroutine, hands its call to that worker, so the instrument sees
+one command at a time::
+
+    dmm = get_instrument("TCPIP::10.0.0.5::INSTR", "DMM").actor()
+
+    dmm.measure_voltage()                       # any thread, queued
+    await dmm.async_measure_voltage()           # any coroutine, queued
+    dmm.submit("shutdown_safety", priority=PRIORITY_HIGH)   # jumps the queue
+
+    with dmm.transaction() as drv:              # nobody else runs in between
+        drv.write(":CONF:VOLT:DC 10")
+        value = drv.query(":READ?")
+
+Queued calls with the same priority run in submission order.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, Tuple, Union
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+# Transaction held by the current thread/task (see InstrumentActor.transaction)
+_holding: contextvars.ContextVar[Optional[object]] = contextvars.ContextVar("instrumation_actor_holding", default=None)
+
+_STOP = object()
+
+
+class InstrumentActor:
+    """Serialises all access to ``driver`` through one worker thread.
+
+    Attribute access is proxied: ``actor.name(...)`` runs ``driver.name``
+    on the worker and waits for the result. ``actor.async_name(...)`` does
+    the same without blocking the event loop. Other attributes are read from
+    the driver directly.
+
+    Args:
+        driver: The driver to own. Its ``async_*`` shim is routed through
+            the actor while the actor is running.
+        name: Worker thread name (defaults to the driver's resource).
+    """
+
+    def __init__(self, driver: Any, name: Optional[str] = None) -> None:
+        self.driver = driver
+        self.name = name or f"actor-{driver.resource}"
+        self.calls_executed = 0
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._token: Optional[object] = None
+        self._thread: Optional[threading.Thread] = None
+        self.start()
+
+    # --- Lifecycle ---
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self.driver._actor = self
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Runs the calls already queued, then stops the worker."""
+        if self._thread is None:
+            return
+        self._queue.put((float("inf"), next(self._seq), _STOP, (), {}, None))
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+        if getattr(self.driver, "_actor", None) is self:
+            self.driver._actor = None
+
+    def __enter__(self) -> "InstrumentActor":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def pending(self) -> int:
+        """Calls waiting in the queue."""
+        return self._queue.qsize()
+
+    def _run(self) -> None:
+        while True:
+            _, _, func, args, kwargs, future = self._queue.get()
+            if func is _STOP:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            self.calls_executed += 1
+
+    # --- Calls ---
+    def _resolve(self, func: Union[str, Callable[..., Any]]) -> Callable[..., Any]:
+        return getattr(self.driver, func) if isinstance(func, str) else func
+
+    def _owns(self) -> bool:
+        """True on the worker itself or inside this actor's transaction."""
+        return (threading.current_thread() is self._thread
+                or (self._token is not None and _holding.get() is self._token))
+
+    def submit(self, func: Union[str, Callable[..., Any]], *args: Any,
+               priority: int = PRIORITY_NORMAL, **kwargs: Any) -> Future:
+        """Queues a call and returns its ``concurrent.futures.Future``.
+
+        Args:
+            func: Driver method name, or any callable (e.g. a lambda
+                taking no arguments that talks to the driver).
+            priority: Lower runs first; see ``PRIORITY_HIGH``/``NORMAL``/``LOW``.
+        """
+        if not self.running:
+            raise RuntimeError(f"Actor {self.name} is not running")
+        future: Future = Future()
+        self._queue.put((priority, next(self._seq), self._resolve(func), args, kwargs, future))
+        return future
+
+    def call(self, func: Union[str, Callable[..., Any]], *args: Any,
+             priority: int = PRIORITY_NORMAL, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """Runs a call on the worker and returns its result (or raises its exception)."""
+        if self._owns():
+            # Already serialised: running here avoids queueing behind ourselves
+            return self._resolve(func)(*args, **kwargs)
+        return self.submit(func, *args, priority=priority, **kwargs).result(timeout)
+
+    async def acall(self, func: Union[str, Callable[..., Any]], *args: Any,
+                    priority: int = PRIORITY_NORMAL, **kwargs: Any) -> Any:
+        """Awaitable :meth:`call`."""
+        if self._owns():
+            return await asyncio.to_thread(self._resolve(func), *args, **kwargs)
+        return await asyncio.wrap_future(self.submit(func, *args, priority=priority, **kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name.startswith("async_"):
+            method = name[6:]
+            if callable(getattr(self.driver, method, None)):
+                async def async_proxy(*args: Any, **kwargs: Any) -> Any:
+                    return await self.acall(method, *args, **kwargs)
+                return async_proxy
+        attr = getattr(self.driver, name)
+        if not callable(attr):
+            return attr
+
+        def proxy(*args: Any, **kwargs: Any) -> Any:
+            return self.call(name, *args, **kwargs)
+        return proxy
+
+    # --- Transactions ---
+    def _hold(self, priority: int) -> Tuple[Future, threading.Event]:
+        granted: Future = Future()
+        release = threading.Event()
+
+        def hold() -> None:
+            granted.set_result(None)
+            release.wait()
+
+        self.submit(hold, priority=priority)
+        return granted, release
+
+    def _enter(self, fence: bool) -> Any:
+        self._token = token = object()
+        reset = _holding.set(token)
+        errors = self.driver.deferred_errors() if fence else None
+        if errors is not None:
+            errors.__enter__()
+        return reset, errors
+
+    def _exit(self, reset: Any, errors: Any, exc: Optional[BaseException]) -> None:
+        try:
+            if errors is not None:
+                if exc is None:
+                    errors.__exit__(None, None, None)
+                else:
+                    errors.__exit__(type(exc), exc, exc.__traceback__)
+        finally:
+            self._token = None
+            _holding.reset(reset)
+
+    @contextmanager
+    def transaction(self, priority: int = PRIORITY_NORMAL, fence: bool = False,
+                    timeout: Optional[float] = None) -> Iterator[Any]:
+        """Holds the instrument for several calls; yields the driver.
+
+        The worker runs no other queued call until the block exits. Calls
+        made inside the block, directly on the driver or through the actor,
+        run in the caller's thread.
+
+        Args:
+            priority: Queue priority of the request for the instrument.
+            fence: Run the block inside ``driver.deferred_errors()``, so the
+                error queue is drained once, still inside the transaction.
+            timeout: Seconds to wait for the instrument.
+        """
+        if self._owns():
+            yield self.driver
+            return
+        granted, release = self._hold(priority)
+        try:
+            granted.result(timeout)
+            reset, errors = self._enter(fence)
+            try:
+                yield self.driver
+            except BaseException as e:
+                self._exit(reset, errors, e)
+                raise
+            self._exit(reset, errors, None)
+        finally:
+            release.set()
+
+    @asynccontextmanager
+    async def atransaction(self, priority: int = PRIORITY_NORMAL, fence: bool = False) -> AsyncIterator[Any]:
+        """Async :meth:`transaction`; use ``await actor.acall(...)`` or ``async_*`` inside."""
+        if self._owns():
+            yield self.driver
+            return
+        granted, release = self._hold(priority)
+        try:
+            await asyncio.wrap_future(granted)
+            reset, errors = self._enter(fence)
+            try:
+                yield self.driver
+            except BaseException as e:
+                self._exit(reset, errors, e)
+                raise
+            self._exit(reset, errors, None)
+        finally:
+            release.set()
@@ -0,0 +1,17 @@
+"""Host-side processing of instrument traces and waveforms (NumPy based)."""
+
+from .accumulator import TraceAccumulator
+from .limits import LimitLine, LimitMask, LimitResult
+from .peaks import Peak, acpr, band_power, find_peaks, marker, occupied_bandwidth, spur_table
+from .spectral import SpectrumStream, get_window, welch
+from .stability import allan_deviation, drift_fit, fractional_frequency, histogram, modified_allan_deviation
+from .waveform import WAVEFORM_PARAMETERS, WaveformMeasurements, measure_waveform
+
+__all__ = [
+    "TraceAccumulator",
+    "LimitLine", "LimitMask", "LimitResult",
+    "Peak", "find_peaks", "spur_table", "marker", "band_power", "acpr", "occupied_bandwidth",
+    "SpectrumStream", "welch", "get_window",
+    "fractional_frequency", "allan_deviation", "modified_allan_deviation", "drift_fit", "histogram",
+    "WAVEFORM_PARAMETERS", "WaveformMeasurements", "measure_waveform",
+]
@@ -0,0 +1,214 @@
+"""Constant-memory accumulation of repeated traces.
+
+:class:`TraceAccumulator` keeps running statistics over a stream of SA or VNA
+traces without growing lists: a running mean, max/min hold, and a bounded ring
+buffer of the most recent traces that backs percentiles and a spectrogram.
+All arrays are allocated on the first trace and updated in place, one
+vectorised operation per trace (or per batch of traces)::
+
+    acc = TraceAccumulator(history=600)
+    with sa.acquisition() as acq:
+        acc.feed(acq, limit=36000, broadcaster=broadcaster, every=10)
+
+    acc.result("max").value     # max-hold trace
+    acc.spectrogram()           # (<= 600, points) array, oldest first
+"""
+
+import time
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..results import MeasurementResult
+
+AVERAGE_MODES = ("auto", "power", "log", "linear")
+
+# Units whose values are logarithmic power ratios (averaged in linear power)
+LOG_POWER_UNITS = ("dB", "dBm", "dBW", "dBc", "dBuV", "dBmV", "dBV", "dBm/Hz", "dBV/Hz")
+
+
+def _as_batch(trace: Any) -> Tuple[np.ndarray, Optional[str]]:
+    """Returns (2-D array of traces, unit) for a trace, result or batch."""
+    unit = None
+    if isinstance(trace, MeasurementResult):
+        unit = trace.unit
+        trace = trace.value
+    arr = np.asarray(trace)
+    if arr.ndim == 1:
+        arr = arr[np.newaxis, :]
+    if arr.ndim != 2 or arr.shape[1] == 0:
+        raise ValueError(f"Expected a trace or a batch of traces, got shape {arr.shape}")
+    return arr, unit
+
+
+class TraceAccumulator:
+    """Running statistics over a stream of equal-length traces.
+
+    Args:
+        history: Number of recent traces kept for percentiles and the
+            spectrogram. Memory use is ``history * points`` values.
+        average: How the running mean is formed:
+
+            * ``"power"`` - dB values are averaged as linear power
+              (``10**(x/10)``), the right choice for noise and spur levels.
+            * ``"log"`` - plain mean of the dB values (an analyzer's
+              log/video average, biased low by 2.5 dB on noise).
+            * ``"linear"`` - plain mean, for volts or complex VNA data.
+            * ``"auto"`` - ``"power"`` for dB units, otherwise ``"linear"``.
+
+    Holds and percentiles of complex traces are taken on the magnitude.
+    """
+
+    def __init__(self, history: int = 256, average: str = "auto") -> None:
+        if history < 1:
+            raise ValueError("history must be at least 1")
+        if average not in AVERAGE_MODES:
+            raise ValueError(f"Unknown average mode '{average}', expected one of {AVERAGE_MODES}")
+        self.history = history
+        self.average = average
+        self.unit = ""
+        self.reset()
+
+    def reset(self) -> None:
+        """Discards all accumulated data (arrays are re-allocated on the next trace)."""
+        self.count = 0
+        self.points: Optional[int] = None
+        self._mode: Optional[str] = None
+        self._sum: Optional[np.ndarray] = None
+        self._max: Optional[np.ndarray] = None
+        self._min: Optional[np.ndarray] = None
+        self._ring: Optional[np.ndarray] = None
+        self._stamps = np.zeros(self.history)
+        self._head = 0
+
+    def __len__(self) -> int:
+        """Number of traces currently held in the history ring."""
+        return min(self.count, self.history)
+
+    def _allocate(self, batch: np.ndarray, unit: Optional[str]) -> None:
+        self.points = batch.shape[1]
+        if unit is not None:
+            self.unit = unit
+        mode = self.average
+        if mode == "auto":
+            mode = "power" if self.unit in LOG_POWER_UNITS else "linear"
+        if mode != "linear" and np.iscomplexobj(batch):
+            raise ValueError(f"Average mode '{mode}' needs real-valued traces")
+        self._mode = mode
+        dtype = np.complex128 if np.iscomplexobj(batch) else np.float64
+        self._sum = np.zeros(self.points, dtype=dtype)
+        self._max = np.full(self.points, -np.inf)
+        self._min = np.full(self.points, np.inf)
+        self._ring = np.zeros((self.history, self.points))
+
+    def update(self, trace: Any, timestamp: Optional[float] = None) -> None:
+        """Adds one trace, a ``MeasurementResult``, or a 2-D batch of traces.
+
+        Raises:
+            ValueError: If the trace length differs from earlier traces.
+        """
+        batch, unit = _as_batch(trace)
+        if self.points is None:
+            self._allocate(batch, unit)
+        elif batch.shape[1] != self.points:
+            raise ValueError(f"Trace has {batch.shape[1]} points, accumulator holds {self.points}")
+
+        if self._mode == "power":
+            self._sum += np.sum(10.0 ** (batch / 10.0), axis=0)
+        else:
+            self._sum += np.sum(batch, axis=0)
+        level = np.abs(batch) if np.iscomplexobj(batch) else batch
+        np.maximum(self._max, level.max(axis=0), out=self._max)
+        np.minimum(self._min, level.min(axis=0), out=self._min)
+
+        # Ring insert; only the newest `history` rows of a large batch survive
+        rows = level[-self.history:]
+        n = rows.shape[0]
+        idx = (self._head + np.arange(n)) % self.history
+        self._ring[idx] = rows
+        self._stamps[idx] = time.time() if timestamp is None else timestamp
+        self._head = (self._head + n) % self.history
+        self.count += batch.shape[0]
+
+    def _require_data(self) -> None:
+        if self.count == 0:
+            raise ValueError("No traces accumulated yet")
+
+    @property
+    def mean(self) -> np.ndarray:
+        """Running mean over every trace since the last reset."""
+        self._require_data()
+        mean = self._sum / self.count
+        if self._mode == "power":
+            return 10.0 * np.log10(mean)
+        return mean
+
+    @property
+    def max_hold(self) -> np.ndarray:
+        self._require_data()
+        return self._max.copy()
+
+    @property
+    def min_hold(self) -> np.ndarray:
+        self._require_data()
+        return self._min.copy()
+
+    def spectrogram(self) -> np.ndarray:
+        """History ring as a ``(rows, points)`` array, oldest trace first."""
+        self._require_data()
+        rows = len(self)
+        if self.count < self.history:
+            return self._ring[:rows].copy()
+        return np.roll(self._ring, -self._head, axis=0)
+
+    def timestamps(self) -> np.ndarray:
+        """Epoch timestamps matching the rows of :meth:`spectrogram`."""
+        rows = len(self)
+        if self.count < self.history:
+            return self._stamps[:rows].copy()
+        return np.roll(self._stamps, -self._head)
+
+    def percentile(self, q: Any) -> np.ndarray:
+        """Per-point percentile(s) over the traces in the history ring."""
+        self._require_data()
+        return np.percentile(self._ring[:len(self)], q, axis=0)
+
+    def result(self, kind: str = "mean") -> MeasurementResult:
+        """Returns ``"mean"``, ``"max"`` or ``"min"`` as a :class:`MeasurementResult`."""
+        arrays = {"mean": lambda: self.mean, "max": lambda: self.max_hold, "min": lambda: self.min_hold}
+        if kind not in arrays:
+            raise ValueError(f"Unknown accumulator result '{kind}', expected one of {tuple(arrays)}")
+        return MeasurementResult(arrays[kind](), self.unit, metadata={
+            "statistic": kind, "count": self.count, "average": self._mode,
+        })
+
+    def snapshot(self, fields: Sequence[str] = ("mean", "max")) -> Dict[str, Any]:
+        """JSON-serialisable summary, e.g. for :class:`~instrumation.utils.DataBroadcaster`."""
+        data: Dict[str, Any] = {"count": self.count, "unit": self.unit}
+        for name in fields:
+            values = self.result(name).value
+            if np.iscomplexobj(values):
+                values = np.abs(values)
+            data[name] = values.tolist()
+        return data
+
+    def feed(self, traces: Iterable[Any], limit: Optional[int] = None,
+             broadcaster: Any = None, every: int = 1,
+             fields: Sequence[str] = ("mean", "max")) -> "TraceAccumulator":
+        """Consumes an iterable of traces (e.g. a ``TraceAcquisition``).
+
+        Args:
+            traces: Traces or ``MeasurementResult`` objects.
+            limit: Stop after this many traces; ``None`` consumes everything.
+            broadcaster: Object with a ``send(dict)`` method that receives a
+                :meth:`snapshot` every ``every`` traces.
+            every: Broadcast interval in traces.
+            fields: Statistics included in each snapshot.
+        """
+        for n, trace in enumerate(traces, 1):
+            self.update(trace)
+            if broadcaster is not None and n % every == 0:
+                broadcaster.send(self.snapshot(fields))
+            if limit is not None and n >= limit:
+                break
+        return self
@@ -0,0 +1,254 @@
+"""Vectorised limit-line (spectral mask) testing.
+
+A :class:`LimitMask` is a set of piecewise-linear upper and/or lower
+:class:`LimitLine` objects over frequency or time. Lines are compiled once per
+:class:`~instrumation.results.TraceAxis` into per-point limit arrays; after that
+a whole batch of traces is checked with a handful of array operations, fast
+enough to keep up with continuous acquisition::
+
+    mask = LimitMask("tx_mask", [
+        LimitLine([(2.40e9, -50), (2.43e9, -50), (2.43e9, -20), (2.45e9, -20),
+                   (2.45e9, -50), (2.48e9, -50)]),
+    ])
+    with sa.acquisition() as acq:
+        for trace in acq:
+            verdict = mask.check(trace)   # sets trace.status to PASS/FAIL
+            if not verdict.passed:
+                print(verdict.failures)
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..results import MeasurementResult, TraceAxis
+
+LIMIT_KINDS = ("upper", "lower")
+
+
+@dataclass
+class LimitLine:
+    """Piecewise-linear limit through ``(x, level)`` points.
+
+    The line applies between its first and last x only. Repeating an x value
+    gives a vertical step (e.g. a mask shoulder).
+
+    Attributes:
+        points: ``(x, level)`` pairs with non-decreasing x.
+        kind: ``'upper'`` (trace must stay at or below) or ``'lower'``.
+        log_x: Interpolate against log10(x), for masks drawn on a log axis.
+    """
+    points: Sequence[Tuple[float, float]]
+    kind: str = "upper"
+    log_x: bool = False
+
+    def __post_init__(self):
+        if self.kind not in LIMIT_KINDS:
+            raise ValueError(f"Unknown limit kind '{self.kind}', expected one of {LIMIT_KINDS}")
+        if len(self.points) < 2:
+            raise ValueError("A limit line needs at least two points")
+        xs = [float(p[0]) for p in self.points]
+        if any(b < a for a, b in zip(xs, xs[1:])):
+            raise ValueError("Limit line x values must be non-decreasing")
+        if self.log_x and xs[0] <= 0:
+            raise ValueError("log_x limit lines need positive x values")
+
+    def sample(self, x: np.ndarray) -> np.ndarray:
+        """Limit level at ``x``; NaN outside the line."""
+        px = np.array([p[0] for p in self.points], dtype=np.float64)
+        py = np.array([p[1] for p in self.points], dtype=np.float64)
+        if self.log_x:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                xq, px = np.log10(x), np.log10(px)
+        else:
+            xq = x
+        # At a vertical step the stricter level applies at the step itself
+        stricter = np.minimum if self.kind == "upper" else np.maximum
+        left = np.interp(xq, px, py)
+        right = -np.interp(-xq, -px[::-1], -py[::-1])  # right-continuous variant
+        level = stricter(left, right)
+        level[(x < self.points[0][0]) | (x > self.points[-1][0])] = np.nan
+        return level
+
+
+@dataclass
+class LimitResult:
+    """Outcome of a mask evaluation.
+
+    For a batch, ``worst_margin``, ``worst_x`` and ``passed`` are arrays with
+    one entry per trace, and ``failures`` has one list per trace.
+
+    Attributes:
+        mask: Mask name.
+        margins: Per-point margin (positive = inside the limits); NaN where
+            no limit applies.
+        worst_margin: Smallest margin.
+        worst_x: Axis position of the smallest margin.
+        passed: True if no point violates the mask.
+        failures: ``(x_start, x_stop, worst_margin)`` for each run of
+            consecutive failing points.
+    """
+    mask: str
+    margins: np.ndarray
+    worst_margin: Any
+    worst_x: Any
+    passed: Any
+    failures: List[Any] = field(default_factory=list)
+
+    @property
+    def status(self) -> Union[str, List[str]]:
+        if isinstance(self.passed, np.ndarray):
+            return ["PASS" if p else "FAIL" for p in self.passed]
+        return "PASS" if self.passed else "FAIL"
+
+    def log(self, logger: Any, test_name: Optional[str] = None) -> None:
+        """Writes one row per trace to a :class:`~instrumation.utils.TestLogger`."""
+        name = test_name or self.mask
+        if isinstance(self.passed, np.ndarray):
+            for i, (margin, verdict) in enumerate(zip(self.worst_margin, self.status)):
+                logger.log(f"{name}[{i}]", f"{margin:.2f}", verdict)
+        else:
+            logger.log(name, f"{self.worst_margin:.2f}", self.status)
+
+
+class _CompiledMask:
+    """Per-point limit arrays of a mask for one axis."""
+
+    def __init__(self, lines: Sequence[LimitLine], x: np.ndarray) -> None:
+        self.x = x
+        self.upper = np.full(x.size, np.inf)
+        self.lower = np.full(x.size, -np.inf)
+        for line in lines:
+            level = line.sample(x)
+            defined = ~np.isnan(level)
+            if line.kind == "upper":
+                self.upper[defined] = np.minimum(self.upper[defined], level[defined])
+            else:
+                self.lower[defined] = np.maximum(self.lower[defined], level[defined])
+        self.covered = np.isfinite(self.upper) | np.isfinite(self.lower)
+
+
+class LimitMask:
+    """Named set of limit lines, compiled lazily per trace axis.
+
+    The ``MAX_COMPILED`` most recently used axes stay compiled, so a
+    mask checked while the span is swept does not grow without bound.
+
+    Args:
+        name: Used in results and log rows.
+        lines: Upper and/or lower limit lines. Where several lines of the
+            same kind overlap, the strictest applies.
+    """
+
+    MAX_COMPILED = 8
+
+    def __init__(self, name: str, lines: Sequence[LimitLine]) -> None:
+        if not lines:
+            raise ValueError("A limit mask needs at least one line")
+        self.name = name
+        self.lines = list(lines)
+        self._compiled: Dict[Any, _CompiledMask] = {}
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any]) -> "LimitMask":
+        """Builds a mask from ``{"upper": [[x, y], ...], "lower": [...], "log_x": bool}``.
+
+        ``upper``/``lower`` may also be a list of point lists for several lines.
+        """
+        lines = []
+        for kind in LIMIT_KINDS:
+            spec = data.get(kind)
+            if not spec:
+                continue
+            groups = spec if isinstance(spec[0][0], (list, tuple)) else [spec]
+            for points in groups:
+                lines.append(LimitLine([tuple(p) for p in points], kind=kind, log_x=data.get("log_x", False)))
+        return cls(name, lines)
+
+    def compile(self, axis: Union[TraceAxis, Sequence[float]]) -> _CompiledMask:
+        """Per-point limits for ``axis``; cached for ``TraceAxis`` objects."""
+        if isinstance(axis, TraceAxis):
+            # Dict order doubles as recency order: a hit moves to the end
+            compiled = self._compiled.pop(axis, None)
+            if compiled is None:
+                compiled = _CompiledMask(self.lines, np.asarray(axis.values(), dtype=np.float64))
+                if len(self._compiled) >= self.MAX_COMPILED:
+                    del self._compiled[next(iter(self._compiled))]
+            self._compiled[axis] = compiled
+            return compiled
+        return _CompiledMask(self.lines, np.asarray(axis, dtype=np.float64))
+
+    def evaluate(self, trace: Any, axis: Any = None, offset: Any = 0.0) -> LimitResult:
+        """Checks a trace, ``MeasurementResult`` or 2-D batch against the mask.
+
+        Args:
+            trace: One trace or a batch (one trace per row).
+            axis: ``TraceAxis`` or x array when ``trace`` carries no axis.
+            offset: Added to the limits, e.g. a per-trace reference level
+                for relative (dBc) masks; scalar or one value per trace.
+
+        NaN samples where the mask applies fail with a margin of ``-inf``,
+        so a trace with no valid readings under the mask is a FAIL.
+        """
+        if isinstance(trace, MeasurementResult):
+            if axis is None:
+                axis = trace.axis
+            trace = trace.value
+        y = np.asarray(trace, dtype=np.float64)
+        single = y.ndim == 1
+        y = np.atleast_2d(y)
+        if axis is None:
+            raise ValueError("Limit testing needs a trace axis")
+        compiled = self.compile(axis)
+        if compiled.x.size != y.shape[1]:
+            raise ValueError(f"Axis has {compiled.x.size} points, trace has {y.shape[1]}")
+
+        if not compiled.covered.any():
+            raise ValueError(f"Mask '{self.name}' does not overlap the trace axis")
+
+        off = np.asarray(offset, dtype=np.float64).reshape(-1, 1)
+        margins = np.minimum(compiled.upper + off - y, y - (compiled.lower + off))
+        # A missing reading (NaN) under the mask cannot be shown to pass
+        margins[np.isnan(margins)] = -np.inf
+        margins[:, ~compiled.covered] = np.nan
+
+        worst_idx = np.nanargmin(margins, axis=1)
+        worst = margins[np.arange(y.shape[0]), worst_idx]
+        passed = worst >= 0
+        failures = self._failing_runs(margins, compiled.x)
+        if single:
+            return LimitResult(self.name, margins[0], float(worst[0]), float(compiled.x[worst_idx[0]]),
+                               bool(passed[0]), failures[0])
+        return LimitResult(self.name, margins, worst, compiled.x[worst_idx], passed, failures)
+
+    @staticmethod
+    def _failing_runs(margins: np.ndarray, x: np.ndarray) -> List[List[Tuple[float, float, float]]]:
+        failing = margins < 0  # NaN compares False
+        padded = np.zeros((failing.shape[0], failing.shape[1] + 2), dtype=np.int8)
+        padded[:, 1:-1] = failing
+        edges = np.diff(padded, axis=1)
+        runs: List[List[Tuple[float, float, float]]] = [[] for _ in range(failing.shape[0])]
+        starts = np.argwhere(edges == 1)
+        stops = np.argwhere(edges == -1)
+        for (row, a), (_, b) in zip(starts, stops):
+            runs[row].append((float(x[a]), float(x[b - 1]), float(margins[row, a:b].min())))
+        return runs
+
+    def check(self, result: MeasurementResult, offset: float = 0.0) -> LimitResult:
+        """Evaluates a trace result and records the verdict on it.
+
+        Sets ``result.status`` to ``'PASS'``/``'FAIL'`` and stores the worst
+        margin and failing segments under ``result.metadata['limit']``.
+        """
+        verdict = self.evaluate(result, offset=offset)
+        result.status = verdict.status
+        if result.metadata is None:
+            result.metadata = {}
+        result.metadata["limit"] = {
+            "mask": self.name,
+            "worst_margin": verdict.worst_margin,
+            "worst_x": verdict.worst_x,
+            "failures": verdict.failures,
+        }
+        return verdict
@@ -0,0 +1,377 @@
+"""Host-side peak search, markers and band-power measurements on traces.
+
+One trace transfer replaces a round trip per instrument marker: the N highest
+peaks (with threshold, excursion and prominence rules), interpolated marker
+readings, band/channel power, ACPR and occupied bandwidth are all computed
+from the trace array. Every function accepts a single trace or a 2-D batch of
+traces (one per row); batch work is vectorised across rows.
+
+Traces are ``MeasurementResult`` objects (their ``axis`` supplies the
+frequencies) or plain arrays with an explicit ``axis``/frequency array. Without
+either, positions are reported in points.
+
+Example::
+
+    trace = sa.get_trace_data()
+    for peak in find_peaks(trace, n=20, threshold=-80, excursion=6):
+        print(f"{peak.frequency / 1e6:10.3f} MHz {peak.amplitude:7.2f} dBm")
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..results import MeasurementResult, TraceAxis
+
+
+@dataclass
+class Peak:
+    """One peak of a trace.
+
+    Attributes:
+        index: Trace point of the local maximum.
+        frequency: Interpolated position on the axis (Hz, s or points).
+        amplitude: Interpolated peak level.
+        prominence: Height above the higher of the two surrounding bases.
+        excursion: Smaller of the rises from the neighbouring valleys.
+    """
+    index: int
+    frequency: float
+    amplitude: float
+    prominence: float
+    excursion: float
+
+
+def _is_single(trace: Any) -> bool:
+    return np.ndim(trace.value if isinstance(trace, MeasurementResult) else trace) != 2
+
+
+def _resolve(trace: Any, axis: Any = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns (2-D float array, x positions) for a trace, result or batch."""
+    if isinstance(trace, MeasurementResult):
+        if axis is None:
+            axis = trace.axis
+        trace = trace.value
+    y = np.asarray(trace, dtype=np.float64)
+    if y.ndim == 1:
+        y = y[np.newaxis, :]
+    if y.ndim != 2 or y.shape[1] == 0:
+        raise ValueError(f"Expected a trace or a batch of traces, got shape {y.shape}")
+    points = y.shape[1]
+    if axis is None:
+        x = np.arange(points, dtype=np.float64)
+    elif isinstance(axis, TraceAxis):
+        x = np.asarray(axis.values(), dtype=np.float64)
+    else:
+        x = np.asarray(axis, dtype=np.float64)
+    if x.shape != (points,):
+        raise ValueError(f"Axis has {x.size} points, trace has {points}")
+    return y, x
+
+
+def _interpolate(y: np.ndarray, x: np.ndarray, rows: np.ndarray, idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Parabolic (3-point) interpolation of peak position and level."""
+    inner = (idx > 0) & (idx < y.shape[1] - 1)
+    left = y[rows, np.where(inner, idx - 1, idx)]
+    mid = y[rows, idx]
+    right = y[rows, np.where(inner, idx + 1, idx)]
+    denom = left - 2.0 * mid + right
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = np.where(inner & (denom != 0), 0.5 * (left - right) / denom, 0.0)
+    delta = np.clip(delta, -0.5, 0.5)
+    level = mid - 0.25 * (left - right) * delta
+    pos = np.interp(idx + delta, np.arange(x.size), x)
+    return pos, level
+
+
+class _RangeTable:
+    """Sparse table: minimum or maximum of any index range in O(1) per query."""
+
+    def __init__(self, values: np.ndarray, op: Any) -> None:
+        self.op = op
+        self.levels = [values]
+        span = 1
+        while 2 * span <= values.size:
+            prev = self.levels[-1]
+            self.levels.append(op(prev[:-span], prev[span:]))
+            span *= 2
+
+    def query(self, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        """``op`` over ``values[lo..hi]`` (inclusive), one result per range."""
+        level = np.frexp(hi - lo + 1)[1] - 1   # floor(log2(length))
+        out = np.empty(lo.size, dtype=self.levels[0].dtype)
+        for j in np.unique(level):
+            sel = level == j
+            table = self.levels[j]
+            out[sel] = self.op(table[lo[sel]], table[hi[sel] - (1 << j) + 1])
+        return out
+
+    def first_above(self, start: np.ndarray, value: np.ndarray, step: int) -> np.ndarray:
+        """First index from ``start`` (walking by ``step`` = -1 or +1) whose
+        value exceeds ``value``; a max table only. One exists by construction."""
+        pos = start.copy()
+        size = self.levels[0].size
+        for j in range(len(self.levels) - 1, -1, -1):
+            span = 1 << j
+            table = self.levels[j]
+            # Skip the whole block of 2**j entries next to pos if none rises above value
+            first = pos - span + 1 if step < 0 else pos
+            valid = (first >= 0) & (first + span <= size)
+            skip = valid & (table[np.where(valid, first, 0)] <= value)
+            pos = pos + step * span * skip
+        return pos
+
+
+def _padded(y: np.ndarray) -> np.ndarray:
+    """The batch as one 1-D array with ``+inf`` before, between and after rows.
+
+    No peak rises above the separators, so valleys and prominence bases
+    never reach into a neighbouring row. ``y[r, c]`` lands at
+    ``r * (points + 1) + 1 + c``.
+    """
+    z = np.full((y.shape[0], y.shape[1] + 1), np.inf)
+    z[:, 1:] = y
+    return np.append(z.ravel(), np.inf)
+
+
+def _segment_min(z: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Minimum of ``z`` over each ``[edges[k], edges[k + 1]]`` (both ends included)."""
+    return np.minimum(np.minimum.reduceat(z, edges[:-1]), z[edges[1:]])
+
+
+def _prominence(z: np.ndarray, at: np.ndarray) -> np.ndarray:
+    """Prominence of the peaks at positions ``at`` of a padded batch.
+
+    A base is the lowest point between a peak and the nearest higher point
+    on that side. The nearest higher point can be found among the local
+    maxima alone, so the search runs on the maxima with range tables:
+    O(N log N) for the row(s) plus O(log N) per peak.
+    """
+    top = np.ones(z.size, dtype=bool)
+    top[1:-1] = (z[1:-1] >= z[:-2]) & (z[1:-1] >= z[2:])
+    top[at] = True
+    tops = np.flatnonzero(top)
+    level = z[at]
+    t = np.searchsorted(tops, at)
+    highest = _RangeTable(z[tops], np.maximum)
+    left = highest.first_above(t - 1, level, -1)
+    right = highest.first_above(t + 1, level, 1)
+    valleys = _RangeTable(_segment_min(z, tops), np.minimum)
+    return level - np.maximum(valleys.query(left, t - 1), valleys.query(t, right - 1))
+
+
+def find_peaks(trace: Any, n: Optional[int] = None, threshold: Optional[float] = None,
+               excursion: Optional[float] = None, prominence: Optional[float] = None,
+               min_distance: int = 1, interpolate: bool = True,
+               axis: Any = None) -> Union[List[Peak], List[List[Peak]]]:
+    """Finds peaks, highest first.
+
+    Args:
+        trace: Trace, ``MeasurementResult`` or 2-D batch (one trace per row).
+        n: Maximum number of peaks per trace.
+        threshold: Ignore local maxima below this level.
+        excursion: Minimum rise and fall (same unit as the trace) relative
+            to the valleys towards the neighbouring peaks, as on an analyzer.
+        prominence: Minimum height above the higher of the two bases.
+        min_distance: Minimum separation in points; lower peaks closer than
+            this to a higher one are dropped.
+        interpolate: Refine position and level with a 3-point parabola.
+        axis: ``TraceAxis`` or frequency array when ``trace`` has none.
+
+    Returns:
+        A list of :class:`Peak` for a single trace, or one list per row for
+        a batch.
+    """
+    single = _is_single(trace)
+    y, x = _resolve(trace, axis)
+    traces, points = y.shape
+    # Local maxima for every row at once; plateaus report their first point
+    mask = np.zeros(y.shape, dtype=bool)
+    if points >= 3:
+        mask[:, 1:-1] = (y[:, 1:-1] > y[:, :-2]) & (y[:, 1:-1] >= y[:, 2:])
+    mask[:, 0] = y[:, 0] > y[:, 1] if points > 1 else True
+    if points > 1:
+        mask[:, -1] = y[:, -1] > y[:, -2]
+    if threshold is not None:
+        mask &= y >= threshold
+    rows, cols = np.nonzero(mask)
+    z = _padded(y)
+    at = rows * (points + 1) + 1 + cols
+    level = z[at]
+
+    # Excursion (analyzer definition): rise from the valley on each side,
+    # where valleys lie between neighbouring candidate peaks.
+    edge = np.zeros(z.size, dtype=bool)
+    edge[at] = True
+    edge[::points + 1] = True
+    edges = np.flatnonzero(edge)
+    valleys = _segment_min(z, edges)
+    k = np.searchsorted(edges, at)
+    exc = level - np.maximum(valleys[k - 1], valleys[k])
+    keep = np.ones(at.size, dtype=bool)
+    if excursion is not None:
+        keep &= exc >= excursion
+    prom = None
+    if prominence is not None:
+        prom = np.full(at.size, -np.inf)
+        prom[keep] = _prominence(z, at[keep])
+        keep &= prom >= prominence
+    survivors = np.flatnonzero(keep)
+
+    # Highest first within each row; ties keep trace order
+    order = survivors[np.lexsort((-level[survivors], rows[survivors]))]
+    bounds = np.searchsorted(rows[order], np.arange(traces + 1))
+    chosen = []
+    for r in range(traces):
+        ranked = order[bounds[r]:bounds[r + 1]]
+        if min_distance > 1:
+            # Sliding-window suppression: each kept peak blocks its neighbourhood
+            blocked = np.zeros(points, dtype=bool)
+            taken = []
+            for p in ranked:
+                c = cols[p]
+                if blocked[c]:
+                    continue
+                blocked[max(c - min_distance + 1, 0):c + min_distance] = True
+                taken.append(p)
+                if n is not None and len(taken) == n:
+                    break
+            ranked = np.array(taken, dtype=np.intp)
+        chosen.append(ranked if n is None else ranked[:n])
+    picked = np.concatenate(chosen) if chosen else np.empty(0, dtype=np.intp)
+    # Without a prominence rule, bases are only needed for the peaks returned
+    prom_picked = prom[picked] if prom is not None else _prominence(z, at[picked])
+
+    if interpolate:
+        pos, amp = _interpolate(y, x, rows[picked], cols[picked])
+    else:
+        pos, amp = x[cols[picked]], y[rows[picked], cols[picked]]
+    peaks = [Peak(int(c), float(f), float(a), float(p), float(e))
+             for c, f, a, p, e in zip(cols[picked], pos, amp, prom_picked, exc[picked])]
+    result = []
+    start = 0
+    for ranked in chosen:
+        result.append(peaks[start:start + ranked.size])
+        start += ranked.size
+    return result[0] if single else result
+
+
+def spur_table(trace: Any, **rules: Any) -> List[Dict[str, float]]:
+    """``find_peaks`` output as rows of plain dicts (for logging/CSV)."""
+    return [
+        {"frequency": p.frequency, "amplitude": p.amplitude, "prominence": p.prominence}
+        for p in find_peaks(trace, **rules)
+    ]
+
+
+def marker(trace: Any, frequency: Union[float, Sequence[float]], axis: Any = None) -> np.ndarray:
+    """Trace level at the given frequencies (linear interpolation).
+
+    Returns shape ``(markers,)`` for one trace, ``(traces, markers)`` for a batch.
+    """
+    single = _is_single(trace)
+    y, x = _resolve(trace, axis)
+    f = np.atleast_1d(np.asarray(frequency, dtype=np.float64))
+    out = np.stack([np.interp(f, x, row) for row in y])
+    return out[0] if single else out
+
+
+def _bin_widths(x: np.ndarray) -> np.ndarray:
+    """Width of the frequency bin each point represents."""
+    if x.size == 1:
+        return np.ones(1)
+    edges = np.concatenate(([x[0]], (x[1:] + x[:-1]) / 2, [x[-1]]))
+    widths = np.diff(edges)
+    widths[0] *= 2
+    widths[-1] *= 2
+    return widths
+
+
+def _band_linear(y: np.ndarray, x: np.ndarray, low: np.ndarray, high: np.ndarray,
+                 rbw: Optional[float], nbw_factor: float) -> np.ndarray:
+    """Linear power (mW) per row in each [low, high] band; bands along last axis."""
+    lin = 10.0 ** (y / 10.0)
+    if rbw is not None:
+        # Each point holds the power in one noise bandwidth: scale to its bin
+        lin = lin * (_bin_widths(x) / (rbw * nbw_factor))
+    inside = (x[np.newaxis, :] >= low[:, np.newaxis]) & (x[np.newaxis, :] <= high[:, np.newaxis])
+    return lin @ inside.T.astype(np.float64)
+
+
+def band_power(trace: Any, start: float, stop: float, rbw: Optional[float] = None,
+               nbw_factor: float = 1.0, axis: Any = None) -> Union[float, np.ndarray]:
+    """Integrated power (dBm) between ``start`` and ``stop``.
+
+    Args:
+        rbw: Resolution bandwidth of the trace. When given, points are
+            treated as power spectral density and integrated over their bin
+            width (channel-power method); otherwise point powers are summed
+            (discrete tones).
+        nbw_factor: Noise bandwidth / RBW ratio of the analyzer filter.
+    """
+    single = _is_single(trace)
+    y, x = _resolve(trace, axis)
+    lin = _band_linear(y, x, np.array([start]), np.array([stop]), rbw, nbw_factor)[:, 0]
+    with np.errstate(divide="ignore"):
+        dbm = 10.0 * np.log10(lin)
+    return float(dbm[0]) if single else dbm
+
+
+def acpr(trace: Any, channel_bw: float, spacing: float, center: Optional[float] = None,
+         adjacent_bw: Optional[float] = None, offsets: int = 1, rbw: Optional[float] = None,
+         nbw_factor: float = 1.0, axis: Any = None) -> Dict[str, Any]:
+    """Adjacent channel power ratio.
+
+    Args:
+        channel_bw: Main channel integration bandwidth.
+        spacing: Offset between channel centres.
+        center: Main channel centre; defaults to the axis centre.
+        adjacent_bw: Adjacent channel bandwidth; defaults to ``channel_bw``.
+        offsets: Number of adjacent channel pairs.
+
+    Returns:
+        ``{"channel_power": dBm, "lower": [dBc...], "upper": [dBc...]}``;
+        values are arrays for a batch.
+    """
+    single = _is_single(trace)
+    y, x = _resolve(trace, axis)
+    if center is None:
+        center = (x[0] + x[-1]) / 2
+    adjacent_bw = channel_bw if adjacent_bw is None else adjacent_bw
+    centres = [center] + [center - k * spacing for k in range(1, offsets + 1)] \
+        + [center + k * spacing for k in range(1, offsets + 1)]
+    widths = [channel_bw] + [adjacent_bw] * (2 * offsets)
+    low = np.array([c - w / 2 for c, w in zip(centres, widths)])
+    high = np.array([c + w / 2 for c, w in zip(centres, widths)])
+    with np.errstate(divide="ignore"):
+        dbm = 10.0 * np.log10(_band_linear(y, x, low, high, rbw, nbw_factor))
+    main = dbm[:, 0]
+    lower = dbm[:, 1:1 + offsets] - main[:, np.newaxis]
+    upper = dbm[:, 1 + offsets:] - main[:, np.newaxis]
+    if single:
+        return {"channel_power": float(main[0]), "lower": lower[0].tolist(), "upper": upper[0].tolist()}
+    return {"channel_power": main, "lower": lower, "upper": upper}
+
+
+def occupied_bandwidth(trace: Any, percent: float = 99.0, axis: Any = None) -> Union[Tuple[float, float, float], np.ndarray]:
+    """Bandwidth containing ``percent`` of the total power.
+
+    Returns ``(low, high, bandwidth)`` for one trace, or an array of shape
+    ``(traces, 3)`` for a batch.
+    """
+    if not 0.0 < percent < 100.0:
+        raise ValueError("percent must be between 0 and 100")
+    single = _is_single(trace)
+    y, x = _resolve(trace, axis)
+    lin = 10.0 ** (y / 10.0)
+    cumulative = np.cumsum(lin, axis=1)
+    cumulative /= cumulative[:, -1:]
+    tail = (1.0 - percent / 100.0) / 2.0
+    out = np.empty((y.shape[0], 3))
+    points = np.arange(x.size)
+    for r in range(y.shape[0]):
+        lo = np.interp(np.interp(tail, cumulative[r], points), points, x)
+        hi = np.interp(np.interp(1.0 - tail, cumulative[r], points), points, x)
+        out[r] = (lo, hi, hi - lo)
+    return tuple(float(v) for v in out[0]) if single else out
@@ -0,0 +1,236 @@
+"""Windowed, Welch-averaged spectra of oscilloscope captures.
+
+Scope records are cut into overlapping segments. Each segment is windowed and
+transformed, and the segment powers are averaged (Welch's method). The result
+is a trace with a frequency :class:`~instrumation.results.TraceAxis`, so the SA
+tooling in this package (``find_peaks``, ``band_power``, ``TraceAccumulator``,
+``LimitMask``) works on it unchanged::
+
+    spectrum = welch(scope.get_waveform(1), nperseg=8192)
+    peaks = find_peaks(spectrum, n=5, threshold=-60)
+
+Long captures never have to be in memory at once. A :class:`SpectrumStream`
+takes the record chunk by chunk, keeping the unfinished tail of each chunk for
+the next one (overlap-save), so the segments and the averaged spectrum are
+exactly those of the contiguous record::
+
+    stream = SpectrumStream(nperseg=65536)
+    for chunk in scope.iter_waveform_chunks(1):
+        stream.feed(chunk)
+    spectrum = stream.result()
+
+Samples, windows and transforms stay in float32 (complex64) to halve memory
+and bandwidth on multi-megapoint records; only the per-bin power sum is kept
+in float64. Rows of a multi-channel batch can be spread over ``workers``
+threads; NumPy releases the GIL inside the transforms.
+
+Scaling follows a spectrum analyzer: with ``scaling="spectrum"`` a tone reads
+its power, and ``metadata["rbw"]`` holds the equivalent noise bandwidth of the
+window, which is what ``band_power(..., rbw=...)`` expects for noise. With
+``scaling="density"`` the trace is a power spectral density per Hz.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from ..results import MeasurementResult, TraceAxis
+from .waveform import _record
+
+# Cosine-sum coefficients a0, a1, ... of w[n] = sum (-1)^k a_k cos(2 pi k n / N)
+WINDOWS: Dict[str, Tuple[float, ...]] = {
+    "rectangular": (1.0,),
+    "hann": (0.5, 0.5),
+    "hamming": (0.54, 0.46),
+    "blackman": (0.42, 0.5, 0.08),
+    "blackmanharris": (0.35875, 0.48829, 0.14128, 0.01168),
+    "flattop": (0.21557895, 0.41663158, 0.277263158, 0.083578947, 0.006947368),
+}
+SCALINGS = ("spectrum", "density")
+SPECTRUM_UNITS = ("dBm", "dBV", "V^2")
+
+_SEGMENT_BLOCK = 1 << 22   # samples windowed and transformed per step, bounds temporaries
+
+
+def get_window(name: str, n: int) -> np.ndarray:
+    """Periodic (DFT-even) window of ``n`` points as float32."""
+    if name not in WINDOWS:
+        raise ValueError(f"Unknown window '{name}', expected one of {tuple(WINDOWS)}")
+    phase = 2.0 * np.pi * np.arange(n) / n
+    w = np.zeros(n)
+    for k, a in enumerate(WINDOWS[name]):
+        w += (-1) ** k * a * np.cos(k * phase)
+    return w.astype(np.float32)
+
+
+def _samples(data: Any) -> Tuple[np.ndarray, Optional[float], Any]:
+    """(2-D float32 samples, sample rate or None, channels) of a chunk."""
+    results = data if isinstance(data, (list, tuple)) and data and isinstance(data[0], MeasurementResult) else None
+    if isinstance(data, MeasurementResult):
+        results = [data]
+    if results is None:
+        y = np.asarray(data, dtype=np.float32)
+        return (y[np.newaxis, :] if y.ndim == 1 else y), None, None
+    records = [_record(r) for r in results]
+    rate = (data.metadata or {}).get("sample_rate") if isinstance(data, MeasurementResult) else None
+    if rate is None and records[0][1]:
+        rate = 1.0 / records[0][1]
+    y = np.stack([np.asarray(rec[0], dtype=np.float32) for rec in records])
+    channel = results[0].channel if len(results) == 1 else [r.channel for r in results]
+    return y, rate, channel
+
+
+class SpectrumStream:
+    """Welch spectrum accumulated over a record fed in chunks.
+
+    Args:
+        sample_rate: Samples per second. Taken from the first chunk's time
+            axis (or preamble) when omitted.
+        nperseg: Segment (FFT) length in samples.
+        overlap: Fraction of a segment shared with the next one.
+        window: Name from ``WINDOWS``.
+        scaling: ``"spectrum"`` (power per bin) or ``"density"`` (per Hz).
+        unit: ``"dBm"`` (power into ``impedance``), ``"dBV"`` or linear ``"V^2"``.
+        impedance: Load for ``"dBm"``, in ohms.
+        workers: Threads for multi-channel chunks (one row per task).
+    """
+
+    def __init__(self, sample_rate: Optional[float] = None, nperseg: int = 4096, overlap: float = 0.5,
+                 window: str = "hann", scaling: str = "spectrum", unit: str = "dBm",
+                 impedance: float = 50.0, workers: int = 1) -> None:
+        if nperseg < 2:
+            raise ValueError(f"nperseg must be at least 2, got {nperseg}")
+        if not 0 <= overlap < 1:
+            raise ValueError(f"overlap must be in [0, 1), got {overlap}")
+        if scaling not in SCALINGS:
+            raise ValueError(f"Unknown scaling '{scaling}', expected one of {SCALINGS}")
+        if unit not in SPECTRUM_UNITS:
+            raise ValueError(f"Unknown unit '{unit}', expected one of {SPECTRUM_UNITS}")
+        self.sample_rate = sample_rate
+        self.nperseg = nperseg
+        self.step = max(1, int(round(nperseg * (1 - overlap))))
+        self.window_name = window
+        self.window = get_window(window, nperseg)
+        self.scaling = scaling
+        self.unit = unit
+        self.impedance = impedance
+        self.workers = workers
+        self.channel = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Drops the accumulated spectrum and any carried samples."""
+        self._tail: Optional[np.ndarray] = None
+        self._power: Optional[np.ndarray] = None
+        self.segments = 0
+
+    def _accumulate(self, row: np.ndarray, count: int) -> np.ndarray:
+        """Sum of |FFT|^2 over ``count`` segments of one row."""
+        segs = np.lib.stride_tricks.sliding_window_view(row, self.nperseg)[::self.step][:count]
+        total = np.zeros(self.nperseg // 2 + 1)
+        block = max(1, _SEGMENT_BLOCK // self.nperseg)
+        for start in range(0, count, block):
+            spec = np.fft.rfft(segs[start:start + block] * self.window, axis=-1)
+            total += (spec.real * spec.real + spec.imag * spec.imag).sum(axis=0, dtype=np.float64)
+        return total
+
+    def feed(self, chunk: Any) -> int:
+        """Adds the next chunk of samples; returns the number of new segments.
+
+        A chunk is a scope ``MeasurementResult``, a list of them (one per
+        channel), or an array with one channel per row. Every chunk must have
+        the same channels, in the same order.
+        """
+        return self._feed(*_samples(chunk))
+
+    def _feed(self, y: np.ndarray, rate: Optional[float], channel: Any) -> int:
+        if self.sample_rate is None:
+            self.sample_rate = rate
+        if self.channel is None:
+            self.channel = channel
+        if self._tail is not None:
+            if self._tail.shape[0] != y.shape[0]:
+                raise ValueError(f"Chunk has {y.shape[0]} channels, the stream has {self._tail.shape[0]}")
+            y = np.concatenate((self._tail, y), axis=1)
+        count = 0 if y.shape[1] < self.nperseg else (y.shape[1] - self.nperseg) // self.step + 1
+        if count:
+            if self.workers > 1 and y.shape[0] > 1:
+                with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="spectral") as pool:
+                    power = np.stack(list(pool.map(lambda row: self._accumulate(row, count), y)))
+            else:
+                power = np.stack([self._accumulate(row, count) for row in y])
+            self._power = power if self._power is None else self._power + power
+            self.segments += count
+        # Samples not yet consumed by a full segment start the next one
+        self._tail = y[:, count * self.step:].copy()
+        return count
+
+    @property
+    def rbw(self) -> float:
+        """Equivalent noise bandwidth of one bin (Hz)."""
+        w = self.window.astype(np.float64)
+        return self.sample_rate * float(np.sum(w * w)) / float(np.sum(w)) ** 2
+
+    def result(self) -> MeasurementResult:
+        """The averaged one-sided spectrum as a trace result."""
+        if self._power is None:
+            raise ValueError(f"Need at least {self.nperseg} samples for one segment, got {self._tail_size()}")
+        if not self.sample_rate:
+            raise ValueError("A sample_rate is required (no time axis in the chunks)")
+        w = self.window.astype(np.float64)
+        if self.scaling == "spectrum":
+            norm = float(np.sum(w)) ** 2
+        else:
+            norm = self.sample_rate * float(np.sum(w * w))
+        power = self._power / (self.segments * norm)
+        # One-sided: fold the negative frequencies onto every bin except DC (and Nyquist)
+        power[:, 1:(None if self.nperseg % 2 else -1)] *= 2.0
+        if self.unit == "dBm":
+            with np.errstate(divide="ignore"):
+                value = 10.0 * np.log10(power / self.impedance / 1e-3)
+        elif self.unit == "dBV":
+            with np.errstate(divide="ignore"):
+                value = 10.0 * np.log10(power)
+        else:
+            value = power
+        unit = self.unit + ("/Hz" if self.scaling == "density" else "")
+        bins = power.shape[1]
+        axis = TraceAxis(0.0, (bins - 1) * self.sample_rate / self.nperseg, bins, unit="Hz")
+        value = value.astype(np.float32)
+        return MeasurementResult(
+            value[0] if value.shape[0] == 1 else value, unit, channel=self.channel, axis=axis,
+            metadata={"rbw": self.rbw, "sample_rate": self.sample_rate, "segments": self.segments,
+                      "nperseg": self.nperseg, "window": self.window_name, "scaling": self.scaling},
+        )
+
+    def _tail_size(self) -> int:
+        return 0 if self._tail is None else self._tail.shape[1]
+
+
+def welch(waveform: Any, sample_rate: Optional[float] = None, **options: Any) -> MeasurementResult:
+    """Welch-averaged spectrum of a capture, a channel batch or a chunk stream.
+
+    Args:
+        waveform: A scope ``MeasurementResult``, a list of them (one per
+            channel), an array with one channel per row, or an iterator of
+            chunks such as ``scope.iter_waveform_chunks(1)``.
+        sample_rate: Samples per second; defaults to the waveform's time axis.
+        **options: :class:`SpectrumStream` settings (``nperseg``, ``overlap``,
+            ``window``, ``scaling``, ``unit``, ``impedance``, ``workers``).
+            ``nperseg`` is clipped to the record length of a single capture.
+
+    Returns:
+        A trace ``MeasurementResult`` with a frequency axis; one row per
+        channel for a batch.
+    """
+    if not isinstance(waveform, (MeasurementResult, list, tuple, np.ndarray)):
+        stream = SpectrumStream(sample_rate, **options)
+        for chunk in waveform:
+            stream.feed(chunk)
+        return stream.result()
+    samples = _samples(waveform)
+    options["nperseg"] = min(options.get("nperseg", 4096), samples[0].shape[1])
+    stream = SpectrumStream(sample_rate, **options)
+    stream._feed(*samples)
+    return stream.result()
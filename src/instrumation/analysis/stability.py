@@ -0,0 +1,152 @@
+"""Frequency stability statistics for gap-free counter readings.
+
+All statistics run on whole arrays: the readings are integrated once into
+phase, and each averaging time is a handful of slice operations. Input is a
+frequency array (Hz) or the ``MeasurementResult`` of a gap-free stream, whose
+``metadata["interval"]`` supplies the reading interval ``tau0``::
+
+    readings = np.concatenate([c.value for c in counter.stream_frequency(1e-3, 100000)])
+    taus, adev = allan_deviation(readings, tau0=1e-3)
+    taus, mdev = modified_allan_deviation(readings, tau0=1e-3)
+    fit = drift_fit(readings, tau0=1e-3)        # {"slope", "fractional_rate", ...}
+
+The statistics assume readings without dead time between gates; readings from
+``measure_frequency()`` loops underestimate low-frequency noise.
+"""
+
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..results import MeasurementResult
+
+TAU_SPACINGS = ("octave", "decade", "all")
+
+
+def _readings(data: Any, tau0: Optional[float]) -> Tuple[np.ndarray, float]:
+    if isinstance(data, MeasurementResult):
+        if tau0 is None:
+            tau0 = (data.metadata or {}).get("interval")
+        data = data.value
+    values = np.asarray(data, dtype=np.float64).ravel()
+    if tau0 is None or tau0 <= 0:
+        raise ValueError("A positive reading interval tau0 is required")
+    return values, float(tau0)
+
+
+def fractional_frequency(data: Any, nominal: Optional[float] = None) -> np.ndarray:
+    """Fractional frequency ``(f - f0) / f0``; ``f0`` defaults to the mean."""
+    if isinstance(data, MeasurementResult):
+        data = data.value
+    freqs = np.asarray(data, dtype=np.float64).ravel()
+    f0 = float(np.mean(freqs)) if nominal is None else nominal
+    return (freqs - f0) / f0
+
+
+def _factors(n: int, max_m: int, taus: Union[str, Sequence[float]], tau0: float) -> np.ndarray:
+    """Averaging factors m (tau = m * tau0) that the record length supports."""
+    if isinstance(taus, str):
+        if taus not in TAU_SPACINGS:
+            raise ValueError(f"Unknown tau spacing '{taus}', expected one of {TAU_SPACINGS}")
+        if taus == "all":
+            m = np.arange(1, max_m + 1)
+        elif taus == "octave":
+            m = 2 ** np.arange(int(np.log2(max(max_m, 1))) + 1)
+        else:
+            # 1-2-5 steps per decade
+            decades = 10 ** np.arange(int(np.log10(max(max_m, 1))) + 1)
+            m = np.outer(decades, [1, 2, 5]).ravel()
+    else:
+        m = np.unique(np.round(np.asarray(taus, dtype=np.float64) / tau0))
+    m = m.astype(int)
+    return m[(m >= 1) & (m <= max_m)]
+
+
+def allan_deviation(data: Any, tau0: Optional[float] = None,
+                    taus: Union[str, Sequence[float]] = "octave",
+                    nominal: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Overlapping Allan deviation of gap-free frequency readings.
+
+    Args:
+        data: Frequencies in Hz (or a stream ``MeasurementResult``).
+        tau0: Reading interval in seconds (the gate time for gap-free readings).
+        taus: ``"octave"``, ``"decade"``, ``"all"`` or explicit averaging times.
+        nominal: Reference frequency for the fractional conversion.
+
+    Returns:
+        ``(taus, adev)`` arrays.
+    """
+    freqs, tau0 = _readings(data, tau0)
+    y = fractional_frequency(freqs, nominal)
+    x = np.concatenate([[0.0], np.cumsum(y)]) * tau0  # phase, seconds
+    n = x.size
+    m = _factors(n, (n - 1) // 2, taus, tau0)
+    adev = np.empty(m.size)
+    for k, mk in enumerate(m):
+        d = x[2 * mk:] - 2.0 * x[mk:n - mk] + x[:n - 2 * mk]
+        adev[k] = np.sqrt(np.dot(d, d) / (2.0 * (mk * tau0) ** 2 * d.size))
+    return m * tau0, adev
+
+
+def modified_allan_deviation(data: Any, tau0: Optional[float] = None,
+                             taus: Union[str, Sequence[float]] = "octave",
+                             nominal: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Modified Allan deviation; separates white from flicker phase noise.
+
+    Arguments as for :func:`allan_deviation`.
+    """
+    freqs, tau0 = _readings(data, tau0)
+    y = fractional_frequency(freqs, nominal)
+    x = np.concatenate([[0.0], np.cumsum(y)]) * tau0
+    n = x.size
+    m = _factors(n, n // 3, taus, tau0)
+    mdev = np.empty(m.size)
+    for k, mk in enumerate(m):
+        d = x[2 * mk:] - 2.0 * x[mk:n - mk] + x[:n - 2 * mk]
+        # Moving sum of m consecutive second differences
+        c = np.concatenate([[0.0], np.cumsum(d)])
+        s = c[mk:] - c[:-mk]
+        mdev[k] = np.sqrt(np.dot(s, s) / (2.0 * mk ** 2 * (mk * tau0) ** 2 * s.size))
+    return m * tau0, mdev
+
+
+def drift_fit(data: Any, tau0: Optional[float] = None, order: int = 1) -> Dict[str, Any]:
+    """Least-squares polynomial fit of frequency against time.
+
+    Returns:
+        ``slope`` (Hz/s), ``fractional_rate`` (slope / mean frequency, per
+        second), ``intercept`` (Hz at the first reading), ``coefficients``
+        (highest power first) and ``residual_rms`` (Hz).
+    """
+    freqs, tau0 = _readings(data, tau0)
+    if order < 1:
+        raise ValueError("order must be at least 1")
+    t = np.arange(freqs.size) * tau0
+    coefficients = np.polyfit(t, freqs, order)
+    residuals = freqs - np.polyval(coefficients, t)
+    slope = float(coefficients[-2])
+    return {
+        "slope": slope,
+        "fractional_rate": slope / float(np.mean(freqs)),
+        "intercept": float(coefficients[-1]),
+        "coefficients": coefficients,
+        "residual_rms": float(np.sqrt(np.mean(residuals ** 2))),
+    }
+
+
+def histogram(data: Any, bins: Union[int, str] = 50, fractional: bool = False) -> Dict[str, Any]:
+    """Distribution of the readings (or of their fractional frequency).
+
+    Returns:
+        ``counts``, bin ``edges``, and the ``mean``, ``std``, ``min`` and
+        ``max`` of the values.
+    """
+    if isinstance(data, MeasurementResult):
+        data = data.value
+    values = fractional_frequency(data) if fractional else np.asarray(data, dtype=np.float64).ravel()
+    counts, edges = np.histogram(values, bins=bins)
+    return {
+        "counts": counts, "edges": edges,
+        "mean": float(np.mean(values)), "std": float(np.std(values, ddof=1)) if values.size > 1 else 0.0,
+        "min": float(np.min(values)), "max": float(np.max(values)),
+    }
@@ -0,0 +1,317 @@
+"""Host-side oscilloscope measurements on transferred waveforms.
+
+Each ``:MEASure`` query costs a round trip per parameter per channel. Here a
+channel is fetched once and the full parameter table is computed from the
+record with array operations. Many channels and captures go through one call
+as a batch, with one waveform per row::
+
+    table = measure_waveform([scope.get_waveform(ch) for ch in (1, 2, 3, 4)])
+    table["frequency"]          # array, one entry per channel
+    table.rising_edges[0]       # mid-level crossing times of channel 1
+
+The definitions follow the scopes' automatic measurements (IEEE 181 style):
+
+* ``vtop``/``vbase`` are the most common levels in the upper and lower half
+  of the record (histogram mode). A half without a flat level, as in a sine
+  or triangle, falls back to ``vmax``/``vmin``.
+* Thresholds are 10 %, 50 % and 90 % of ``vamp = vtop - vbase`` by default.
+  An edge must cross both the low and the high threshold, so noise around
+  the mid level does not add edges.
+* Edge times are interpolated mid-level crossings. ``rise_time`` and
+  ``fall_time`` run between the low and high crossings of each edge.
+* ``period`` averages over all complete cycles between the first and last
+  rising edge (falling edges if there are fewer than two rising ones).
+  ``duty_cycle`` is the mean positive width over the period.
+* ``overshoot`` and ``preshoot`` are ``(vmax - vtop)`` and ``(vbase - vmin)``
+  in percent of ``vamp``. ``vrms`` and ``vavg`` cover the whole record.
+
+Timing parameters are averaged over every edge in the record, like the
+scope's measurement statistics. They are NaN when the record holds too few
+edges.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..results import MeasurementResult, TraceAxis
+
+# Parameter name -> unit ("V" stands for the waveform's own unit)
+WAVEFORM_PARAMETERS = {
+    "vmax": "V", "vmin": "V", "vpp": "V", "vtop": "V", "vbase": "V", "vamp": "V",
+    "vavg": "V", "vrms": "V", "overshoot": "%", "preshoot": "%",
+    "frequency": "Hz", "period": "s", "duty_cycle": "%",
+    "positive_width": "s", "negative_width": "s", "rise_time": "s", "fall_time": "s",
+}
+
+_HISTOGRAM_BINS = 256      # one bin per code of an 8-bit scope
+_FLAT_LEVEL_SHARE = 0.05   # mode bin share of a half-record to count as a flat top/base
+
+
+@dataclass
+class WaveformMeasurements:
+    """Parameter table of one waveform or a batch.
+
+    For a single waveform every parameter is a float and the edge lists are
+    arrays. For a batch the parameters are arrays shaped like the batch, and
+    ``rising_edges``/``falling_edges`` hold one array per waveform in row
+    order.
+
+    Attributes:
+        parameters: Parameter name -> value (see ``WAVEFORM_PARAMETERS``).
+        units: Parameter name -> unit.
+        rising_edges: Mid-level rising crossing times (s).
+        falling_edges: Mid-level falling crossing times (s).
+        channels: Channel of each waveform, when the inputs carried one.
+    """
+    parameters: Dict[str, Any]
+    units: Dict[str, str]
+    rising_edges: Any
+    falling_edges: Any
+    channels: List[Any] = field(default_factory=list)
+
+    def __getitem__(self, name: str) -> Any:
+        return self.parameters[name]
+
+    def result(self, name: str) -> MeasurementResult:
+        """One parameter as a ``MeasurementResult``."""
+        channel = self.channels[0] if len(self.channels) == 1 else None
+        return MeasurementResult(self.parameters[name], self.units[name], channel=channel)
+
+    def table(self) -> List[Dict[str, Any]]:
+        """One row per waveform, for a logger or a DataFrame."""
+        columns = {k: np.ravel(v) for k, v in self.parameters.items()}
+        rows = []
+        for i in range(len(columns["vpp"])):
+            row = {"channel": self.channels[i] if i < len(self.channels) else None}
+            row.update({k: float(v[i]) for k, v in columns.items()})
+            rows.append(row)
+        return rows
+
+
+def _record(result: MeasurementResult) -> Tuple[np.ndarray, Optional[float], float]:
+    """(volts, sample interval, first sample time) of a scope result."""
+    value = result.value
+    if isinstance(value, tuple) and len(value) == 2:
+        value = value[1]   # (time, voltage) records
+    axis = result.axis
+    preamble = (result.metadata or {}).get("preamble") or {}
+    if isinstance(axis, TraceAxis) and axis.points > 1:
+        return np.asarray(value, dtype=np.float64), axis.step, axis.start
+    if "x_increment" in preamble:
+        x0 = preamble.get("x_origin", 0.0) - preamble.get("x_reference", 0) * preamble["x_increment"]
+        return np.asarray(value, dtype=np.float64), preamble["x_increment"], x0
+    return np.asarray(value, dtype=np.float64), None, 0.0
+
+
+def _flatten(data: Any) -> Optional[Tuple[List[MeasurementResult], Tuple[int, ...]]]:
+    """Flattens a (nested) sequence of results; None if ``data`` holds none."""
+    if isinstance(data, MeasurementResult):
+        return [data], ()
+    if isinstance(data, (list, tuple)) and data and not isinstance(data[0], (int, float)):
+        parts = [_flatten(d) for d in data]
+        if all(p is not None for p in parts) and len({p[1] for p in parts}) == 1:
+            return [r for p in parts for r in p[0]], (len(parts),) + parts[0][1]
+    return None
+
+
+def _batch(data: Any, x_increment: Optional[float], x_origin: Any):
+    """Returns (2-D volts, dt, per-row x0, batch shape, unit, channels)."""
+    flat = _flatten(data)
+    if flat is not None:
+        results, shape = flat
+        records = [_record(r) for r in results]
+        lengths = {rec[0].size for rec in records}
+        if len(lengths) != 1:
+            raise ValueError(f"Waveforms in a batch must have the same length, got {sorted(lengths)}")
+        steps = [rec[1] for rec in records if rec[1] is not None]
+        if x_increment is None and steps:
+            if not np.allclose(steps, steps[0], rtol=1e-9, atol=0):
+                raise ValueError("Waveforms in a batch must share one sample interval")
+            x_increment = steps[0]
+        y = np.stack([rec[0] for rec in records])
+        x0 = np.array([rec[2] for rec in records]) if x_origin is None else x_origin
+        channels = [r.channel for r in results if r.channel is not None]
+        unit = results[0].unit
+    else:
+        y = np.asarray(data, dtype=np.float64)
+        shape = y.shape[:-1]
+        y = y.reshape(-1, y.shape[-1]) if y.ndim else y.reshape(1, 1)
+        x0 = 0.0 if x_origin is None else x_origin
+        channels, unit = [], "V"
+    if x_increment is None or x_increment <= 0:
+        raise ValueError("A positive sample interval x_increment is required")
+    if y.shape[1] < 3:
+        raise ValueError(f"Waveforms need at least 3 points, got {y.shape[1]}")
+    x0 = np.broadcast_to(np.asarray(x0, dtype=np.float64).ravel(), (y.shape[0],))
+    return y, float(x_increment), x0, shape, unit, channels
+
+
+def _levels(y: np.ndarray, vmin: np.ndarray, vmax: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Histogram-mode top and base of every row."""
+    rows, n = y.shape
+    bins = _HISTOGRAM_BINS
+    span = np.where(vmax > vmin, vmax - vmin, 1.0)
+    idx = ((y - vmin[:, None]) * ((bins - 1) / span)[:, None]).round().astype(np.intp)
+    idx += (np.arange(rows) * bins)[:, None]
+    counts = np.bincount(idx.ravel(), minlength=rows * bins).reshape(rows, bins)
+    sums = np.bincount(idx.ravel(), weights=y.ravel(), minlength=rows * bins).reshape(rows, bins)
+    half = bins // 2
+    levels = []
+    for lo, hi, fallback in ((half, bins, vmax), (0, half, vmin)):
+        part = counts[:, lo:hi]
+        mode = part.argmax(axis=1)
+        mode_count = part[np.arange(rows), mode]
+        flat = mode_count >= _FLAT_LEVEL_SHARE * np.maximum(part.sum(axis=1), 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            level = sums[np.arange(rows), lo + mode] / mode_count
+        levels.append(np.where(flat & (mode_count > 0), level, fallback))
+    return levels[0], levels[1]
+
+
+def _crossings(y: np.ndarray, level: np.ndarray, rising: bool, inclusive_start: bool) -> np.ndarray:
+    """Flat indices i where row y crosses ``level`` between samples i and i + 1."""
+    a, b, lv = y[:, :-1], y[:, 1:], level[:, None]
+    if rising:
+        hit = (a <= lv) & (b > lv) if inclusive_start else (a < lv) & (b >= lv)
+    else:
+        hit = (a >= lv) & (b < lv) if inclusive_start else (a > lv) & (b <= lv)
+    cond = np.zeros(y.shape, dtype=bool)
+    cond[:, :-1] = hit
+    return np.flatnonzero(cond)
+
+
+def _interp(flat_y: np.ndarray, at: np.ndarray, level: np.ndarray) -> np.ndarray:
+    """Fractional sample position of the crossing in [at, at + 1]."""
+    a, b = flat_y[at], flat_y[at + 1]
+    return at + (level - a) / (b - a)
+
+
+def _row_mean(rows: np.ndarray, values: np.ndarray, count: int) -> np.ndarray:
+    n = np.bincount(rows, minlength=count)
+    total = np.bincount(rows, weights=values, minlength=count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 0, total / np.maximum(n, 1), np.nan)
+
+
+def _period(rows: np.ndarray, times: np.ndarray, count: int) -> np.ndarray:
+    """Mean cycle length from the first to the last edge of each row."""
+    n = np.bincount(rows, minlength=count)
+    period = np.full(count, np.nan)
+    usable = n >= 2
+    if usable.any():
+        last = np.cumsum(n) - 1
+        first = last - n + 1
+        period[usable] = (times[last[usable]] - times[first[usable]]) / (n[usable] - 1)
+    return period
+
+
+def _edges(y: np.ndarray, low: np.ndarray, mid: np.ndarray, high: np.ndarray):
+    """Hysteresis edges: (flat mid position, direction, rise/fall duration in samples)."""
+    rows, n = y.shape
+    flat_y = y.ravel()
+    state = np.where(y >= high[:, None], 1, np.where(y <= low[:, None], -1, 0)).astype(np.int8).ravel()
+    settled = np.flatnonzero(state)
+    s = state[settled]
+    change = np.flatnonzero((s[1:] != s[:-1]) & (settled[1:] // n == settled[:-1] // n)) + 1
+    if change.size == 0:
+        empty = np.empty(0)
+        return empty, empty.astype(np.int8), empty
+    arrive = settled[change]              # first sample past the far threshold
+    direction = s[change]
+    row_of = arrive // n
+    out_pos = np.empty(arrive.size)
+    out_dur = np.empty(arrive.size)
+    for sign in (1, -1):
+        sel = direction == sign
+        if not sel.any():
+            continue
+        r, j = row_of[sel], arrive[sel]
+        rising = sign == 1
+        mid_x = _crossings(y, mid, rising, inclusive_start=False)
+        # Last mid crossing before the edge settled
+        at_mid = mid_x[np.searchsorted(mid_x, j, side="left") - 1]
+        start_level, end_level = (low, high) if rising else (high, low)
+        start_x = _crossings(y, start_level, rising, inclusive_start=True)
+        end_x = _crossings(y, end_level, rising, inclusive_start=False)
+        at_start = start_x[np.searchsorted(start_x, at_mid, side="right") - 1]
+        at_end = end_x[np.searchsorted(end_x, at_mid, side="left")]
+        out_pos[sel] = _interp(flat_y, at_mid, mid[r])
+        out_dur[sel] = _interp(flat_y, at_end, end_level[r]) - _interp(flat_y, at_start, start_level[r])
+    return out_pos, direction, out_dur
+
+
+def measure_waveform(waveform: Any, x_increment: Optional[float] = None, x_origin: Any = None,
+                     thresholds: Sequence[float] = (10.0, 50.0, 90.0)) -> WaveformMeasurements:
+    """Computes the full parameter table of one waveform or a batch.
+
+    Args:
+        waveform: A scope ``MeasurementResult`` (its time ``axis`` or
+            preamble supplies the sample interval), a (nested) list of them,
+            or an array with one waveform per row along the last axis, e.g.
+            ``(captures, channels, points)``.
+        x_increment: Sample interval in seconds. Required for plain arrays;
+            overrides the interval of results.
+        x_origin: Time of the first sample (scalar or one per waveform).
+        thresholds: Low, mid and high reference levels in percent of the
+            amplitude.
+
+    Returns:
+        A :class:`WaveformMeasurements` with every parameter of
+        ``WAVEFORM_PARAMETERS``.
+    """
+    low_pct, mid_pct, high_pct = thresholds
+    if not 0 <= low_pct < mid_pct < high_pct <= 100:
+        raise ValueError(f"Thresholds must rise within 0..100 %, got {tuple(thresholds)}")
+    y, dt, x0, shape, unit, channels = _batch(waveform, x_increment, x_origin)
+    rows, n = y.shape
+
+    vmax, vmin = y.max(axis=1), y.min(axis=1)
+    vtop, vbase = _levels(y, vmin, vmax)
+    vamp = vtop - vbase
+    with np.errstate(invalid="ignore", divide="ignore"):
+        overshoot = np.where(vamp > 0, (vmax - vtop) / vamp * 100.0, np.nan)
+        preshoot = np.where(vamp > 0, (vbase - vmin) / vamp * 100.0, np.nan)
+    params = {
+        "vmax": vmax, "vmin": vmin, "vpp": vmax - vmin, "vtop": vtop, "vbase": vbase, "vamp": vamp,
+        "vavg": y.mean(axis=1), "vrms": np.sqrt(np.einsum("ij,ij->i", y, y) / n),
+        "overshoot": overshoot, "preshoot": preshoot,
+    }
+
+    low, mid, high = (vbase + vamp * (pct / 100.0) for pct in (low_pct, mid_pct, high_pct))
+    nan = np.full(rows, np.nan)
+    if np.any(vamp > 0):
+        pos, direction, duration = _edges(y, low, mid, high)
+    else:
+        pos, direction, duration = np.empty(0), np.empty(0, dtype=np.int8), np.empty(0)
+    row_of = (pos // n).astype(np.intp)
+    times = x0[row_of] + (pos - row_of * n) * dt
+    rise, fall = direction == 1, direction == -1
+    params["rise_time"] = _row_mean(row_of[rise], duration[rise] * dt, rows) if rise.any() else nan
+    params["fall_time"] = _row_mean(row_of[fall], duration[fall] * dt, rows) if fall.any() else nan
+
+    # Widths between consecutive (alternating) edges of the same row
+    same_row = row_of[1:] == row_of[:-1]
+    gaps = times[1:] - times[:-1]
+    pos_w = same_row & (direction[:-1] == 1)
+    neg_w = same_row & (direction[:-1] == -1)
+    params["positive_width"] = _row_mean(row_of[:-1][pos_w], gaps[pos_w], rows) if pos_w.any() else nan
+    params["negative_width"] = _row_mean(row_of[:-1][neg_w], gaps[neg_w], rows) if neg_w.any() else nan
+
+    # Rising edges set the period; falling edges stand in where they cannot
+    period = _period(row_of[rise], times[rise], rows)
+    period = np.where(np.isnan(period), _period(row_of[fall], times[fall], rows), period)
+    params["period"] = period
+    with np.errstate(invalid="ignore", divide="ignore"):
+        params["frequency"] = 1.0 / period
+        params["duty_cycle"] = params["positive_width"] / period * 100.0
+
+    units = {k: (unit if u == "V" else u) for k, u in WAVEFORM_PARAMETERS.items()}
+    rising_edges = np.split(times[rise], np.searchsorted(row_of[rise], np.arange(1, rows)))
+    falling_edges = np.split(times[fall], np.searchsorted(row_of[fall], np.arange(1, rows)))
+    if shape == ():
+        return WaveformMeasurements({k: float(v[0]) for k, v in params.items()}, units,
+                                    rising_edges[0], falling_edges[0], channels)
+    return WaveformMeasurements({k: np.asarray(v).reshape(shape) for k, v in params.items()}, units,
+                                rising_edges, falling_edges, channels)
@@ -0,0 +1,250 @@
+"""Buffered burst readings from digital multimeters.
+
+``measure_voltage()`` and friends configure the meter and take one reading per
+call, which caps throughput at a few readings per second. A
+:class:`ReadingBurst` configures the measurement once, arms the meter for a
+whole burst (``SAMP:COUN`` x ``TRIG:COUN``) and lets it fill its reading memory
+while the host drains it in binary blocks::
+
+    with dmm.burst("VOLT:DC", samples=5000, nplc=0.02) as burst:
+        result = burst.read()            # numpy array of 5000 readings
+
+    with dmm.burst("CURR:DC", samples=100000, nplc=0.2) as burst:
+        for chunk in burst.stream(chunk=2000):
+            log(chunk.value, chunk.metadata["timestamps"])
+
+Drivers opt in by declaring ``BURST_*`` class attributes. Meters without them
+(including the simulated ones) fall back to repeated ``measure_*()`` calls so
+scripts run unchanged.
+"""
+
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .exceptions import ConfigurationError, InstrumentTimeout
+from .results import MeasurementResult
+
+FUNCTION_UNITS = {
+    "VOLT": "V", "CURR": "A", "RES": "Ohm", "FRES": "Ohm",
+    "FREQ": "Hz", "PER": "s", "TEMP": "C", "CAP": "F",
+}
+
+# Per-reading driver calls used when a meter has no burst support
+_FALLBACK: Dict[str, Tuple[str, Dict[str, Any]]] = {
+    "VOLT:DC": ("measure_voltage", {}),
+    "VOLT:AC": ("measure_voltage", {"ac": True}),
+    "CURR:DC": ("measure_current", {}),
+    "CURR:AC": ("measure_current", {"ac": True}),
+    "RES": ("measure_resistance", {}),
+    "FRES": ("measure_resistance", {"four_wire": True}),
+    "FREQ": ("measure_frequency", {}),
+    "PER": ("measure_period", {}),
+}
+
+
+def _normalize_function(function: str) -> str:
+    function = function.upper().lstrip(":")
+    if function in ("VOLT", "CURR"):
+        function += ":DC"
+    return function
+
+
+class ReadingBurst:
+    """Context manager running one buffered burst on ``driver``.
+
+    Args:
+        driver: Connected multimeter driver.
+        function: Measurement function, e.g. ``"VOLT:DC"``, ``"CURR:AC"``,
+            ``"RES"``.
+        samples: Readings per trigger (``SAMP:COUN``).
+        triggers: Triggers accepted (``TRIG:COUN``); the burst holds
+            ``samples * triggers`` readings.
+        nplc: Integration time in power-line cycles.
+        aperture: Integration time in seconds. Meters without an aperture
+            command get the equivalent NPLC at their line frequency.
+        trigger_source: ``"IMM"`` (default), ``"BUS"`` or ``"EXT"``.
+        channel: Input channel, for instruments with several.
+
+    Driver attributes:
+        BURST_CONFIGURE: Selects the function (``{function}``, ``{channel}``).
+        BURST_NPLC / BURST_APERTURE: Integration time (``{function}``, ``{value}``).
+        BURST_ARM: Sent once on entry (``{samples}``, ``{triggers}``, ``{total}``,
+            ``{source}``), including the binary ``FORM`` selection.
+        BURST_START: Starts the burst.
+        BURST_FETCH: Binary fetch of up to ``{count}`` readings.
+        BURST_DRAINS: True if the fetch removes readings from memory (so the
+            burst can be streamed); otherwise the whole burst is fetched once
+            ``BURST_POINTS`` reports it complete.
+        BURST_POINTS: Query for the number of readings in memory.
+        BURST_DTYPE: NumPy dtype of the binary readings.
+        BURST_GAP_FREE: True if readings follow each other without dead time
+            (e.g. a counter in continuous mode); timestamps are then exact
+            multiples of ``aperture`` after the start instead of host times.
+        BURST_TEARDOWN: Sent on exit.
+    """
+
+    def __init__(self, driver: Any, function: str = "VOLT:DC", samples: int = 1000,
+                 triggers: int = 1, nplc: Optional[float] = None,
+                 aperture: Optional[float] = None, trigger_source: str = "IMM",
+                 channel: int = 1) -> None:
+        if samples < 1 or triggers < 1:
+            raise ValueError("samples and triggers must be at least 1")
+        if nplc is not None and aperture is not None:
+            raise ValueError("Give either nplc or aperture, not both")
+        self.driver = driver
+        self.function = _normalize_function(function)
+        self.unit = FUNCTION_UNITS.get(self.function.split(":")[0], "")
+        self.samples = samples
+        self.triggers = triggers
+        self.total = samples * triggers
+        self.nplc = nplc
+        self.aperture = aperture
+        self.trigger_source = trigger_source.upper()
+        self.channel = channel
+        self.buffered = getattr(driver, "BURST_FETCH", None) is not None
+        self.gap_free = self.buffered and aperture is not None and getattr(driver, "BURST_GAP_FREE", False)
+        self.received = 0
+        self.started: Optional[float] = None
+        self._last_fetch = 0.0
+        self._active = False
+
+    def __enter__(self) -> "ReadingBurst":
+        self._active = True
+        if self.buffered:
+            self._configure()
+        elif self.function not in _FALLBACK:
+            raise ConfigurationError(f"{type(self.driver).__name__} cannot measure '{self.function}' in a burst")
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._active = False
+        if not self.buffered:
+            return
+        try:
+            for command in self.driver.BURST_TEARDOWN:
+                self.driver.write(command)
+        except Exception:
+            if exc_type is None:
+                raise
+
+    def _integration_commands(self) -> List[str]:
+        d = self.driver
+        if self.aperture is not None:
+            if getattr(d, "BURST_APERTURE", None):
+                return [d.BURST_APERTURE.format(function=self.function, value=self.aperture)]
+            if not getattr(d, "BURST_NPLC", None):
+                raise ConfigurationError(f"{type(d).__name__} has no integration time setting")
+            line_hz = float(d.query(d.BURST_LINE_FREQUENCY)) if getattr(d, "BURST_LINE_FREQUENCY", None) else 50.0
+            return [d.BURST_NPLC.format(function=self.function, value=f"{self.aperture * line_hz:g}")]
+        if self.nplc is not None:
+            if not getattr(d, "BURST_NPLC", None):
+                raise ConfigurationError(f"{type(d).__name__} has no NPLC setting")
+            return [d.BURST_NPLC.format(function=self.function, value=f"{self.nplc:g}")]
+        return []
+
+    def _configure(self) -> None:
+        d = self.driver
+        fields = {"samples": self.samples, "triggers": self.triggers,
+                  "total": self.total, "source": self.trigger_source}
+        commands = [d.BURST_CONFIGURE.format(function=self.function, channel=self.channel)]
+        commands += self._integration_commands()
+        commands += [c.format(**fields) for c in d.BURST_ARM]
+        # One error check for the whole setup instead of one per command
+        with d.deferred_errors():
+            for command in commands:
+                d.write(command)
+
+    def start(self) -> None:
+        """Starts (or restarts) the burst; called on entry."""
+        if self.buffered:
+            self.driver.write(self.driver.BURST_START)
+        self.received = 0
+        self.started = self._last_fetch = time.time()
+
+    def _stamp(self, count: int) -> np.ndarray:
+        """Timestamps for the next ``count`` readings.
+
+        Gap-free readings are exactly one aperture apart; otherwise host
+        times are spread evenly since the previous fetch.
+        """
+        now = time.time()
+        if self.gap_free:
+            self._last_fetch = now
+            return self.started + (self.received + np.arange(1, count + 1)) * self.aperture
+        stamps = np.linspace(self._last_fetch, now, count + 1)[1:]
+        self._last_fetch = now
+        return stamps
+
+    def _chunk(self, readings: np.ndarray, stamps: np.ndarray) -> MeasurementResult:
+        first = self.received
+        self.received += readings.size
+        metadata = {"function": self.function, "first": first, "timestamps": stamps}
+        if self.gap_free:
+            metadata["interval"] = self.aperture
+        return MeasurementResult(readings, self.unit, metadata=metadata)
+
+    def _fetch(self, count: int) -> np.ndarray:
+        d = self.driver
+        blocks = d.query_binary_blocks(d.BURST_FETCH.format(count=count), dtype=d.BURST_DTYPE)
+        return np.concatenate(blocks).astype(np.float64) if blocks else np.empty(0)
+
+    def stream(self, chunk: int = 1000, poll: float = 0.01,
+               timeout: float = 60.0) -> Iterator[MeasurementResult]:
+        """Yields readings as they arrive, at most ``chunk`` per result.
+
+        Each result carries ``metadata["timestamps"]`` (epoch times; see
+        ``BURST_GAP_FREE``) and ``metadata["first"]`` (index of its first
+        reading in the burst).
+
+        Raises:
+            InstrumentTimeout: If no reading arrives within ``timeout`` seconds.
+        """
+        if not self._active:
+            raise RuntimeError("ReadingBurst must be used as a context manager")
+        if not self.buffered:
+            yield from self._stream_fallback(chunk)
+            return
+        d = self.driver
+        idle_since = time.time()
+        while self.received < self.total:
+            if d.BURST_DRAINS:
+                readings = self._fetch(min(chunk, self.total - self.received))
+            elif int(float(d.query(d.BURST_POINTS))) >= self.total:
+                readings = self._fetch(self.total)
+            else:
+                readings = np.empty(0)
+            if readings.size:
+                idle_since = time.time()
+                stamps = self._stamp(readings.size)
+                for start in range(0, readings.size, chunk):
+                    yield self._chunk(readings[start:start + chunk], stamps[start:start + chunk])
+                continue
+            if time.time() - idle_since > timeout:
+                raise InstrumentTimeout(
+                    f"Burst on {d.resource} stalled at {self.received}/{self.total} readings")
+            time.sleep(poll)
+
+    def _stream_fallback(self, chunk: int) -> Iterator[MeasurementResult]:
+        name, kwargs = _FALLBACK[self.function]
+        measure = getattr(self.driver, name)
+        while self.received < self.total:
+            count = min(chunk, self.total - self.received)
+            readings = np.array([float(measure(**kwargs).value) for _ in range(count)])
+            yield self._chunk(readings, self._stamp(count))
+
+    def read(self, timeout: float = 60.0) -> MeasurementResult:
+        """Waits for the rest of the burst and returns all readings as one result."""
+        chunks = list(self.stream(chunk=self.total, timeout=timeout))
+        values = np.concatenate([c.value for c in chunks]) if chunks else np.empty(0)
+        stamps = np.concatenate([c.metadata["timestamps"] for c in chunks]) if chunks else np.empty(0)
+        metadata = {
+            "function": self.function, "first": chunks[0].metadata["first"] if chunks else self.received,
+            "timestamps": stamps,
+            "elapsed_s": self._last_fetch - self.started,
+        }
+        if self.gap_free:
+            metadata["interval"] = self.aperture
+        return MeasurementResult(values, self.unit, metadata=metadata)
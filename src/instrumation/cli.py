@@ -8,6 +8,11 @@ from .station import Station
 def handle_scan(args):
     print("Scanning for instruments...")
     devices = scan()
+    if getattr(args, "lan", False):
+        from .discovery import discover
+        for found in discover(timeout=args.timeout):
+            desc = " ".join(filter(None, (found.manufacturer, found.model, found.serial))) or found.service
+            devices.append({"type": "lan", "id": found.resource, "desc": desc})
     if not devices:
         print("No devices found.")
         return
@@ -64,6 +69,16 @@ def handle_station_measure(args):
         print(f"Error: {e}")
         sys.exit(1)
 
+def handle_emulate(args):
+    from .emulator import PERSONALITIES, run_farm
+    layout = {kind: getattr(args, kind.lower()) for kind in PERSONALITIES if kind != "NA"}
+    layout = {kind: count for kind, count in layout.items() if count}
+    if not layout:
+        print("Error: No instruments requested (e.g. --sa 4 --dmm 16).")
+        sys.exit(1)
+    print(f"Serving {sum(layout.values())} emulated instruments on {args.host} (Ctrl+C to stop)")
+    run_farm(layout, host=args.host, base_port=args.base_port, response_delay=args.delay)
+
 def main():
     parser = argparse.ArgumentParser(prog="instrumation", description="Instrumation CLI - RF Test Station HAL")
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
@@ -75,7 +90,9 @@ def main():
     record_parser.add_argument("output", help="Output .json file")
 
     # Scan command
-    subparsers.add_parser("scan", help="Scan for available instruments")
+    scan_parser = subparsers.add_parser("scan", help="Scan for available instruments")
+    scan_parser.add_argument("--lan", action="store_true", help="Also discover LXI instruments (DNS-SD, VXI-11 broadcast)")
+    scan_parser.add_argument("--timeout", type=float, default=1.0, help="LAN discovery wait in seconds")
 
     # Measure command
     measure_parser = subparsers.add_parser("measure", help="Take a one-off measurement")
@@ -95,6 +112,15 @@ def main():
     st_measure_parser.add_argument("method", help="Method to call")
     st_measure_parser.add_argument("-c", "--config", help="Path to station.toml")
 
+    # Emulate command
+    emulate_parser = subparsers.add_parser("emulate", help="Serve virtual SCPI instruments over TCP sockets")
+    for kind in ("SA", "SG", "DMM", "PSU", "SCOPE", "VNA", "COUNTER"):
+        emulate_parser.add_argument(f"--{kind.lower()}", type=int, default=0, metavar="N",
+                                    help=f"Number of emulated {kind} instruments")
+    emulate_parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    emulate_parser.add_argument("--base-port", type=int, default=0, help="First TCP port (default: OS-assigned)")
+    emulate_parser.add_argument("--delay", type=float, default=0.0, help="Per-message response delay in seconds")
+
     args = parser.parse_args()
 
     if args.command == "record":
@@ -129,6 +155,8 @@ def main():
         handle_scan(args)
     elif args.command == "measure":
         handle_measure(args)
+    elif args.command == "emulate":
+        handle_emulate(args)
     elif args.command == "station":
         if args.subcommand == "list":
             handle_station_list(args)
@@ -0,0 +1,410 @@
+"""LAN instrument discovery: DNS-SD browsing and VXI-11 broadcast.
+
+LXI instruments announce themselves over multicast DNS (DNS-SD) and answer
+the ONC RPC portmapper on UDP port 111. :func:`discover` runs both at once
+and returns after a fixed wait, with the model information the instruments
+advertise::
+
+    for found in discover(timeout=1.0):
+        print(found.resource, found.manufacturer, found.model)
+
+DNS-SD results carry the LXI TXT record (``Manufacturer``, ``Model``,
+``SerialNumber``, ``FirmwareVersion``), so :func:`get_instrument` can route
+them to a driver without sending ``*IDN?`` (see :func:`advertised`). VXI-11
+replies only prove that a host runs an instrument server; their entries get
+model information only when the same host also answered over DNS-SD.
+
+Both mechanisms use the standard library only. Queries are sent from an
+ephemeral port, so responders answer by unicast (RFC 6762 legacy unicast)
+and no multicast group has to be joined. ``mdns_address`` and ``broadcast``
+can point at a local responder for testing.
+"""
+
+import itertools
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+MDNS_ADDRESS = ("224.0.0.251", 5353)
+DNSSD_SERVICES = ("_hislip._tcp.local", "_lxi._tcp.local", "_vxi-11._tcp.local", "_scpi-raw._tcp.local")
+DEFAULT_TIMEOUT = 1.0
+
+# Probe preference when one host offers several services
+_SERVICE_RANK = {"_hislip._tcp": 0, "_vxi-11._tcp": 1, "_lxi._tcp": 1, "vxi11": 1, "_scpi-raw._tcp": 2}
+
+_TYPE_A, _TYPE_PTR, _TYPE_TXT, _TYPE_SRV = 1, 12, 16, 33
+
+# ONC RPC portmapper GETPORT for the VXI-11 core channel
+PORTMAPPER_PORT = 111
+_PMAP_PROG, _PMAP_VERS, _PMAP_GETPORT = 100000, 2, 3
+_VXI11_CORE_PROG, _VXI11_CORE_VERS = 0x0607AF, 1
+_IPPROTO_TCP = 6
+
+_xids = itertools.count(int.from_bytes(os.urandom(2), "big") << 8)
+
+# Everything the latest discovery found, by resource string (see advertised)
+_advertised: Dict[str, "DiscoveredInstrument"] = {}
+_advertised_lock = threading.Lock()
+
+
+@dataclass
+class DiscoveredInstrument:
+    """One instrument service found on the network.
+
+    Attributes:
+        resource: VISA resource string to open.
+        address: IPv4 address of the instrument.
+        service: DNS-SD service type (``"_hislip._tcp"``, ...) or ``"vxi11"``.
+        port: Advertised TCP port.
+        name: DNS-SD instance name (``""`` for VXI-11 replies).
+        host: Advertised host name.
+        manufacturer, model, serial, firmware: From the LXI TXT record.
+        txt: The whole TXT record.
+    """
+    resource: str
+    address: str
+    service: str
+    port: Optional[int] = None
+    name: str = ""
+    host: str = ""
+    manufacturer: str = ""
+    model: str = ""
+    serial: str = ""
+    firmware: str = ""
+    txt: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def idn(self) -> str:
+        """``*IDN?``-style string from the advertised fields; ``""`` if no model is known."""
+        if not self.model:
+            return ""
+        return ",".join((self.manufacturer, self.model, self.serial, self.firmware))
+
+
+def resource_for(service: str, address: str, port: Optional[int]) -> str:
+    """VISA resource string for a service advertised at ``address``."""
+    service = service.replace(".local", "").rstrip(".")
+    if service == "_hislip._tcp":
+        return f"TCPIP::{address}::hislip0::INSTR" if port in (None, 4880) else f"TCPIP::{address}::hislip0,{port}::INSTR"
+    if service == "_scpi-raw._tcp":
+        return f"TCPIP::{address}::{port or 5025}::SOCKET"
+    # _lxi._tcp advertises the web server; LXI requires VXI-11 alongside it
+    return f"TCPIP::{address}::INSTR"
+
+
+# --- DNS messages ---
+def _encode_name(name: str) -> bytes:
+    out = b""
+    for label in name.rstrip(".").split("."):
+        raw = label.encode("utf-8")
+        out += bytes([len(raw)]) + raw
+    return out + b"\x00"
+
+
+def _mdns_query(questions: Sequence[Tuple[str, int]]) -> bytes:
+    """Standard query (ID 0) for ``(name, type)`` pairs, class IN."""
+    message = struct.pack(">6H", 0, 0, len(questions), 0, 0, 0)
+    for name, rtype in questions:
+        message += _encode_name(name) + struct.pack(">HH", rtype, 1)
+    return message
+
+
+def _read_name(data: bytes, offset: int) -> Tuple[str, int]:
+    """Decodes a (possibly compressed) name; returns it and the offset after it."""
+    labels: List[str] = []
+    end: Optional[int] = None
+    for _ in range(128):  # bounds pointer loops in malformed packets
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(data[offset:offset + length].decode("utf-8", "replace"))
+        offset += length
+    else:
+        raise ValueError("DNS name compression loop")
+    return ".".join(labels), end if end is not None else offset
+
+
+def _parse_records(data: bytes) -> List[Tuple[str, int, object]]:
+    """All resource records of a DNS message as ``(name, type, value)``.
+
+    Values: PTR -> target name, SRV -> ``(port, target)``, TXT -> dict,
+    A -> dotted address. Other types are skipped.
+    """
+    _, flags, qdcount, ancount, nscount, arcount = struct.unpack_from(">6H", data)
+    if not flags & 0x8000:
+        return []  # a query, not a response
+    offset = 12
+    for _ in range(qdcount):
+        _, offset = _read_name(data, offset)
+        offset += 4
+    records = []
+    for _ in range(ancount + nscount + arcount):
+        name, offset = _read_name(data, offset)
+        rtype, _, _, rdlength = struct.unpack_from(">HHIH", data, offset)
+        offset += 10
+        rdata_at, offset = offset, offset + rdlength
+        if rtype == _TYPE_PTR:
+            records.append((name, rtype, _read_name(data, rdata_at)[0]))
+        elif rtype == _TYPE_SRV:
+            _, _, port = struct.unpack_from(">HHH", data, rdata_at)
+            records.append((name, rtype, (port, _read_name(data, rdata_at + 6)[0])))
+        elif rtype == _TYPE_TXT:
+            txt, pos = {}, rdata_at
+            while pos < offset:
+                length = data[pos]
+                key, _, value = data[pos + 1:pos + 1 + length].decode("utf-8", "replace").partition("=")
+                if key:
+                    txt[key] = value
+                pos += 1 + length
+            records.append((name, rtype, txt))
+        elif rtype == _TYPE_A and rdlength == 4:
+            records.append((name, rtype, socket.inet_ntoa(data[rdata_at:offset])))
+    return records
+
+
+def _txt_field(txt: Dict[str, str], key: str) -> str:
+    key = key.lower()
+    for k, v in txt.items():
+        if k.lower() == key:
+            return v
+    return ""
+
+
+class _Browse:
+    """Accumulates PTR/SRV/TXT/A records from any number of responses."""
+
+    def __init__(self, services: Iterable[str]) -> None:
+        self.services = {s.lower().rstrip("."): s for s in services}
+        self.instances: Dict[str, str] = {}      # instance -> service
+        self.srv: Dict[str, Tuple[int, str]] = {}
+        self.txt: Dict[str, Dict[str, str]] = {}
+        self.hosts: Dict[str, str] = {}
+        self.sender: Dict[str, str] = {}         # instance -> source address
+
+    def add(self, data: bytes, source: str) -> None:
+        for name, rtype, value in _parse_records(data):
+            key = name.lower()
+            if rtype == _TYPE_PTR and key in self.services:
+                self.instances.setdefault(value, self.services[key])
+                self.sender.setdefault(value, source)
+            elif rtype == _TYPE_SRV:
+                self.srv[name] = value
+                self.sender.setdefault(name, source)
+            elif rtype == _TYPE_TXT:
+                self.txt[name] = value
+            elif rtype == _TYPE_A:
+                self.hosts[key] = value
+
+    def unresolved(self) -> List[str]:
+        return [i for i in self.instances if i not in self.srv or i not in self.txt]
+
+    def results(self) -> List[DiscoveredInstrument]:
+        found = []
+        for instance, service in self.instances.items():
+            port, host = self.srv.get(instance, (None, ""))
+            address = self.hosts.get(host.lower()) or self.sender[instance]
+            txt = self.txt.get(instance, {})
+            # Instance names may contain dots ("PXA (10.0.0.5)._hislip._tcp.local")
+            suffix = "." + service.lower()
+            name = instance[:-len(suffix)] if instance.lower().endswith(suffix) else instance
+            service = service.replace(".local", "")
+            found.append(DiscoveredInstrument(
+                resource=resource_for(service, address, port), address=address,
+                service=service, port=port, name=name, host=host,
+                manufacturer=_txt_field(txt, "Manufacturer"), model=_txt_field(txt, "Model"),
+                serial=_txt_field(txt, "SerialNumber"), firmware=_txt_field(txt, "FirmwareVersion"),
+                txt=txt,
+            ))
+        return found
+
+
+def _collect(sock: socket.socket, deadline: float, handle, midpoint=None) -> None:
+    """Feeds datagrams to ``handle`` until ``deadline``; calls ``midpoint`` once halfway."""
+    half = None if midpoint is None else time.monotonic() + (deadline - time.monotonic()) / 2
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            return
+        if half is not None and now >= half:
+            midpoint()
+            half = None
+        sock.settimeout(max(min(deadline, half or deadline) - now, 0.001))
+        try:
+            data, source = sock.recvfrom(9000)
+        except socket.timeout:
+            continue
+        except OSError as e:
+            logger.debug(f"Discovery receive failed: {e}")
+            return
+        try:
+            handle(data, source[0])
+        except (ValueError, IndexError, struct.error) as e:
+            logger.debug(f"Ignoring malformed discovery reply from {source[0]}: {e}")
+
+
+def browse_mdns(services: Sequence[str] = DNSSD_SERVICES, timeout: float = DEFAULT_TIMEOUT,
+                address: Tuple[str, int] = MDNS_ADDRESS) -> List[DiscoveredInstrument]:
+    """Browses DNS-SD for instrument services.
+
+    Sends one PTR query for all ``services`` and collects replies for
+    ``timeout`` seconds. Halfway through, instances whose SRV or TXT record
+    did not come with the PTR answer are queried once more.
+
+    Args:
+        services: Service types to browse, e.g. ``"_hislip._tcp.local"``.
+        timeout: Total wait in seconds.
+        address: Where to send the query (the mDNS group by default).
+
+    Returns:
+        One entry per advertised service instance.
+    """
+    browse = _Browse(services)
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    except OSError as e:
+        logger.debug(f"mDNS browse unavailable: {e}")
+        return []
+    with sock:
+        try:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 255)
+            sock.sendto(_mdns_query([(s, _TYPE_PTR) for s in services]), address)
+        except OSError as e:
+            logger.debug(f"mDNS query to {address[0]} failed: {e}")
+            return []
+
+        def resolve() -> None:
+            pending = browse.unresolved()
+            if pending:
+                questions = [(i, t) for i in pending for t in (_TYPE_SRV, _TYPE_TXT)]
+                try:
+                    sock.sendto(_mdns_query(questions), address)
+                except OSError as e:
+                    logger.debug(f"mDNS resolve query failed: {e}")
+
+        _collect(sock, time.monotonic() + timeout, browse.add, resolve)
+    return browse.results()
+
+
+def _getport_call(xid: int) -> bytes:
+    """RPC call: portmapper GETPORT for the VXI-11 core channel over TCP."""
+    return struct.pack(">10I", xid, 0, 2, _PMAP_PROG, _PMAP_VERS, _PMAP_GETPORT, 0, 0, 0, 0) \
+        + struct.pack(">4I", _VXI11_CORE_PROG, _VXI11_CORE_VERS, _IPPROTO_TCP, 0)
+
+
+def _getport_reply(data: bytes, xid: int) -> Optional[int]:
+    """Port from an accepted GETPORT reply to ``xid``; None for anything else."""
+    if len(data) < 24:
+        return None
+    rxid, mtype, reply_stat = struct.unpack_from(">3I", data)
+    if rxid != xid or mtype != 1 or reply_stat != 0:
+        return None
+    _, verf_len = struct.unpack_from(">2I", data, 12)
+    offset = 20 + (verf_len + 3) // 4 * 4
+    if len(data) < offset + 8:
+        return None
+    accept_stat, port = struct.unpack_from(">2I", data, offset)
+    return port if accept_stat == 0 and port else None
+
+
+def vxi11_broadcast(timeout: float = DEFAULT_TIMEOUT,
+                    broadcast: Union[str, Sequence[str]] = "255.255.255.255",
+                    port: int = PORTMAPPER_PORT) -> List[DiscoveredInstrument]:
+    """Finds VXI-11 instruments by broadcasting a portmapper GETPORT.
+
+    Every host that has the VXI-11 core program registered answers with its
+    port; each answer becomes a ``TCPIP::<address>::INSTR`` entry.
+
+    Args:
+        timeout: Total wait in seconds.
+        broadcast: Broadcast address(es), e.g. ``"192.168.1.255"``.
+        port: Portmapper port.
+    """
+    targets = [broadcast] if isinstance(broadcast, str) else list(broadcast)
+    xid = next(_xids) & 0xFFFFFFFF
+    found: Dict[str, DiscoveredInstrument] = {}
+
+    def handle(data: bytes, source: str) -> None:
+        core_port = _getport_reply(data, xid)
+        if core_port and source not in found:
+            found[source] = DiscoveredInstrument(
+                resource=resource_for("vxi11", source, None), address=source,
+                service="vxi11", port=core_port)
+
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    except OSError as e:
+        logger.debug(f"VXI-11 broadcast unavailable: {e}")
+        return []
+    with sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        sent = False
+        for target in targets:
+            try:
+                sock.sendto(_getport_call(xid), (target, port))
+                sent = True
+            except OSError as e:
+                logger.debug(f"VXI-11 broadcast to {target} failed: {e}")
+        if sent:
+            _collect(sock, time.monotonic() + timeout, handle)
+    return list(found.values())
+
+
+def _merge(mdns: List[DiscoveredInstrument], vxi11: List[DiscoveredInstrument]) -> List[DiscoveredInstrument]:
+    """One entry per resource; model info shared between services of a host."""
+    by_resource: Dict[str, DiscoveredInstrument] = {}
+    for entry in mdns + vxi11:
+        by_resource.setdefault(entry.resource, entry)
+    identified = {e.address: e for e in mdns if e.model}
+    for entry in by_resource.values():
+        source = identified.get(entry.address)
+        if source is not None and not entry.model:
+            entry.manufacturer, entry.model = source.manufacturer, source.model
+            entry.serial, entry.firmware = source.serial, source.firmware
+    return sorted(by_resource.values(), key=lambda e: (_SERVICE_RANK.get(e.service, 3), e.address))
+
+
+def discover(timeout: float = DEFAULT_TIMEOUT, services: Sequence[str] = DNSSD_SERVICES,
+             mdns: bool = True, vxi11: bool = True,
+             mdns_address: Tuple[str, int] = MDNS_ADDRESS,
+             broadcast: Union[str, Sequence[str]] = "255.255.255.255",
+             vxi11_port: int = PORTMAPPER_PORT) -> List[DiscoveredInstrument]:
+    """Runs DNS-SD browsing and the VXI-11 broadcast concurrently.
+
+    Returns after about ``timeout`` seconds, with HiSLIP resources first, then
+    VXI-11, then raw sockets. The results are also remembered for
+    :func:`advertised`.
+    """
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="discovery") as pool:
+        mdns_future = pool.submit(browse_mdns, services, timeout, mdns_address) if mdns else None
+        vxi11_future = pool.submit(vxi11_broadcast, timeout, broadcast, vxi11_port) if vxi11 else None
+        found = _merge(mdns_future.result() if mdns_future else [],
+                       vxi11_future.result() if vxi11_future else [])
+    remember(found)
+    return found
+
+
+def remember(found: Iterable[DiscoveredInstrument]) -> None:
+    """Records discovery results for :func:`advertised`."""
+    with _advertised_lock:
+        for entry in found:
+            _advertised[entry.resource] = entry
+
+
+def advertised(resource: str) -> Optional[DiscoveredInstrument]:
+    """What discovery learned about ``resource`` in this process, if anything."""
+    with _advertised_lock:
+        return _advertised.get(resource)
@@ -2,11 +2,23 @@ from .base import SpectrumAnalyzer, NetworkAnalyzer
 from .registry import register_driver
 from .real import RealDriver
 from ..results import MeasurementResult
+import numpy as np
+
+
+def _interleaved_to_complex(values: np.ndarray) -> np.ndarray:
+    """Real/imaginary pairs (SDATA) as a complex array."""
+    return values[0::2] + 1j * values[1::2]
+
 
 @register_driver("SA")
 class AnritsuSA(RealDriver, SpectrumAnalyzer):
     """Generic Driver for Anritsu Spectrum Analyzers."""
-    
+
+    AXIS_QUERY = ":FREQ:STAR?;:FREQ:STOP?;:SWE:POIN?"
+    TRACE_FORMAT_BINARY = ":FORM:DATA REAL,32"
+    TRACE_BYTE_ORDER = ":FORM:BORD SWAP"
+    TRACE_FORMAT_ASCII = ":FORM:DATA ASC"
+
     def preset(self, automation_optimized: bool = True) -> None:
         self.write("*RST")
         self.wait_ready()
@@ -43,10 +55,8 @@ class AnritsuSA(RealDriver, SpectrumAnalyzer):
         self.safe_send(f":BAND:VID {self.format_frequency(hz)}")
 
     def get_trace_data(self) -> MeasurementResult:
-        # Optimization: Use 32-bit float binary transfer
-        self.write(":FORM:DATA REAL32")
-        data = self.query_binary_values(":TRAC:DATA? TRACE1", datatype='f', is_big_endian=False)
-        return MeasurementResult(list(data), "dBm")
+        data = self.fetch_trace_values(":TRAC:DATA? TRACE1")
+        return MeasurementResult(data, "dBm", axis=self.get_trace_axis())
 
     def shutdown_safety(self) -> None:
         self.sync_config()
@@ -54,7 +64,11 @@ class AnritsuSA(RealDriver, SpectrumAnalyzer):
 @register_driver("NA")
 class AnritsuVNA(RealDriver, NetworkAnalyzer):
     """Generic Driver for Anritsu Vector Network Analyzers (Handheld/Legacy)."""
-    
+
+    TRACE_FORMAT_BINARY = ":FORM:DATA REAL,32"
+    TRACE_BYTE_ORDER = ":FORM:BORD SWAP"
+    TRACE_FORMAT_ASCII = ":FORM:DATA ASC"
+
     def preset(self, automation_optimized: bool = True) -> None:
         self.write("*RST")
         self.wait_ready()
@@ -73,16 +87,11 @@ class AnritsuVNA(RealDriver, NetworkAnalyzer):
 
     def get_trace_data(self, measurement_name: str = "S11") -> MeasurementResult:
         self.safe_send(f":CALC:PAR:SEL '{measurement_name}'")
-        self.write(":FORM REAL")
-        data = self.query_binary_values(":CALC:DATA? FDATA", datatype='f', is_big_endian=False)
-        return MeasurementResult(list(data), "dB")
+        return MeasurementResult(self.fetch_trace_values(":CALC:DATA? FDATA"), "dB")
 
     def get_complex_trace(self, measurement_name: str = "S11") -> MeasurementResult:
         self.safe_send(f":CALC:PAR:SEL '{measurement_name}'")
-        self.write(":FORM REAL")
-        raw_data = self.query_binary_values(":CALC:DATA? SDATA", datatype='f', is_big_endian=False)
-        data = [complex(raw_data[i], raw_data[i+1]) for i in range(0, len(raw_data), 2)]
-        return MeasurementResult(data, "IQ")
+        return MeasurementResult(_interleaved_to_complex(self.fetch_trace_values(":CALC:DATA? SDATA")), "IQ")
 
     def get_smith_data(self, measurement_name: str = "S11") -> MeasurementResult:
         self._unsupported_feature("get_smith_data")
@@ -92,6 +101,10 @@ class AnritsuVNA(RealDriver, NetworkAnalyzer):
 class AnritsuShockLineVNA(RealDriver, NetworkAnalyzer):
     """Driver for Anritsu ShockLine MS46522B/MS46524B VNAs."""
 
+    TRACE_FORMAT_BINARY = ":FORMat:DATA REAL,32"
+    TRACE_BYTE_ORDER = ":FORMat:BORDer SWAPped"
+    TRACE_FORMAT_ASCII = ":FORMat:DATA ASCii"
+
     def connect(self) -> None:
         super().connect()
         self._discover_capabilities()
@@ -126,26 +139,15 @@ class AnritsuShockLineVNA(RealDriver, NetworkAnalyzer):
 
     def get_trace_data(self, measurement_name: str = "S21") -> MeasurementResult:
         self.write(f":CALCulate1:PARameter:SELect '{measurement_name}'")
-        self.write(":FORMat:DATA REAL,32")
-        self.write(":FORMat:BORDer SWAP") 
         self.write(":SENSe1:SWEep:MODE SINGle")
         self.wait_ready()
-        data = self.query_binary_values(
-            ":CALCulate1:DATA:FDATa?", datatype='f', is_big_endian=False
-        )
-        return MeasurementResult(list(data), "dB")
+        return MeasurementResult(self.fetch_trace_values(":CALCulate1:DATA:FDATa?"), "dB")
 
     def get_complex_trace(self, measurement_name: str = "S21") -> MeasurementResult:
         self.write(f":CALCulate1:PARameter:SELect '{measurement_name}'")
-        self.write(":FORMat:DATA REAL,32")
-        self.write(":FORMat:BORDer SWAP")
         self.write(":SENSe1:SWEep:MODE SINGle")
         self.wait_ready()
-        raw = self.query_binary_values(
-            ":CALCulate1:DATA:SDATa?", datatype='f', is_big_endian=False
-        )
-        data = [complex(raw[i], raw[i+1]) for i in range(0, len(raw), 2)]
-        return MeasurementResult(data, "IQ")
+        return MeasurementResult(_interleaved_to_complex(self.fetch_trace_values(":CALCulate1:DATA:SDATa?")), "IQ")
 
     def get_smith_data(self, measurement_name: str = "S21") -> MeasurementResult:
         self._unsupported_feature("get_smith_data")
@@ -162,6 +164,10 @@ class AnritsuMS2035B(RealDriver, SpectrumAnalyzer, NetworkAnalyzer):
     VNA_MODE = "VNA"
     SA_MODE  = "SPA" # Spectrum Analyzer mode is usually SPA in handhelds
 
+    TRACE_FORMAT_BINARY = ":FORM:DATA REAL,32"
+    TRACE_BYTE_ORDER = ":FORM:BORD SWAP"
+    TRACE_FORMAT_ASCII = ":FORM:DATA ASC"
+
     def _set_mode(self, mode: str) -> None:
         current = self.query(":INSTrument:SELect?").strip().strip('"')
         if current != mode:
@@ -189,23 +195,16 @@ class AnritsuMS2035B(RealDriver, SpectrumAnalyzer, NetworkAnalyzer):
         # Check if we are in VNA mode or SA mode
         mode = self.query(":INSTrument:SELect?").strip().strip('"')
         if mode == self.SA_MODE:
-            self.write(":FORM REAL")
-            data = self.query_binary_values(":TRAC? TRACE1", datatype='f', is_big_endian=False)
-            return MeasurementResult(list(data), "dBm")
+            return MeasurementResult(self.fetch_trace_values(":TRAC? TRACE1"), "dBm")
         else:
             # VNA data fetch logic
             self.safe_send(f":CALC:PAR:SEL '{measurement_name}'")
-            self.write(":FORM REAL")
-            data = self.query_binary_values(":CALC:DATA? FDATA", datatype='f', is_big_endian=False)
-            return MeasurementResult(list(data), "dB")
+            return MeasurementResult(self.fetch_trace_values(":CALC:DATA? FDATA"), "dB")
 
     def get_complex_trace(self, measurement_name: str = "S11") -> MeasurementResult:
         self._set_mode(self.VNA_MODE)
         self.safe_send(f":CALC:PAR:SEL '{measurement_name}'")
-        self.write(":FORM REAL")
-        raw_data = self.query_binary_values(":CALC:DATA? SDATA", datatype='f', is_big_endian=False)
-        data = [complex(raw_data[i], raw_data[i+1]) for i in range(0, len(raw_data), 2)]
-        return MeasurementResult(data, "IQ")
+        return MeasurementResult(_interleaved_to_complex(self.fetch_trace_values(":CALC:DATA? SDATA")), "IQ")
 
     def set_start_frequency(self, freq_hz: float) -> None:
         self._set_mode(self.VNA_MODE)
@@ -106,6 +106,9 @@ class AsyncInstrumentDriver:
     async def check_errors(self) -> None:
         await asyncio.to_thread(self._driver.check_errors)
 
+    async def fence(self) -> None:
+        await asyncio.to_thread(self._driver.fence)
+
     async def save_state(self, index: Union[int, str]) -> None:
         await asyncio.to_thread(self._driver.save_state, index)
 
@@ -1,8 +1,18 @@
 from abc import ABC, abstractmethod
-from typing import List, Union, Dict, Any, Optional
+from typing import List, Union, Dict, Any, Optional, Iterator, Sequence, TYPE_CHECKING
+from contextlib import contextmanager
 import asyncio
-from ..results import MeasurementResult
+import numpy as np
+from ..results import MeasurementResult, TraceAxis
 from ..exceptions import OverloadError, ConfigurationError
+from .cache import StateCache
+
+if TYPE_CHECKING:
+    from ..profiles import InstrumentProfile
+    from ..acquisition import TraceAcquisition
+    from ..burst import ReadingBurst
+    from ..actor import InstrumentActor
+    from ..analysis.waveform import WaveformMeasurements
 
 class InstrumentDriver(ABC):
     """Abstract Base Class for all instrument drivers following the 'Abstract Hardware' spec."""
@@ -22,10 +32,26 @@ class InstrumentDriver(ABC):
         self.max_power_dbm = 0.0
         self.max_voltage = 0.0
 
+        # Opt-in shadow of written settings (see enable_state_cache)
+        self.state_cache: Optional[StateCache] = None
+
+        # Nesting depth of deferred_errors() blocks
+        self._deferred_depth = 0
+
+        # Settings sent by the last apply_profile(); cleared on reset/recall
+        self.applied_profile: Dict[str, Any] = {}
+
+        # X axis of the current trace configuration (see get_trace_axis)
+        self._trace_axis: Optional[TraceAxis] = None
+
     def __getattr__(self, name: str) -> Any:
         """Dynamic async wrapper for all driver methods."""
         if name.startswith("async_"):
             sync_name = name[6:]
+            actor = self.__dict__.get("_actor")
+            if actor is not None and actor.running:
+                # Actor mode: queue on the instrument's worker instead of a free thread
+                return getattr(actor, name)
             if hasattr(self, sync_name):
                 sync_method = getattr(self, sync_name)
                 async def wrapper(*args: Any, **kwargs: Any) -> Any:
@@ -34,6 +60,14 @@ class InstrumentDriver(ABC):
         raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
 
 
+    def actor(self) -> "InstrumentActor":
+        """Switches to actor mode: all calls go through one I/O worker (see :mod:`instrumation.actor`)."""
+        from ..actor import InstrumentActor
+        actor = self.__dict__.get("_actor")
+        if actor is not None and actor.running:
+            return actor
+        return InstrumentActor(self)
+
     @property
     def resource_address(self) -> str:
         return self.resource
@@ -101,6 +135,36 @@ class InstrumentDriver(ABC):
         """Queries SYST:ERR? and updates local error_stack."""
         pass
 
+    @contextmanager
+    def deferred_errors(self) -> Iterator["InstrumentDriver"]:
+        """Batches error checking: SYST:ERR? runs once at the end, not per command.
+
+        Inside the block ``safe_send``/``query_ascii`` skip their per-command
+        check; the error queue is drained by :meth:`fence` when the outermost
+        block exits (or whenever ``fence()`` is called explicitly), and any
+        errors are raised as one ``ConfigurationError``. If the block itself
+        raises, queued errors are recorded in ``error_stack`` but do not mask
+        the original exception.
+        """
+        self._deferred_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._deferred_depth -= 1
+            if not self._deferred_depth:
+                try:
+                    self.fence()
+                except ConfigurationError:
+                    pass
+            raise
+        self._deferred_depth -= 1
+        if not self._deferred_depth:
+            self.fence()
+
+    def fence(self) -> None:
+        """Drains pending errors; drivers without deferred support just check once."""
+        self.check_errors()
+
     def save_state(self, index: Union[int, str]) -> None:
         """Saves current state to memory."""
         self._unsupported_feature("save_state")
@@ -109,6 +173,41 @@ class InstrumentDriver(ABC):
         """Recalls state from memory."""
         self._unsupported_feature("load_state")
 
+    # --- State Cache ---
+    def enable_state_cache(self, max_age: Optional[float] = None) -> StateCache:
+        """Answers cached getters locally and skips redundant setter writes.
+
+        Only enable this when the driver is the sole controller of the
+        instrument; front-panel changes go unnoticed until the cache is
+        invalidated or ``max_age`` expires.
+        """
+        if self.state_cache is None:
+            self.state_cache = StateCache(max_age=max_age)
+        return self.state_cache
+
+    def disable_state_cache(self) -> None:
+        self.state_cache = None
+
+    def invalidate_state_cache(self) -> None:
+        """Forgets all cached settings, e.g. after manual front-panel use."""
+        if self.state_cache is not None:
+            self.state_cache.invalidate()
+
+    def get_trace_axis(self) -> Optional[TraceAxis]:
+        """X axis of traces in the current configuration, or None if unknown."""
+        return self._trace_axis
+
+    # --- Setup Profiles ---
+    def apply_profile(self, profile: Union["InstrumentProfile", Dict[str, Any]], force: bool = False) -> List[str]:
+        """Applies a setup profile in one round trip, sending only changed settings.
+
+        See :mod:`instrumation.profiles` for the profile format.
+        """
+        from ..profiles import InstrumentProfile, apply_profile
+        if not isinstance(profile, InstrumentProfile):
+            profile = InstrumentProfile.from_dict("adhoc", profile)
+        return apply_profile(self, profile, force=force)
+
     # --- Unit Guards & Formatting ---
     def format_frequency(self, val: Union[float, str]) -> str:
         """Ensures input is Hz and formats for SCPI (e.g. 1.5e9 -> '1.5 GHz')."""
@@ -270,6 +369,18 @@ class FrequencyCounter(InstrumentDriver):
         """Measures time interval between two events (e.g. 'CH1', 'CH2')."""
         pass
 
+    def stream_frequency(self, gate_time: float = 1e-3, count: int = 10000,
+                         chunk: int = 1000, channel: int = 1) -> Iterator[MeasurementResult]:
+        """Yields ``count`` back-to-back frequency readings in chunks as they arrive.
+
+        Counters with a buffered gap-free mode (see :mod:`instrumation.burst`)
+        stamp reading k at exactly k gate times after the start; others fall
+        back to one ``measure_frequency()`` per reading, with dead time.
+        """
+        from ..burst import ReadingBurst
+        with ReadingBurst(self, "FREQ", samples=count, aperture=gate_time, channel=channel) as burst:
+            yield from burst.stream(chunk=chunk)
+
     @abstractmethod
     def set_impedance(self, ohms: float) -> None:
         """Sets input impedance (50 or 1e6)."""
@@ -304,6 +415,11 @@ class Multimeter(InstrumentDriver):
     @abstractmethod
     def set_auto_range(self, state: bool) -> None: pass
 
+    def burst(self, function: str = "VOLT:DC", samples: int = 1000, **options: Any) -> "ReadingBurst":
+        """Opens a buffered burst of readings (see :mod:`instrumation.burst`)."""
+        from ..burst import ReadingBurst
+        return ReadingBurst(self, function=function, samples=samples, **options)
+
 class PowerSupply(InstrumentDriver):
     @abstractmethod
     def set_voltage(self, voltage: float) -> None: pass
@@ -387,6 +503,20 @@ class SpectrumAnalyzer(InstrumentDriver):
         self.peak_search()
         return self.get_marker_amplitude()
 
+    def find_peaks(self, n: int = 10, **rules: Any) -> list:
+        """Host-side multi-peak search on one trace transfer.
+
+        See :func:`instrumation.analysis.peaks.find_peaks` for the rules
+        (``threshold``, ``excursion``, ``prominence``, ``min_distance``).
+        """
+        from ..analysis.peaks import find_peaks
+        return find_peaks(self.get_trace_data(), n=n, **rules)
+
+    def acquisition(self, count: Optional[int] = None) -> "TraceAcquisition":
+        """Opens a double-buffered single-sweep session (see :mod:`instrumation.acquisition`)."""
+        from ..acquisition import TraceAcquisition
+        return TraceAcquisition(self, count=count)
+
 class NetworkAnalyzer(InstrumentDriver):
     @abstractmethod
     def set_start_frequency(self, freq_hz: float) -> None: pass
@@ -432,6 +562,27 @@ class NetworkAnalyzer(InstrumentDriver):
     
     @abstractmethod
     def get_smith_data(self, measurement_name: str = "CH1_S11_1") -> MeasurementResult: pass
+
+    @staticmethod
+    def sparameter_names(ports: Sequence[int]) -> List[str]:
+        """Parameter names of the S-matrix for ``ports``, row by row (S11, S12, ..., S21, ...)."""
+        return [f"S{i}{j}" if i < 10 and j < 10 else f"S{i}_{j}" for i in ports for j in ports]
+
+    def get_sparameters(self, ports: Sequence[int] = (1, 2),
+                        measurements: Optional[Dict[str, str]] = None) -> MeasurementResult:
+        """Fetches the S-matrix for ``ports`` as a complex ``(points, n, n)`` array.
+
+        ``value[:, i, j]`` is S(ports[i], ports[j]). ``measurements`` maps
+        parameter names (``"S21"``) to measurement names; by default the
+        parameter name is used. This generic version fetches one trace per
+        parameter; drivers override it with a bulk transfer where possible.
+        """
+        measurements = measurements or {}
+        n = len(ports)
+        traces = [np.asarray(self.get_complex_trace(measurements.get(p, p)).value)
+                  for p in self.sparameter_names(ports)]
+        s = np.stack(traces, axis=-1).reshape(-1, n, n)
+        return MeasurementResult(s, "S", metadata={"ports": list(ports)}, axis=self.get_trace_axis())
     
     def peak_search(self, marker: int = 1) -> None: 
         self._unsupported_feature("peak_search")
@@ -476,6 +627,28 @@ class Oscilloscope(InstrumentDriver):
     @abstractmethod
     def measure_v_peak_to_peak(self, channel: int = 1) -> MeasurementResult: pass
 
+    def measure_waveform(self, channels: Union[int, Sequence[int]] = 1, **options: Any) -> "WaveformMeasurements":
+        """Host-side parameter table from one waveform transfer per channel.
+
+        Computes frequency, period, duty, rise/fall, Vpp, Vrms, overshoot and
+        edge times without a ``:MEASure`` round trip per parameter. See
+        :func:`instrumation.analysis.waveform.measure_waveform` for the
+        definitions and ``options`` (``thresholds``).
+        """
+        from ..analysis.waveform import measure_waveform
+        if isinstance(channels, int):
+            return measure_waveform(self.get_waveform(channels), **options)
+        return measure_waveform([self.get_waveform(ch) for ch in channels], **options)
+
+    def get_spectrum(self, channel: int = 1, **options: Any) -> MeasurementResult:
+        """Welch-averaged spectrum of one waveform transfer, as an SA-style trace.
+
+        See :func:`instrumation.analysis.spectral.welch` for ``options``
+        (``nperseg``, ``window``, ``scaling``, ``unit``, ``sample_rate``).
+        """
+        from ..analysis.spectral import welch
+        return welch(self.get_waveform(channel), **options)
+
 class SignalGenerator(InstrumentDriver):
     @abstractmethod
     def set_frequency(self, hz: float) -> None: pass
@@ -0,0 +1,223 @@
+"""Write-through shadow cache of instrument settings.
+
+Setter methods decorated with :func:`cached_setter` record the value they
+wrote; matching getters decorated with :func:`cached_getter` are answered from
+that record instead of a round trip, and a setter called with the value the
+instrument already holds is skipped entirely.
+
+The cache is opt-in per driver (``driver.enable_state_cache()``) because it
+trusts that nothing else changes the instrument behind the driver's back.
+It likewise trusts that the instrument holds exactly the value written;
+settings the instrument snaps or rounds (scope V/div to 1-2-5 steps, analyzer
+span and sweep points) are declared ``coerced`` and only cached once a getter
+has read back what the instrument actually chose.
+It is flushed automatically when the driver sends a command that rewrites the
+whole state (``*RST``, ``*RCL``, ``MMEM:LOAD``, ``SYST:PRES``, autoscale) or
+hands the instrument back to the front panel (``SYST:LOC``, ``GTL``).
+"""
+
+import functools
+import inspect
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+# Commands after which no cached setting can be trusted. Matched against each
+# message unit of a (possibly compound) program message.
+INVALIDATING_COMMANDS = (
+    r"\*RST",
+    r"\*RCL",
+    r"MMEM(?:ORY)?:LOAD",
+    r"SYST(?:EM)?:PRES(?:ET)?",
+    r"SYST(?:EM)?:LOC(?:AL)?",
+    r"SYST(?:EM)?:REM(?:OTE)?\s+LOC",
+    r"GTL",
+    r"AUT(?:O|OSCALE)?",
+    r"INST(?:RUMENT)?:(?:N?SEL(?:ECT)?)",
+)
+
+_MISSING = object()
+
+
+def _compile_invalidators(fragments: Iterable[str]) -> "re.Pattern":
+    return re.compile(r"(?:^|;)\s*:?(?:" + "|".join(fragments) + r")\b", re.IGNORECASE)
+
+
+_DEFAULT_INVALIDATORS = _compile_invalidators(INVALIDATING_COMMANDS)
+
+
+def invalidates_state(command: str) -> bool:
+    """True if ``command`` contains one of :data:`INVALIDATING_COMMANDS`."""
+    return bool(_DEFAULT_INVALIDATORS.search(command))
+
+
+class StateCache:
+    """Thread-safe map of ``(setting, *qualifiers)`` keys to last-known values.
+
+    Args:
+        max_age: Optional lifetime in seconds. Entries older than this are
+            treated as misses, which bounds how long a front-panel change can
+            go unnoticed. ``None`` (default) keeps entries until invalidated.
+        invalidate_on: Regex fragments for commands that flush the cache.
+            Defaults to :data:`INVALIDATING_COMMANDS`.
+    """
+
+    def __init__(self, max_age: Optional[float] = None, invalidate_on: Iterable[str] = INVALIDATING_COMMANDS) -> None:
+        self.max_age = max_age
+        self._pattern = _compile_invalidators(invalidate_on)
+        self._entries: Dict[Tuple[Hashable, ...], Tuple[Any, float, bool]] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.skipped_writes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Tuple[Hashable, ...]) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(self, key: Tuple[Hashable, ...], default: Any = None, count: bool = True) -> Any:
+        """Returns the cached value for ``key`` or ``default`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.max_age is not None and time.monotonic() - entry[1] > self.max_age:
+                del self._entries[key]
+                entry = None
+            if count:
+                if entry is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+            return default if entry is None else entry[0]
+
+    def store(self, key: Tuple[Hashable, ...], value: Any, derived: bool = False) -> None:
+        """Records ``value`` for ``key``.
+
+        Derived entries (settings the instrument computes from others, such
+        as sample rate) are dropped on every write rather than only on resets.
+        """
+        with self._lock:
+            self._entries[key] = (value, time.monotonic(), derived)
+
+    def discard(self, key: Tuple[Hashable, ...]) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate(self, setting: Optional[Hashable] = None) -> None:
+        """Drops every entry, or only the entries of one setting name."""
+        with self._lock:
+            if setting is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == setting]:
+                    del self._entries[key]
+
+    def observe_write(self, command: str) -> None:
+        """Called by the transport for every outgoing write."""
+        with self._lock:
+            if self._pattern.search(command):
+                self._entries.clear()
+            else:
+                for key in [k for k, e in self._entries.items() if e[2]]:
+                    del self._entries[key]
+
+    def observe_query(self, command: str) -> None:
+        """Queries only flush the cache when they embed an invalidating command."""
+        if self._pattern.search(command):
+            self.invalidate()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "skipped_writes": self.skipped_writes, "entries": len(self)}
+
+
+def _bind(func: Callable) -> Callable[..., Tuple[Any, ...]]:
+    """Returns a function mapping call arguments to their positional values."""
+    sig = inspect.signature(func)
+
+    def values(self: Any, *args: Any, **kwargs: Any) -> Tuple[Any, ...]:
+        bound = sig.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        return tuple(bound.arguments.values())[1:]
+
+    return values
+
+
+def cached_setter(setting: str, normalize: Optional[Callable[[Any], Any]] = None,
+                  invalidates: Tuple[str, ...] = (), coerced: bool = False) -> Callable:
+    """Decorates a setter whose last argument is the value being written.
+
+    Earlier arguments (e.g. a channel number) qualify the cache key, so
+    ``set_channel_scale(2, 0.5)`` is stored under ``("channel_scale", 2)``.
+
+    Args:
+        setting: Cache key name, shared with the matching :func:`cached_getter`.
+        normalize: Optional function applied to the value before it is compared
+            and stored (e.g. ``str.upper`` for enumerated settings).
+        invalidates: Other setting names the instrument recomputes when this
+            one changes (e.g. span moves start/stop).
+        coerced: The instrument may store a different value than requested
+            (rounding, discrete steps). The written value is then not cached;
+            the next getter reads back the real one.
+    """
+    def decorator(func: Callable) -> Callable:
+        arguments = _bind(func)
+
+        @functools.wraps(func)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            cache = getattr(self, "state_cache", None)
+            if cache is None:
+                return func(self, *args, **kwargs)
+            *qualifiers, value = arguments(self, *args, **kwargs)
+            if normalize is not None:
+                value = normalize(value)
+            key = (setting, *qualifiers)
+            if cache.get(key, _MISSING, count=False) == value:
+                cache.skipped_writes += 1
+                return None
+            try:
+                result = func(self, *args, **kwargs)
+            except Exception:
+                cache.discard(key)
+                raise
+            for other in invalidates:
+                cache.invalidate(other)
+            if coerced:
+                cache.discard(key)
+            else:
+                cache.store(key, value)
+            return result
+
+        return wrapper
+    return decorator
+
+
+def cached_getter(setting: str, derived: bool = False) -> Callable:
+    """Decorates a getter; all of its arguments qualify the cache key.
+
+    A miss performs the query and caches the result, so repeated reads of a
+    setting the driver never wrote still cost only one round trip.
+
+    Args:
+        setting: Cache key name, shared with the matching :func:`cached_setter`.
+        derived: Mark the value as computed by the instrument from other
+            settings; it is then dropped on any write.
+    """
+    def decorator(func: Callable) -> Callable:
+        arguments = _bind(func)
+
+        @functools.wraps(func)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            cache = getattr(self, "state_cache", None)
+            if cache is None:
+                return func(self, *args, **kwargs)
+            key = (setting, *arguments(self, *args, **kwargs))
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = func(self, *args, **kwargs)
+                cache.store(key, value, derived=derived)
+            return value
+
+        return wrapper
+    return decorator
@@ -1,12 +1,33 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
 from .base import Multimeter, PowerSupply
 from .registry import register_driver
 from .real import RealDriver
+from ..exceptions import ConfigurationError, OverloadError
 from ..results import MeasurementResult
+from ..sweep import sweep_values
 
 @register_driver("DMM")
 class Keithley2000(RealDriver, Multimeter):
     """Driver for Keithley 2000 Series Digital Multimeters."""
 
+    # Buffered bursts (see instrumation.burst): readings go to the trace
+    # buffer and are fetched in one single-precision block once complete.
+    BURST_CONFIGURE = ":CONF:{function}"
+    BURST_NPLC = ":SENS:{function}:NPLC {value}"
+    BURST_LINE_FREQUENCY = ":SYST:LFR?"
+    BURST_ARM = (":FORM:DATA SRE", ":FORM:BORD SWAP", ":FORM:ELEM READ",
+                 ":TRIG:SOUR {source}", ":TRIG:COUN {triggers}", ":SAMP:COUN {samples}",
+                 ":TRAC:CLE", ":TRAC:POIN {total}", ":TRAC:FEED SENS", ":TRAC:FEED:CONT NEXT")
+    BURST_START = ":INIT"
+    BURST_FETCH = ":TRAC:DATA?"
+    BURST_DRAINS = False
+    BURST_POINTS = ":TRAC:POIN:ACT?"
+    BURST_DTYPE = "<f4"
+    BURST_TEARDOWN = (":ABOR", ":TRAC:FEED:CONT NEV", ":FORM:DATA ASC")
+
     def preset(self, automation_optimized: bool = True) -> None:
         self.write("*RST")
         self.wait_ready()
@@ -63,6 +84,10 @@ class Keithley2400(Keithley2000, PowerSupply):
     making it a true Source Measure Unit.
     """
 
+    # The SourceMeter buffer stores several elements per reading; the
+    # 2000-style burst does not apply.
+    BURST_FETCH = None
+
     def __init__(self, resource: str) -> None:
         super().__init__(resource)
         self.max_voltage = 210.0
@@ -133,6 +158,118 @@ class Keithley2400(Keithley2000, PowerSupply):
         i = float(self.query_ascii(":MEAS:CURR:DC?"))
         return MeasurementResult(v * i, "W")
 
+    # ── Source sweeps ──────────────────────────────────────────
+
+    # Sweep limits of the 2400 trigger model
+    SWEEP_MAX_POINTS = 2500
+    LIST_MAX_POINTS = 100
+
+    def sweep_voltage(self, start: Optional[float] = None, stop: Optional[float] = None,
+                      points: Optional[int] = None, spacing: str = "LIN",
+                      values: Optional[Sequence[float]] = None, compliance: Optional[float] = None,
+                      nplc: float = 1.0, delay: float = 0.0) -> MeasurementResult:
+        """Runs a hardware voltage sweep and returns the current at each point.
+
+        The sweep (``"LIN"``/``"LOG"`` from ``start`` to ``stop``, or a list of
+        ``values``) is programmed into the source and trigger model, started
+        with a single ``:INIT`` and read back from the trace buffer as one
+        binary block.
+
+        Args:
+            compliance: Current limit in A (``:SENS:CURR:PROT``).
+            nplc: Integration time per point in power-line cycles.
+            delay: Source delay before each measurement, in seconds.
+
+        Returns:
+            MeasurementResult with the measured currents; ``metadata`` holds
+            the measured ``voltage`` and the instrument ``time`` of each point.
+        """
+        levels = sweep_values(start, stop, points, spacing, values)
+        if np.abs(levels).max() > self.max_voltage:
+            raise OverloadError(f"Sweep voltage {np.abs(levels).max()} V exceeds safety limit")
+        return self._source_sweep("VOLT", levels, "LIST" if values is not None else spacing.upper(),
+                                  compliance, nplc, delay)
+
+    def sweep_current(self, start: Optional[float] = None, stop: Optional[float] = None,
+                      points: Optional[int] = None, spacing: str = "LIN",
+                      values: Optional[Sequence[float]] = None, compliance: Optional[float] = None,
+                      nplc: float = 1.0, delay: float = 0.0) -> MeasurementResult:
+        """Runs a hardware current sweep and returns the voltage at each point.
+
+        Counterpart of :meth:`sweep_voltage`; ``compliance`` is a voltage limit
+        and ``metadata`` holds the measured ``current``.
+        """
+        levels = sweep_values(start, stop, points, spacing, values)
+        return self._source_sweep("CURR", levels, "LIST" if values is not None else spacing.upper(),
+                                  compliance, nplc, delay)
+
+    def _source_sweep(self, source: str, levels: np.ndarray, spacing: str,
+                      compliance: Optional[float], nplc: float, delay: float) -> MeasurementResult:
+        sense = "CURR" if source == "VOLT" else "VOLT"
+        if spacing == "LIST":
+            runs = [levels[i:i + self.LIST_MAX_POINTS] for i in range(0, len(levels), self.LIST_MAX_POINTS)]
+        elif len(levels) > self.SWEEP_MAX_POINTS:
+            raise ValueError(f"A sweep holds at most {self.SWEEP_MAX_POINTS} points")
+        else:
+            runs = [levels]
+
+        setup = [
+            f":SOUR:FUNC {source}",
+            f':SENS:FUNC "{sense}"',
+            f":SENS:{sense}:NPLC {nplc:g}",
+            f":SOUR:DEL {delay:g}",
+            ":SOUR:CLE:AUTO ON",  # output on for the sweep only
+            ":FORM:ELEM VOLT,CURR,TIME",
+            ":FORM:DATA SRE",
+            ":FORM:BORD SWAP",
+        ]
+        if compliance is not None:
+            setup.append(f":SENS:{sense}:PROT {compliance:g}")
+        with self.deferred_errors():
+            for command in setup:
+                self.write(command)
+
+        # Each point: source delay, measurement (~3 conversions with autozero)
+        point_time = delay + 3 * nplc / 50.0 + 0.002
+        data = np.concatenate([self._run_sweep(source, run, spacing, point_time) for run in runs])
+        volts, amps, times = data[:, 0], data[:, 1], data[:, 2]
+        self._source_mode = source
+        measured, unit, readback = (amps, "A", "voltage") if source == "VOLT" else (volts, "V", "current")
+        return MeasurementResult(measured, unit, metadata={
+            readback: volts if source == "VOLT" else amps,
+            "time": times,
+            "spacing": spacing,
+        })
+
+    def _run_sweep(self, source: str, levels: np.ndarray, spacing: str, point_time: float) -> np.ndarray:
+        n = len(levels)
+        if spacing == "LIST":
+            commands = [f":SOUR:{source}:MODE LIST",
+                        f":SOUR:LIST:{source} " + ",".join(f"{v:.9g}" for v in levels)]
+        else:
+            commands = [f":SOUR:{source}:MODE SWE", f":SOUR:SWE:SPAC {spacing}",
+                        f":SOUR:{source}:STAR {levels[0]:.9g}", f":SOUR:{source}:STOP {levels[-1]:.9g}",
+                        f":SOUR:SWE:POIN {n}", ":SOUR:SWE:RANG BEST"]
+        commands += [f":TRIG:COUN {n}", ":TRAC:CLE", f":TRAC:POIN {n}",
+                     ":TRAC:FEED SENS", ":TRAC:FEED:CONT NEXT"]
+        with self.deferred_errors():
+            for command in commands:
+                self.write(command)
+
+        old_timeout = self.inst.timeout
+        self.inst.timeout = max(old_timeout or 0, int((n * point_time + 5.0) * 1000))
+        try:
+            self.write(":INIT")
+            self.query("*OPC?")  # returns when the whole sweep is in the buffer
+        finally:
+            self.inst.timeout = old_timeout
+
+        blocks = self.query_binary_blocks(":TRAC:DATA?", dtype="<f4")
+        data = np.concatenate(blocks).astype(np.float64) if blocks else np.empty(0)
+        if data.size != 3 * n:
+            raise ConfigurationError(f"Sweep on {self.resource} returned {data.size // 3} of {n} points")
+        return data.reshape(n, 3)
+
     # ── Measure functions (Multimeter) ─────────────────────────
 
     def configure_voltage_dc(self) -> None:
@@ -1,12 +1,42 @@
 from .base import SpectrumAnalyzer, NetworkAnalyzer, SignalGenerator, Oscilloscope, Multimeter, FrequencyCounter
 from .registry import register_driver
 from .real import RealDriver
-from ..results import MeasurementResult
-from typing import List
+from .cache import cached_getter, cached_setter
+from ..results import MeasurementResult, TraceAxis
+from ..exceptions import ConfigurationError
+from typing import Dict, List, Optional, Sequence
+import numpy as np
 
 @register_driver("SA")
 class KeysightMXA(RealDriver, SpectrumAnalyzer):
     """Driver for Keysight MXA Series Spectrum Analyzers."""
+
+    # Setup profile templates, in the order the instrument should receive them
+    # (frequency axis first, since span changes auto-coupled RBW/VBW).
+    PROFILE_COMMANDS = {
+        "center_freq": ":SENS:FREQ:CENT {value}",
+        "span": ":SENS:FREQ:SPAN {value}",
+        "start_freq": ":SENS:FREQ:STAR {value}",
+        "stop_freq": ":SENS:FREQ:STOP {value}",
+        "sweep_points": ":SENS:SWE:POIN {value}",
+        "rbw_auto": ":SENS:BAND:AUTO {value}",
+        "rbw": ":SENS:BAND {value}",
+        "vbw": ":SENS:BAND:VID {value}",
+        "ref_level": ":DISP:WIND:TRAC:Y:RLEV {value}",
+        "attenuation": ":SENS:POW:ATT {value}",
+        "continuous": ":INIT:CONT {value}",
+    }
+
+    # Double-buffered acquisition: finished sweeps are copied to a held
+    # TRACE2 and read from there while TRACE1 is already sweeping again.
+    ACQ_SETUP = (":FORM:DATA REAL,32", ":FORM:BORD SWAP", ":INIT:CONT OFF", ":TRAC2:UPD OFF")
+    ACQ_TRIGGER = ":INIT:IMM"
+    ACQ_WAIT = "*WAI"
+    ACQ_SNAPSHOT = ":TRAC:COPY TRACE1,TRACE2"
+    ACQ_FETCH = ":TRAC? TRACE2"
+    ACQ_TEARDOWN = (":ABOR", ":TRAC2:UPD ON", ":INIT:CONT ON")
+
+    AXIS_QUERY = ":SENS:FREQ:STAR?;:SENS:FREQ:STOP?;:SENS:SWE:POIN?"
     
     def preset(self, automation_optimized: bool = True) -> None:
         self.write("*RST")
@@ -27,44 +57,105 @@ class KeysightMXA(RealDriver, SpectrumAnalyzer):
         val = self.query_ascii(":CALC:MARK1:Y?")
         return MeasurementResult(float(val), "dBm")
 
+    @cached_setter("center_freq", normalize=float)
     def set_center_freq(self, hz: float) -> None:
         self._validate_frequency(hz)
         self.write(f":SENS:FREQ:CENT {hz}")
 
+    @cached_getter("center_freq")
     def get_center_freq(self) -> float:
         return float(self.query(":SENS:FREQ:CENT?"))
 
+    @cached_setter("span", normalize=float, invalidates=("rbw", "vbw", "sweep_time"), coerced=True)
     def set_span(self, hz: float) -> None:
         self.write(f":SENS:FREQ:SPAN {hz}")
 
+    @cached_getter("span")
     def get_span(self) -> float:
         return float(self.query(":SENS:FREQ:SPAN?"))
 
+    @cached_setter("sweep_points", normalize=int, coerced=True)
     def set_sweep_points(self, points: int) -> None:
         self.write(f":SENS:SWE:POIN {points}")
 
+    @cached_setter("ref_level", normalize=float)
     def set_ref_level(self, dbm: float) -> None:
         self.write(f":DISP:WIND:TRAC:Y:RLEV {dbm}")
 
+    @cached_setter("attenuation", normalize=float)
     def set_attenuation(self, db: float) -> None:
         self.write(f":SENS:POW:ATT {db}")
 
+    @cached_setter("rbw", normalize=float, invalidates=("vbw", "rbw_auto"))
     def set_rbw(self, hz: float) -> None:
         self.safe_send(f":SENS:BAND {hz}")
 
+    @cached_setter("vbw", normalize=float, invalidates=("vbw_auto",))
     def set_vbw(self, hz: float) -> None:
         self.safe_send(f":SENS:BAND:VID {hz}")
 
     def get_trace_data(self) -> MeasurementResult:
-        # Optimization: Use 32-bit float binary transfer instead of ASCII
-        self.write(":FORM:DATA REAL,32")
-        self.write(":FORM:BORD SWAP") # Ensure Little-Endian
         self.write(":INIT:CONT OFF")  # Single sweep mode
         self.write(":INIT:IMM")       # Trigger sweep
         self.wait_ready()             # Wait for sweep completion
-        data = self.query_binary_values(":TRAC? TRACE1", datatype='f', is_big_endian=False)
+        data = self.fetch_trace()
         self.write(":INIT:CONT ON")   # Restore continuous sweep
-        return MeasurementResult(list(data), "dBm")
+        return MeasurementResult(data, "dBm", axis=self.get_trace_axis())
+
+    def fetch_trace(self) -> List[float]:
+        """Reads TRACE1 as it stands, without starting a new sweep."""
+        # Optimization: Use 32-bit float binary transfer instead of ASCII
+        self.write(":FORM:DATA REAL,32")
+        self.write(":FORM:BORD SWAP") # Ensure Little-Endian
+        return list(self.query_binary_values(":TRAC? TRACE1", datatype='f', is_big_endian=False))
+
+    def trigger_sweep(self) -> None:
+        """Takes one single sweep and blocks until it is complete.
+
+        Uses a single ``*OPC?`` round trip instead of :meth:`wait_ready` polling.
+        """
+        self.query(":INIT:CONT OFF;:INIT:IMM;*OPC?")
+
+    def get_continuous(self) -> bool:
+        return self.query(":INIT:CONT?").strip() in ("1", "ON")
+
+    def set_continuous(self, state: bool) -> None:
+        self.write(f":INIT:CONT {'ON' if state else 'OFF'}")
+
+    def read_peak(self) -> float:
+        """Peak amplitude (dBm) of the last sweep, in one round trip."""
+        return float(self.query(":CALC:MARK1:MAX;:CALC:MARK1:Y?"))
+
+    def arm_external_sweep(self, start: float, stop: float, points: int,
+                           sweep_time: float, delay: float = 0.0) -> None:
+        """Arms one sweep that waits for a rising edge on EXT TRIG 1.
+
+        Used for hardware-synchronised sweeps: the sweep starts when the
+        source asserts its trigger output, so no software handshake sits
+        between the two instruments.
+        """
+        self._validate_frequency(start)
+        self._validate_frequency(stop)
+        with self.deferred_errors():
+            self.write(":INIT:CONT OFF")
+            self.safe_send(f":SENS:FREQ:STAR {start}")
+            self.safe_send(f":SENS:FREQ:STOP {stop}")
+            self.safe_send(f":SENS:SWE:POIN {int(points)}")
+            self.safe_send(f":SENS:SWE:TIME {sweep_time}")
+            self.safe_send(f":TRIG:EXT1:DEL {delay}")
+            self.safe_send(f":TRIG:EXT1:DEL:STAT {'ON' if delay else 'OFF'}")
+            self.safe_send(":TRIG:SOUR EXT1")
+            self.write(":INIT:IMM")
+        self.invalidate_state_cache()
+
+    def read_external_sweep(self, timeout: float = 30.0) -> MeasurementResult:
+        """Waits for an armed external sweep, fetches it and returns to free run."""
+        self.wait_ready(timeout=timeout)
+        data = self.fetch_trace()
+        self.write(":TRIG:SOUR IMM")
+        self.write(":INIT:CONT ON")
+        return MeasurementResult(data, "dBm", axis=self.get_trace_axis())
+
     def measure_frequency(self) -> MeasurementResult: return MeasurementResult(0.0, "Hz")
     def measure_duty_cycle(self) -> MeasurementResult: return MeasurementResult(0.0, "%")
     def measure_v_peak_to_peak(self) -> MeasurementResult: return MeasurementResult(0.0, "V")
@@ -72,6 +163,21 @@ class KeysightMXA(RealDriver, SpectrumAnalyzer):
 @register_driver("SA")
 class KeysightPXA(KeysightMXA):
     """Driver for Keysight PXA Series Spectrum Analyzers (N9030A/B)."""
+
+    PROFILE_COMMANDS = {
+        **KeysightMXA.PROFILE_COMMANDS,
+        "sweep_type": ":SENS:SWE:TYPE {value}",
+        "detector": ":SENS:AVER:FUNC {value}",
+        "average_count": ":SENS:AVER:COUN {value}",
+        "video_average": ":SENS:BAND:VID:AUTO {value}",
+        "vbw_ratio": ":SENS:BAND:VID:RAT {value}",
+        "input_coupling": ":INP:COUP {value}",
+        "trigger_source": ":TRIG:SOUR {value}",
+        "trigger_level": ":TRIG:LEV {value}",
+        "trigger_slope": ":TRIG:SLOP {value}",
+        "trigger_delay": ":TRIG:DEL {value}",
+    }
+
     def __init__(self, resource: str) -> None:
         super().__init__(resource)
         # PXA typically has higher performance and frequency range
@@ -113,6 +219,7 @@ class KeysightPXA(KeysightMXA):
             raise ValueError("Average count must be >= 1")
         self.safe_send(f":SENS:AVER:COUN {count}")
 
+    @cached_setter("vbw_auto", normalize=bool, invalidates=("vbw",))
     def set_video_average(self, enable: bool) -> None:
         """Enable or disable video averaging.
 
@@ -227,6 +334,7 @@ class KeysightPXA(KeysightMXA):
 
     # ── Bandwidth & Sweep ───────────────────────────────────────────────────────
 
+    @cached_setter("rbw_auto", normalize=bool, invalidates=("rbw", "vbw"))
     def set_rbw_auto(self, enable: bool) -> None:
         """Enable or disable automatic RBW.
 
@@ -234,6 +342,7 @@ class KeysightPXA(KeysightMXA):
         """
         self.write(f":SENS:BAND:AUTO {'ON' if enable else 'OFF'}")
 
+    @cached_setter("vbw_ratio", normalize=float, invalidates=("vbw",))
     def set_vbw_ratio(self, ratio: float) -> None:
         """Set VBW to RBW ratio.
 
@@ -243,6 +352,7 @@ class KeysightPXA(KeysightMXA):
             raise ValueError("VBW ratio must be > 0")
         self.safe_send(f":SENS:BAND:VID:RAT {ratio}")
 
+    @cached_getter("sweep_time", derived=True)
     def get_sweep_time(self) -> float:
         """Get current sweep time in seconds.
 
@@ -332,6 +442,10 @@ class KeysightPXA(KeysightMXA):
 @register_driver("VNA")
 class KeysightPNA(RealDriver, NetworkAnalyzer):
     """Driver for Keysight PNA Series (including E836x, N52xx)."""
+
+    # Channel 1 stimulus; the sweep type marks log-frequency sweeps
+    AXIS_QUERY = ":SENS:FREQ:STAR?;:SENS:FREQ:STOP?;:SENS:SWE:POIN?;:SENS:SWE:TYPE?"
+
     def connect(self) -> None:
         super().connect()
         self._discover_capabilities()
@@ -455,6 +569,15 @@ class KeysightPNA(RealDriver, NetworkAnalyzer):
         parts = catalog.split(',')
         return parts[::2] # Extract names
 
+    def get_parameter_map(self) -> Dict[str, str]:
+        """Maps each defined parameter (e.g. ``"S21"``) to the first measurement measuring it."""
+        catalog = self.query("CALC:PAR:CAT:EXT?").strip().strip('"')
+        parts = catalog.split(',') if catalog else []
+        mapping: Dict[str, str] = {}
+        for name, parameter in zip(parts[::2], parts[1::2]):
+            mapping.setdefault(parameter.strip().upper(), name.strip())
+        return mapping
+
     def get_screenshot(self) -> bytes:
         """Captures a screenshot from the VNA using high-speed binary transfer."""
         self.safe_send("DISP:ENAB ON")
@@ -481,7 +604,7 @@ class KeysightPNA(RealDriver, NetworkAnalyzer):
         self.safe_send("FORM:BORD SWAP") 
         self.safe_send("FORM:DATA REAL,32")
         data = self.query_binary_values("CALC:DATA? FDATA", datatype='f', is_big_endian=False)
-        return MeasurementResult(list(data), "dB")
+        return MeasurementResult(list(data), "dB", axis=self.get_trace_axis())
 
     def get_complex_trace(self, measurement_name: str = "CH1_S11_1") -> MeasurementResult:
         """Fetches complex data (Real/Imag) for the specified measurement."""
@@ -490,7 +613,43 @@ class KeysightPNA(RealDriver, NetworkAnalyzer):
         self.safe_send("FORM:DATA REAL,32")
         raw_data = self.query_binary_values("CALC:DATA? SDATA", datatype='f', is_big_endian=False)
         data = [complex(raw_data[i], raw_data[i+1]) for i in range(0, len(raw_data), 2)]
-        return MeasurementResult(data, "IQ")
+        return MeasurementResult(data, "IQ", axis=self.get_trace_axis())
+
+    def get_sparameters(self, ports: Sequence[int] = (1, 2),
+                        measurements: Optional[Dict[str, str]] = None) -> MeasurementResult:
+        """Fetches the S-matrix for ``ports`` in a single binary transfer.
+
+        The data format is set once and the select/SDATA fetch of every
+        parameter is pipelined into one compound query, instead of the
+        select, format and error checks ``get_complex_trace`` repeats per
+        parameter. Measurements are looked up in the catalog (one query)
+        unless ``measurements`` maps them, e.g. ``{"S21": "CH1_S21_1"}``.
+
+        Returns:
+            MeasurementResult holding a complex ``(points, n, n)`` array,
+            ``value[:, i, j]`` being S(ports[i], ports[j]).
+
+        Raises:
+            ConfigurationError: If a parameter has no measurement, or the
+                measurements differ in point count.
+        """
+        names = self.sparameter_names(ports)
+        if measurements is None:
+            measurements = self.get_parameter_map()
+        missing = [p for p in names if p not in measurements]
+        if missing:
+            raise ConfigurationError(f"No measurement defined for {', '.join(missing)} on {self.resource}")
+
+        self.write("FORM:BORD SWAP;:FORM:DATA REAL,32")
+        fetch = ";:".join(f"CALC:PAR:SEL '{measurements[p]}';:CALC:DATA? SDATA" for p in names)
+        blocks = self.query_binary_blocks(fetch, dtype="<f4")
+        if len(blocks) != len(names) or len({b.size for b in blocks}) != 1:
+            raise ConfigurationError(f"Inconsistent S-parameter data from {self.resource}: "
+                                     f"{[b.size // 2 for b in blocks]} points for {names}")
+        iq = np.stack(blocks).astype(np.float64)
+        n = len(ports)
+        s = (iq[:, 0::2] + 1j * iq[:, 1::2]).T.reshape(-1, n, n)
+        return MeasurementResult(s, "S", metadata={"ports": list(ports)}, axis=self.get_trace_axis())
 
     def get_smith_data(self, measurement_name: str = "CH1_S11_1") -> MeasurementResult:
         """Fetches Smith Chart data (R + jX) using the instrument's built-in math engine."""
@@ -541,6 +700,16 @@ class KeysightPNA(RealDriver, NetworkAnalyzer):
 @register_driver("SG")
 class KeysightSG(RealDriver, SignalGenerator):
     """Driver for Keysight Signal Generators (EXG/MXG)."""
+
+    PROFILE_COMMANDS = {
+        "reference_clock": ":ROSC:SOUR {value}",
+        "frequency": ":FREQ {value}",
+        "amplitude": ":POW {value}",
+        "am": ":AM:STAT {value}",
+        "fm": ":FM:STAT {value}",
+        "pulse": ":PULM:STAT {value}",
+        "output": ":OUTP {value}",
+    }
     
     def __init__(self, resource: str) -> None:
         super().__init__(resource)
@@ -572,23 +741,29 @@ class KeysightSG(RealDriver, SignalGenerator):
 
     def shutdown_safety(self) -> None:
         """Emergency Shutdown: RF OFF and -130 dBm, then restore Display."""
+        # Never let a stale cached level suppress the safety writes
+        self.invalidate_state_cache()
         self.set_output(False)
         self.set_amplitude(-130.0)
         self.write(":DISP:STAT ON")
         self.sync_config()
 
+    @cached_setter("frequency", normalize=float)
     def set_frequency(self, hz: float) -> None:
         self.safe_send(f":FREQ {self.format_frequency(hz)}")
 
+    @cached_setter("amplitude", normalize=float)
     def set_amplitude(self, dbm: float) -> None:
         self.safe_send(f":POW {self.format_power(dbm)}")
 
     def set_output(self, state: bool) -> None:
         self.write(f":OUTP {'ON' if state else 'OFF'}")
 
+    @cached_getter("frequency")
     def get_frequency(self) -> float:
         return float(self.query(":FREQ:CW?"))
 
+    @cached_getter("amplitude")
     def get_amplitude(self) -> float:
         return float(self.query(":POW?"))
 
@@ -621,6 +796,42 @@ class KeysightSG(RealDriver, SignalGenerator):
         self.safe_send(f":LIST:FREQ {freq_str}")
         self.safe_send(f":LIST:POW {pow_str}")
 
+    def arm_list_sweep(self, freq_list: List[float], power_list: Optional[List[float]] = None,
+                       dwell: float = 0.001) -> None:
+        """Loads a frequency (and optional power) list and waits for :meth:`trigger_list_sweep`.
+
+        Points advance on the internal dwell timer, so the whole list plays out
+        without any bus traffic. TRIG OUT marks the start of the sweep and can
+        drive an analyzer's external trigger input.
+        """
+        for hz in freq_list:
+            self._validate_frequency(hz)
+        if power_list is None:
+            power_list = [self.get_amplitude()] * len(freq_list)
+        for dbm in power_list:
+            self._validate_power(dbm)
+        with self.deferred_errors():
+            self.configure_list_sweep(freq_list, power_list)
+            self.safe_send(":LIST:TYPE LIST")
+            self.safe_send(":LIST:DWEL:TYPE STEP")
+            self.safe_send(f":SWE:DWEL {dwell}")
+            self.safe_send(":LIST:TRIG:SOUR IMM")
+            self.safe_send(":TRIG:SOUR IMM")
+            self.write(":INIT:CONT OFF")
+            self.safe_send(":FREQ:MODE LIST")
+            self.safe_send(":POW:MODE LIST")
+        self.invalidate_state_cache()
+
+    def trigger_list_sweep(self) -> None:
+        """Starts a sweep armed by :meth:`arm_list_sweep` without waiting for it."""
+        self.write(":INIT")
+
+    def stop_list_sweep(self) -> None:
+        """Returns frequency and power to fixed (CW) mode."""
+        self.write(":FREQ:MODE CW")
+        self.write(":POW:MODE FIX")
+        self.invalidate_state_cache()
+
     def set_reference_clock(self, source: str) -> None:
         self.safe_send(f":ROSC:SOUR {source}")
 
@@ -774,16 +985,21 @@ class KeysightInfiniiVision(RealDriver, Oscilloscope):
         # Query scaling
         preamble = self.query(":WAVeform:PREamble?").split(",")
         # Preamble structure: format, type, points, count, xinc, xor, xref, yinc, yor, yref
+        x_inc = float(preamble[4])
+        x_origin = float(preamble[5])
+        x_ref = float(preamble[6])
         y_inc = float(preamble[7])
         y_origin = float(preamble[8])
         y_ref = float(preamble[9])
 
         # Fetch binary data
         raw_data = self.query_binary_values(":WAVeform:DATA?", datatype='h', is_big_endian=False)
-        
-        # Voltage = ((raw - yref) * yinc) + yorigin
-        data = [((val - y_ref) * y_inc) + y_origin for val in raw_data]
-        return MeasurementResult(data, "V")
+
+        # Voltage = ((raw - yref) * yinc) + yorigin, time = ((n - xref) * xinc) + xorigin
+        data = ((np.asarray(raw_data, dtype=np.float64) - y_ref) * y_inc + y_origin).tolist()
+        t0 = x_origin - x_ref * x_inc
+        axis = TraceAxis(t0, t0 + (len(data) - 1) * x_inc, len(data), unit="s") if data else None
+        return MeasurementResult(data, "V", channel=channel, axis=axis)
 
     def auto_scale(self) -> None:
         self.write(":AUToscale")
@@ -823,6 +1039,20 @@ class Keysight34461A(RealDriver, Multimeter):
     Frequency, Period, Temperature, Capacitance, and Diode test.
     """
 
+    # Buffered bursts (see instrumation.burst); R? drains reading memory
+    # as little-endian REAL,64 blocks. No aperture command on the 34461A.
+    BURST_CONFIGURE = ":CONF:{function}"
+    BURST_NPLC = ":SENS:{function}:NPLC {value}"
+    BURST_LINE_FREQUENCY = ":SYST:LFR?"
+    BURST_ARM = (":FORM:DATA REAL,64", ":FORM:BORD SWAP", ":TRIG:SOUR {source}",
+                 ":TRIG:COUN {triggers}", ":SAMP:COUN {samples}")
+    BURST_START = ":INIT"
+    BURST_FETCH = ":R? {count}"
+    BURST_DRAINS = True
+    BURST_POINTS = ":DATA:POIN?"
+    BURST_DTYPE = "<f8"
+    BURST_TEARDOWN = (":ABOR", ":FORM:DATA ASC")
+
     def preset(self, automation_optimized: bool = True) -> None:
         self.write("*RST")
         self.wait_ready()
@@ -903,6 +1133,21 @@ class Keysight53230A(RealDriver, FrequencyCounter):
         - :INP{ch}:RANG:AUTO {ON|OFF}         — auto range
     """
 
+    # Gap-free streaming (see instrumation.burst): in continuous mode the gates
+    # are back to back, so reading k starts exactly k gate times after :INIT.
+    BURST_CONFIGURE = ":CONF:{function} (@{channel})"
+    BURST_APERTURE = ":SENS:FREQ:GATE:TIME {value}"
+    BURST_ARM = (":SENS:FREQ:MODE CONT", ":SENS:FREQ:GATE:SOUR TIME", ":FORM REAL,64",
+                 ":FORM:BORD SWAP", ":TRIG:SOUR {source}", ":TRIG:COUN {triggers}",
+                 ":SAMP:COUN {samples}")
+    BURST_START = ":INIT"
+    BURST_FETCH = ":R? {count}"
+    BURST_DRAINS = True
+    BURST_POINTS = ":DATA:POIN?"
+    BURST_DTYPE = "<f8"
+    BURST_GAP_FREE = True
+    BURST_TEARDOWN = (":ABOR", ":FORM ASC")
+
     def __init__(self, resource: str) -> None:
         super().__init__(resource)
         self.min_frequency = 0.0
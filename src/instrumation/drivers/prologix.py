@@ -1,14 +1,30 @@
+import itertools
 import logging
+import re
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+import numpy as np
+
 from .real import RealDriver
 from .registry import register_driver
+from ..exceptions import ConnectionLost
+from ..transport import split_ieee_blocks
 
 logger = logging.getLogger(__name__)
 
+_GPIB_RESOURCE = re.compile(r"^GPIB\d*::(\d+)(?:::(\d+))?::INSTR$", re.IGNORECASE)
+
+
 @register_driver("BRIDGE")
 class PrologixDriver(RealDriver):
     """
     Driver for the Prologix GPIB-USB Controller.
     This acts as a bridge to communicate with GPIB instruments via a Serial port.
+
+    For several instruments behind one controller use :class:`PrologixBus`,
+    which serialises access to the port and switches ``++addr`` only when needed.
     """
 
     def __init__(self, resource_address: str, gpib_address: int = 1) -> None:
@@ -47,5 +63,264 @@ class PrologixDriver(RealDriver):
 
     def read(self) -> str:
         """Reads data from the serial buffer."""
-        # We override to handle the fact that Prologix returns data via Serial
-        return super().read()
+        # Prologix returns data via Serial; RealDriver has no read() of its own
+        if not self.inst:
+            raise ConnectionLost("Not connected.")
+        return self.inst.read()
+
+
+class GPIBSession:
+    """pyvisa-like resource for one GPIB address behind a :class:`PrologixBus`.
+
+    Drivers use it as their ``inst``; every call is one locked bus operation.
+    The instrument keeps its reply until it is addressed to talk, so a write
+    and the following read need not be in the same operation.
+    """
+
+    def __init__(self, bus: "PrologixBus", address: int, secondary: Optional[int] = None) -> None:
+        self.bus = bus
+        self.address = address
+        self.secondary = secondary
+        self.timeout = 5000  # ms, applied to the serial port for this session's reads
+        self.read_termination = "\n"
+        self.write_termination = "\n"
+        self.resource_name = f"GPIB0::{address}::INSTR" if secondary is None \
+            else f"GPIB0::{address}::{secondary}::INSTR"
+
+    @property
+    def target(self) -> Tuple[int, Optional[int]]:
+        return (self.address, self.secondary)
+
+    def write(self, command: str) -> None:
+        self.bus.write(self.target, command)
+
+    def read(self) -> str:
+        return self.bus.read(self.target, timeout=self.timeout).decode(errors="replace")
+
+    def read_raw(self) -> bytes:
+        return self.bus.read(self.target, timeout=self.timeout)
+
+    def query(self, command: str) -> str:
+        return self.bus.query(self.target, command, timeout=self.timeout).decode(errors="replace")
+
+    def query_ascii_values(self, command: str, converter: str = "f", separator: str = ",") -> List[float]:
+        return [float(v) for v in self.query(command).strip().split(separator) if v.strip()]
+
+    def query_binary_values(self, command: str, datatype: str = "f",
+                            is_big_endian: bool = False) -> List[float]:
+        raw = self.bus.query(self.target, command, timeout=self.timeout)
+        blocks = split_ieee_blocks(raw)
+        dtype = (">" if is_big_endian else "<") + datatype
+        return np.frombuffer(blocks[0], dtype=dtype).tolist() if blocks else []
+
+    def clear(self) -> None:
+        """Selected device clear (``++clr``)."""
+        self.bus.command(self.target, "++clr")
+
+    def close(self) -> None:
+        """Sessions share the bus; the serial port stays open."""
+
+
+class PrologixBus:
+    """Arbiter for one Prologix GPIB-USB controller shared by several instruments.
+
+    Owns the serial port and hands out per-address :class:`GPIBSession`
+    objects. Operations are serialised with a lock; when several threads are
+    waiting, those addressing the currently selected instrument go first so
+    ``++addr`` switches are kept to a minimum (at most ``MAX_BATCH`` grants in
+    a row, so other addresses are not starved). ``++addr`` is only sent when
+    the target actually changes::
+
+        bus = PrologixBus.shared("ASRL/dev/ttyUSB0::INSTR")
+        dmm = bus.instrument(Keithley2000, 16)
+        smu = bus.instrument(Keithley2400, 24)
+
+    Args:
+        port: VISA resource of the controller's serial port.
+        rm: Resource manager used to open the port (default: the shared one).
+        read_timeout_ms: Controller inter-character timeout (``++read_tmo_ms``).
+    """
+
+    MAX_BATCH = 16
+
+    _shared: Dict[str, "PrologixBus"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, port: str, rm: Any = None, read_timeout_ms: int = 500) -> None:
+        self.port = port
+        self.rm = rm
+        self.read_timeout_ms = read_timeout_ms
+        self.serial: Any = None
+        self.current: Optional[Tuple[int, Optional[int]]] = None
+        self.address_switches = 0
+        self._cond = threading.Condition()
+        self._owner: Optional[int] = None
+        self._depth = 0
+        self._batch = 0
+        self._tickets = itertools.count()
+        self._waiting: List[Tuple[int, Tuple[int, Optional[int]]]] = []
+
+    @classmethod
+    def shared(cls, port: str, rm: Any = None) -> "PrologixBus":
+        """The one bus for ``port`` in this process, opened on first use."""
+        with cls._shared_lock:
+            bus = cls._shared.get(port)
+            if bus is None:
+                bus = cls._shared[port] = cls(port, rm=rm)
+            if bus.serial is None:
+                bus.open()
+            return bus
+
+    def open(self) -> None:
+        """Opens the serial port and configures the controller."""
+        from ..factory import get_rm
+        rm = self.rm or get_rm()
+        self.serial = rm.open_resource(self.port)
+        self.serial.write_termination = "\n"
+        self.serial.read_termination = "\n"
+        self.current = None
+        for command in ("++mode 1", "++auto 0", "++eoi 1", f"++read_tmo_ms {self.read_timeout_ms}"):
+            self.serial.write(command)
+        logger.info(f"Prologix bus opened on {self.port}")
+
+    def close(self) -> None:
+        with self._cond:
+            if self.serial is not None:
+                self.serial.close()
+            self.serial = None
+            self.current = None
+        with self._shared_lock:
+            if self._shared.get(self.port) is self:
+                del self._shared[self.port]
+
+    # --- Arbitration ---
+    def _next(self) -> Optional[Tuple[int, Tuple[int, Optional[int]]]]:
+        if not self._waiting:
+            return None
+        if self._batch < self.MAX_BATCH:
+            for entry in self._waiting:
+                if entry[1] == self.current:
+                    return entry
+        return self._waiting[0]
+
+    @contextmanager
+    def exclusive(self, target: Any) -> Iterator[None]:
+        """Holds the bus for ``target`` (address or ``(address, secondary)``).
+
+        Re-entrant for the holding thread, so several operations can be
+        grouped without another instrument cutting in.
+        """
+        target = _target(target)
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner != me:
+                entry = (next(self._tickets), target)
+                self._waiting.append(entry)
+                while self._owner is not None or self._next() is not entry:
+                    self._cond.wait()
+                self._waiting.remove(entry)
+                self._owner = me
+                self._batch = self._batch + 1 if target == self.current else 1
+            self._depth += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._depth -= 1
+                if not self._depth:
+                    self._owner = None
+                    self._cond.notify_all()
+
+    def _select(self, target: Tuple[int, Optional[int]]) -> None:
+        if self.serial is None:
+            raise ConnectionLost(f"Prologix bus on {self.port} is not open")
+        if target == self.current:
+            return
+        address, secondary = target
+        # Secondary addresses are sent as 96 + SAD
+        self.serial.write(f"++addr {address}" if secondary is None else f"++addr {address} {96 + secondary}")
+        self.current = target
+        self.address_switches += 1
+
+    # --- Bus operations ---
+    def write(self, target: Any, command: str) -> None:
+        target = _target(target)
+        with self.exclusive(target):
+            self._select(target)
+            self.serial.write(command.rstrip("\n"))
+
+    def read(self, target: Any, timeout: Optional[float] = None) -> bytes:
+        """Addresses ``target`` to talk and reads its reply up to EOI."""
+        target = _target(target)
+        with self.exclusive(target):
+            self._select(target)
+            if timeout is not None:
+                self.serial.timeout = timeout
+            self.serial.write("++read eoi")
+            return self._read_message()
+
+    def _read_message(self) -> bytes:
+        """Reads one reply; definite-length binary blocks are read by count.
+
+        The port's ``\n`` read termination would otherwise cut a block at the
+        first 0x0A byte in its data.
+        """
+        data = bytearray()
+        while True:
+            head = self.serial.read_bytes(1)
+            data += head
+            if head == b"\n":
+                return bytes(data)
+            if head != b"#":
+                data += self.serial.read_raw()
+                return bytes(data)
+            digits = self.serial.read_bytes(1)
+            data += digits
+            if digits == b"0":
+                # Indefinite length: the block runs to the end of the message
+                data += self.serial.read_raw()
+                return bytes(data)
+            length = self.serial.read_bytes(int(digits))
+            data += length + self.serial.read_bytes(int(length))
+            separator = self.serial.read_bytes(1)
+            data += separator
+            if separator not in (b";", b","):
+                return bytes(data)
+
+    def query(self, target: Any, command: str, timeout: Optional[float] = None) -> bytes:
+        target = _target(target)
+        with self.exclusive(target):
+            self.write(target, command)
+            return self.read(target, timeout)
+
+    def command(self, target: Any, command: str) -> None:
+        """Sends a controller (``++``) command with ``target`` selected."""
+        self.write(target, command)
+
+    # --- Sessions ---
+    def session(self, address: int, secondary: Optional[int] = None) -> GPIBSession:
+        return GPIBSession(self, address, secondary)
+
+    def open_resource(self, resource_name: str, **kwargs: Any) -> GPIBSession:
+        """Resource-manager interface: ``GPIB0::16::INSTR`` -> session for address 16."""
+        match = _GPIB_RESOURCE.match(resource_name.strip())
+        if not match:
+            raise ValueError(f"'{resource_name}' is not a GPIB INSTR resource")
+        secondary = int(match.group(2)) if match.group(2) is not None else None
+        return self.session(int(match.group(1)), secondary)
+
+    def instrument(self, driver_cls: Type[RealDriver], address: int,
+                   secondary: Optional[int] = None, connect: bool = True) -> RealDriver:
+        """Creates a driver talking through this bus (and connects it)."""
+        resource = f"GPIB0::{address}::INSTR" if secondary is None else f"GPIB0::{address}::{secondary}::INSTR"
+        driver = driver_cls(resource)
+        driver.rm = self
+        if connect:
+            driver.connect()
+        return driver
+
+
+def _target(target: Any) -> Tuple[int, Optional[int]]:
+    if isinstance(target, tuple):
+        return (int(target[0]), None if target[1] is None else int(target[1]))
+    return (int(target), None)
@@ -1,12 +1,83 @@
+import functools
+import numpy as np
 import pyvisa
+import re
 import time
-from typing import List, Tuple
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Iterator, List, Optional, Tuple
 from .base import InstrumentDriver
-from ..results import MeasurementResult
+from .cache import invalidates_state
+from ..results import MeasurementResult, TraceAxis
 from ..exceptions import ConnectionLost, ConfigurationError, InstrumentTimeout
+from ..transport import SocketResource, split_ieee_blocks
+from ..timeouts import AdaptiveTimeouts
+
+# *ESR? bits 2-5: query, device-dependent, execution and command errors
+ESR_ERROR_BITS = 0x3C
+
+_ERROR_ENTRY = re.compile(r'([+-]?\d+)\s*,\s*"([^"]*)"')
+
+
+# Program message units that move a trace X axis (frequency, span, points,
+# sweep type, timebase); a cached TraceAxis is dropped when one is written.
+_AXIS_SETTING = re.compile(r"FREQ|SPAN|POIN|SWE(EP)?:TYPE|TIM", re.IGNORECASE)
+
+
+# Bytes of an ASCII number list; a binary float payload is never made of these alone
+_ASCII_NUMBER_BYTES = b"0123456789+-.eE, \t\r\n"
+
+
+@functools.lru_cache(maxsize=None)
+def _header_pattern(template: str) -> "re.Pattern":
+    """Matches the header of a ``PROFILE_COMMANDS`` template in short or long form.
+
+    Each node matches from its short form (the upper-case letters) on, so
+    ``:CHANnel{index}:SCALe`` also matches ``:CHAN2:SCAL``; ``{index}`` is
+    captured and a leading ``SENS`` node is optional, as in SCPI.
+    """
+    nodes = []
+    for node in template.split(" ", 1)[0].strip(":").split(":"):
+        name, index, _ = node.partition("{index}")
+        short = "".join(c for c in name if c.isupper()) or name
+        nodes.append(re.escape(short) + "[A-Z]*" + (r"(\d+)" if index else ""))
+    head = "(?:" + nodes.pop(0) + ":)?" if nodes[0].startswith("SENS") and len(nodes) > 1 else ""
+    return re.compile(r":?" + head + ":".join(nodes), re.IGNORECASE)
+
+
+def _is_no_error(err: str) -> bool:
+    m = _ERROR_ENTRY.match(err.strip())
+    if m:
+        return int(m.group(1)) == 0
+    return '+0,"No error"' in err or '0,"No error"' in err
+
 
 class RealDriver(InstrumentDriver):
     """Refined RealDriver with Auto-Handshake Engine."""
+
+    # Deferred error checking (see deferred_errors/fence).
+    # Status query used to skip the drain when no error bit is set; None disables.
+    ERROR_STATUS_QUERY: Optional[str] = "*ESR?"
+    # Single-transaction dump of the whole error queue, where supported.
+    ERROR_QUEUE_ALL_QUERY: Optional[str] = None
+    # Upper bound on SYST:ERR? reads per fence when draining one at a time.
+    ERROR_QUEUE_DEPTH = 32
+    # Commands remembered for attributing errors back to their source.
+    JOURNAL_DEPTH = 4096
+    # Pipelined "start?;stop?;points?[;sweep type?]" query for get_trace_axis.
+    AXIS_QUERY: Optional[str] = None
+    # VISA timeout set on connect; learned per command once adaptive timeouts are on.
+    DEFAULT_TIMEOUT_MS = 5000
+    # Open ::SOCKET resources with SocketResource instead of VISA (see use_raw_socket).
+    RAW_SOCKET = False
+    # Negotiated trace transfer (see fetch_trace_values): commands selecting
+    # 32-bit float data and its byte order, the dtype that results, and the
+    # ASCII format used when the firmware has no binary mode.
+    TRACE_FORMAT_BINARY: Optional[str] = None
+    TRACE_BYTE_ORDER: Optional[str] = None
+    TRACE_DTYPE = "<f4"
+    TRACE_FORMAT_ASCII: Optional[str] = None
+
     @staticmethod
     def scan() -> Tuple[str, ...]:
         """Scans for available instruments."""
@@ -26,13 +97,30 @@ class RealDriver(InstrumentDriver):
         self.inst = None
         self.is_simulated = False
         self.bridge_config: dict = {} # e.g. {"type": "prologix", "gpib_address": 1}
+        self.raw_socket = self.RAW_SOCKET
+
+        # Every outgoing command gets a sequence number; while errors are
+        # deferred, (seq, command) pairs are journaled until the next fence.
+        self.command_seq = 0
+        self._journal: Deque[Tuple[int, str]] = deque(maxlen=self.JOURNAL_DEPTH)
+
+        # Opt-in learned per-command timeouts (see enable_adaptive_timeouts)
+        self.adaptive_timeouts: Optional[AdaptiveTimeouts] = None
+        self._base_timeout: Optional[int] = None
+
+        # "binary" or "ascii" once fetch_trace_values has seen a reply
+        self.trace_transfer: Optional[str] = None
 
     def connect(self) -> None:
         """Connects, runs sync_config, and discovers identity/options."""
         try:
-            self.inst = self.rm.open_resource(self.resource)
-            self.inst.timeout = 5000
+            self.inst = self._open_resource()
+            self.inst.timeout = self._base_timeout = self.DEFAULT_TIMEOUT_MS
             self.connected = True
+            self.invalidate_state_cache()
+            self.applied_profile = {}
+            self._trace_axis = None
+            self.trace_transfer = None
             
             # Sync & Discovery
             self.sync_config()
@@ -41,6 +129,34 @@ class RealDriver(InstrumentDriver):
         except pyvisa.VisaIOError as e:
             raise ConnectionLost(f"Failed to connect to {self.resource}: {e}")
 
+    def _open_resource(self):
+        if self.raw_socket and self.resource.upper().endswith("::SOCKET"):
+            return SocketResource.from_resource(self.resource, timeout=self.DEFAULT_TIMEOUT_MS)
+        inst = self.rm.open_resource(self.resource)
+        if self.resource.upper().endswith("::SOCKET"):
+            # Raw sockets have no END indicator; replies are newline-framed.
+            inst.read_termination = "\n"
+            inst.write_termination = "\n"
+        return inst
+
+    def use_raw_socket(self, enabled: bool = True) -> None:
+        """Talks to a ``TCPIP::host::port::SOCKET`` resource without VISA.
+
+        :class:`~instrumation.transport.SocketResource` keeps the pyvisa
+        resource interface, so every driver method works unchanged. On a
+        connected driver the transport is swapped in place, keeping the
+        current timeout; otherwise it applies from the next ``connect()``.
+        """
+        if enabled and not self.resource.upper().endswith("::SOCKET"):
+            raise ConfigurationError(f"{self.resource} is not a raw socket resource")
+        self.raw_socket = enabled
+        if self.inst is None or not self.connected or isinstance(self.inst, SocketResource) == enabled:
+            return
+        timeout = self.inst.timeout
+        self.inst.close()
+        self.inst = self._open_resource()
+        self.inst.timeout = timeout
+
     def _discover_identity(self) -> None:
         idn = self.query("*IDN?").split(',')
         if len(idn) >= 4:
@@ -61,6 +177,57 @@ class RealDriver(InstrumentDriver):
         if self.inst:
             self.inst.close()
         self.connected = False
+        self.invalidate_state_cache()
+        if self.adaptive_timeouts is not None and self.adaptive_timeouts.path:
+            self.adaptive_timeouts.save()
+
+    # --- Adaptive timeouts ---
+    def enable_adaptive_timeouts(self, manager: Optional[AdaptiveTimeouts] = None) -> AdaptiveTimeouts:
+        """Times every query and sets its VISA timeout from learned latency.
+
+        ``manager`` may be shared between drivers (statistics are kept per
+        instrument model). Calls made while a method has explicitly stretched
+        the timeout (calibration, screenshots, sweeps) keep that timeout.
+        """
+        if manager is not None:
+            self.adaptive_timeouts = manager
+        elif self.adaptive_timeouts is None:
+            self.adaptive_timeouts = AdaptiveTimeouts()
+        return self.adaptive_timeouts
+
+    def disable_adaptive_timeouts(self) -> None:
+        self.adaptive_timeouts = None
+
+    def _latency_key(self) -> str:
+        return self.identity.get("model") or type(self).__name__
+
+    @contextmanager
+    def _timed(self, command: str) -> Iterator[None]:
+        manager = self.adaptive_timeouts
+        if manager is None or "Mock" in type(self.inst).__name__:
+            yield
+            return
+        key = self._latency_key()
+        base = self.inst.timeout
+        if self._base_timeout is None:
+            self._base_timeout = base
+        # Only replace the standing timeout, never one a method stretched on purpose
+        adaptive = base == self._base_timeout
+        timeout_ms = manager.timeout_for(key, command, default=base) if adaptive else base
+        if adaptive:
+            self.inst.timeout = timeout_ms
+        start = time.perf_counter()
+        try:
+            yield
+        except pyvisa.VisaIOError as e:
+            if e.error_code == pyvisa.constants.StatusCode.error_timeout:
+                manager.record_timeout(key, command, timeout_ms)
+            raise
+        else:
+            manager.record(key, command, time.perf_counter() - start)
+        finally:
+            if adaptive:
+                self.inst.timeout = base
 
     def write(self, command: str) -> None:
         if not self.inst:
@@ -71,35 +238,199 @@ class RealDriver(InstrumentDriver):
             if not command.endswith("\n") and not command.startswith("++"):
                 command += "\n"
         
+        if self.state_cache is not None:
+            self.state_cache.observe_write(command)
+        if self.applied_profile:
+            self._forget_profile_settings(command)
+        if self.adaptive_timeouts is not None:
+            self.adaptive_timeouts.observe_write(self._latency_key(), command)
+        self._observe_axis(command)
+        if self._deferred_depth and command.lstrip(":").upper().startswith("*CLS"):
+            # *CLS empties the error queue; collect what is there first
+            self.fence()
+        self._tag(command)
         self.inst.write(command)
 
+    def _forget_profile_settings(self, command: str) -> None:
+        """Drops ``applied_profile`` entries for the settings ``command`` writes.
+
+        A setter or a raw write after ``apply_profile`` makes the remembered
+        value stale; without this a re-apply of the same profile would send
+        nothing. Resets forget the whole profile.
+        """
+        if invalidates_state(command):
+            self.applied_profile = {}
+            return
+        templates = getattr(self, "PROFILE_COMMANDS", {})
+        profile = dict(self.applied_profile)
+        for unit in command.split(";"):
+            header = unit.strip().split(" ", 1)[0]
+            if not header or header.endswith("?"):
+                continue
+            for key, template in templates.items():
+                m = _header_pattern(template).fullmatch(header)
+                if m is None or key not in profile:
+                    continue
+                if m.groups() and isinstance(profile[key], dict):
+                    profile[key] = {ch: v for ch, v in profile[key].items() if str(ch) != m.group(1)}
+                else:
+                    del profile[key]
+        self.applied_profile = profile
+
+    def _observe_axis(self, command: str) -> None:
+        if self._trace_axis is None:
+            return
+        for unit in command.split(";"):
+            unit = unit.strip()
+            if unit and not unit.endswith("?") and (_AXIS_SETTING.search(unit) or invalidates_state(unit)):
+                self._trace_axis = None
+                return
+
+    def get_trace_axis(self) -> Optional[TraceAxis]:
+        """X axis of the current trace configuration.
+
+        Read with one pipelined ``AXIS_QUERY`` and cached until a command
+        changes frequency, span, points or sweep type (or resets the
+        instrument), so consecutive traces share one axis object.
+        """
+        # Avoid breaking unit tests using mocks
+        if self.AXIS_QUERY is None or "Mock" in type(self.inst).__name__:
+            return None
+        if self._trace_axis is None:
+            self._trace_axis = TraceAxis.from_scpi(self.query(self.AXIS_QUERY).split(";"))
+        return self._trace_axis
+
+    def _tag(self, command: str) -> None:
+        if command.startswith("++"):
+            return
+        self.command_seq += 1
+        if self._deferred_depth:
+            self._journal.append((self.command_seq, command.strip()))
+
     def safe_send(self, command: str) -> None:
-        """Sends command and automatically runs SYST:ERR?."""
+        """Sends command and automatically runs SYST:ERR? (deferred inside deferred_errors())."""
         self.write(command)
-        self.check_errors()
+        if not self._deferred_depth:
+            self.check_errors()
 
     def query(self, command: str) -> str:
         if not self.inst:
             raise ConnectionLost("Not connected.")
         
+        if self.state_cache is not None:
+            self.state_cache.observe_query(command)
+        self._observe_axis(command)
+
         # Bridge handling
         if self.bridge_config.get("type") == "prologix":
-            self.write(command)
-            self.write("++read eoi")
-            return self.inst.read().strip()
-            
-        return self.inst.query(command).strip()
+            with self._timed(command):
+                self.write(command)
+                self.write("++read eoi")
+                return self.inst.read().strip()
+
+        # Setting units riding along in a compound query ("...;:INIT:IMM;*OPC?")
+        settings = ";".join(u for u in command.split(";") if u.strip() and not u.strip().endswith("?"))
+        if settings:
+            if self.state_cache is not None:
+                self.state_cache.observe_write(settings)
+            if self.applied_profile:
+                self._forget_profile_settings(settings)
+            if self.adaptive_timeouts is not None:
+                self.adaptive_timeouts.observe_write(self._latency_key(), settings)
+        self._tag(command)
+        with self._timed(command):
+            return self.inst.query(command).strip()
 
     def query_ascii(self, command: str) -> str:
         """Sends command, reads response, and checks for errors."""
         resp = self.query(command)
-        self.check_errors()
+        if not self._deferred_depth:
+            self.check_errors()
         return resp
 
     def query_binary_values(self, command: str, datatype: str = 'f', is_big_endian: bool = False) -> List[float]:
         if not self.inst:
             raise ConnectionLost("Not connected.")
-        return self.inst.query_binary_values(command, datatype=datatype, is_big_endian=is_big_endian)
+        with self._timed(command):
+            return self.inst.query_binary_values(command, datatype=datatype, is_big_endian=is_big_endian)
+
+    def query_binary_blocks(self, command: str, dtype: str = "<f4") -> List[np.ndarray]:
+        """Sends a compound query and returns one array per binary block in the reply.
+
+        Lets several binary fetches (``"SEL a;:DATA?;:SEL b;:DATA?"``) share a
+        single round trip instead of one query each.
+        """
+        self.write(command)
+        with self._timed(command):
+            raw = self._read_block_reply()
+        return [np.frombuffer(block, dtype=dtype) for block in split_ieee_blocks(raw)]
+
+    def _read_block_reply(self) -> bytes:
+        """Reads one reply; definite-length binary blocks are read by count.
+
+        ``read_raw()`` stops at the read termination, so a ``\n`` resource
+        (raw sockets, serial) cuts a block at the first 0x0A byte in its data.
+        The rest of each block is read with ``read_bytes()``, which ignores
+        the termination character, and the message then runs on to its
+        terminator or to the next ``;``-separated block.
+        """
+        data = bytearray(self.inst.read_raw())
+        pos = len(data) - len(data.lstrip())
+
+        def need(count: int) -> None:
+            if len(data) < count:
+                data.extend(self.inst.read_bytes(count - len(data)))
+
+        while data[pos:pos + 1] == b"#":
+            need(pos + 2)
+            digits = int(data[pos + 1:pos + 2])
+            if digits == 0:
+                # Indefinite length: the block runs to the end of the message
+                break
+            need(pos + 2 + digits)
+            end = pos + 2 + digits + int(data[pos + 2:pos + 2 + digits])
+            need(end)
+            if len(data) == end:
+                data.extend(self.inst.read_raw())
+            if data[end:end + 1] not in (b";", b","):
+                break
+            pos = end + 1
+        return bytes(data)
+
+    def fetch_trace_values(self, command: str) -> np.ndarray:
+        """Runs a trace query in the negotiated format; returns float64 values.
+
+        Binary transfer (``TRACE_FORMAT_BINARY`` plus ``TRACE_BYTE_ORDER``) is
+        requested until a reply shows the firmware ignored it. The reply
+        decides: an IEEE block of float data confirms binary mode, while
+        comma-separated numbers (bare or inside a block, as some firmware
+        sends them) switch the driver to ``TRACE_FORMAT_ASCII`` for the rest
+        of the connection, discarding the errors the rejected commands left.
+        The format commands are written before every fetch, so a preset that
+        resets ``FORM`` does not break later traces.
+        """
+        if self.trace_transfer == "ascii":
+            setup = [self.TRACE_FORMAT_ASCII]
+        else:
+            setup = [self.TRACE_FORMAT_BINARY, self.TRACE_BYTE_ORDER]
+        for cmd in setup:
+            if cmd:
+                self.write(cmd)
+        self.write(command)
+        with self._timed(command):
+            raw = self._read_block_reply()
+        body = raw.lstrip()
+        payload = split_ieee_blocks(body)[0] if body[:1] == b"#" else body
+        if not payload.strip():
+            return np.empty(0)
+        if payload.translate(None, _ASCII_NUMBER_BYTES):
+            self.trace_transfer = "binary"
+            return np.frombuffer(payload, dtype=self.TRACE_DTYPE).astype(np.float64)
+        if self.trace_transfer is None and self.TRACE_FORMAT_BINARY:
+            self.trace_transfer = "ascii"
+            if "Mock" not in type(self.inst).__name__:
+                self._drain_errors()
+        return np.array(payload.decode("ascii").strip().rstrip(",").split(","), dtype=np.float64)
 
     # --- Global Logic & Sync ---
     def clear_status(self) -> None:
@@ -135,6 +466,74 @@ class RealDriver(InstrumentDriver):
             resource_name = self.identity.get("model") or self.resource
             raise ConfigurationError(f"Hardware Error on {resource_name}: {err}")
 
+    def fence(self) -> None:
+        """Drains the error queue and attributes each error to a journaled command.
+
+        One ``*ESR?`` round trip decides whether anything went wrong; only
+        then is the queue read, via ``ERROR_QUEUE_ALL_QUERY`` when the
+        instrument has one, otherwise ``SYST:ERR?`` until it reports no error.
+        Any error also drops the state cache, which may hold rejected values.
+        """
+        journal = list(self._journal)
+        self._journal.clear()
+        # Avoid breaking unit tests using mocks
+        if self.inst is None or "Mock" in type(self.inst).__name__:
+            return
+
+        errors = self._drain_errors()
+        if not errors:
+            return
+        if self.state_cache is not None:
+            # Cached setters stored values the instrument may have rejected
+            self.state_cache.invalidate()
+        self.error_stack.extend(errors)
+        resource_name = self.identity.get("model") or self.resource
+        details = "; ".join(f"{err} <- {self._attribute_error(err, journal)}" for err in errors)
+        raise ConfigurationError(f"Hardware Error on {resource_name}: {details}")
+
+    def _drain_errors(self) -> List[str]:
+        if self.ERROR_STATUS_QUERY:
+            try:
+                esr = int(float(self.inst.query(self.ERROR_STATUS_QUERY).strip()))
+            except ValueError:
+                esr = None
+            if esr is not None and not esr & ESR_ERROR_BITS:
+                return []
+
+        if self.ERROR_QUEUE_ALL_QUERY:
+            resp = self.inst.query(self.ERROR_QUEUE_ALL_QUERY).strip()
+            entries = [f'{code},"{msg}"' for code, msg in _ERROR_ENTRY.findall(resp)]
+            return [e for e in entries if not _is_no_error(e)]
+
+        errors = []
+        for _ in range(self.ERROR_QUEUE_DEPTH):
+            err = self.inst.query("SYST:ERR?").strip()
+            if _is_no_error(err):
+                break
+            errors.append(err)
+        return errors
+
+    @staticmethod
+    def _attribute_error(err: str, journal: List[Tuple[int, str]]) -> str:
+        """Best-effort mapping of an error entry to the command that caused it.
+
+        Many instruments quote the offending header in the message
+        (``-222,"Data out of range;FREQ 100 GHz"``); otherwise a lone
+        journaled command is blamed, or the whole sequence window reported.
+        """
+        if not journal:
+            return "unknown command"
+        text = err.upper()
+        for seq, cmd in reversed(journal):
+            for unit in cmd.split(";"):
+                header = unit.strip().lstrip(":").split(" ")[0].upper()
+                if len(header) > 3 and header in text:
+                    return f"#{seq} {cmd}"
+        if len(journal) == 1:
+            seq, cmd = journal[0]
+            return f"#{seq} {cmd}"
+        return f"one of #{journal[0][0]}..#{journal[-1][0]}"
+
     def get_id(self) -> str:
         return self.query("*IDN?")
 
@@ -1,8 +1,10 @@
-from typing import List, Tuple
+from typing import Iterator, List, Optional, Tuple
 from .base import SpectrumAnalyzer, Oscilloscope
 from .registry import register_driver
 from .real import RealDriver
-from ..results import MeasurementResult
+from .cache import cached_getter, cached_setter
+from ..exceptions import InstrumentError
+from ..results import MeasurementResult, TraceAxis
 
 try:
     import numpy as np
@@ -13,6 +15,11 @@ except ImportError:
 class RigolDSA(RealDriver, SpectrumAnalyzer):
     """Driver for Rigol DSA Series Spectrum Analyzers."""
 
+    AXIS_QUERY = ":SENS:FREQ:STAR?;:SENS:FREQ:STOP?;:SENS:SWE:POIN?"
+    TRACE_FORMAT_BINARY = ":FORM:TRAC:DATA REAL,32"
+    TRACE_BYTE_ORDER = ":FORM:BORD SWAP"
+    TRACE_FORMAT_ASCII = ":FORM:TRAC:DATA ASC"
+
     def preset(self, automation_optimized: bool = True) -> None:
         self.write("*RST")
         self.wait_ready()
@@ -49,8 +56,8 @@ class RigolDSA(RealDriver, SpectrumAnalyzer):
         self.write(f":SENS:POW:ATT {db}")
 
     def get_trace_data(self) -> MeasurementResult:
-        data = self.query_ascii_values(":TRAC:DATA? TRACE1")
-        return MeasurementResult(list(data), "dBm")
+        data = self.fetch_trace_values(":TRAC:DATA? TRACE1")
+        return MeasurementResult(data, "dBm", axis=self.get_trace_axis())
 
     def measure_frequency(self) -> MeasurementResult:
         return MeasurementResult(0.0, "Hz")
@@ -74,6 +81,28 @@ class RigolDS1054Z(RealDriver, Oscilloscope):
     commands are excluded (option-gated or -S variant features).
     """
 
+    # Setup profile templates; probe ratio precedes scale/offset because it
+    # rescales them. The DS1000Z parser is unreliable with compound
+    # messages, so profiles are sent as separate writes behind one fence.
+    PROFILE_COMMANDS = {
+        "acquire_type": ":ACQuire:TYPE {value}",
+        "memory_depth": ":ACQuire:MDEPth {value}",
+        "channel_display": ":CHANnel{index}:DISPlay {value}",
+        "channel_coupling": ":CHANnel{index}:COUPling {value}",
+        "channel_probe": ":CHANnel{index}:PROBe {value}",
+        "channel_scale": ":CHANnel{index}:SCALe {value}",
+        "channel_offset": ":CHANnel{index}:OFFSet {value}",
+        "channel_bw_limit": ":CHANnel{index}:BWLimit {value}",
+        "channel_invert": ":CHANnel{index}:INVert {value}",
+        "timebase_scale": ":TIMebase:SCALe {value}",
+        "timebase_offset": ":TIMebase:OFFSet {value}",
+        "trigger_sweep": ":TRIGger:SWEep {value}",
+        "trigger_source": ":TRIGger:EDGe:SOURce {value}",
+        "trigger_slope": ":TRIGger:EDGe:SLOPe {value}",
+        "trigger_level": ":TRIGger:EDGe:LEVel {value}",
+    }
+    PROFILE_COMPOUND = False
+
     def __init__(self, resource: str, rm=None) -> None:
         super().__init__(resource, rm)
         self.max_voltage = 40.0
@@ -169,6 +198,7 @@ class RigolDS1054Z(RealDriver, Oscilloscope):
         """
         self.safe_send(f":ACQuire:MDEPth {mdep}")
 
+    @cached_getter("sample_rate", derived=True)
     def get_sample_rate(self) -> float:
         """:ACQuire:SRATe? — Query current sample rate (samples/sec)."""
         return float(self.query(":ACQuire:SRATe?"))
@@ -179,6 +209,7 @@ class RigolDS1054Z(RealDriver, Oscilloscope):
         if channel < 1 or channel > self._channel_count:
             raise ValueError(f"Channel must be 1..{self._channel_count}, got {channel}")
 
+    @cached_setter("channel_display", normalize=bool)
     def set_channel_display(self, channel: int, state: bool) -> None:
         """:CHANnel<n>:DISPlay — Enable/disable channel display.
 
@@ -189,11 +220,13 @@ class RigolDS1054Z(RealDriver, Oscilloscope):
         self._validate_channel(channel)
         self.safe_send(f":CHANnel{channel}:DISPlay {'ON' if state else 'OFF'}")
 
+    @cached_getter("channel_display")
     def get_channel_display(self, channel: int) -> bool:
         """:CHANnel<n>:DISPlay? — Query channel display state."""
         self._validate_channel(channel)
         return self.query(f":CHANnel{channel}:DISPlay?") == "1"
 
+    @cached_setter("channel_coupling", normalize=str.upper)
     def set_channel_coupling(self, channel: int, coupling: str) -> None:
         """:CHANnel<n>:COUPling — Set input coupling.
 
@@ -207,11 +240,13 @@ class RigolDS1054Z(RealDriver, Oscilloscope):
             raise ValueError(f"Invalid coupling: {coupling}")
         self.safe_send(f":CHANnel{channel}:COUPling {coupling.upper()}")
 
+    @cached_getter("channel_coupling")
     def get_channel_coupling(self, channel: int) -> str:
         """:CHANnel<n>:COUPling? — Query input coupling."""
         self._validate_channel(channel)
         return self.query(f":CHANnel{channel}:COUPling?")
 
+    @cached_setter("channel_scale", normalize=float, invalidates=("channel_offset",), coerced=True)
     def set_channel_scale(self, channel: int, scale: float) -> None:
         """:CHANnel<n>:SCALe — Set vertical scale (volts/div).
 
@@ -222,11 +257,13 @@ class RigolDS1054Z(RealDriver, Oscilloscope):
         self._validate_channel(channel)
         self.safe_send(f":CHANnel{channel}:SCALe {scale}")
 
+    @cached_getter("channel_scale")
     def get_channel_scale(self, channel: int) -> float:
         """:CHANnel<n>:SCALe? — Query vertical scale."""
         self._validate_channel(channel)
         return float(self.query(f":CHANnel{channel}:SCALe?"))
 
+    @cached_setter("channel_offset", normalize=float)
     def set_channel_offset(self, channel: int, offset: float) -> None:
         """:CHANnel<n>:OFFSet — Set vertical offset (volts).
 
@@ -237,11 +274,13 @@ class RigolDS1054Z(RealDriver, Oscilloscope):
         self._validate_channel(channel)
         self.safe_send(f":CHANnel{channel}:OFFSet {offset}")
 
+    @cached_getter("channel_offset")
     def get_channel_offset(self, channel: int) -> float:
         """:CHANnel<n>:OFFSet? — Query vertical offset."""
         self._validate_channel(channel)
         return float(self.query(f":CHANnel{channel}:OFFSet?"))
 
+    @cached_setter("channel_probe", normalize=float, invalidates=("channel_scale", "channel_offset"))
     def set_channel_probe(self, channel: int, attenuation: float) -> None:
         """:CHANnel<n>:PROBe — Set probe attenuation factor.
 
@@ -252,11 +291,13 @@ class RigolDS1054Z(RealDriver, Oscilloscope):
         self._validate_channel(channel)
         self.safe_send(f":CHANnel{channel}:PROBe {attenuation}")
 
+    @cached_getter("channel_probe")
     def get_channel_probe(self, channel: int) -> float:
         """:CHANnel<n>:PROBe? — Query probe attenuation."""
         self._validate_channel(channel)
         return float(self.query(f":CHANnel{channel}:PROBe?"))
 
+    @cached_setter("channel_bw_limit", normalize=str.upper)
     def set_channel_bw_limit(self, channel: int, bw: str) -> None:
         """:CHANnel<n>:BWLimit — Set bandwidth limit.
 
@@ -270,11 +311,13 @@ class RigolDS1054Z(RealDriver, Oscilloscope):
             raise ValueError(f"Invalid bandwidth limit: {bw}")
         self.safe_send(f":CHANnel{channel}:BWLimit {bw.upper()}")
 
+    @cached_getter("channel_bw_limit")
     def get_channel_bw_limit(self, channel: int) -> str:
         """:CHANnel<n>:BWLimit? — Query bandwidth limit."""
         self._validate_channel(channel)
         return self.query(f":CHANnel{channel}:BWLimit?")
 
+    @cached_setter("channel_invert", normalize=bool)
     def set_channel_invert(self, channel: int, state: bool) -> None:
         """:CHANnel<n>:INVert — Enable/disable channel inversion.
 
@@ -285,6 +328,7 @@ class RigolDS1054Z(RealDriver, Oscilloscope):
         self._validate_channel(channel)
         self.safe_send(f":CHANnel{channel}:INVert {'ON' if state else 'OFF'}")
 
+    @cached_getter("channel_invert")
     def get_channel_invert(self, channel: int) -> bool:
         """:CHANnel<n>:INVert? — Query channel inversion state."""
         self._validate_channel(channel)
@@ -309,6 +353,7 @@ class RigolDS1054Z(RealDriver, Oscilloscope):
         """:TIMebase:MODE — Query timebase mode (MAIN, XY, ROLL)."""
         return self.query(":TIMebase:MODE?")
 
+    @cached_setter("timebase_scale", normalize=float, invalidates=("timebase_offset",), coerced=True)
     def set_timebase_scale(self, scale: float) -> None:
         """:TIMebase[:MAIN]:SCALe — Set horizontal scale (seconds/div).
 
@@ -317,10 +362,12 @@ class RigolDS1054Z(RealDriver, Oscilloscope):
         """
         self.safe_send(f":TIMebase:SCALe {scale}")
 
+    @cached_getter("timebase_scale")
     def get_timebase_scale(self) -> float:
         """:TIMebase[:MAIN]:SCALe? — Query horizontal scale."""
         return float(self.query(":TIMebase:SCALe?"))
 
+    @cached_setter("timebase_offset", normalize=float)
     def set_timebase_offset(self, offset: float) -> None:
         """:TIMebase[:MAIN]:OFFSet — Set horizontal offset (seconds).
 
@@ -329,6 +376,7 @@ class RigolDS1054Z(RealDriver, Oscilloscope):
         """
         self.safe_send(f":TIMebase:OFFSet {offset}")
 
+    @cached_getter("timebase_offset")
     def get_timebase_offset(self) -> float:
         """:TIMebase[:MAIN]:OFFSet? — Query horizontal offset."""
         return float(self.query(":TIMebase:OFFSet?"))
@@ -521,7 +569,8 @@ class RigolDS1054Z(RealDriver, Oscilloscope):
             channel: 1-4
 
         Returns:
-            MeasurementResult with value=(time_array, voltage_array), unit="V".
+            MeasurementResult with value=(time_array, voltage_array), unit="V"
+            and a time ``axis`` (unit "s").
         """
         preamble = self.get_waveform_preamble()
         raw = self.get_waveform_raw(channel)
@@ -533,25 +582,77 @@ class RigolDS1054Z(RealDriver, Oscilloscope):
         x_origin = preamble["x_origin"]
         x_ref = preamble["x_reference"]
 
-        voltage = [((v - y_ref) * y_inc) + y_origin for v in raw]
-        time_axis = [
-            ((n - x_ref) * x_inc) + x_origin for n in range(len(raw))
-        ]
+        t0 = x_origin - x_ref * x_inc
+        axis = TraceAxis(t0, t0 + (len(raw) - 1) * x_inc, len(raw), unit="s") if raw else None
 
         if np is not None:
-            time_arr = np.array(time_axis)
-            voltage_arr = np.array(voltage)
+            voltage_arr = (np.asarray(raw, dtype=np.float64) - y_ref) * y_inc + y_origin
+            time_arr = t0 + np.arange(len(raw)) * x_inc
         else:
-            time_arr = time_axis
-            voltage_arr = voltage
+            voltage_arr = [((v - y_ref) * y_inc) + y_origin for v in raw]
+            time_arr = [t0 + n * x_inc for n in range(len(raw))]
 
         return MeasurementResult(
             value=(time_arr, voltage_arr),
             unit="V",
             channel=channel,
             metadata={"preamble": preamble},
+            axis=axis,
         )
 
+    def iter_waveform_chunks(self, channel: int, chunk: int = 250000,
+                             points: Optional[int] = None) -> Iterator[MeasurementResult]:
+        """Read the full acquisition memory of a channel in chunks.
+
+        Uses :WAVeform:MODE RAW with BYTE data and :WAVeform:STARt/STOP
+        windows, so a 14 Mpt record is read without holding a Python list of
+        it. The scope must be stopped (:STOP or a finished :SINGle). Each
+        window's block is read by its declared length, so 0x0A codes do not
+        end it early on a newline-terminated socket.
+
+        Args:
+            channel: 1-4
+            chunk: Points per read (the DS1000Z allows at most 250000 in BYTE).
+            points: Read only the first ``points`` of the record.
+
+        Yields:
+            MeasurementResult per chunk: float32 volts with a time ``axis``,
+            ``metadata["sample_rate"]`` and ``metadata["offset"]`` (first point).
+        """
+        if not 1 <= chunk <= 250000:
+            raise ValueError(f"Chunk must be 1..250000 points, got {chunk}")
+        self._validate_channel(channel)
+        self.set_waveform_source(channel)
+        self.set_waveform_mode("RAW")
+        self.set_waveform_format("BYTE")
+        preamble = self.get_waveform_preamble()
+        total = preamble["points"] if points is None else min(points, preamble["points"])
+        x_inc = preamble["x_increment"]
+        t0 = preamble["x_origin"] - preamble["x_reference"] * x_inc
+        y_inc = np.float32(preamble["y_increment"])
+        y_base = np.float32(preamble["y_origin"] - preamble["y_reference"] * preamble["y_increment"])
+
+        for first in range(0, total, chunk):
+            last = min(first + chunk, total)
+            self.write(f":WAVeform:STARt {first + 1}")
+            self.write(f":WAVeform:STOP {last}")
+            try:
+                blocks = self.query_binary_blocks(":WAVeform:DATA?", dtype="u1")
+            except ValueError as e:
+                raise InstrumentError(f"Bad :WAVeform:DATA? reply for window {first + 1}-{last}: {e}")
+            if not blocks or not blocks[0].size:
+                raise InstrumentError(f"No waveform data for window {first + 1}-{last}")
+            codes = blocks[0]
+            volts = codes.astype(np.float32) * y_inc + y_base
+            yield MeasurementResult(
+                value=volts,
+                unit="V",
+                channel=channel,
+                metadata={"preamble": preamble, "sample_rate": 1.0 / x_inc, "offset": first},
+                axis=TraceAxis(t0 + first * x_inc, t0 + (first + len(volts) - 1) * x_inc,
+                               max(len(volts), 1), unit="s"),
+            )
+
     # ── Measurement Helpers (Oscilloscope interface) ───────────
 
     def measure_frequency(self, channel: int = 1) -> MeasurementResult:
@@ -7,6 +7,7 @@ from typing import List
 @register_driver("SG")
 class RohdeSchwarzSG(RealDriver, SignalGenerator):
     """Generic Driver for Rohde & Schwarz Signal Generators."""
+    ERROR_QUEUE_ALL_QUERY = ":SYST:ERR:ALL?"
     
     def __init__(self, resource: str) -> None:
         super().__init__(resource)
@@ -71,6 +72,18 @@ class RohdeSchwarzSG(RealDriver, SignalGenerator):
 @register_driver("SA")
 class RohdeSchwarzSA(RealDriver, SpectrumAnalyzer):
     """Generic Driver for Rohde & Schwarz Spectrum Analyzers."""
+    ERROR_QUEUE_ALL_QUERY = ":SYST:ERR:ALL?"
+
+    # Double-buffered acquisition: TRACE2 in VIEW mode holds the last sweep
+    # (TRAC:COPY takes destination first) while TRACE1 sweeps again.
+    ACQ_SETUP = (":FORM REAL,32", ":INIT:CONT OFF", ":DISP:TRAC2:MODE VIEW")
+    ACQ_TRIGGER = ":INIT"
+    ACQ_WAIT = "*WAI"
+    ACQ_SNAPSHOT = ":TRAC:COPY TRACE2,TRACE1"
+    ACQ_FETCH = ":TRAC:DATA? TRACE2"
+    ACQ_TEARDOWN = (":ABOR", ":DISP:TRAC2:MODE BLAN", ":INIT:CONT ON")
+
+    AXIS_QUERY = ":FREQ:STAR?;:FREQ:STOP?;:SWE:POIN?"
     
     def preset(self, automation_optimized: bool = True) -> None:
         self.write("*RST")
@@ -114,4 +127,4 @@ class RohdeSchwarzSA(RealDriver, SpectrumAnalyzer):
         self.write(":INIT;*WAI") # Single sweep and wait
         data = self.query_binary_values(":TRAC:DATA? TRACE1", datatype='f', is_big_endian=False)
         self.write(":INIT:CONT ON")
-        return MeasurementResult(list(data), "dBm")
+        return MeasurementResult(list(data), "dBm", axis=self.get_trace_axis())
@@ -1,7 +1,16 @@
+import re
+
+import numpy as np
+
 from .base import Oscilloscope, ElectronicLoad
 from .registry import register_driver
 from .real import RealDriver
-from ..results import MeasurementResult
+from ..exceptions import InstrumentError
+from ..results import MeasurementResult, TraceAxis
+from ..transport import split_ieee_blocks
+
+_NUMBER = re.compile(r"([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)\s*([GMkmun]?)")
+_SI_PREFIX = {"G": 1e9, "M": 1e6, "k": 1e3, "m": 1e-3, "u": 1e-6, "n": 1e-9}
 
 @register_driver("SCOPE")
 class SiglentSDS(RealDriver, Oscilloscope):
@@ -22,12 +31,26 @@ class SiglentSDS(RealDriver, Oscilloscope):
         # Find where the data starts (after the header prefix 'Cx:WF DAT2,')
         header_prefix = f"C{channel}:WF DAT2,".encode()
         header_start = raw_data.find(header_prefix)
-        if header_start != -1:
-            data_start = header_start + len(header_prefix)
+        if header_start == -1:
+            return MeasurementResult([], "V", channel=channel)
+        data_start = header_start + len(header_prefix)
+        if raw_data[data_start:data_start + 1] == b"#":
+            data_bytes = split_ieee_blocks(raw_data[data_start:])[0]
+        else:
             # The data is everything after the header, excluding the last 2 bytes (footer)
             data_bytes = raw_data[data_start:-2]
-            return MeasurementResult([float(b) for b in data_bytes], "V")
-        return MeasurementResult([], "V")
+
+        # Codes are signed bytes, 25 codes per division: V = code * vdiv / 25 - offset
+        vdiv = self._query_number(f"C{channel}:VDIV?")
+        offset = self._query_number(f"C{channel}:OFST?")
+        codes = np.frombuffer(data_bytes, dtype=np.int8).astype(np.float64)
+        data = (codes * (vdiv / 25.0) - offset).tolist()
+
+        # First point sits half the 14-division screen before the trigger delay
+        x_inc = 1.0 / self._query_number("SARA?")
+        t0 = -self._query_number("TRDL?") - 7 * self._query_number("TDIV?")
+        axis = TraceAxis(t0, t0 + (len(data) - 1) * x_inc, len(data), unit="s") if data else None
+        return MeasurementResult(data, "V", channel=channel, axis=axis)
 
     def auto_scale(self) -> None:
         self.safe_send("AUTOSCALE")
@@ -41,6 +64,14 @@ class SiglentSDS(RealDriver, Oscilloscope):
         self.write("SCDP")
         return self.inst.read_raw()
 
+    def _query_number(self, command: str) -> float:
+        """Parses replies such as ``C1:VDIV 5.00E-01V`` or ``SARA 1.00GSa/s``."""
+        resp = self.query_ascii(command)
+        match = _NUMBER.search(resp.split(" ")[-1])
+        if not match:
+            raise InstrumentError(f"Unexpected reply to {command}: {resp!r}")
+        return float(match.group(1)) * _SI_PREFIX.get(match.group(2), 1.0)
+
     def _measure_pava(self, channel: int, param: str) -> float:
         resp = self.query_ascii(f"C{channel}:PAVA? {param}")
         # Parse "CHx:PAVA param,value unit"
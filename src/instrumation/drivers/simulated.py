@@ -1,10 +1,13 @@
 import random
 import time
 import math
-from typing import Optional, List, Tuple, Union
+from typing import Iterator, Optional, List, Sequence, Tuple, Union
+import numpy as np
 from .base import InstrumentDriver, Multimeter, PowerSupply, SpectrumAnalyzer, NetworkAnalyzer, Oscilloscope, FunctionGenerator, ElectronicLoad, FrequencyCounter
 from .registry import register_driver
-from ..results import MeasurementResult
+from ..exceptions import OverloadError
+from ..results import MeasurementResult, TraceAxis
+from ..sweep import sweep_values
 
 class SimulatedBaseDriver(InstrumentDriver):
     def __init__(self, resource: str, latency: float = 0.01) -> None:
@@ -184,6 +187,7 @@ class SimulatedSpectrumAnalyzer(SimulatedBaseDriver, SpectrumAnalyzer):
         self._validate_frequency(hz)
         self._center_freq = hz
         self._sweep_data = []
+        self._trace_axis = None
         print(f"[SIM] Setting SA Center Freq: {hz}")
     def set_ref_level(self, dbm: float) -> None:
         self._ref_level = dbm
@@ -196,7 +200,12 @@ class SimulatedSpectrumAnalyzer(SimulatedBaseDriver, SpectrumAnalyzer):
     def set_span(self, hz: float) -> None:
         self._span = hz
         self._sweep_data = []
+        self._trace_axis = None
     def get_span(self) -> float: return self._span
+    def get_trace_axis(self) -> TraceAxis:
+        if self._trace_axis is None:
+            self._trace_axis = TraceAxis.from_center_span(self._center_freq, self._span, 1001)
+        return self._trace_axis
     def set_rbw(self, hz: float) -> None:
         self._rbw = hz
         print(f"[SIM] SA RBW: {hz}")
@@ -207,7 +216,7 @@ class SimulatedSpectrumAnalyzer(SimulatedBaseDriver, SpectrumAnalyzer):
         if not self._sweep_data:
             self._generate_sweep_data()
         amps = [amp for _, amp in self._sweep_data]
-        return MeasurementResult(amps, "dBm")
+        return MeasurementResult(amps, "dBm", axis=self.get_trace_axis())
 
 @register_driver("NA")
 @register_driver("VNA")
@@ -273,7 +282,9 @@ class SimulatedOscilloscope(SimulatedBaseDriver, Oscilloscope):
         print("[SIM] Scope: Single")
     def get_waveform(self, channel: int) -> MeasurementResult:
         data = [0.75 if math.sin(i * 0.1) >= 0 else -0.75 for i in range(1000)]
-        return MeasurementResult(data, "V")
+        # 20*pi samples per cycle at this interval make the 1 kHz measure_frequency() reports
+        x_inc = 1.0 / (1000.0 * 20.0 * math.pi)
+        return MeasurementResult(data, "V", channel=channel, axis=TraceAxis(0.0, 999 * x_inc, 1000, unit="s"))
     def auto_scale(self) -> None:
         print("[SIM] Scope: Auto Scale")
     def set_trigger(self, source: str, level: float, slope: str) -> None:
@@ -332,11 +343,69 @@ class SimulatedKeithley2400(SimulatedBaseDriver, Multimeter, PowerSupply):
         self._current_limit = 0.1
         self._output = False
         self._source_mode = "VOLT"
+        # DUT model for sweeps: resistor in parallel with an optional diode
+        # (Shockley equation; diode_saturation=0 disables it).
+        self.load_resistance = 1000.0
+        self.diode_saturation = 0.0
+        self.diode_ideality = 1.0
+        self.max_voltage = 210.0
 
     def connect(self) -> None:
         super().connect()
         self.identity = {"manufacturer": "KEITHLEY", "model": "2400", "serial": "SIM-2400", "version": "1.0"}
 
+    # ── I-V model ──────────────────────────────────────────
+    def iv_current(self, voltage: np.ndarray) -> np.ndarray:
+        """DUT current at ``voltage`` (vectorised)."""
+        v = np.asarray(voltage, dtype=np.float64)
+        current = v / self.load_resistance
+        if self.diode_saturation:
+            vt = 0.025852 * self.diode_ideality
+            current = current + self.diode_saturation * np.expm1(np.minimum(v / vt, 700.0))
+        return current
+
+    def iv_voltage(self, current: np.ndarray) -> np.ndarray:
+        """DUT voltage at ``current``; inverts the monotonic I-V curve."""
+        i = np.asarray(current, dtype=np.float64)
+        if not self.diode_saturation:
+            return i * self.load_resistance
+        grid = np.linspace(-self.max_voltage, self.max_voltage, 200001)
+        return np.interp(i, self.iv_current(grid), grid)
+
+    def _sweep_result(self, volts: np.ndarray, amps: np.ndarray, source: str, spacing: str,
+                      nplc: float, delay: float) -> MeasurementResult:
+        times = np.arange(1, len(volts) + 1) * (delay + 3 * nplc / 50.0)
+        if source == "VOLT":
+            amps = amps + np.random.normal(0.0, 1e-9 + np.abs(amps) * 5e-5)
+            return MeasurementResult(amps, "A", metadata={"voltage": volts, "time": times, "spacing": spacing})
+        volts = volts + np.random.normal(0.0, 1e-6 + np.abs(volts) * 5e-5)
+        return MeasurementResult(volts, "V", metadata={"current": amps, "time": times, "spacing": spacing})
+
+    def sweep_voltage(self, start: Optional[float] = None, stop: Optional[float] = None,
+                      points: Optional[int] = None, spacing: str = "LIN",
+                      values: Optional[Sequence[float]] = None, compliance: Optional[float] = None,
+                      nplc: float = 1.0, delay: float = 0.0) -> MeasurementResult:
+        volts = sweep_values(start, stop, points, spacing, values)
+        if np.abs(volts).max() > self.max_voltage:
+            raise OverloadError(f"Sweep voltage {np.abs(volts).max()} V exceeds safety limit")
+        limit = self._current_limit if compliance is None else compliance
+        amps = np.clip(self.iv_current(volts), -limit, limit)
+        # In compliance the source can only reach the voltage the limit allows
+        volts = np.where(np.abs(amps) >= limit, self.iv_voltage(amps), volts)
+        print(f"[SIM] K2400 Voltage Sweep: {len(volts)} points")
+        return self._sweep_result(volts, amps, "VOLT", "LIST" if values is not None else spacing.upper(), nplc, delay)
+
+    def sweep_current(self, start: Optional[float] = None, stop: Optional[float] = None,
+                      points: Optional[int] = None, spacing: str = "LIN",
+                      values: Optional[Sequence[float]] = None, compliance: Optional[float] = None,
+                      nplc: float = 1.0, delay: float = 0.0) -> MeasurementResult:
+        amps = sweep_values(start, stop, points, spacing, values)
+        limit = self.max_voltage if compliance is None else compliance
+        volts = np.clip(self.iv_voltage(amps), -limit, limit)
+        amps = np.where(np.abs(volts) >= limit, self.iv_current(volts), amps)
+        print(f"[SIM] K2400 Current Sweep: {len(amps)} points")
+        return self._sweep_result(volts, amps, "CURR", "LIST" if values is not None else spacing.upper(), nplc, delay)
+
     def get_id(self) -> str: return "KEITHLEY,2400,SIM-2400,1.0"
 
     # ── PowerSupply ────────────────────────────────────────
@@ -620,11 +689,37 @@ class SimulatedFrequencyCounter(SimulatedBaseDriver, FrequencyCounter):
         self._trigger_level = 0.0
         self._coupling = "DC"
         self._auto_range = True
+        # Synthetic oscillator for stream_frequency (fractional frequency):
+        # white FM gives an Allan deviation of white_fm at tau = 1 s,
+        # random-walk FM rises as sqrt(tau), plus a linear drift per second.
+        self.nominal_frequency = 10e6
+        self.white_fm = 1e-11
+        self.random_walk_fm = 1e-14
+        self.drift_rate = 1e-13
 
     def connect(self) -> None:
         super().connect()
         self.identity = {"manufacturer": "SIM", "model": "SIM_COUNTER", "serial": "999", "version": "1.0"}
 
+    def stream_frequency(self, gate_time: float = 1e-3, count: int = 10000,
+                         chunk: int = 1000, channel: int = 1) -> Iterator[MeasurementResult]:
+        """Gap-free readings of the synthetic oscillator, generated per chunk."""
+        started = time.time()
+        walk = 0.0
+        for first in range(0, count, chunk):
+            n = min(chunk, count - first)
+            k = first + np.arange(n)
+            # Each reading averages y over one gate
+            white = np.random.normal(0.0, self.white_fm / np.sqrt(gate_time), n)
+            steps = np.random.normal(0.0, self.random_walk_fm * np.sqrt(gate_time), n)
+            rw = walk + np.cumsum(steps)
+            walk = rw[-1]
+            y = white + rw + self.drift_rate * (k + 0.5) * gate_time
+            yield MeasurementResult(self.nominal_frequency * (1.0 + y), "Hz", metadata={
+                "function": "FREQ", "first": first, "interval": gate_time,
+                "timestamps": started + (k + 1) * gate_time,
+            })
+
     def get_id(self) -> str: return "SIM_COUNTER"
 
     def measure_frequency(self, range: str = "AUTO") -> MeasurementResult:
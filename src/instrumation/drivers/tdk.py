@@ -1,28 +1,71 @@
+import logging
+import re
+import threading
 import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, Optional
 from .base import PowerSupply
 from .registry import register_driver
 from .real import RealDriver
 from ..results import MeasurementResult
 from ..exceptions import InstrumentError
 
+logger = logging.getLogger(__name__)
+
+_NSEL = re.compile(r"^:?INST(?:RUMENT)?:NSEL(?:ECT)?\s+(\d+)\s*$", re.IGNORECASE)
+
+
+def wait_selected(inst: Any, timeout: float = 1.0) -> None:
+    """Waits until a unit answers after ``INST:NSEL``, instead of a fixed sleep.
+
+    Polls ``INST:NSEL?`` with a short timeout; any reply means the selected
+    unit's controller is listening. Gives up silently after ``timeout``.
+    """
+    deadline = time.time() + timeout
+    previous = inst.timeout
+    inst.timeout = 100
+    try:
+        while True:
+            try:
+                inst.query("INST:NSEL?")
+                return
+            except Exception:
+                if time.time() >= deadline:
+                    return
+    finally:
+        inst.timeout = previous
+
+
 @register_driver("PSU")
 class TDKLambdaZPlus(RealDriver, PowerSupply):
-    """Driver for TDK-Lambda Z+ Series Power Supplies."""
+    """Driver for TDK-Lambda Z+ Series Power Supplies.
+
+    Args:
+        resource: VISA resource of the serial port.
+        address: Multi-drop address selected with ``INST:NSEL``.
+    """
+
+    def __init__(self, resource: str, address: int = 6) -> None:
+        super().__init__(resource)
+        self.address = address
+
+    def _open(self) -> None:
+        self.inst = self.rm.open_resource(self.resource)
+        self.inst.baud_rate = 9600
+        self.inst.read_termination = '\r\n'
+        self.inst.write_termination = '\r\n'
+        self.inst.timeout = 5000
 
     def connect(self) -> None:
         """Overrides connect to send INST:NSEL command before identity check."""
         try:
             # 1. Establish raw connection
-            self.inst = self.rm.open_resource(self.resource)
-            self.inst.baud_rate = 9600
-            self.inst.read_termination = '\r\n'
-            self.inst.write_termination = '\r\n'
-            self.inst.timeout = 5000 
+            self._open()
             self.connected = True
             
-            # 2. Wake up the unit (NSEL 6 is the SCPI way for Z+)
-            self.inst.write('INST:NSEL 6')
-            time.sleep(1.0) # Buffer for PSU internal controller
+            # 2. Wake up the unit (NSEL is the SCPI way for Z+)
+            self.inst.write(f'INST:NSEL {self.address}')
+            wait_selected(self.inst)
             
             # 3. Now run the standard discovery
             self._discover_identity()
@@ -160,3 +203,234 @@ class TDKLambdaZPlus(RealDriver, PowerSupply):
         self.set_output(False)
         self.set_voltage(0.0)
         self.sync_config()
+
+
+@dataclass
+class ChainReadback:
+    """Last polled readback of one unit on a :class:`TDKChain`."""
+    voltage: float
+    current: float
+    mode: str
+    timestamp: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.timestamp
+
+
+class ChainSession:
+    """pyvisa-like resource for one address on a :class:`TDKChain`."""
+
+    def __init__(self, chain: "TDKChain", address: int) -> None:
+        self.chain = chain
+        self.address = address
+        self.timeout = 5000
+
+    def write(self, command: str) -> None:
+        self.chain.write(self.address, command)
+
+    def query(self, command: str) -> str:
+        return self.chain.query(self.address, command, timeout=self.timeout)
+
+    def close(self) -> None:
+        """Units share the chain; the serial port stays open."""
+
+
+class TDKChainSupply(TDKLambdaZPlus):
+    """One Z+ unit on a :class:`TDKChain`.
+
+    Setpoints and protection commands go straight to the unit. Measured
+    voltage, current and mode come from the chain's latest poll when it is
+    younger than ``chain.max_age``; otherwise the unit is polled on demand.
+    """
+
+    def __init__(self, chain: "TDKChain", address: int) -> None:
+        super().__init__(f"{chain.port}::NSEL{address}", address=address)
+        self.chain = chain
+
+    def _open(self) -> None:
+        self.inst = ChainSession(self.chain, self.address)
+
+    def readback(self) -> ChainReadback:
+        return self.chain.readback(self.address)
+
+    def measure_voltage_actual(self) -> MeasurementResult:
+        rb = self.readback()
+        return MeasurementResult(rb.voltage, "V", metadata={"age_s": rb.age})
+
+    def measure_current(self) -> MeasurementResult:
+        rb = self.readback()
+        return MeasurementResult(rb.current, "A", metadata={"age_s": rb.age})
+
+    def measure_power(self) -> MeasurementResult:
+        rb = self.readback()
+        return MeasurementResult(rb.voltage * rb.current, "W", metadata={"age_s": rb.age})
+
+    def get_mode(self) -> str:
+        return self.readback().mode
+
+
+class TDKChain:
+    """Scheduler for several Z+ supplies daisy-chained on one RS-485/RS-232 port.
+
+    Owns the serial link and exposes one :class:`TDKChainSupply` (a full
+    ``PowerSupply``) per address. ``INST:NSEL`` is only sent when the
+    addressed unit changes. Readbacks are batched into one compound query
+    per unit, and :meth:`start` polls every unit on a fixed cadence so
+    measurements are never older than ``max_age``::
+
+        with TDKChain("ASRL/dev/ttyUSB0::INSTR", range(1, 17), poll_interval=1.0) as chain:
+            for psu in chain:
+                psu.set_voltage(12.0)
+                psu.set_output(True)
+            chain.start()
+            chain[3].measure_current()    # from the last poll, at most max_age old
+
+    Args:
+        port: VISA resource of the serial port.
+        addresses: Multi-drop addresses of the units.
+        rm: Resource manager used to open the port (default: the shared one).
+        poll_interval: Seconds between the starts of consecutive poll cycles.
+        max_age: Oldest readback served without polling the unit again
+            (default: twice the poll interval).
+    """
+
+    READBACK_QUERY = ":MEAS:VOLT?;:MEAS:CURR?;:OUTP:MODE?"
+
+    def __init__(self, port: str, addresses: Iterable[int], rm: Any = None,
+                 poll_interval: float = 1.0, max_age: Optional[float] = None,
+                 baud_rate: int = 9600) -> None:
+        self.port = port
+        self.addresses = list(addresses)
+        if not self.addresses:
+            raise ValueError("A TDK chain needs at least one address")
+        if len(set(self.addresses)) != len(self.addresses):
+            raise ValueError("Duplicate addresses on the chain")
+        self.rm = rm
+        self.poll_interval = poll_interval
+        self.max_age = max_age if max_age is not None else 2 * poll_interval
+        self.baud_rate = baud_rate
+        self.serial: Any = None
+        self.selected: Optional[int] = None
+        self.selections = 0
+        self.units: Dict[int, TDKChainSupply] = {}
+        self._readings: Dict[int, ChainReadback] = {}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def open(self) -> None:
+        """Opens the port and connects every unit."""
+        from ..factory import get_rm
+        rm = self.rm or get_rm()
+        self.serial = rm.open_resource(self.port)
+        self.serial.baud_rate = self.baud_rate
+        self.serial.read_termination = '\r\n'
+        self.serial.write_termination = '\r\n'
+        self.serial.timeout = 5000
+        self.selected = None
+        for address in self.addresses:
+            unit = TDKChainSupply(self, address)
+            unit.connect()
+            self.units[address] = unit
+
+    def close(self) -> None:
+        self.stop()
+        with self._lock:
+            if self.serial is not None:
+                self.serial.close()
+            self.serial = None
+            self.selected = None
+
+    def __enter__(self) -> "TDKChain":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __getitem__(self, address: int) -> TDKChainSupply:
+        return self.units[address]
+
+    def __iter__(self) -> Iterator[TDKChainSupply]:
+        return iter(self.units.values())
+
+    # --- Link access ---
+    def _select(self, address: int) -> None:
+        if self.serial is None:
+            raise InstrumentError(f"TDK chain on {self.port} is not open")
+        if address != self.selected:
+            self.serial.write(f"INST:NSEL {address}")
+            self.selected = address
+            self.selections += 1
+
+    def write(self, address: int, command: str) -> None:
+        with self._lock:
+            m = _NSEL.match(command)
+            if m:
+                self._select(int(m.group(1)))
+                return
+            self._select(address)
+            self.serial.write(command)
+            # A setting change makes the last readback of this unit misleading
+            self._readings.pop(address, None)
+
+    def query(self, address: int, command: str, timeout: Optional[float] = None) -> str:
+        with self._lock:
+            self._select(address)
+            if timeout is not None:
+                self.serial.timeout = timeout
+            return self.serial.query(command)
+
+    # --- Polling ---
+    def poll(self, address: int) -> ChainReadback:
+        """Reads voltage, current and mode of one unit in a single query."""
+        with self._lock:
+            volt, curr, mode = self.query(address, self.READBACK_QUERY).strip().split(";")[:3]
+            rb = self._readings[address] = ChainReadback(float(volt), float(curr), mode.strip(), time.time())
+            return rb
+
+    def poll_all(self) -> Dict[int, ChainReadback]:
+        """One poll cycle; starts at the selected unit to save a selection."""
+        order = list(self.addresses)
+        if self.selected in order:
+            i = order.index(self.selected)
+            order = order[i:] + order[:i]
+        for address in order:
+            try:
+                self.poll(address)
+            except Exception as e:
+                logger.warning(f"TDK chain {self.port}: poll of address {address} failed: {e}")
+        return self.readings()
+
+    def readings(self) -> Dict[int, ChainReadback]:
+        with self._lock:
+            return dict(self._readings)
+
+    def readback(self, address: int) -> ChainReadback:
+        """Latest readback of ``address``, polled again if older than ``max_age``."""
+        with self._lock:
+            rb = self._readings.get(address)
+            if rb is None or rb.age > self.max_age:
+                rb = self.poll(address)
+            return rb
+
+    def start(self) -> None:
+        """Polls every unit each ``poll_interval`` seconds in a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="tdk-chain-poll", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.time()
+            self.poll_all()
+            self._stop.wait(max(0.0, self.poll_interval - (time.time() - started)))
@@ -2,7 +2,7 @@ from typing import List
 from .base import Oscilloscope, FunctionGenerator
 from .registry import register_driver
 from .real import RealDriver
-from ..results import MeasurementResult
+from ..results import MeasurementResult, TraceAxis
 
 @register_driver("SCOPE")
 class TektronixTDS(RealDriver, Oscilloscope):
@@ -27,13 +27,18 @@ class TektronixTDS(RealDriver, Oscilloscope):
         ymult = float(self.query("WFMPRE:YMULT?"))
         yoff = float(self.query("WFMPRE:YOFF?"))
         yzero = float(self.query("WFMPRE:YZERO?"))
-        
+        xincr = float(self.query("WFMPRE:XINCR?"))
+        xzero = float(self.query("WFMPRE:XZERO?"))
+        pt_off = float(self.query("WFMPRE:PT_OFF?"))
+
         # Fetch raw binary curve
         raw_counts = self.query_binary_values("CURVE?", datatype='h', is_big_endian=True)
-        
-        # Scale to Volts: (raw - yoff) * ymult + yzero
+
+        # Scale to Volts: (raw - yoff) * ymult + yzero; time: xzero + (n - pt_off) * xincr
         scaled_data = [(x - yoff) * ymult + yzero for x in raw_counts]
-        return MeasurementResult(scaled_data, "V")
+        t0 = xzero - pt_off * xincr
+        axis = TraceAxis(t0, t0 + (len(scaled_data) - 1) * xincr, len(scaled_data), unit="s") if scaled_data else None
+        return MeasurementResult(scaled_data, "V", channel=channel, axis=axis)
 
     def auto_scale(self) -> None:
         """Standard Tektronix autoset command."""
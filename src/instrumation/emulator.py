@@ -0,0 +1,1296 @@
+"""Networked SCPI instrument emulator farm.
+
+Serves virtual SCPI instruments on local TCP ports using the raw-socket
+convention (``TCPIP::<host>::<port>::SOCKET``), so the real transport stack --
+:class:`~instrumation.drivers.real.RealDriver`, factory routing and the
+``poll_*`` helpers in :mod:`instrumation.transport` -- can be exercised under
+realistic load on a single machine.
+
+Each virtual instrument is backed by the matching simulated driver model from
+:mod:`instrumation.drivers.simulated` and speaks enough IEEE-488.2/SCPI to look
+real on the wire: vendor ``*IDN?`` strings, an error queue behind
+``SYST:ERR?``, the standard event and status byte registers, and
+definite-length binary blocks (``#<n><len><data>``) for trace and waveform
+transfers.
+
+Usage::
+
+    from instrumation.emulator import EmulatorFarm
+
+    with EmulatorFarm({"SA": 50, "DMM": 200}) as farm:
+        for address in farm.resources:
+            ...  # "TCPIP::127.0.0.1::40123::SOCKET"
+
+or, from async code::
+
+    async with EmulatorFarm(["SA", "SG"]) as farm:
+        ...
+
+The farm can also be started from the command line with
+``instrumation emulate --sa 50 --dmm 200``.
+"""
+
+import asyncio
+import logging
+import re
+import socket
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .drivers.simulated import (
+    SimulatedBaseDriver,
+    SimulatedFrequencyCounter,
+    SimulatedKeysight34461A,
+    SimulatedNetworkAnalyzer,
+    SimulatedOscilloscope,
+    SimulatedPowerSupply,
+    SimulatedSignalGenerator,
+    SimulatedSpectrumAnalyzer,
+)
+from .exceptions import ConfigurationError, OverloadError
+
+logger = logging.getLogger(__name__)
+
+# IEEE-488.2 caps the error queue; the oldest entry is overwritten when full.
+ERROR_QUEUE_DEPTH = 32
+
+# Maximum length of a single program message line accepted by the server.
+# List sweeps can carry thousands of comma-separated values.
+MAX_MESSAGE_BYTES = 4 * 1024 * 1024
+
+_NO_ERROR = '+0,"No error"'
+
+_UNIT_SCALE = {
+    "": 1.0, "HZ": 1.0, "KHZ": 1e3, "MHZ": 1e6, "GHZ": 1e9,
+    "DBM": 1.0, "DB": 1.0, "V": 1.0, "MV": 1e-3, "UV": 1e-6,
+    "A": 1.0, "MA": 1e-3, "UA": 1e-6, "S": 1.0, "MS": 1e-3,
+    "US": 1e-6, "NS": 1e-9, "OHM": 1.0, "W": 1.0,
+}
+
+_NUMBER_RE = re.compile(r"^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*([A-Za-z]*)\s*$")
+_UNIT_RE = re.compile(r"^\s*:?([^\s?]+)(\?)?\s*(.*?)\s*$", re.S)
+
+
+class _ScpiError(Exception):
+    """Raised by command handlers to push an entry onto the error queue."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _compile_header(spec: str) -> "re.Pattern":
+    """Compile a SCPI mnemonic spec into a regex accepting short or long form.
+
+    ``"[SENSe]:FREQuency:CENTer"`` matches ``FREQ:CENT``, ``SENS:FREQ:CENT``
+    and ``SENSE:FREQUENCY:CENTER``. Square brackets mark optional nodes and a
+    trailing ``#`` captures a numeric suffix (``CHANnel#`` -> ``CHAN2``).
+    """
+    out = ""
+    need_sep = False
+    for token in spec.replace("[:", ":[").lstrip(":").split(":"):
+        optional = token.startswith("[") and token.endswith("]")
+        word = token.strip("[]")
+        suffix = word.endswith("#")
+        word = word.rstrip("#")
+        if word.startswith("*"):
+            node = re.escape(word)
+        else:
+            short = "".join(c for c in word if not c.islower())
+            long = word.upper()
+            node = f"(?:{short}|{long})" if short != long else short
+        if suffix:
+            node += r"(\d*)"
+        if optional:
+            out += f"(?::{node})?" if need_sep else f"(?:{node}:)?"
+        else:
+            out += (":" if need_sep else "") + node
+            need_sep = True
+    return re.compile(out, re.I)
+
+
+def _split_units(message: str) -> List[str]:
+    """Split a compound program message on ``;`` outside quoted strings."""
+    units, current, quote = [], [], None
+    for ch in message:
+        if quote:
+            current.append(ch)
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+            current.append(ch)
+        elif ch == ";":
+            units.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    units.append("".join(current))
+    return [u.strip() for u in units if u.strip()]
+
+
+def parse_number(text: str) -> float:
+    """Parse a SCPI numeric argument, honouring unit suffixes such as ``GHz``.
+
+    Raises:
+        ValueError: If ``text`` is not a number with an optional known unit.
+    """
+    m = _NUMBER_RE.match(text)
+    if not m or m.group(2).upper() not in _UNIT_SCALE:
+        raise ValueError(f"Not a SCPI number: {text!r}")
+    return float(m.group(1)) * _UNIT_SCALE[m.group(2).upper()]
+
+
+def ieee_block(payload: bytes) -> bytes:
+    """Wrap ``payload`` in an IEEE-488.2 definite-length block header."""
+    length = str(len(payload))
+    return b"#" + str(len(length)).encode() + length.encode() + payload
+
+
+def _nr3(value: float) -> str:
+    """Format a value the way most instruments return measurements (NR3)."""
+    return f"{value:+.9E}"
+
+
+def _boolean(arg: str) -> bool:
+    token = arg.strip().upper()
+    if token in ("1", "ON"):
+        return True
+    if token in ("0", "OFF"):
+        return False
+    raise _ScpiError(-224, "Illegal parameter value")
+
+
+class VirtualInstrument:
+    """One emulated SCPI endpoint backed by a simulated driver model.
+
+    Subclasses declare their command tree in :attr:`COMMANDS` as
+    ``(mnemonic spec, handler name)`` pairs and list plain stored settings
+    (commands that are accepted and echoed back on query, such as
+    ``DISP:ENAB``) in :attr:`SETTINGS` with their ``*RST`` defaults.
+
+    Handlers are called as ``handler(query, arg, *suffixes)`` and return the
+    response (``str`` or ``bytes``) for queries, or ``None``.
+    """
+
+    kind = "GENERIC"
+    idn_manufacturer = "INSTRUMATION"
+    idn_model = "EMULATOR"
+    idn_version = "1.0"
+    model_cls = SimulatedBaseDriver
+    options = "0"
+    COMMANDS: Tuple[Tuple[str, str], ...] = ()
+    SETTINGS: Dict[str, str] = {}
+
+    _COMMON = (
+        ("*IDN", "_cmd_idn"),
+        ("*RST", "_cmd_rst"),
+        ("*CLS", "_cmd_cls"),
+        ("*OPC", "_cmd_opc"),
+        ("*WAI", "_cmd_wai"),
+        ("*ESR", "_cmd_esr"),
+        ("*ESE", "_cmd_ese"),
+        ("*SRE", "_cmd_sre"),
+        ("*STB", "_cmd_stb"),
+        ("*OPT", "_cmd_opt"),
+        ("*TST", "_cmd_tst"),
+        ("SYSTem:ERRor:ALL", "_cmd_syst_err_all"),
+        ("SYSTem:ERRor[:NEXT]", "_cmd_syst_err"),
+        ("FORMat[:TRACe][:DATA]", "_cmd_form_data"),
+        ("FORMat:BORDer", "_cmd_form_bord"),
+    )
+
+    _table_cache: Dict[type, List[Tuple["re.Pattern", str]]] = {}
+
+    def __init__(self, serial: str = "EMU00001") -> None:
+        self.serial = serial
+        model = self.model_cls(f"EMU::{serial}::INSTR")
+        model.latency = 0.0
+        model.connect()
+        self.model = model
+        self.errors: deque = deque(maxlen=ERROR_QUEUE_DEPTH)
+        self.esr = 0
+        self.ese = 0
+        self.sre = 0
+        self.commands_handled = 0
+        self.reset()
+
+    # ── Dispatch ──────────────────────────────────────────
+
+    @classmethod
+    def _table(cls) -> List[Tuple["re.Pattern", str]]:
+        table = cls._table_cache.get(cls)
+        if table is None:
+            table = [(_compile_header(spec), name) for spec, name in cls._COMMON + tuple(cls.COMMANDS)]
+            table += [(_compile_header(spec), "_cmd_setting") for spec in cls.SETTINGS]
+            cls._table_cache[cls] = table
+        return table
+
+    def process(self, message: str) -> Optional[bytes]:
+        """Execute one program message and return the response message, if any."""
+        responses: List[bytes] = []
+        for unit in _split_units(message):
+            self.commands_handled += 1
+            try:
+                result = self._execute(unit, bool(responses))
+            except _ScpiError as e:
+                self._push_error(e.code, e.message)
+                continue
+            if result is not None:
+                responses.append(result if isinstance(result, bytes) else result.encode("latin-1"))
+        if not responses:
+            return None
+        return b";".join(responses) + b"\n"
+
+    def _execute(self, unit: str, output_pending: bool) -> Optional[Union[str, bytes]]:
+        m = _UNIT_RE.match(unit)
+        if not m:
+            raise _ScpiError(-102, "Syntax error")
+        header, query, arg = m.group(1), bool(m.group(2)), m.group(3)
+        for pattern, name in self._table():
+            hm = pattern.fullmatch(header)
+            if hm:
+                self._output_pending = output_pending
+                if name == "_cmd_setting":
+                    return self._cmd_setting(query, arg, pattern.pattern)
+                return getattr(self, name)(query, arg, *[s for s in hm.groups() if s is not None])
+        raise _ScpiError(-113, "Undefined header")
+
+    def _push_error(self, code: int, message: str) -> None:
+        self.errors.append(f'{code:+d},"{message}"')
+        if -199 <= code <= -100:
+            self.esr |= 0x20  # Command error
+        elif -299 <= code <= -200:
+            self.esr |= 0x10  # Execution error
+        elif -399 <= code <= -300:
+            self.esr |= 0x08  # Device-dependent error
+        elif -499 <= code <= -400:
+            self.esr |= 0x04  # Query error
+
+    # ── State ─────────────────────────────────────────────
+
+    def reset(self) -> None:
+        """Return to ``*RST`` defaults. Subclasses extend this."""
+        self.settings = {_compile_header(spec).pattern: value for spec, value in self.SETTINGS.items()}
+        self.binary_format = "ASCII"
+        self.big_endian = True
+
+    def _setting_value(self, arg: str) -> str:
+        token = arg.strip()
+        if token.upper() in ("ON", "OFF"):
+            return "1" if token.upper() == "ON" else "0"
+        try:
+            return ",".join(f"{parse_number(t):.12g}" for t in token.split(","))
+        except ValueError:
+            return token.upper()
+
+    def _setting(self, spec: str) -> str:
+        """Current value of a plain setting declared in :attr:`SETTINGS`."""
+        return self.settings.get(_compile_header(spec).pattern, "")
+
+    def _cmd_setting(self, query: bool, arg: str, key: str) -> Optional[str]:
+        if query:
+            return self.settings.get(key, "0")
+        if not arg:
+            raise _ScpiError(-109, "Missing parameter")
+        self.settings[key] = self._setting_value(arg)
+        return None
+
+    def _number(self, arg: str) -> float:
+        try:
+            return parse_number(arg)
+        except ValueError:
+            raise _ScpiError(-104, "Data type error")
+
+    def _encode_values(self, values: Any) -> Union[str, bytes]:
+        """Encode a trace according to the active ``FORM:DATA``/``FORM:BORD``."""
+        arr = np.asarray(values, dtype=np.float64)
+        if self.binary_format == "REAL32":
+            dtype = ">f4" if self.big_endian else "<f4"
+        elif self.binary_format == "REAL64":
+            dtype = ">f8" if self.big_endian else "<f8"
+        else:
+            return ",".join(_nr3(v) for v in arr)
+        return ieee_block(arr.astype(dtype).tobytes())
+
+    # ── IEEE-488.2 common commands ────────────────────────
+
+    def _cmd_idn(self, query: bool, arg: str) -> str:
+        return f"{self.idn_manufacturer},{self.idn_model},{self.serial},{self.idn_version}"
+
+    def _cmd_rst(self, query: bool, arg: str) -> None:
+        self.reset()
+
+    def _cmd_cls(self, query: bool, arg: str) -> None:
+        self.errors.clear()
+        self.esr = 0
+
+    def _cmd_opc(self, query: bool, arg: str) -> Optional[str]:
+        if query:
+            return "1"
+        self.esr |= 0x01
+        return None
+
+    def _cmd_wai(self, query: bool, arg: str) -> None:
+        return None
+
+    def _cmd_esr(self, query: bool, arg: str) -> str:
+        value, self.esr = self.esr, 0
+        return str(value)
+
+    def _cmd_ese(self, query: bool, arg: str) -> Optional[str]:
+        if query:
+            return str(self.ese)
+        self.ese = int(self._number(arg)) & 0xFF
+        return None
+
+    def _cmd_sre(self, query: bool, arg: str) -> Optional[str]:
+        if query:
+            return str(self.sre)
+        self.sre = int(self._number(arg)) & 0xFF
+        return None
+
+    def _cmd_stb(self, query: bool, arg: str) -> str:
+        stb = 0
+        if self.errors:
+            stb |= 0x04  # EAV: error/event queue not empty
+        if self._output_pending:
+            stb |= 0x10  # MAV: earlier response still in the output queue
+        if self.esr & self.ese:
+            stb |= 0x20  # ESB
+        if stb & self.sre & 0xBF:
+            stb |= 0x40  # RQS/MSS
+        return str(stb)
+
+    def _cmd_opt(self, query: bool, arg: str) -> str:
+        return self.options
+
+    def _cmd_tst(self, query: bool, arg: str) -> str:
+        return "0"
+
+    def _cmd_syst_err(self, query: bool, arg: str) -> str:
+        return self.errors.popleft() if self.errors else _NO_ERROR
+
+    def _cmd_syst_err_all(self, query: bool, arg: str) -> str:
+        if not self.errors:
+            return _NO_ERROR
+        entries = ",".join(self.errors)
+        self.errors.clear()
+        return entries
+
+    def _cmd_form_data(self, query: bool, arg: str) -> Optional[str]:
+        if query:
+            return {"REAL32": "REAL,32", "REAL64": "REAL,64"}.get(self.binary_format, "ASC,8")
+        token = arg.replace(" ", "").upper()
+        if token.startswith("REAL"):
+            self.binary_format = "REAL64" if token.endswith("64") else "REAL32"
+        elif token.startswith("ASC"):
+            self.binary_format = "ASCII"
+        else:
+            raise _ScpiError(-224, "Illegal parameter value")
+        return None
+
+    def _cmd_form_bord(self, query: bool, arg: str) -> Optional[str]:
+        if query:
+            return "NORM" if self.big_endian else "SWAP"
+        self.big_endian = not arg.strip().upper().startswith("SWAP")
+        return None
+
+
+class VirtualSpectrumAnalyzer(VirtualInstrument):
+    """Keysight X-Series (N9030B PXA) personality."""
+
+    kind = "SA"
+    idn_manufacturer = "Keysight Technologies"
+    idn_model = "N9030B"
+    idn_version = "A.33.03"
+    model_cls = SimulatedSpectrumAnalyzer
+    options = "503,B25,EA3,P03"
+    COMMANDS = (
+        ("[SENSe]:FREQuency:CENTer", "_cmd_center"),
+        ("[SENSe]:FREQuency:SPAN", "_cmd_span"),
+        ("[SENSe]:FREQuency:STARt", "_cmd_start"),
+        ("[SENSe]:FREQuency:STOP", "_cmd_stop"),
+        ("[SENSe]:SWEep:POINts", "_cmd_points"),
+        ("[SENSe]:SWEep:TIME", "_cmd_sweep_time"),
+        ("[SENSe]:BANDwidth[:RESolution]", "_cmd_rbw"),
+        ("[SENSe]:BANDwidth:VIDeo", "_cmd_vbw"),
+        ("DISPlay:WINDow:TRACe:Y[:SCALe]:RLEVel", "_cmd_ref_level"),
+        ("[SENSe]:POWer[:RF]:ATTenuation", "_cmd_attenuation"),
+        ("INITiate[:IMMediate]", "_cmd_init"),
+        ("TRACe[:DATA]", "_cmd_trace"),
+        ("CALCulate:MARKer#:MAXimum", "_cmd_marker_max"),
+        ("CALCulate:MARKer#:X", "_cmd_marker_x"),
+        ("CALCulate:MARKer#:Y", "_cmd_marker_y"),
+    )
+    SETTINGS = {
+        "INITiate:CONTinuous": "1",
+        "DISPlay:ENABle": "1",
+        "CALCulate:MARKer#:STATe": "0",
+        "CALCulate:MARKer#:TRACe": "1",
+        "[SENSe]:BANDwidth:AUTO": "1",
+        "[SENSe]:BANDwidth:VIDeo:AUTO": "1",
+        "[SENSe]:AVERage:FUNCtion": "LOG",
+        "[SENSe]:AVERage:COUNt": "100",
+        "[SENSe]:SWEep:TYPE": "AUTO",
+        "TRIGger[:SEQuence]:SOURce": "IMM",
+        "INPut:COUPling": "AC",
+    }
+
+    def reset(self) -> None:
+        super().reset()
+        model = self.model
+        model._center_freq = 13.255e9
+        model._span = 26.49e9
+        model._rbw = 3e6
+        model._vbw = 3e6
+        model._ref_level = 0.0
+        model._atn = 10.0
+        model._sweep_data = []
+        self.points = 1001
+        self.marker = (model._center_freq, -100.0)
+
+    def _freq(self, query: bool, arg: str, attr: str) -> Optional[str]:
+        if query:
+            return f"{getattr(self.model, attr):.12g}"
+        value = self._number(arg)
+        if value < 0 or value > self.model.max_frequency:
+            raise _ScpiError(-222, "Data out of range")
+        setattr(self.model, attr, value)
+        self.model._sweep_data = []
+        return None
+
+    def _cmd_center(self, query: bool, arg: str) -> Optional[str]:
+        return self._freq(query, arg, "_center_freq")
+
+    def _cmd_span(self, query: bool, arg: str) -> Optional[str]:
+        return self._freq(query, arg, "_span")
+
+    def _cmd_start(self, query: bool, arg: str) -> Optional[str]:
+        m = self.model
+        if query:
+            return f"{m._center_freq - m._span / 2:.12g}"
+        start, stop = self._number(arg), m._center_freq + m._span / 2
+        m._center_freq, m._span = (start + stop) / 2, abs(stop - start)
+        m._sweep_data = []
+        return None
+
+    def _cmd_stop(self, query: bool, arg: str) -> Optional[str]:
+        m = self.model
+        if query:
+            return f"{m._center_freq + m._span / 2:.12g}"
+        start, stop = m._center_freq - m._span / 2, self._number(arg)
+        m._center_freq, m._span = (start + stop) / 2, abs(stop - start)
+        m._sweep_data = []
+        return None
+
+    def _cmd_points(self, query: bool, arg: str) -> Optional[str]:
+        if query:
+            return str(self.points)
+        points = int(self._number(arg))
+        if not 1 <= points <= 100001:
+            raise _ScpiError(-222, "Data out of range")
+        self.points = points
+        return None
+
+    def _cmd_sweep_time(self, query: bool, arg: str) -> Optional[str]:
+        if query:
+            return _nr3(max(1e-3, 2.0 * self.model._span / max(self.model._rbw, 1.0) ** 2))
+        return None
+
+    def _cmd_rbw(self, query: bool, arg: str) -> Optional[str]:
+        return self._freq(query, arg, "_rbw")
+
+    def _cmd_vbw(self, query: bool, arg: str) -> Optional[str]:
+        return self._freq(query, arg, "_vbw")
+
+    def _cmd_ref_level(self, query: bool, arg: str) -> Optional[str]:
+        if query:
+            return f"{self.model._ref_level:.12g}"
+        self.model._ref_level = self._number(arg)
+        return None
+
+    def _cmd_attenuation(self, query: bool, arg: str) -> Optional[str]:
+        if query:
+            return f"{self.model._atn:.12g}"
+        self.model._atn = self._number(arg)
+        return None
+
+    def _cmd_init(self, query: bool, arg: str) -> None:
+        self.model._sweep_data = []
+
+    def _trace(self) -> np.ndarray:
+        amps = np.asarray(self.model.get_trace_data().value, dtype=np.float64)
+        if self.points == len(amps):
+            return amps
+        src = np.linspace(0.0, 1.0, len(amps))
+        return np.interp(np.linspace(0.0, 1.0, self.points), src, amps)
+
+    def _cmd_trace(self, query: bool, arg: str) -> Union[str, bytes]:
+        if not query:
+            raise _ScpiError(-113, "Undefined header")
+        return self._encode_values(self._trace())
+
+    def _cmd_marker_max(self, query: bool, arg: str, marker: str = "1") -> None:
+        freq, amp = self.model.peak_search()
+        self.marker = (freq.value, amp.value)
+
+    def _cmd_marker_x(self, query: bool, arg: str, marker: str = "1") -> Optional[str]:
+        if query:
+            return f"{self.marker[0]:.12g}"
+        self.marker = (self._number(arg), self.marker[1])
+        return None
+
+    def _cmd_marker_y(self, query: bool, arg: str, marker: str = "1") -> str:
+        return _nr3(self.marker[1])
+
+
+class VirtualSignalGenerator(VirtualInstrument):
+    """Keysight MXG (N5183B) personality."""
+
+    kind = "SG"
+    idn_manufacturer = "Keysight Technologies"
+    idn_model = "N5183B"
+    idn_version = "B.01.86"
+    model_cls = SimulatedSignalGenerator
+    options = "1E1,520,UNT,UNW"
+    COMMANDS = (
+        ("[SOURce]:FREQuency[:CW]", "_cmd_frequency"),
+        ("[SOURce]:POWer[:LEVel][:IMMediate][:AMPLitude]", "_cmd_power"),
+        ("OUTPut[:STATe]", "_cmd_output"),
+    )
+    SETTINGS = {
+        "[SOURce]:FREQuency:MODE": "CW",
+        "[SOURce]:FREQuency:STARt": "250000",
+        "[SOURce]:FREQuency:STOP": "6000000000",
+        "[SOURce]:SWEep:POINts": "101",
+        "[SOURce]:SWEep:DWELl": "0.002",
+        "[SOURce]:LIST:TYPE": "STEP",
+        "[SOURce]:LIST:FREQuency": "",
+        "[SOURce]:LIST:POWer": "",
+        "[SOURce]:LIST:DWELl": "0.002",
+        "[SOURce]:LIST:TRIGger:SOURce": "IMM",
+        "[SOURce]:POWer:MODE": "FIX",
+        "[SOURce]:AM:STATe": "0",
+        "[SOURce]:FM:STATe": "0",
+        "[SOURce]:PULM:STATe": "0",
+        "[SOURce]:ROSCillator:SOURce": "INT",
+        "INITiate[:IMMediate]": "",
+        "INITiate:CONTinuous": "0",
+        "DISPlay:STATe": "1",
+    }
+
+    def reset(self) -> None:
+        super().reset()
+        self.frequency = 1e9
+        self.power = -144.0
+        self.output = False
+
+    def _cmd_frequency(self, query: bool, arg: str) -> Optional[str]:
+        if query:
+            token = arg.strip().upper()
+            if token.startswith("MIN"):
+                return f"{self.model.min_frequency:.12g}"
+            if token.startswith("MAX"):
+                return f"{self.model.max_frequency:.12g}"
+            return f"{self.frequency:.12g}"
+        value = self._number(arg)
+        try:
+            self.model._validate_frequency(value)
+        except ConfigurationError:
+            raise _ScpiError(-222, "Data out of range")
+        self.frequency = value
+        return None
+
+    def _cmd_power(self, query: bool, arg: str) -> Optional[str]:
+        if query:
+            if arg.strip().upper().startswith("MAX"):
+                return f"{self.model.max_power_dbm:.12g}"
+            return f"{self.power:.12g}"
+        value = self._number(arg)
+        try:
+            self.model._validate_power(value)
+        except OverloadError:
+            raise _ScpiError(-222, "Data out of range")
+        self.power = value
+        return None
+
+    def _cmd_output(self, query: bool, arg: str) -> Optional[str]:
+        if query:
+            return "1" if self.output else "0"
+        self.output = _boolean(arg)
+        return None
+
+
+class VirtualMultimeter(VirtualInstrument):
+    """Keysight 34461A Truevolt personality."""
+
+    kind = "DMM"
+    idn_manufacturer = "Keysight Technologies"
+    idn_model = "34461A"
+    idn_version = "A.03.01-03.15-03.01-00.52-03-02"
+    model_cls = SimulatedKeysight34461A
+    options = "DIG,MEM"
+    COMMANDS = (
+        ("MEASure:VOLTage[:DC]", "_cmd_meas_volt_dc"),
+        ("MEASure:VOLTage:AC", "_cmd_meas_volt_ac"),
+        ("MEASure:CURRent[:DC]", "_cmd_meas_curr_dc"),
+        ("MEASure:CURRent:AC", "_cmd_meas_curr_ac"),
+        ("MEASure:RESistance", "_cmd_meas_res"),
+        ("MEASure:FRESistance", "_cmd_meas_res"),
+        ("MEASure:FREQuency", "_cmd_meas_freq"),
+        ("MEASure:PERiod", "_cmd_meas_per"),
+        ("MEASure:CAPacitance", "_cmd_meas_cap"),
+        ("MEASure:DIODe", "_cmd_meas_diode"),
+        ("MEASure:TEMPerature", "_cmd_meas_temp"),
+        ("CONFigure:VOLTage[:DC]", "_cmd_conf_volt_dc"),
+        ("CONFigure:VOLTage:AC", "_cmd_conf_volt_ac"),
+        ("CONFigure:CURRent[:DC]", "_cmd_conf_curr_dc"),
+        ("CONFigure:CURRent:AC", "_cmd_conf_curr_ac"),
+        ("CONFigure:RESistance", "_cmd_conf_res"),
+        ("CONFigure:FRESistance", "_cmd_conf_res"),
+        ("READ", "_cmd_read"),
+        ("INITiate[:IMMediate]", "_cmd_init"),
+        ("ABORt", "_cmd_abort"),
+        ("R", "_cmd_remove"),
+        ("DATA:REMove", "_cmd_remove"),
+        ("DATA:POINts", "_cmd_data_points"),
+        ("SYSTem:LFRequency", "_cmd_line_frequency"),
+    )
+    SETTINGS = {
+        "[SENSe]:VOLTage[:DC]:RANGe:AUTO": "1",
+        "[SENSe]:VOLTage[:DC]:NPLC": "10",
+        "[SENSe]:VOLTage:AC:BANDwidth": "20",
+        "[SENSe]:CURRent[:DC]:NPLC": "10",
+        "[SENSe]:RESistance:NPLC": "10",
+        "[SENSe]:FRESistance:NPLC": "10",
+        "TRIGger:SOURce": "IMM",
+        "TRIGger:COUNt": "1",
+        "SAMPle:COUNt": "1",
+    }
+
+    def reset(self) -> None:
+        super().reset()
+        self.function = "VOLT:DC"
+        self.memory: deque = deque(maxlen=10000)
+
+    def _measure(self, function: str) -> str:
+        m = self.model
+        readers = {
+            "VOLT:DC": lambda: m.measure_voltage(),
+            "VOLT:AC": lambda: m.measure_voltage(ac=True),
+            "CURR:DC": lambda: m.measure_current(),
+            "CURR:AC": lambda: m.measure_current(ac=True),
+            "RES": lambda: m.measure_resistance(),
+            "FREQ": lambda: m.measure_frequency(),
+            "PER": lambda: m.measure_period(),
+            "CAP": lambda: m.measure_capacitance(),
+            "DIOD": lambda: m.measure_diode(),
+            "TEMP": lambda: m.measure_temperature(),
+        }
+        return _nr3(readers[function]().value)
+
+    def _query_only(self, query: bool, function: str) -> str:
+        if not query:
+            raise _ScpiError(-113, "Undefined header")
+        return self._measure(function)
+
+    def _cmd_meas_volt_dc(self, query: bool, arg: str) -> str:
+        return self._query_only(query, "VOLT:DC")
+
+    def _cmd_meas_volt_ac(self, query: bool, arg: str) -> str:
+        return self._query_only(query, "VOLT:AC")
+
+    def _cmd_meas_curr_dc(self, query: bool, arg: str) -> str:
+        return self._query_only(query, "CURR:DC")
+
+    def _cmd_meas_curr_ac(self, query: bool, arg: str) -> str:
+        return self._query_only(query, "CURR:AC")
+
+    def _cmd_meas_res(self, query: bool, arg: str) -> str:
+        return self._query_only(query, "RES")
+
+    def _cmd_meas_freq(self, query: bool, arg: str) -> str:
+        return self._query_only(query, "FREQ")
+
+    def _cmd_meas_per(self, query: bool, arg: str) -> str:
+        return self._query_only(query, "PER")
+
+    def _cmd_meas_cap(self, query: bool, arg: str) -> str:
+        return self._query_only(query, "CAP")
+
+    def _cmd_meas_diode(self, query: bool, arg: str) -> str:
+        return self._query_only(query, "DIOD")
+
+    def _cmd_meas_temp(self, query: bool, arg: str) -> str:
+        return self._query_only(query, "TEMP")
+
+    def _configure(self, function: str) -> None:
+        self.function = function
+
+    def _cmd_conf_volt_dc(self, query: bool, arg: str) -> None:
+        self._configure("VOLT:DC")
+
+    def _cmd_conf_volt_ac(self, query: bool, arg: str) -> None:
+        self._configure("VOLT:AC")
+
+    def _cmd_conf_curr_dc(self, query: bool, arg: str) -> None:
+        self._configure("CURR:DC")
+
+    def _cmd_conf_curr_ac(self, query: bool, arg: str) -> None:
+        self._configure("CURR:AC")
+
+    def _cmd_conf_res(self, query: bool, arg: str) -> None:
+        self._configure("RES")
+
+    def _cmd_read(self, query: bool, arg: str) -> str:
+        return self._query_only(query, self.function)
+
+    def _cmd_init(self, query: bool, arg: str) -> None:
+        # The whole burst completes instantly into reading memory
+        count = int(float(self._setting("SAMPle:COUNt"))) * int(float(self._setting("TRIGger:COUNt")))
+        self.memory.clear()
+        for _ in range(count):
+            self.memory.append(float(self._measure(self.function)))
+
+    def _cmd_abort(self, query: bool, arg: str) -> None:
+        pass
+
+    def _cmd_remove(self, query: bool, arg: str) -> bytes:
+        if not query:
+            raise _ScpiError(-113, "Undefined header")
+        limit = int(self._number(arg.split(",")[0])) if arg.strip() else len(self.memory)
+        readings = [self.memory.popleft() for _ in range(min(limit, len(self.memory)))]
+        encoded = self._encode_values(readings)
+        # R? always answers with a definite-length block, even in ASCII format
+        return encoded if isinstance(encoded, bytes) else ieee_block(encoded.encode("latin-1"))
+
+    def _cmd_data_points(self, query: bool, arg: str) -> str:
+        return str(len(self.memory))
+
+    def _cmd_line_frequency(self, query: bool, arg: str) -> str:
+        return "60"
+
+
+class VirtualPowerSupply(VirtualInstrument):
+    """TDK-Lambda Z+ personality."""
+
+    kind = "PSU"
+    idn_manufacturer = "TDK-LAMBDA"
+    idn_model = "Z60-14"
+    idn_version = "1.9"
+    model_cls = SimulatedPowerSupply
+    max_voltage = 60.0
+    max_current = 14.0
+    COMMANDS = (
+        ("[SOURce]:VOLTage[:LEVel][:IMMediate][:AMPLitude]", "_cmd_voltage"),
+        ("[SOURce]:CURRent[:LEVel][:IMMediate][:AMPLitude]", "_cmd_current"),
+        ("OUTPut[:STATe]", "_cmd_output"),
+        ("OUTPut:MODE", "_cmd_mode"),
+        ("MEASure[:SCALar]:VOLTage[:DC]", "_cmd_meas_volt"),
+        ("MEASure[:SCALar]:CURRent[:DC]", "_cmd_meas_curr"),
+        ("MEASure[:SCALar]:POWer[:DC]", "_cmd_meas_pow"),
+    )
+    SETTINGS = {
+        "INSTrument:NSELect": "6",
+        "[SOURce]:VOLTage:PROTection[:LEVel]": "66",
+        "[SOURce]:CURRent:PROTection[:LEVel]": "15.4",
+        "OUTPut:PROTection:FOLDback": "OFF",
+        "OUTPut:PROTection:DELay": "0.1",
+        "OUTPut:PON": "0",
+        "SYSTem:REMote[:STATe]": "REM",
+    }
+
+    def reset(self) -> None:
+        super().reset()
+        self.model._voltage = 0.0
+        self.model._output = False
+        self.current = 0.0
+
+    def _limit(self, query: bool, arg: str, current: float, maximum: float) -> float:
+        token = arg.strip().upper()
+        if query:
+            return maximum if token.startswith("MAX") else current
+        value = self._number(arg)
+        if value < 0 or value > maximum:
+            raise _ScpiError(-222, "Data out of range")
+        return value
+
+    def _cmd_voltage(self, query: bool, arg: str) -> Optional[str]:
+        value = self._limit(query, arg, self.model._voltage, self.max_voltage)
+        if query:
+            return f"{value:.12g}"
+        self.model._voltage = value
+        return None
+
+    def _cmd_current(self, query: bool, arg: str) -> Optional[str]:
+        value = self._limit(query, arg, self.current, self.max_current)
+        if query:
+            return f"{value:.12g}"
+        self.current = value
+        return None
+
+    def _cmd_output(self, query: bool, arg: str) -> Optional[str]:
+        if query:
+            return "1" if self.model._output else "0"
+        self.model._output = _boolean(arg)
+        return None
+
+    def _cmd_mode(self, query: bool, arg: str) -> str:
+        return self.model.get_mode() if self.model._output else "OFF"
+
+    def _cmd_meas_volt(self, query: bool, arg: str) -> str:
+        return _nr3(self.model.measure_voltage_actual().value)
+
+    def _cmd_meas_curr(self, query: bool, arg: str) -> str:
+        return _nr3(self.model.measure_current().value)
+
+    def _cmd_meas_pow(self, query: bool, arg: str) -> str:
+        return _nr3(self.model.measure_power().value)
+
+
+class VirtualOscilloscope(VirtualInstrument):
+    """Rigol DS1054Z personality."""
+
+    kind = "SCOPE"
+    idn_manufacturer = "RIGOL TECHNOLOGIES"
+    idn_model = "DS1054Z"
+    idn_version = "00.04.04.SP4"
+    model_cls = SimulatedOscilloscope
+    options = "DSER,RLU,RML"
+    COMMANDS = (
+        ("WAVeform:PREamble", "_cmd_preamble"),
+        ("WAVeform:DATA", "_cmd_wave_data"),
+        ("WAVeform:XINCrement", "_cmd_xinc"),
+        ("WAVeform:YINCrement", "_cmd_yinc"),
+        ("ACQuire:SRATe", "_cmd_srate"),
+        ("MEASure:FREQuency", "_cmd_meas_freq"),
+        ("MEASure:DUTYcycle", "_cmd_meas_duty"),
+        ("MEASure:VPP", "_cmd_meas_vpp"),
+        ("RUN", "_cmd_run"),
+        ("STOP", "_cmd_stop"),
+        ("SINGle", "_cmd_single"),
+    )
+    SETTINGS = {
+        "WAVeform:SOURce": "CHAN1",
+        "WAVeform:FORMat": "BYTE",
+        "WAVeform:MODE": "NORM",
+        "WAVeform:BYTEorder": "LSBF",
+        "ACQuire:TYPE": "NORM",
+        "ACQuire:MDEPth": "AUTO",
+        "CHANnel#:DISPlay": "1",
+        "CHANnel#:SCALe": "1",
+        "CHANnel#:OFFSet": "0",
+        "CHANnel#:COUPling": "DC",
+        "CHANnel#:PROBe": "10",
+        "TIMebase[:MAIN]:SCALe": "0.001",
+        "TIMebase[:MAIN]:OFFSet": "0",
+        "TRIGger:MODE": "EDGE",
+        "TRIGger:EDGe:SOURce": "CHAN1",
+        "TRIGger:EDGe:LEVel": "0",
+        "TRIGger:EDGe:SLOPe": "POS",
+        "TRIGger:SWEep": "AUTO",
+        "AUToscale": "",
+    }
+
+    # The simulated square wave has a 20*pi sample period; this x-increment
+    # makes it come out at the 1 kHz the simulated scope reports.
+    x_increment = 1.0 / (1000.0 * 20.0 * np.pi)
+    y_increment = 0.01
+    y_reference = 127
+
+    def reset(self) -> None:
+        super().reset()
+        self.running = True
+
+    def _cmd_run(self, query: bool, arg: str) -> None:
+        self.running = True
+
+    def _cmd_stop(self, query: bool, arg: str) -> None:
+        self.running = False
+
+    def _cmd_single(self, query: bool, arg: str) -> None:
+        self.running = False
+
+    def _volts(self) -> np.ndarray:
+        return np.asarray(self.model.get_waveform(1).value, dtype=np.float64)
+
+    def _cmd_preamble(self, query: bool, arg: str) -> str:
+        fmt = {"WORD": 1, "ASCII": 2, "ASC": 2}.get(self._setting("WAVeform:FORMat"), 0)
+        points = len(self._volts())
+        return (f"{fmt},0,{points},1,{self.x_increment:.6E},0.000000E+00,0,"
+                f"{self.y_increment:.6E},0.000000E+00,{self.y_reference}")
+
+    def _cmd_wave_data(self, query: bool, arg: str) -> Union[str, bytes]:
+        volts = self._volts()
+        fmt = self._setting("WAVeform:FORMat")
+        if fmt.startswith("ASC"):
+            return ",".join(_nr3(v) for v in volts)
+        codes = np.round(volts / self.y_increment) + self.y_reference
+        if fmt == "WORD":
+            return ieee_block(codes.astype("<u2").tobytes())
+        return ieee_block(np.clip(codes, 0, 255).astype("u1").tobytes())
+
+    def _cmd_xinc(self, query: bool, arg: str) -> str:
+        return f"{self.x_increment:.6E}"
+
+    def _cmd_yinc(self, query: bool, arg: str) -> str:
+        return f"{self.y_increment:.6E}"
+
+    def _cmd_srate(self, query: bool, arg: str) -> str:
+        return _nr3(1.0 / self.x_increment)
+
+    def _cmd_meas_freq(self, query: bool, arg: str) -> str:
+        high = self._volts() > 0
+        rising = np.flatnonzero(high[1:] & ~high[:-1])
+        if len(rising) < 2:
+            return "9.9E37"
+        return _nr3(1.0 / (np.mean(np.diff(rising)) * self.x_increment))
+
+    def _cmd_meas_duty(self, query: bool, arg: str) -> str:
+        return _nr3(100.0 * np.mean(self._volts() > 0))
+
+    def _cmd_meas_vpp(self, query: bool, arg: str) -> str:
+        volts = self._volts()
+        return _nr3(float(volts.max() - volts.min()))
+
+
+class VirtualNetworkAnalyzer(VirtualInstrument):
+    """Keysight PNA-L (N5232A) personality."""
+
+    kind = "VNA"
+    idn_manufacturer = "Keysight Technologies"
+    idn_model = "N5232A"
+    idn_version = "A.10.49.08"
+    model_cls = SimulatedNetworkAnalyzer
+    options = "200,219,220,222"
+    min_frequency = 300e3
+    max_frequency = 20e9
+    COMMANDS = (
+        ("[SENSe#]:FREQuency:STARt", "_cmd_start"),
+        ("[SENSe#]:FREQuency:STOP", "_cmd_stop"),
+        ("[SENSe#]:SWEep:POINts", "_cmd_points"),
+        ("CALCulate#:PARameter:SELect", "_cmd_par_sel"),
+        ("CALCulate#:PARameter:DEFine:EXTended", "_cmd_par_def"),
+        ("CALCulate#:PARameter:CATalog:EXTended", "_cmd_par_cat"),
+        ("CALCulate#:PARameter:DELete:ALL", "_cmd_par_del_all"),
+        ("CALCulate#:DATA", "_cmd_calc_data"),
+    )
+    SETTINGS = {
+        "[SENSe#]:FREQuency:CENTer": "10000150000",
+        "[SENSe#]:FREQuency:SPAN": "19999700000",
+        "[SENSe#]:BANDwidth[:RESolution]": "35000",
+        "[SENSe#]:SWEep:TYPE": "LIN",
+        "[SENSe#]:AVERage[:STATe]": "0",
+        "[SENSe#]:AVERage:COUNt": "1",
+        "[SOURce#]:POWer[:LEVel][:IMMediate][:AMPLitude]": "-5",
+        "INITiate:CONTinuous": "1",
+        "DISPlay:ENABle": "1",
+        "DISPlay:WINDow#[:STATe]": "1",
+        "DISPlay:WINDow#:TRACe#:FEED": "",
+        "CALCulate#:FORMat": "MLOG",
+        "CALCulate#:PARameter:MODify": "S11",
+        "ABORt": "",
+    }
+
+    def reset(self) -> None:
+        super().reset()
+        self.start = self.min_frequency
+        self.stop = self.max_frequency
+        self.points = 201
+        self.measurements = {"CH1_S11_1": "S11"}
+        self.selected = "CH1_S11_1"
+
+    def _bounded(self, query: bool, arg: str, current: float) -> Union[str, float]:
+        token = arg.strip().upper()
+        if query:
+            if token.startswith("MIN"):
+                return f"{self.min_frequency:.12g}"
+            if token.startswith("MAX"):
+                return f"{self.max_frequency:.12g}"
+            return f"{current:.12g}"
+        value = self._number(arg)
+        if not self.min_frequency <= value <= self.max_frequency:
+            raise _ScpiError(-222, "Data out of range")
+        return value
+
+    def _cmd_start(self, query: bool, arg: str, channel: str = "") -> Optional[str]:
+        value = self._bounded(query, arg, self.start)
+        if query:
+            return value
+        self.start = value
+        return None
+
+    def _cmd_stop(self, query: bool, arg: str, channel: str = "") -> Optional[str]:
+        value = self._bounded(query, arg, self.stop)
+        if query:
+            return value
+        self.stop = value
+        return None
+
+    def _cmd_points(self, query: bool, arg: str, channel: str = "") -> Optional[str]:
+        if query:
+            return str(self.points)
+        points = int(self._number(arg))
+        if not 1 <= points <= 32001:
+            raise _ScpiError(-222, "Data out of range")
+        self.points = points
+        return None
+
+    def _cmd_par_sel(self, query: bool, arg: str, channel: str = "") -> Optional[str]:
+        if query:
+            return f'"{self.selected}"'
+        name = arg.strip().strip("'\"")
+        if name not in self.measurements:
+            raise _ScpiError(-224, "Illegal parameter value")
+        self.selected = name
+        return None
+
+    def _cmd_par_def(self, query: bool, arg: str, channel: str = "") -> None:
+        parts = [p.strip().strip("'\"") for p in arg.split(",")]
+        if len(parts) != 2:
+            raise _ScpiError(-109, "Missing parameter")
+        self.measurements[parts[0]] = parts[1].upper()
+
+    def _cmd_par_cat(self, query: bool, arg: str, channel: str = "") -> str:
+        return '"' + ",".join(f"{n},{p}" for n, p in self.measurements.items()) + '"'
+
+    def _cmd_par_del_all(self, query: bool, arg: str, channel: str = "") -> None:
+        self.measurements = {}
+        self.selected = ""
+
+    def _resample(self, values: np.ndarray) -> np.ndarray:
+        if len(values) == self.points:
+            return values
+        src = np.linspace(0.0, 1.0, len(values))
+        dst = np.linspace(0.0, 1.0, self.points)
+        if np.iscomplexobj(values):
+            return np.interp(dst, src, values.real) + 1j * np.interp(dst, src, values.imag)
+        return np.interp(dst, src, values)
+
+    def _cmd_calc_data(self, query: bool, arg: str, channel: str = "") -> Union[str, bytes]:
+        if not query or not self.selected:
+            raise _ScpiError(-221, "Settings conflict")
+        kind = arg.strip().upper()
+        if kind == "SDATA":
+            iq = self._resample(np.asarray(self.model.get_complex_trace(self.selected).value))
+            interleaved = np.empty(2 * len(iq))
+            interleaved[0::2], interleaved[1::2] = iq.real, iq.imag
+            return self._encode_values(interleaved)
+        if kind == "FDATA":
+            return self._encode_values(self._resample(np.asarray(self.model.get_trace_data(self.selected).value)))
+        raise _ScpiError(-224, "Illegal parameter value")
+
+
+class VirtualFrequencyCounter(VirtualInstrument):
+    """Keysight 53230A personality."""
+
+    kind = "COUNTER"
+    idn_manufacturer = "Agilent Technologies"
+    idn_model = "53230A"
+    idn_version = "02.05-1519.666-1.19-4.15-127-155-35"
+    model_cls = SimulatedFrequencyCounter
+    options = "106,150,300"
+    COMMANDS = (
+        ("MEASure:FREQuency", "_cmd_meas_freq"),
+        ("MEASure:PERiod", "_cmd_meas_per"),
+    )
+    SETTINGS = {
+        "INPut#:IMPedance": "1000000",
+        "INPut#:LEVel[:ABSolute]": "0",
+        "INPut#:COUPling": "AC",
+        "INPut#:RANGe:AUTO": "1",
+        "DISPlay:ENABle": "1",
+    }
+
+    def _cmd_meas_freq(self, query: bool, arg: str) -> str:
+        return _nr3(self.model.measure_frequency().value)
+
+    def _cmd_meas_per(self, query: bool, arg: str) -> str:
+        return _nr3(self.model.measure_period().value)
+
+
+PERSONALITIES: Dict[str, type] = {
+    "SA": VirtualSpectrumAnalyzer,
+    "SG": VirtualSignalGenerator,
+    "DMM": VirtualMultimeter,
+    "PSU": VirtualPowerSupply,
+    "SCOPE": VirtualOscilloscope,
+    "VNA": VirtualNetworkAnalyzer,
+    "NA": VirtualNetworkAnalyzer,
+    "COUNTER": VirtualFrequencyCounter,
+}
+
+
+class EmulatorFarm:
+    """Serves many :class:`VirtualInstrument` endpoints from one event loop.
+
+    Parameters
+    ----------
+    layout : dict or sequence of str
+        Either a mapping of instrument type to count (``{"SA": 10, "DMM": 90}``)
+        or a flat list of types (``["SA", "SG"]``). Types are the factory's
+        driver types (see :data:`PERSONALITIES`).
+    host : str, optional
+        Interface to bind. Defaults to ``"127.0.0.1"``.
+    base_port : int, optional
+        First TCP port to use; instruments get consecutive ports. The default
+        ``0`` lets the OS pick a free port per instrument.
+    response_delay : float, optional
+        Seconds to wait before answering each program message, to model
+        instrument processing latency without blocking the event loop.
+
+    Notes
+    -----
+    One listening socket is opened per instrument, so very large farms may need
+    a higher open-file limit (``ulimit -n``).
+    """
+
+    def __init__(
+        self,
+        layout: Union[Dict[str, int], Sequence[str]],
+        host: str = "127.0.0.1",
+        base_port: int = 0,
+        response_delay: float = 0.0,
+    ) -> None:
+        kinds = [k for k, n in layout.items() for _ in range(n)] if isinstance(layout, dict) else list(layout)
+        self.host = host
+        self.base_port = base_port
+        self.response_delay = response_delay
+        self.instruments: List[VirtualInstrument] = []
+        for index, kind in enumerate(kinds):
+            cls = PERSONALITIES.get(kind.upper())
+            if cls is None:
+                raise ValueError(f"No emulator personality for instrument type: {kind}")
+            self.instruments.append(cls(serial=f"EMU{index:05d}"))
+        self.ports: List[int] = []
+        self._servers: List[asyncio.AbstractServer] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def resources(self) -> List[str]:
+        """VISA-style raw-socket addresses of the running instruments."""
+        return [f"TCPIP::{self.host}::{port}::SOCKET" for port in self.ports]
+
+    def resource_map(self) -> Dict[str, VirtualInstrument]:
+        """Maps each resource address to the instrument serving it."""
+        return dict(zip(self.resources, self.instruments))
+
+    async def _serve(self, inst: VirtualInstrument, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = line.decode("latin-1").strip()
+                if not message:
+                    continue
+                if self.response_delay:
+                    await asyncio.sleep(self.response_delay)
+                response = inst.process(message)
+                if response is not None:
+                    writer.write(response)
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as e:
+            logger.debug(f"Emulator session for {inst.serial} closed: {e}")
+        finally:
+            writer.close()
+
+    async def start(self) -> "EmulatorFarm":
+        """Bind one listening socket per instrument on the running loop."""
+        for index, inst in enumerate(self.instruments):
+            port = self.base_port + index if self.base_port else 0
+
+            async def handler(reader, writer, inst=inst):
+                await self._serve(inst, reader, writer)
+
+            server = await asyncio.start_server(handler, self.host, port, limit=MAX_MESSAGE_BYTES)
+            self._servers.append(server)
+            self.ports.append(server.sockets[0].getsockname()[1])
+        logger.info(f"Emulator farm serving {len(self.instruments)} instruments on {self.host}")
+        return self
+
+    async def stop(self) -> None:
+        """Close every listening socket."""
+        for server in self._servers:
+            server.close()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers = []
+        self.ports = []
+
+    async def __aenter__(self) -> "EmulatorFarm":
+        return await self.start()
+
+    async def __aexit__(self, *_: Any) -> None:
+        await self.stop()
+
+    # ── Background-thread mode (for synchronous callers) ──
+
+    def start_background(self) -> "EmulatorFarm":
+        """Run the farm on a private event loop in a daemon thread.
+
+        Returns once every port is bound, so :attr:`resources` is immediately
+        usable by synchronous drivers.
+        """
+        ready = threading.Event()
+        failure: List[BaseException] = []
+
+        def run() -> None:
+            loop = asyncio.new_event_loop()
+            self._loop = loop
+            try:
+                loop.run_until_complete(self.start())
+            except BaseException as e:
+                failure.append(e)
+                ready.set()
+                loop.close()
+                return
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="instrumation-emulator", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if failure:
+            raise failure[0]
+        return self
+
+    def stop_background(self) -> None:
+        """Stop a farm started with :meth:`start_background`."""
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5.0)
+        self._loop = None
+        self._thread = None
+
+    def __enter__(self) -> "EmulatorFarm":
+        return self.start_background()
+
+    def __exit__(self, *_: Any) -> None:
+        self.stop_background()
+
+
+def run_farm(layout: Union[Dict[str, int], Sequence[str]], host: str = "127.0.0.1",
+             base_port: int = 0, response_delay: float = 0.0) -> None:
+    """Serve a farm in the foreground until interrupted, printing its addresses."""
+    async def main() -> None:
+        async with EmulatorFarm(layout, host, base_port, response_delay) as farm:
+            for address, inst in farm.resource_map().items():
+                print(f"{inst.kind:<8} {address}")
+            await asyncio.Event().wait()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
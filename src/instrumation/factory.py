@@ -9,11 +9,12 @@ import pyvisa
 import json
 import logging
 import os
-import time
 from pathlib import Path
 from .drivers.real import RealDriver
 from .drivers.generic import GenericDriver
 from .drivers.registry import DriverRegistry
+from .drivers.tdk import wait_selected
+from .discovery import advertised, browse_mdns, remember, vxi11_broadcast
 from .drivers.base import Oscilloscope, SpectrumAnalyzer, SignalGenerator, FunctionGenerator, PowerSupply, Multimeter, NetworkAnalyzer, ElectronicLoad, FrequencyCounter
 
 logger = logging.getLogger(__name__)
@@ -67,41 +68,24 @@ def is_sim_mode() -> bool:
     return mode == "SIM" or mode == "SIMULATED"
 
 def _discover_lan_resources() -> list:
-    """Scans the local ARP table for potential LAN instruments."""
-    resources = []
+    """Finds VXI-11 instruments by portmapper broadcast (see :mod:`.discovery`)."""
     try:
-        import subprocess
-        import re
-        output = subprocess.check_output(["arp", "-an"]).decode()
-        ips = re.findall(r"\((\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\)", output)
-        for ip in ips:
-            # Skip broadcast and local loopback
-            if ip.endswith(".255") or ip.startswith("127.") or ip.startswith("224.") or ip.startswith("239."):
-                continue
-            # Try both VXI-11 and HiSLIP — modern Keysight instruments prefer HiSLIP
-            resources.append(f"TCPIP::{ip}::hislip0::INSTR")
-            resources.append(f"TCPIP::{ip}::INSTR")
-    except Exception:
-        pass
-    return resources
+        found = vxi11_broadcast()
+    except Exception as e:
+        logger.debug(f"VXI-11 discovery failed: {e}")
+        return []
+    remember(found)
+    return [d.resource for d in found]
 
 def _discover_mdns_resources() -> list:
-    """Probe known Keysight mDNS hostnames via HiSLIP."""
-    import socket
-    resources = []
-    # Common Keysight hostname patterns resolvable via mDNS/Bonjour
-    candidates = [
-        "a-n5232a-20127.local",  # your VNA
-        "a-n9030a-10156.local",  # your PXA
-    ]
-    for host in candidates:
-        try:
-            # Resolve and check if HiSLIP port (4880) is open
-            socket.getaddrinfo(host, 4880)
-            resources.append(f"TCPIP::{host}::hislip0::INSTR")
-        except socket.gaierror:
-            pass
-    return resources
+    """Browses DNS-SD for HiSLIP, VXI-11 and raw-socket instruments (see :mod:`.discovery`)."""
+    try:
+        found = sorted(browse_mdns(), key=lambda d: d.service != "_hislip._tcp")
+    except Exception as e:
+        logger.debug(f"DNS-SD discovery failed: {e}")
+        return []
+    remember(found)
+    return [d.resource for d in found]
 
 def get_instrument(resource_address: str, driver_type: str = "GENERIC") -> any:
     """Connect to an instrument and return a driver instance for it.
@@ -113,10 +97,12 @@ def get_instrument(resource_address: str, driver_type: str = "GENERIC") -> any:
     2. **Simulation** -- when :func:`is_sim_mode` is true, a simulated driver
        registered for ``driver_type`` is returned instead of touching hardware.
     3. **Auto-discovery** -- the literal address ``"AUTO"`` searches for a
-       matching instrument, trying the on-disk cache first, then mDNS, then the
-       LAN ARP table, then a full VISA scan.
-    4. **Real hardware** -- any other address is opened directly, identified via
-       ``*IDN?``, and routed to the matching vendor driver.
+       matching instrument, trying the on-disk cache first, then DNS-SD, then
+       a VXI-11 broadcast, then a full VISA scan. Both network searches run
+       in the background while the cache is probed.
+    4. **Real hardware** -- any other address is identified via ``*IDN?``
+       (or the model advertised over DNS-SD, when discovery found it) and
+       routed to the matching vendor driver.
 
     Parameters
     ----------
@@ -200,7 +186,11 @@ def get_instrument(resource_address: str, driver_type: str = "GENERIC") -> any:
             except (IOError, OSError):
                 pass
         
-        lan_resources = _discover_lan_resources()
+        # Network discovery waits a fixed time; run it while the cache is probed
+        discovery_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="discovery")
+        mdns_future = discovery_pool.submit(_discover_mdns_resources)
+        lan_future = discovery_pool.submit(_discover_lan_resources)
+        discovery_pool.shutdown(wait=False)
         tried = set()
 
         def run_probe(resources, desc):
@@ -264,14 +254,13 @@ def get_instrument(resource_address: str, driver_type: str = "GENERIC") -> any:
             if result:
                 return result
 
-        # --- Phase 0.5: Try mDNS (Bonjour) ---
-        mdns_resources = _discover_mdns_resources()
-        result = run_probe(mdns_resources, "mDNS/Bonjour")
+        # --- Phase 0.5: Try DNS-SD (mDNS/Bonjour) ---
+        result = run_probe(mdns_future.result(), "mDNS/Bonjour")
         if result:
             return result
 
-        # --- Phase 1: Try LAN (Quick Search) ---
-        result = run_probe(lan_resources, "Fast Track (LAN)")
+        # --- Phase 1: Try LAN (VXI-11 broadcast) ---
+        result = run_probe(lan_future.result(), "Fast Track (LAN)")
         if result:
             return result
 
@@ -286,9 +275,13 @@ def get_instrument(resource_address: str, driver_type: str = "GENERIC") -> any:
 
     # 4. Real Hardware Logic
     idn = ""
+    found = advertised(resource_address)
     try:
         if "SIM" in resource_address or "MOCK" in resource_address:
             idn = ""
+        elif found is not None and found.idn:
+            # The LXI TXT record already names the model; skip *IDN?
+            idn = found.idn.upper()
         else:
             base_dev = RealDriver(resource_address, rm=get_rm())
             
@@ -301,7 +294,7 @@ def get_instrument(resource_address: str, driver_type: str = "GENERIC") -> any:
                     base_dev.inst.write_termination = '\r\n'
                     base_dev.inst.timeout = 500 # 500ms is enough for local Serial
                     base_dev.inst.write('INST:NSEL 6')
-                    time.sleep(0.2)
+                    wait_selected(base_dev.inst, timeout=0.2)
                     idn = base_dev.inst.query("*IDN?").upper()
                     base_dev.inst.close()
                 except Exception:
@@ -435,6 +428,8 @@ def get_instrument_from_config(config: dict) -> any:
     config : dict
         Must contain ``"address"`` -- a VISA resource string or ``"AUTO"`` --
         and ``"type"``, the driver category passed through as ``driver_type``.
+        ``"raw_socket": true`` moves a ``::SOCKET`` instrument off VISA once
+        connected (see ``RealDriver.use_raw_socket``).
 
     Returns
     -------
@@ -456,7 +451,10 @@ def get_instrument_from_config(config: dict) -> any:
         raise ValueError("Missing required configuration key: 'address'")
     if not driver_type:
         raise ValueError("Missing required configuration key: 'type'")
-    return get_instrument(resource_address, driver_type)
+    instrument = get_instrument(resource_address, driver_type)
+    if config.get("raw_socket") and hasattr(instrument, "use_raw_socket"):
+        instrument.use_raw_socket()
+    return instrument
 
 def load_plugins(plugin_path: str = None):
     """Dynamically loads all available instrument drivers."""
@@ -0,0 +1,210 @@
+"""Declarative instrument setup profiles.
+
+A profile is a flat mapping of setting names to values for one instrument::
+
+    {"center_freq": 2.437e9, "span": 40e6, "rbw": 100e3, "ref_level": 0}
+
+Drivers describe how each setting is written in a ``PROFILE_COMMANDS``
+class attribute (setting name -> SCPI template). :func:`apply_profile` compiles
+the profile into a single compound message terminated by ``*OPC?`` and one
+``SYST:ERR?``, so a complete setup costs one round trip instead of one (or
+two) per setter. The driver remembers what it last applied and only sends the
+settings that differ, so switching between test-step profiles is cheap.
+
+Per-channel settings take a table keyed by channel::
+
+    {"channel_scale": {1: 0.5, 2: 1.0}}
+
+In ``station.toml`` profiles live under ``[profiles.<profile>.<instrument>]``::
+
+    [profiles.wifi_ch6.sa_main]
+    center_freq = 2.437e9
+    span = 40e6
+
+    [profiles.wifi_ch6.scope.channel_scale]
+    1 = 0.5
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .exceptions import ConfigurationError
+
+_MISSING = object()
+
+
+@dataclass
+class InstrumentProfile:
+    """Named set of settings for one instrument."""
+    name: str
+    settings: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any]) -> "InstrumentProfile":
+        """Builds a profile, normalising TOML string channel keys to ints."""
+        settings = {}
+        for key, value in data.items():
+            if isinstance(value, dict):
+                value = {_channel_key(k): v for k, v in value.items()}
+            settings[key] = value
+        return cls(name=name, settings=settings)
+
+    def diff(self, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Settings in this profile whose value differs from ``previous``.
+
+        Per-channel tables are diffed entry by entry.
+        """
+        previous = previous or {}
+        changed: Dict[str, Any] = {}
+        for key, value in self.settings.items():
+            old = previous.get(key, _MISSING)
+            if isinstance(value, dict):
+                old = old if isinstance(old, dict) else {}
+                delta = {ch: v for ch, v in value.items() if old.get(ch, _MISSING) != v}
+                if delta:
+                    changed[key] = delta
+            elif old != value:
+                changed[key] = value
+        return changed
+
+
+def _channel_key(key: Any) -> Any:
+    try:
+        return int(key)
+    except (TypeError, ValueError):
+        return key
+
+
+def format_value(value: Any) -> str:
+    """Formats a Python value as a SCPI parameter."""
+    if isinstance(value, bool):
+        return "ON" if value else "OFF"
+    if isinstance(value, float):
+        return f"{value:.12g}"
+    return str(value)
+
+
+def _validate(driver: Any, key: str, value: Any) -> None:
+    """Runs the driver's software safety guards on frequency and power settings."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return
+    if key.endswith(("freq", "frequency")):
+        driver._validate_frequency(float(value))
+    elif key in ("amplitude", "power", "power_level"):
+        driver._validate_power(float(value))
+
+
+def compile_profile(driver: Any, settings: Dict[str, Any]) -> List[str]:
+    """Expands settings into SCPI message units using ``driver.PROFILE_COMMANDS``.
+
+    Units are emitted in the order of ``PROFILE_COMMANDS``, not the order of
+    ``settings``, so drivers can encode coupling (e.g. span before RBW).
+
+    Raises:
+        ValueError: If a setting is not declared by the driver.
+    """
+    templates: Dict[str, str] = getattr(driver, "PROFILE_COMMANDS", {})
+    unknown = set(settings) - set(templates)
+    if unknown:
+        raise ValueError(f"{type(driver).__name__} has no profile setting(s): {', '.join(sorted(unknown))}")
+
+    units = []
+    for key, template in templates.items():
+        if key not in settings:
+            continue
+        value = settings[key]
+        entries = value.items() if isinstance(value, dict) else [(None, value)]
+        for index, item in entries:
+            _validate(driver, key, item)
+            units.append(template.format(index=index, value=format_value(item)))
+    return units
+
+
+def _apply_with_setters(driver: Any, settings: Dict[str, Any]) -> List[str]:
+    """Fallback for drivers without PROFILE_COMMANDS (e.g. simulated twins)."""
+    applied = []
+    for key, value in settings.items():
+        setter = getattr(driver, f"set_{key}", None)
+        if setter is None:
+            raise ValueError(f"{type(driver).__name__} has no profile setting: {key}")
+        if isinstance(value, dict):
+            for index, item in value.items():
+                setter(index, item)
+        else:
+            setter(value)
+        applied.append(key)
+    return applied
+
+
+def _send(driver: Any, units: List[str], deferred: bool) -> Tuple[str, str]:
+    """Sends units plus the *OPC?/SYST:ERR? fence; returns (opc, first error)."""
+    tail = ["*OPC?"] if deferred else ["*OPC?", ":SYST:ERR?"]
+    if getattr(driver, "PROFILE_COMPOUND", True):
+        response = driver.query(";".join(units + tail))
+        opc, _, err = response.partition(";")
+        return opc.strip(), err.strip()
+    # Instruments that mishandle compound messages: one write per unit, one fence
+    for unit in units:
+        driver.write(unit)
+    opc = driver.query("*OPC?")
+    return opc.strip(), "" if deferred else driver.query(":SYST:ERR?").strip()
+
+
+def apply_profile(driver: Any, profile: InstrumentProfile, force: bool = False) -> List[str]:
+    """Applies ``profile`` to ``driver``, sending only what changed.
+
+    Args:
+        driver: Connected instrument driver.
+        profile: Settings to apply.
+        force: Resend every setting, ignoring the last-applied profile.
+
+    Returns:
+        The SCPI message units that were sent (setting names for drivers
+        without ``PROFILE_COMMANDS``).
+
+    Raises:
+        ConfigurationError: If the instrument reports an error or does not
+            confirm completion; the profile memory is cleared so the next
+            apply resends everything.
+    """
+    from .drivers.real import RealDriver, _is_no_error
+
+    previous = None if force else driver.applied_profile
+    changed = profile.diff(previous)
+    if not changed:
+        return []
+
+    if not hasattr(driver, "PROFILE_COMMANDS"):
+        sent = _apply_with_setters(driver, changed)
+    else:
+        sent = compile_profile(driver, changed)
+        opc, err = _send(driver, sent, deferred=bool(driver._deferred_depth))
+        if driver.state_cache is not None:
+            # A profile moves coupled and derived settings the cache cannot track
+            # (start/stop follow center/span, sweep time follows span and RBW)
+            driver.state_cache.invalidate()
+        if err and not _is_no_error(err):
+            errors = [err]
+            for _ in range(getattr(driver, "ERROR_QUEUE_DEPTH", 32)):
+                nxt = driver.query(":SYST:ERR?").strip()
+                if _is_no_error(nxt):
+                    break
+                errors.append(nxt)
+            driver.applied_profile = {}
+            driver.error_stack.extend(errors)
+            journal = list(enumerate(sent, 1))
+            details = "; ".join(f"{e} <- {RealDriver._attribute_error(e, journal)}" for e in errors)
+            raise ConfigurationError(f"Profile '{profile.name}' failed on {driver.resource}: {details}")
+        if opc.lstrip("+") != "1":
+            driver.applied_profile = {}
+            raise ConfigurationError(
+                f"Profile '{profile.name}' did not complete on {driver.resource}: *OPC? returned {opc!r}")
+
+    merged = dict(driver.applied_profile)
+    for key, value in changed.items():
+        if isinstance(value, dict):
+            merged[key] = {**(merged.get(key) or {}), **value}
+        else:
+            merged[key] = value
+    driver.applied_profile = merged
+    return sent
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Optional, Dict, Union
+from typing import Any, Optional, Dict, Sequence, Union
 import json
 
 try:
@@ -8,6 +8,87 @@ try:
 except ImportError:
     np = None
 
+AXIS_SCALES = ("linear", "log")
+
+
+@dataclass(frozen=True)
+class TraceAxis:
+    """Describes the X axis of a trace without materialising it.
+
+    Traces taken with the same instrument settings share one ``TraceAxis``;
+    the point array is only built (once) when :meth:`values` is called.
+
+    Attributes:
+        start: First point (Hz or s).
+        stop: Last point.
+        points: Number of points.
+        scale: ``'linear'`` or ``'log'`` point spacing.
+        unit: Axis unit, ``'Hz'`` for spectra and ``'s'`` for time records.
+    """
+    start: float
+    stop: float
+    points: int
+    scale: str = "linear"
+    unit: str = "Hz"
+    _values: Any = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.points < 1:
+            raise ValueError(f"Axis needs at least one point, got {self.points}")
+        if self.scale not in AXIS_SCALES:
+            raise ValueError(f"Unknown axis scale '{self.scale}', expected one of {AXIS_SCALES}")
+        if self.scale == "log" and min(self.start, self.stop) <= 0:
+            raise ValueError("Log axis must be strictly positive")
+
+    @classmethod
+    def from_center_span(cls, center: float, span: float, points: int, unit: str = "Hz") -> "TraceAxis":
+        return cls(center - span / 2, center + span / 2, points, unit=unit)
+
+    @classmethod
+    def from_scpi(cls, fields: Sequence[str], unit: str = "Hz") -> "TraceAxis":
+        """Builds an axis from ``start;stop;points[;sweep type]`` query fields."""
+        scale = "log" if len(fields) > 3 and fields[3].strip().upper().startswith("LOG") else "linear"
+        return cls(float(fields[0]), float(fields[1]), int(float(fields[2])), scale=scale, unit=unit)
+
+    def __len__(self):
+        return self.points
+
+    @property
+    def step(self) -> float:
+        """Point spacing of a linear axis."""
+        return 0.0 if self.points == 1 else (self.stop - self.start) / (self.points - 1)
+
+    @property
+    def center(self) -> float:
+        return (self.start + self.stop) / 2
+
+    @property
+    def span(self) -> float:
+        return self.stop - self.start
+
+    def values(self):
+        """Point positions as a read-only numpy array (a list without numpy)."""
+        if self._values is None:
+            if np is None:
+                if self.scale == "log":
+                    ratio = 1.0 if self.points == 1 else (self.stop / self.start) ** (1 / (self.points - 1))
+                    vals = [self.start * ratio ** i for i in range(self.points)]
+                else:
+                    vals = [self.start + i * self.step for i in range(self.points)]
+            else:
+                if self.scale == "log":
+                    vals = np.geomspace(self.start, self.stop, self.points)
+                else:
+                    vals = np.linspace(self.start, self.stop, self.points)
+                vals.flags.writeable = False
+            object.__setattr__(self, "_values", vals)
+        return self._values
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"start": self.start, "stop": self.stop, "points": self.points,
+                "scale": self.scale, "unit": self.unit}
+
+
 @dataclass
 class MeasurementResult:
     """Standardized object for measurement results.
@@ -19,6 +100,7 @@ class MeasurementResult:
         status: Status of the measurement ('OK', 'ERROR', 'OVERLOAD', etc.).
         channel: Optional channel index for multi-channel instruments.
         metadata: Optional additional information from the driver.
+        axis: Optional X axis of a trace result (see :class:`TraceAxis`).
     """
     value: Any
     unit: str
@@ -26,6 +108,7 @@ class MeasurementResult:
     status: str = "OK"
     channel: Optional[Union[int, str]] = None
     metadata: Optional[Dict[str, Any]] = field(default_factory=dict)
+    axis: Optional[TraceAxis] = None
 
     def __str__(self):
         chan_str = f" [CH {self.channel}]" if self.channel is not None else ""
@@ -71,7 +154,7 @@ class MeasurementResult:
                 for v in val
             ]
 
-        return {
+        data = {
             "value": val,
             "unit": self.unit,
             "timestamp": self.timestamp.isoformat(),
@@ -79,6 +162,9 @@ class MeasurementResult:
             "channel": self.channel,
             "metadata": self.metadata
         }
+        if self.axis is not None:
+            data["axis"] = self.axis.to_dict()
+        return data
 
     def to_json(self) -> str:
         """Returns the JSON string representation of the result."""
@@ -0,0 +1,330 @@
+"""Dependency-graph scheduling of instrument operations.
+
+A test step is declared as a graph of operations (configure, trigger, wait,
+fetch, analyse) with explicit dependencies. :class:`TestStep` runs every branch
+that is ready concurrently, but never lets two operations talk to the same
+instrument session at once. After a run it reports the critical path - the
+chain of operations (including waits for a busy instrument) that determined
+the step time - and feeds the observed durations into a :class:`LatencyModel`
+so the next run can be estimated before any hardware is touched.
+
+Example::
+
+    step = station.step("tx_power")
+    step.add("psu_on", psu.set_output, True, instrument="psu", kind="configure")
+    step.add("sa_setup", sa.apply_profile, wifi_ch6, instrument="sa", kind="configure")
+    step.add("sweep", sa.get_trace_data, instrument="sa", kind="fetch",
+             after=["psu_on", "sa_setup"])
+    step.add("peak", lambda trace: max(trace.value), kind="analyse", inputs=["sweep"])
+
+    report = step.run()
+    print(report.results["peak"], report.critical_path)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+OPERATION_KINDS = ("configure", "trigger", "wait", "fetch", "analyse", "op")
+
+
+@dataclass
+class Operation:
+    """One node of a test step graph.
+
+    ``after`` dependencies only order the operations; the results of
+    ``inputs`` dependencies are also passed to ``func`` as extra positional
+    arguments, after ``args``.
+    """
+    name: str
+    func: Callable[..., Any]
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    instrument: Any = None
+    kind: str = "op"
+    after: Tuple[str, ...] = ()
+    inputs: Tuple[str, ...] = ()
+
+    @property
+    def depends_on(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(self.after + self.inputs))
+
+    @property
+    def signature(self) -> str:
+        """Key under which this operation's latency is recorded."""
+        func_name = getattr(self.func, "__qualname__", None) or type(self.func).__name__
+        target = self.instrument if isinstance(self.instrument, str) else _session_key(self.instrument)
+        return f"{target or 'host'}:{func_name}"
+
+
+@dataclass
+class OperationTiming:
+    """When an operation ran, in seconds relative to the step start."""
+    name: str
+    start: float
+    end: float
+    blocked_by: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class StepReport:
+    """Outcome of :meth:`TestStep.run`."""
+    step: str
+    results: Dict[str, Any]
+    timings: Dict[str, OperationTiming]
+    elapsed: float
+    critical_path: List[str]
+    estimated: Optional[float] = None
+
+    def summary(self) -> str:
+        """Human-readable timing table with the critical path marked."""
+        lines = [f"Step '{self.step}': {self.elapsed * 1e3:.1f} ms"]
+        if self.estimated is not None:
+            lines[0] += f" (estimated {self.estimated * 1e3:.1f} ms)"
+        for name, timing in sorted(self.timings.items(), key=lambda item: item[1].start):
+            mark = "*" if name in self.critical_path else " "
+            lines.append(f" {mark} {name:<24} {timing.start * 1e3:9.1f} -> {timing.end * 1e3:9.1f} ms")
+        return "\n".join(lines)
+
+
+def _session_key(instrument: Any) -> Any:
+    """Operations sharing this key are serialized (one VISA session each)."""
+    if instrument is None:
+        return None
+    return getattr(instrument, "resource", None) or id(instrument)
+
+
+class LatencyModel:
+    """Exponentially weighted average of observed operation durations.
+
+    Args:
+        alpha: Weight of the newest observation.
+        default: Estimate (seconds) for operations never seen before.
+    """
+
+    def __init__(self, alpha: float = 0.3, default: float = 0.0) -> None:
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.default = default
+        self.latencies: Dict[str, float] = {}
+
+    def record(self, signature: str, seconds: float) -> None:
+        old = self.latencies.get(signature)
+        self.latencies[signature] = seconds if old is None else old + self.alpha * (seconds - old)
+
+    def estimate_operation(self, operation: Operation) -> float:
+        return self.latencies.get(operation.signature, self.default)
+
+    def estimate(self, step: "TestStep") -> Tuple[float, List[str]]:
+        """Predicts step time and critical path from recorded latencies.
+
+        Replays the graph as a list schedule: an operation starts when its
+        dependencies are done and its instrument session is free.
+        """
+        ends: Dict[str, float] = {}
+        blockers: Dict[str, Optional[str]] = {}
+        session_free: Dict[Any, Tuple[float, Optional[str]]] = {}
+        for op in step.ordered():
+            start, blocker = 0.0, None
+            for dep in op.depends_on:
+                if ends[dep] > start:
+                    start, blocker = ends[dep], dep
+            key = step.session_of(op)
+            if key is not None and key in session_free and session_free[key][0] > start:
+                start, blocker = session_free[key]
+            ends[op.name] = start + self.estimate_operation(op)
+            blockers[op.name] = blocker
+            if key is not None:
+                session_free[key] = (ends[op.name], op.name)
+        if not ends:
+            return 0.0, []
+        last = max(ends, key=ends.get)
+        return ends[last], _walk_back(last, blockers)
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump({"alpha": self.alpha, "default": self.default, "latencies": self.latencies}, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "LatencyModel":
+        """Loads a saved model; a missing file yields an empty model."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            data = json.load(f)
+        model = cls(alpha=data.get("alpha", 0.3), default=data.get("default", 0.0))
+        model.latencies = {k: float(v) for k, v in data.get("latencies", {}).items()}
+        return model
+
+
+def _walk_back(last: str, blockers: Dict[str, Optional[str]]) -> List[str]:
+    path = [last]
+    while blockers.get(path[-1]) is not None:
+        path.append(blockers[path[-1]])
+    return path[::-1]
+
+
+class TestStep:
+    """A graph of instrument operations that runs as one test step.
+
+    Args:
+        name: Step name used in logs and reports.
+        instruments: Optional name -> driver mapping, so operations can
+            refer to instruments by name (e.g. ``Station.instruments``).
+        latency_model: Model updated after every run and used for estimates.
+    """
+
+    __test__ = False  # not a pytest test class
+
+    def __init__(self, name: str, instruments: Optional[Dict[str, Any]] = None,
+                 latency_model: Optional[LatencyModel] = None) -> None:
+        self.name = name
+        self.instruments = instruments or {}
+        self.latency_model = latency_model if latency_model is not None else LatencyModel()
+        self.operations: Dict[str, Operation] = {}
+
+    def add(self, name: str, func: Callable[..., Any], *args: Any, instrument: Any = None,
+            kind: str = "op", after: Sequence[str] = (), inputs: Sequence[str] = (),
+            **kwargs: Any) -> str:
+        """Adds an operation and returns its name (for use in ``after``/``inputs``).
+
+        Args:
+            name: Unique operation name.
+            func: Callable to run; blocking driver calls run in a worker thread.
+            instrument: Driver, or instrument name from ``instruments``, whose
+                session the operation uses. ``None`` for host-side work.
+            kind: One of ``configure``, ``trigger``, ``wait``, ``fetch``,
+                ``analyse`` or ``op``; informational.
+            after: Operations that must finish first.
+            inputs: Operations that must finish first and whose results are
+                appended to the call arguments.
+        """
+        if name in self.operations:
+            raise ValueError(f"Operation '{name}' already defined in step '{self.name}'")
+        if kind not in OPERATION_KINDS:
+            raise ValueError(f"Unknown operation kind '{kind}', expected one of {OPERATION_KINDS}")
+        if isinstance(instrument, str) and instrument not in self.instruments:
+            raise ValueError(f"Unknown instrument '{instrument}' in step '{self.name}'")
+        self.operations[name] = Operation(
+            name=name, func=func, args=args, kwargs=kwargs, instrument=instrument,
+            kind=kind, after=tuple(after), inputs=tuple(inputs),
+        )
+        return name
+
+    def session_of(self, op: Operation) -> Any:
+        instrument = self.instruments[op.instrument] if isinstance(op.instrument, str) else op.instrument
+        return _session_key(instrument)
+
+    def ordered(self) -> List[Operation]:
+        """Operations in dependency order.
+
+        Raises:
+            ValueError: On unknown dependencies or cycles.
+        """
+        order: List[Operation] = []
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(name: str, chain: Tuple[str, ...]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Dependency cycle in step '{self.name}': {' -> '.join(chain + (name,))}")
+            if name not in self.operations:
+                raise ValueError(f"'{chain[-1]}' depends on unknown operation '{name}'")
+            state[name] = 1
+            for dep in self.operations[name].depends_on:
+                visit(dep, chain + (name,))
+            state[name] = 2
+            order.append(self.operations[name])
+
+        for name in self.operations:
+            visit(name, ())
+        return order
+
+    def estimate(self) -> Tuple[float, List[str]]:
+        """Predicted ``(seconds, critical_path)`` from the latency model."""
+        return self.latency_model.estimate(self)
+
+    def run(self) -> StepReport:
+        """Runs the step to completion (blocking)."""
+        return asyncio.run(self.run_async())
+
+    async def run_async(self) -> StepReport:
+        """Runs the step inside an existing event loop.
+
+        If an operation raises, operations depending on it are skipped, the
+        independent branches are allowed to finish, and the first exception
+        is re-raised.
+        """
+        ordered = self.ordered()
+        estimated = self.estimate()[0] if self.latency_model.latencies else None
+        locks: Dict[Any, asyncio.Lock] = {}
+        last_on_session: Dict[Any, str] = {}
+        done: Dict[str, asyncio.Future] = {}
+        results: Dict[str, Any] = {}
+        timings: Dict[str, OperationTiming] = {}
+        loop = asyncio.get_running_loop()
+        t0 = time.perf_counter()
+
+        for op in ordered:
+            done[op.name] = loop.create_future()
+
+        async def execute(op: Operation) -> None:
+            try:
+                for dep in op.depends_on:
+                    await done[dep]
+                key = self.session_of(op)
+                lock = locks.setdefault(key, asyncio.Lock()) if key is not None else None
+                if lock is not None:
+                    await lock.acquire()
+                try:
+                    ready_deps = [(timings[d].end, d) for d in op.depends_on]
+                    previous = last_on_session.get(key) if key is not None else None
+                    if previous is not None:
+                        ready_deps.append((timings[previous].end, previous))
+                    blocked_by = max(ready_deps)[1] if ready_deps else None
+
+                    start = time.perf_counter() - t0
+                    args = op.args + tuple(results[d] for d in op.inputs)
+                    result = await asyncio.to_thread(op.func, *args, **op.kwargs)
+                    end = time.perf_counter() - t0
+                    if key is not None:
+                        last_on_session[key] = op.name
+                finally:
+                    if lock is not None:
+                        lock.release()
+                results[op.name] = result
+                timings[op.name] = OperationTiming(op.name, start, end, blocked_by)
+                self.latency_model.record(op.signature, end - start)
+                done[op.name].set_result(None)
+            except BaseException as e:
+                done[op.name].set_exception(e)
+                raise
+
+        outcomes = await asyncio.gather(*(execute(op) for op in ordered), return_exceptions=True)
+        elapsed = time.perf_counter() - t0
+        for future in done.values():
+            # Retrieve every future's exception so none is reported as unhandled
+            if future.done() and not future.cancelled():
+                future.exception()
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                logger.error(f"Step '{self.name}' failed: {outcome}")
+                raise outcome
+
+        blockers = {name: timing.blocked_by for name, timing in timings.items()}
+        last = max(timings, key=lambda name: timings[name].end) if timings else None
+        critical = _walk_back(last, blockers) if last else []
+        logger.debug(f"Step '{self.name}' took {elapsed:.3f} s, critical path: {' -> '.join(critical)}")
+        return StepReport(self.name, results, timings, elapsed, critical, estimated)
@@ -1,12 +1,15 @@
 import os
 import logging
 from types import SimpleNamespace
-from typing import Dict, Any
+from typing import Dict, Any, List
 from dataclasses import dataclass
 
 import toml
 
+from .exceptions import ConfigurationError
 from .factory import get_instrument
+from .profiles import InstrumentProfile
+from .scheduler import LatencyModel, TestStep
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +45,8 @@ class Station:
         self.config_path = config_path
         self.instruments: Dict[str, Any] = {}
         self.instr = SimpleNamespace()
+        self.profiles: Dict[str, Dict[str, InstrumentProfile]] = {}
+        self.latency_model = LatencyModel()
         self.load()
 
     def load(self):
@@ -61,6 +66,7 @@ class Station:
         # Clear existing instruments if reloading
         self.instruments = {}
         self.instr = SimpleNamespace()
+        self.profiles = {}
 
         for name, settings in instrument_configs_raw.items():
             try:
@@ -72,6 +78,13 @@ class Station:
             except Exception as e:
                 logger.error(f"Failed to initialize instrument '{name}': {e}")
 
+        for profile_name, targets in raw_config.get("profiles", {}).items():
+            self.profiles[profile_name] = {}
+            for inst_name, settings in targets.items():
+                if inst_name not in instrument_configs_raw:
+                    raise ValueError(f"Profile '{profile_name}' targets unknown instrument '{inst_name}'.")
+                self.profiles[profile_name][inst_name] = InstrumentProfile.from_dict(profile_name, settings)
+
     def _add_instrument(self, name: str, settings: InstrumentConfig):
         """Creates and attaches an instrument driver instance.
 
@@ -87,6 +100,47 @@ class Station:
         self.instruments[name] = instance
         logger.debug(f"Instrument '{name}' added to station.")
 
+    def apply_profile(self, name: str, force: bool = False) -> Dict[str, List[str]]:
+        """Applies a named profile from the ``[profiles]`` section to its instruments.
+
+        Each instrument receives only the settings that changed since the
+        profile it last had applied.
+
+        Args:
+            name (str): Profile name, i.e. the ``<name>`` in ``[profiles.<name>.<instrument>]``.
+            force (bool): Resend every setting regardless of what was last applied.
+
+        Returns:
+            Dict[str, List[str]]: Commands sent, keyed by instrument name.
+
+        Raises:
+            ConfigurationError: If a target instrument failed to initialize.
+        """
+        if name not in self.profiles:
+            raise KeyError(f"Profile '{name}' not found in station.")
+        sent = {}
+        for inst_name, profile in self.profiles[name].items():
+            if inst_name not in self.instruments:
+                raise ConfigurationError(
+                    f"Profile '{name}' targets instrument '{inst_name}', which failed to initialize.")
+            sent[inst_name] = self.instruments[inst_name].apply_profile(profile, force=force)
+            logger.debug(f"Profile '{name}' applied to {inst_name}: {len(sent[inst_name])} command(s)")
+        return sent
+
+    def step(self, name: str) -> TestStep:
+        """Creates a test step whose operations can name this station's instruments.
+
+        All steps share the station's latency model, so estimates improve as
+        steps are run.
+
+        Args:
+            name (str): Step name used in logs and reports.
+
+        Returns:
+            TestStep: Empty step graph bound to the station instruments.
+        """
+        return TestStep(name, instruments=self.instruments, latency_model=self.latency_model)
+
     def connect(self):
         """Connects all initialized instruments."""
         for name, inst in self.instruments.items():
@@ -0,0 +1,206 @@
+"""Per-command timeouts learned from observed latency.
+
+A fixed VISA timeout is wrong in both directions: 5 s lets a hung instrument
+stall a test on every ``*IDN?``, while a long sweep or calibration still times
+out spuriously. :class:`AdaptiveTimeouts` keeps latency statistics per
+``(instrument model, command pattern)`` and derives each call's timeout from
+them::
+
+    timeouts = AdaptiveTimeouts.load(".latency_profile.json")
+    sa.enable_adaptive_timeouts(timeouts)
+    ...                     # every query is timed and its timeout set
+    timeouts.save()         # also done by disconnect()
+
+A pattern is the command with its arguments dropped and numeric suffixes
+folded (``":INP2:LEV 0.5"`` -> ``":INP#:LEV"``), so one entry covers every
+value sent. Until a pattern has ``min_samples`` observations the driver's
+own timeout applies.
+
+Commands that wait for an acquisition (``*OPC?``, ``:READ?``, ``:INIT``...)
+take as long as the instrument's integration or sweep settings make them, so
+writing one of those settings (NPLC, sweep time, span, RBW, averaging) makes
+the manager forget what it learned for them.
+"""
+
+import json
+import math
+import os
+import re
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional
+
+import numpy as np
+
+_SUFFIX = re.compile(r"(?<=[A-Za-z])\d+")
+
+# Headers of settings that change how long an acquisition takes
+_ACQUISITION_SETTINGS = re.compile(
+    r"NPLC|:APER|SWE(?:EP)?:(?:TIME|POIN)|:SPAN|:STAR|:STOP|:BAND|:BWID|AVER(?:AGE)?:COUN|:COUN")
+# Patterns whose latency is set by those settings
+_ACQUISITION_WAITS = re.compile(r"\*OPC\?|\*WAI|READ\?|MEAS|INIT|FETC")
+
+
+def command_pattern(command: str) -> str:
+    """Normalised form of ``command`` used as the statistics key."""
+    units = []
+    for unit in command.strip().split(";"):
+        header = unit.strip().split(" ", 1)[0].upper()
+        if header:
+            units.append(_SUFFIX.sub("#", header))
+    return ";".join(units)
+
+
+class LatencyStats:
+    """EWMA, EW variance and a window of recent latencies (seconds) for one pattern."""
+
+    def __init__(self, alpha: float = 0.2, window: int = 64) -> None:
+        self.alpha = alpha
+        self.mean: Optional[float] = None
+        self.var = 0.0
+        self.count = 0
+        self.timeouts = 0
+        self.escalated_ms: Optional[int] = None
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.samples.append(seconds)
+        self.escalated_ms = None
+        if self.mean is None:
+            self.mean = seconds
+            return
+        diff = seconds - self.mean
+        self.mean += self.alpha * diff
+        self.var = (1.0 - self.alpha) * (self.var + self.alpha * diff * diff)
+
+    def percentile(self, q: float) -> float:
+        return float(np.percentile(np.fromiter(self.samples, dtype=np.float64), q * 100.0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"mean": self.mean, "var": self.var, "count": self.count,
+                "timeouts": self.timeouts, "samples": list(self.samples)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], alpha: float, window: int) -> "LatencyStats":
+        stats = cls(alpha, window)
+        stats.mean = data.get("mean")
+        stats.var = float(data.get("var", 0.0))
+        stats.count = int(data.get("count", 0))
+        stats.timeouts = int(data.get("timeouts", 0))
+        stats.samples.extend(float(s) for s in data.get("samples", []))
+        return stats
+
+
+class AdaptiveTimeouts:
+    """Learns per-command latency and turns it into VISA timeouts.
+
+    The timeout for a known pattern is ``safety`` times the larger of the
+    ``quantile`` of recent latencies and ``mean + 4 * std`` (EWMA), clamped
+    to ``[floor_ms, ceiling_ms]``. After a timeout the next call of that
+    pattern gets at least twice the limit that expired, until a call
+    succeeds again.
+
+    Args:
+        alpha: EWMA weight of the newest observation.
+        safety: Multiplier applied to the learned latency.
+        quantile: High percentile of the sample window, in (0, 1].
+        floor_ms: Shortest timeout ever set (covers OS and transport jitter).
+        ceiling_ms: Longest timeout ever set.
+        min_samples: Observations needed before a pattern is trusted.
+        window: Recent observations kept per pattern.
+        path: Default file for :meth:`save`.
+    """
+
+    def __init__(self, alpha: float = 0.2, safety: float = 3.0, quantile: float = 0.99,
+                 floor_ms: int = 100, ceiling_ms: int = 300000, min_samples: int = 5,
+                 window: int = 64, path: Optional[str] = None) -> None:
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        if not 0.0 < quantile <= 1.0:
+            raise ValueError("quantile must be in (0, 1]")
+        if safety < 1.0:
+            raise ValueError("safety factor must be at least 1")
+        self.alpha = alpha
+        self.safety = safety
+        self.quantile = quantile
+        self.floor_ms = floor_ms
+        self.ceiling_ms = ceiling_ms
+        self.min_samples = min_samples
+        self.window = window
+        self.path = path
+        self.stats: Dict[str, Dict[str, LatencyStats]] = {}
+
+    def _stats(self, model: str, command: str, create: bool = False) -> Optional[LatencyStats]:
+        patterns = self.stats.get(model)
+        pattern = command_pattern(command)
+        if patterns is None or pattern not in patterns:
+            if not create:
+                return None
+            patterns = self.stats.setdefault(model, {})
+            patterns[pattern] = LatencyStats(self.alpha, self.window)
+        return patterns[pattern]
+
+    def record(self, model: str, command: str, seconds: float) -> None:
+        """Adds one observed latency."""
+        self._stats(model, command, create=True).add(seconds)
+
+    def record_timeout(self, model: str, command: str, timeout_ms: int) -> None:
+        """Notes a call that timed out at ``timeout_ms``; the next limit doubles."""
+        stats = self._stats(model, command, create=True)
+        stats.timeouts += 1
+        stats.escalated_ms = int(min(2 * timeout_ms, self.ceiling_ms))
+
+    def observe_write(self, model: str, command: str) -> None:
+        """Forgets acquisition latencies of ``model`` if ``command`` changes their duration."""
+        headers = command_pattern(command).split(";")
+        if not any(_ACQUISITION_SETTINGS.search(h) and not h.endswith("?") for h in headers):
+            return
+        patterns = self.stats.get(model, {})
+        for pattern in [p for p in patterns if _ACQUISITION_WAITS.search(p)]:
+            del patterns[pattern]
+
+    def timeout_for(self, model: str, command: str, default: Optional[int] = None) -> Optional[int]:
+        """Timeout (ms) for the next ``command`` on ``model``; ``default`` while still learning."""
+        stats = self._stats(model, command)
+        if stats is None:
+            return default
+        if stats.count < self.min_samples:
+            return stats.escalated_ms or default
+        spread = stats.mean + 4.0 * math.sqrt(stats.var)
+        learned = max(stats.percentile(self.quantile), spread) * self.safety * 1000.0
+        learned = int(min(max(learned, self.floor_ms), self.ceiling_ms))
+        return max(learned, stats.escalated_ms or 0)
+
+    def patterns(self, model: str) -> Iterable[str]:
+        return self.stats.get(model, {}).keys()
+
+    # --- Persistence ---
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        if not path:
+            raise ValueError("No path given for the latency profile")
+        data = {
+            "alpha": self.alpha, "safety": self.safety, "quantile": self.quantile,
+            "floor_ms": self.floor_ms, "ceiling_ms": self.ceiling_ms,
+            "min_samples": self.min_samples, "window": self.window,
+            "stats": {model: {p: s.to_dict() for p, s in patterns.items()}
+                      for model, patterns in self.stats.items()},
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "AdaptiveTimeouts":
+        """Loads a saved profile; a missing file yields an empty one that saves to ``path``."""
+        if not os.path.exists(path):
+            return cls(path=path)
+        with open(path) as f:
+            data = json.load(f)
+        manager = cls(alpha=data.get("alpha", 0.2), safety=data.get("safety", 3.0),
+                      quantile=data.get("quantile", 0.99), floor_ms=data.get("floor_ms", 100),
+                      ceiling_ms=data.get("ceiling_ms", 300000), min_samples=data.get("min_samples", 5),
+                      window=data.get("window", 64), path=path)
+        for model, patterns in data.get("stats", {}).items():
+            manager.stats[model] = {p: LatencyStats.from_dict(s, manager.alpha, manager.window)
+                                    for p, s in patterns.items()}
+        return manager
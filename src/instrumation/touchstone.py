@@ -0,0 +1,226 @@
+"""Touchstone (``.sNp``) export and import of S-parameter data.
+
+Both directions work on whole arrays: the writer formats blocks of frequency
+points with ``np.savetxt`` and streams them to the file, and the reader parses
+all numbers in one pass and reshapes them. Files are Touchstone 1.x, with an
+option line such as ``# HZ S RI R 50``::
+
+    s = vna.get_sparameters(ports=(1, 2, 3, 4))    # complex (points, 4, 4)
+    write_touchstone("dut.s4p", s)                  # frequencies from s.axis
+
+    net = read_touchstone("dut.s4p")
+    net.s[:, 1, 0]                                  # S21
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, IO, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .results import MeasurementResult
+
+FREQ_UNITS = {"HZ": 1.0, "KHZ": 1e3, "MHZ": 1e6, "GHZ": 1e9}
+DATA_FORMATS = ("RI", "MA", "DB")
+
+# Touchstone 1.x allows at most four complex pairs per line for 3+ ports
+_PAIRS_PER_LINE = 4
+
+_PORTS_FROM_NAME = re.compile(r"\.s(\d+)p$", re.IGNORECASE)
+
+
+@dataclass
+class TouchstoneData:
+    """S-parameters read from (or to be written to) a Touchstone file.
+
+    Attributes:
+        frequencies: Frequencies in Hz.
+        s: Complex ``(points, n, n)`` array; ``s[:, i, j]`` is S(i+1, j+1).
+        z0: Reference impedance in ohms.
+        comments: Comment lines (without the leading ``!``).
+    """
+    frequencies: np.ndarray
+    s: np.ndarray
+    z0: float = 50.0
+    comments: List[str] = field(default_factory=list)
+
+    @property
+    def ports(self) -> int:
+        return self.s.shape[1]
+
+
+def _file_order(s: np.ndarray) -> np.ndarray:
+    """Flattens each S-matrix in file order (2-port files are column-major)."""
+    if s.shape[1] == 2:
+        s = s.transpose(0, 2, 1)
+    return s.reshape(s.shape[0], -1)
+
+
+def _encode(values: np.ndarray, data_format: str) -> np.ndarray:
+    """Complex ``(points, k)`` -> interleaved real ``(points, 2k)`` pairs."""
+    pairs = np.empty((values.shape[0], 2 * values.shape[1]))
+    if data_format == "RI":
+        pairs[:, 0::2], pairs[:, 1::2] = values.real, values.imag
+    else:
+        mag = np.abs(values)
+        if data_format == "DB":
+            with np.errstate(divide="ignore"):
+                mag = 20.0 * np.log10(mag)
+        pairs[:, 0::2], pairs[:, 1::2] = mag, np.angle(values, deg=True)
+    return pairs
+
+
+def _decode(pairs: np.ndarray, data_format: str) -> np.ndarray:
+    first, second = pairs[:, 0::2], pairs[:, 1::2]
+    if data_format == "RI":
+        return first + 1j * second
+    if data_format == "DB":
+        first = 10.0 ** (first / 20.0)
+    return first * np.exp(1j * np.deg2rad(second))
+
+
+def _line_format(ports: int, precision: int) -> str:
+    """printf-style format for one frequency point (several lines for 3+ ports)."""
+    pair = f"%.{precision}g %.{precision}g"
+    freq = "%.12g"
+    if ports <= 2:
+        return " ".join([freq] + [pair] * ports * ports)
+    lines = []
+    for row in range(ports):
+        for start in range(0, ports, _PAIRS_PER_LINE):
+            chunk = " ".join([pair] * min(_PAIRS_PER_LINE, ports - start))
+            lines.append((freq + " " if not lines else "  ") + chunk)
+    return "\n".join(lines)
+
+
+def _as_matrix(data: Any, frequencies: Optional[Iterable[float]]) -> Tuple[np.ndarray, np.ndarray]:
+    if isinstance(data, TouchstoneData):
+        return np.asarray(data.frequencies, dtype=np.float64), np.asarray(data.s)
+    if isinstance(data, MeasurementResult):
+        if frequencies is None and data.axis is not None:
+            frequencies = data.axis.values()
+        data = data.value
+    s = np.asarray(data, dtype=np.complex128)
+    if s.ndim == 1:
+        s = s.reshape(-1, 1, 1)
+    if s.ndim != 3 or s.shape[1] != s.shape[2]:
+        raise ValueError(f"Expected a (points, n, n) S-parameter array, got shape {s.shape}")
+    if frequencies is None:
+        raise ValueError("Frequencies are required when the data carries no trace axis")
+    freqs = np.asarray(frequencies, dtype=np.float64)
+    if freqs.shape != (s.shape[0],):
+        raise ValueError(f"{freqs.size} frequencies for {s.shape[0]} points")
+    return freqs, s
+
+
+def write_touchstone(target: Union[str, os.PathLike, IO[str]], data: Any,
+                     frequencies: Optional[Iterable[float]] = None, z0: float = 50.0,
+                     data_format: str = "RI", freq_unit: str = "HZ",
+                     comments: Iterable[str] = (), precision: int = 9,
+                     chunk: int = 4096) -> None:
+    """Writes S-parameters as a Touchstone 1.x file.
+
+    Args:
+        target: Path or open text file.
+        data: ``MeasurementResult`` (e.g. from ``get_sparameters``), a
+            :class:`TouchstoneData`, or a complex ``(points, n, n)`` array.
+            A 1-D complex trace is written as a 1-port file.
+        frequencies: Frequencies in Hz; taken from the result's axis if omitted.
+        z0: Reference impedance in ohms.
+        data_format: ``"RI"``, ``"MA"`` or ``"DB"``.
+        freq_unit: ``"HZ"``, ``"KHZ"``, ``"MHZ"`` or ``"GHZ"``.
+        comments: Lines written as ``!`` comments above the option line.
+        precision: Significant digits of the data values.
+        chunk: Frequency points formatted per block.
+    """
+    data_format = data_format.upper()
+    freq_unit = freq_unit.upper()
+    if data_format not in DATA_FORMATS:
+        raise ValueError(f"Unknown Touchstone format '{data_format}', expected one of {DATA_FORMATS}")
+    if freq_unit not in FREQ_UNITS:
+        raise ValueError(f"Unknown frequency unit '{freq_unit}', expected one of {tuple(FREQ_UNITS)}")
+    freqs, s = _as_matrix(data, frequencies)
+    if isinstance(data, TouchstoneData):
+        z0 = data.z0
+        comments = list(data.comments) + list(comments)
+
+    ports = s.shape[1]
+    fmt = _line_format(ports, precision)
+    scaled = freqs / FREQ_UNITS[freq_unit]
+
+    own = not hasattr(target, "write")
+    fh = open(target, "w", newline="\n") if own else target
+    try:
+        for line in comments:
+            fh.write(f"! {line}\n")
+        fh.write(f"# {freq_unit} S {data_format} R {z0:g}\n")
+        for start in range(0, len(freqs), chunk):
+            block = slice(start, start + chunk)
+            rows = np.column_stack([scaled[block], _encode(_file_order(s[block]), data_format)])
+            np.savetxt(fh, rows, fmt=fmt)
+    finally:
+        if own:
+            fh.close()
+
+
+def read_touchstone(source: Union[str, os.PathLike, IO[str]], ports: Optional[int] = None) -> TouchstoneData:
+    """Reads a Touchstone 1.x file.
+
+    Args:
+        source: Path or open text file.
+        ports: Port count; inferred from a ``.sNp`` file name if omitted.
+
+    Raises:
+        ValueError: If the port count is unknown, the file is Touchstone 2.0,
+            or the number of values does not fit the port count.
+    """
+    if ports is None:
+        name = os.fspath(source) if not hasattr(source, "read") else getattr(source, "name", "")
+        match = _PORTS_FROM_NAME.search(str(name))
+        if not match:
+            raise ValueError("Cannot infer the port count; pass ports=")
+        ports = int(match.group(1))
+
+    if hasattr(source, "read"):
+        text = source.read()
+    else:
+        with open(source, "r") as fh:
+            text = fh.read()
+
+    # Touchstone defaults when the option line omits a field
+    freq_unit, data_format, z0 = "GHZ", "MA", 50.0
+    comments: List[str] = []
+    numbers: List[str] = []
+    for line in text.splitlines():
+        line, _, comment = line.partition("!")
+        if comment and not numbers:
+            comments.append(comment.strip())
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("["):
+            raise ValueError("Touchstone 2.0 files are not supported")
+        if line.startswith("#"):
+            tokens = line[1:].upper().split()
+            for i, token in enumerate(tokens):
+                if token in FREQ_UNITS:
+                    freq_unit = token
+                elif token in DATA_FORMATS:
+                    data_format = token
+                elif token == "R" and i + 1 < len(tokens):
+                    z0 = float(tokens[i + 1])
+                elif token in ("Y", "Z", "H", "G"):
+                    raise ValueError(f"Only S-parameter files are supported, got '{token}'")
+            continue
+        numbers.append(line)
+
+    values = np.array(" ".join(numbers).split(), dtype=np.float64)
+    per_point = 1 + 2 * ports * ports
+    if values.size % per_point:
+        raise ValueError(f"{values.size} values do not form {ports}-port data points")
+    rows = values.reshape(-1, per_point)
+    s = _decode(rows[:, 1:], data_format).reshape(-1, ports, ports)
+    if ports == 2:
+        s = s.transpose(0, 2, 1)
+    return TouchstoneData(rows[:, 0] * FREQ_UNITS[freq_unit], np.ascontiguousarray(s), z0, comments)
@@ -1,20 +1,29 @@
 """Low-level transport wrappers and SCPI handshake helpers.
 
-Provides thin connection wrappers for the two physical transports the library
-speaks -- VISA (:class:`VisaDriver`) and raw serial (:class:`SerialDriver`) --
+Provides thin connection wrappers for the physical transports the library
+speaks -- VISA (:class:`VisaDriver`), raw serial (:class:`SerialDriver`, or
+the framed, thread-backed :class:`FramedSerial`) and raw SCPI sockets
+(:class:`SocketResource`) --
 plus helpers for the handshake problems that come up when talking to real
 instruments: guessing line terminations, finding a workable timeout, and
 waiting for an operation to finish without blind sleeps.
 
-Both wrapper classes are deliberately forgiving: a failed connection leaves the
-object usable but inert rather than raising. See the individual docstrings for
+:class:`VisaDriver` and :class:`SerialDriver` are deliberately forgiving: a failed
+connection leaves the object usable but inert rather than raising. See the individual docstrings for
 what that means for callers.
 """
 
 import asyncio
+import re
 import serial # type: ignore
+import socket
+import struct
+import threading
 import time
-from typing import List, Optional, Tuple, Union, Any
+from collections import deque
+from typing import Deque, List, Optional, Sequence, Tuple, Union, Any
+
+import numpy as np
 
 class VisaDriver:
     """Generic wrapper for VISA instruments.
@@ -116,9 +125,10 @@ class VisaDriver:
 class SerialDriver:
     """Generic wrapper for Serial devices.
 
-    Opens the port on construction and waits two seconds for the device to
-    stabilise, which many USB-serial adapters need before they will accept
-    traffic.
+    Opens the port on construction and waits ``settle`` seconds (two by
+    default) for the device to stabilise, which many USB-serial adapters need
+    before they will accept traffic. :class:`FramedSerial` detects readiness
+    by probing instead.
 
     Parameters
     ----------
@@ -129,6 +139,8 @@ class SerialDriver:
         Baud rate. Defaults to ``9600``.
     timeout : float, optional
         Read timeout in seconds. Defaults to ``1``.
+    settle : float, optional
+        Stabilisation wait after opening, in seconds. Defaults to ``2``.
 
     Notes
     -----
@@ -137,7 +149,7 @@ class SerialDriver:
     are all no-ops. Check ``driver.ser is not None`` before relying on it.
 
     Because of the stabilisation wait, constructing this class blocks for
-    roughly two seconds even when the port opens immediately.
+    ``settle`` seconds even when the port opens immediately.
 
     Attributes
     ----------
@@ -150,13 +162,14 @@ class SerialDriver:
     ser : serial.Serial or None
         The open port, or ``None`` if it could not be opened.
     """
-    def __init__(self, port, baudrate: int = 9600, timeout: float = 1) -> None :
+    def __init__(self, port, baudrate: int = 9600, timeout: float = 1, settle: float = 2) -> None :
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
         try:
             self.ser = serial.Serial(port, baudrate, timeout=timeout)
-            time.sleep(2) # Stabilization time
+            if settle:
+                time.sleep(settle) # Stabilization time
         except Exception as e:
             print(f"Error opening serial port {port}: {e}")
             self.ser = None
@@ -219,6 +232,592 @@ class SerialDriver:
             self.ser.close()
 
 
+class FramedSerial:
+    """Serial transport with a background reader and a framed receive buffer.
+
+    A reader thread moves bytes from the port into a buffer as they arrive and
+    cuts them into frames, either at any of the configured terminators or by
+    a length prefix. :meth:`send` returns as soon as the bytes are written and
+    :meth:`expect` takes the next complete frame, so a reply is returned the
+    moment its terminator arrives instead of after a ``readline()`` timeout.
+
+    Readiness is detected by probing: :meth:`open` (or :meth:`wait_ready`)
+    sends ``probe`` again after every ``probe_interval`` seconds of silence
+    until the device answers, replacing the fixed stabilisation sleep of
+    :class:`SerialDriver`::
+
+        with FramedSerial("/dev/ttyUSB0", 115200, terminator=(b"\\r\\n", b"\\n")) as fx:
+            fx.open(probe="*IDN?")           # returns once the fixture answers
+            fx.send("RELAY:CH3")
+            reply = fx.query("MEAS?", timeout=0.5)
+
+    Parameters
+    ----------
+    port : str
+        Device path or COM port name.
+    baudrate : int, optional
+        Baud rate. Defaults to ``9600``.
+    terminator : bytes or sequence of bytes, optional
+        Frame terminator(s). With several, a frame ends at the first one to
+        arrive and empty frames are dropped (so ``\\r\\n`` split across reads
+        does not produce a blank frame). Defaults to ``b"\\n"``.
+    length_prefix : str, optional
+        ``struct`` format of a length header (e.g. ``">H"``). When given,
+        frames are ``<length><payload>`` and ``terminator`` is ignored.
+    encoding : str, optional
+        Encoding of ``str`` commands. Defaults to ``"utf-8"``.
+    ser : serial.Serial, optional
+        An already open port to use instead of opening ``port``.
+
+    Notes
+    -----
+    Unlike :class:`SerialDriver`, errors are raised: opening a missing port
+    raises ``serial.SerialException`` and waiting too long raises
+    :class:`~instrumation.exceptions.InstrumentTimeout`.
+    """
+
+    READ_POLL = 0.02  # seconds the reader blocks when the port is idle
+
+    def __init__(self, port: str, baudrate: int = 9600,
+                 terminator: Union[bytes, Sequence[bytes]] = b"\n",
+                 length_prefix: Optional[str] = None, encoding: str = "utf-8",
+                 ser: Any = None) -> None:
+        self.port = port
+        self.baudrate = baudrate
+        self.terminators = [terminator] if isinstance(terminator, bytes) else list(terminator)
+        if not self.terminators or not all(self.terminators):
+            raise ValueError("At least one non-empty terminator is required")
+        self.length_prefix = length_prefix
+        self.encoding = encoding
+        self.ser = ser
+        # Longest first so b"\r\n" wins over b"\r" at the same position
+        self._split = re.compile(b"|".join(re.escape(t) for t in sorted(self.terminators, key=len, reverse=True)))
+        self._buffer = bytearray()
+        self._frames: Deque[bytes] = deque()
+        self._received = 0   # bytes read so far; tells wait_ready a reply is still arriving
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.error: Optional[Exception] = None
+
+    def __enter__(self) -> "FramedSerial":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def open(self, probe: Union[str, bytes, None] = None, expect: Union[str, bytes, None] = None,
+             ready_timeout: float = 3.0, probe_interval: float = 0.05) -> Optional[bytes]:
+        """Opens the port, starts the reader and optionally probes for readiness.
+
+        Returns
+        -------
+        bytes or None
+            The device's answer to ``probe``, if one was given.
+        """
+        if self.ser is None:
+            self.ser = serial.Serial(self.port, self.baudrate, timeout=self.READ_POLL)
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._reader, name=f"serial-reader-{self.port}", daemon=True)
+            self._thread.start()
+        if probe is None:
+            return None
+        return self.wait_ready(probe, expect, ready_timeout, probe_interval)
+
+    def close(self) -> None:
+        """Stops the reader thread and closes the port."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.ser is not None:
+            self.ser.close()
+            self.ser = None
+
+    def _reader(self) -> None:
+        while self._running:
+            try:
+                data = self.ser.read(self.ser.in_waiting or 1)
+            except Exception as e:
+                with self._cond:
+                    self.error = e
+                    self._running = False
+                    self._cond.notify_all()
+                return
+            if data:
+                with self._cond:
+                    self._buffer += data
+                    self._received += len(data)
+                    self._extract()
+                    self._cond.notify_all()
+
+    def _extract(self) -> None:
+        buf = self._buffer
+        if self.length_prefix:
+            header = struct.calcsize(self.length_prefix)
+            while len(buf) >= header:
+                (size,) = struct.unpack(self.length_prefix, bytes(buf[:header]))
+                if len(buf) < header + size:
+                    break
+                self._frames.append(bytes(buf[header:header + size]))
+                del buf[:header + size]
+            return
+        start = 0
+        for m in self._split.finditer(buf):
+            frame = bytes(buf[start:m.start()])
+            if frame or len(self.terminators) == 1:
+                self._frames.append(frame)
+            start = m.end()
+        del buf[:start]
+
+    def send(self, data: Union[str, bytes]) -> None:
+        """Writes one frame and returns without waiting for a reply.
+
+        ``str`` commands are encoded and get the first terminator appended
+        (or the length header, for length-prefixed framing).
+        """
+        if self.ser is None:
+            from .exceptions import ConnectionLost
+            raise ConnectionLost(f"Serial port {self.port} is not open")
+        payload = data.encode(self.encoding) if isinstance(data, str) else bytes(data)
+        if self.length_prefix:
+            payload = struct.pack(self.length_prefix, len(payload)) + payload
+        elif isinstance(data, str) and not any(payload.endswith(t) for t in self.terminators):
+            payload += self.terminators[0]
+        self.ser.write(payload)
+
+    def expect(self, pattern: Union[str, bytes, None] = None, timeout: float = 1.0) -> Optional[bytes]:
+        """Returns the next frame, waiting up to ``timeout`` seconds.
+
+        Parameters
+        ----------
+        pattern : str or bytes, optional
+            Regular expression the frame must match (``re.match``); frames
+            that do not match, such as unsolicited status lines, are dropped.
+        timeout : float, optional
+            Seconds to wait. ``0`` polls: returns ``None`` if no frame is
+            available instead of raising.
+
+        Raises
+        ------
+        InstrumentTimeout
+            If no (matching) frame arrives in time. The message includes any
+            unterminated bytes received, which usually point to a wrong
+            terminator.
+        """
+        regex = re.compile(pattern.encode(self.encoding) if isinstance(pattern, str) else pattern) \
+            if pattern is not None else None
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                while self._frames:
+                    frame = self._frames.popleft()
+                    if regex is None or regex.match(frame):
+                        return frame
+                if self.error is not None:
+                    from .exceptions import ConnectionLost
+                    raise ConnectionLost(f"Serial port {self.port} failed: {self.error}")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    if timeout <= 0:
+                        return None
+                    from .exceptions import InstrumentTimeout
+                    pending = f"; unterminated data {bytes(self._buffer)[:40]!r}" if self._buffer else ""
+                    raise InstrumentTimeout(f"No frame from {self.port} within {timeout}s{pending}")
+                self._cond.wait(remaining)
+
+    def query(self, command: Union[str, bytes], pattern: Union[str, bytes, None] = None,
+              timeout: float = 1.0) -> str:
+        """Sends ``command`` and returns the next (matching) frame, decoded and stripped."""
+        self.send(command)
+        return self.expect(pattern, timeout).decode(self.encoding, errors="replace").strip()
+
+    def pending(self) -> int:
+        """Number of complete frames waiting to be read."""
+        with self._cond:
+            return len(self._frames)
+
+    def flush(self) -> None:
+        """Discards received frames and partial data."""
+        with self._cond:
+            self._frames.clear()
+            self._buffer.clear()
+
+    def wait_ready(self, probe: Union[str, bytes], expect: Union[str, bytes, None] = None,
+                   timeout: float = 3.0, interval: float = 0.05) -> bytes:
+        """Sends ``probe`` until the device answers (with a frame matching ``expect``).
+
+        The probe is repeated only after ``interval`` seconds without a byte
+        from the device, so a slow reply is never cut off by the next probe.
+        When more than one probe went out, replies to the extra ones are read
+        and discarded until the port is quiet for ``interval`` again, so they
+        do not answer the next query. ``interval`` should exceed the device's
+        reply latency.
+
+        Returns
+        -------
+        bytes
+            The first answer.
+
+        Raises
+        ------
+        InstrumentTimeout
+            If the device does not answer within ``timeout`` seconds.
+        """
+        regex = re.compile(expect.encode(self.encoding) if isinstance(expect, str) else expect) \
+            if expect is not None else None
+        deadline = time.monotonic() + timeout
+        probes = 0
+        while True:
+            # Only reached when the port is idle: anything buffered is stale
+            self.flush()
+            self.send(probe)
+            probes += 1
+            answer = self._await_answer(regex, interval, deadline)
+            if answer is not None:
+                break
+            if time.monotonic() >= deadline:
+                from .exceptions import InstrumentTimeout
+                raise InstrumentTimeout(f"{self.port} did not answer {probe!r} within {timeout}s")
+        if probes > 1:
+            self._drain_until_quiet(interval)
+        return answer
+
+    def _await_answer(self, regex: Optional["re.Pattern"], interval: float, deadline: float) -> Optional[bytes]:
+        """Next frame matching ``regex``; ``None`` after ``interval`` of silence or at ``deadline``."""
+        with self._cond:
+            received = self._received
+            last = time.monotonic()
+            while True:
+                while self._frames:
+                    frame = self._frames.popleft()
+                    if regex is None or regex.match(frame):
+                        return frame
+                if self.error is not None:
+                    from .exceptions import ConnectionLost
+                    raise ConnectionLost(f"Serial port {self.port} failed: {self.error}")
+                now = time.monotonic()
+                if self._received != received:
+                    received, last = self._received, now
+                wake = min(last + interval, deadline)
+                if now >= wake:
+                    return None
+                self._cond.wait(wake - now)
+
+    def _drain_until_quiet(self, interval: float) -> None:
+        """Discards everything received until no byte arrives for ``interval`` seconds."""
+        with self._cond:
+            received = self._received
+            last = time.monotonic()
+            while True:
+                now = time.monotonic()
+                if self._received != received:
+                    received, last = self._received, now
+                if now - last >= interval:
+                    self._frames.clear()
+                    self._buffer.clear()
+                    return
+                self._cond.wait(last + interval - now)
+
+
+# pyvisa/struct datatype codes with their standard sizes, as numpy dtypes
+_BINARY_DTYPES = {
+    "b": "i1", "B": "u1", "h": "i2", "H": "u2", "i": "i4", "I": "u4",
+    "l": "i4", "L": "u4", "q": "i8", "Q": "u8", "e": "f2", "f": "f4", "d": "f8",
+}
+
+_SOCKET_RESOURCE = re.compile(r"^TCPIP\d*::([^:]+)::(\d+)::SOCKET$", re.IGNORECASE)
+
+
+class SocketResource:
+    """SCPI over a raw TCP socket, with the pyvisa resource interface.
+
+    Most LAN instruments accept SCPI on a plain TCP port (5025 by
+    convention). Talking to it directly skips the VISA library and its
+    backend. Replies are read into one preallocated buffer with
+    ``recv_into``. :meth:`query_binary_values` parses the IEEE-488.2 block
+    header in that buffer and receives the payload straight into the
+    returned NumPy array, so a trace is never copied through ``bytes``::
+
+        sa = SocketResource.from_resource("TCPIP::192.168.1.20::5025::SOCKET")
+        sa.query("*IDN?")
+        trace = sa.query_binary_values(":TRAC? TRACE1", container=np.ndarray)
+
+    ``RealDriver`` uses it in place of ``rm.open_resource`` when
+    ``raw_socket`` is set (see ``RealDriver.use_raw_socket``).
+
+    Parameters
+    ----------
+    host : str
+        Host name or IP address.
+    port : int, optional
+        TCP port. Defaults to ``5025``.
+    timeout : int or None, optional
+        I/O timeout in milliseconds, ``None`` for no limit. Defaults to
+        ``5000``.
+    read_termination, write_termination : str, optional
+        Message terminators. Default to ``"\\n"``.
+    encoding : str, optional
+        Encoding of text messages. Defaults to ``"ascii"``.
+    buffer_size : int, optional
+        Initial receive buffer size in bytes; it grows for larger replies.
+
+    Notes
+    -----
+    Errors follow pyvisa, so code written against a VISA resource behaves
+    the same: an expired timeout raises ``pyvisa.VisaIOError`` with
+    ``StatusCode.error_timeout``. A connection that cannot be opened or is
+    closed by the instrument raises
+    :class:`~instrumation.exceptions.ConnectionLost`.
+    """
+
+    BUFFER_SIZE = 1 << 16
+
+    def __init__(self, host: str, port: int = 5025, timeout: Optional[int] = 5000,
+                 read_termination: str = "\n", write_termination: str = "\n",
+                 encoding: str = "ascii", buffer_size: int = BUFFER_SIZE) -> None:
+        self.host = host
+        self.port = port
+        self.resource_name = f"TCPIP::{host}::{port}::SOCKET"
+        self.read_termination = read_termination
+        self.write_termination = write_termination
+        self.encoding = encoding
+        self._timeout = timeout
+        self._buf = bytearray(buffer_size)
+        self._view = memoryview(self._buf)
+        # Received but unread bytes are _buf[_start:_end]
+        self._start = 0
+        self._end = 0
+        self.sock: Optional[socket.socket] = None
+        self.open()
+
+    @classmethod
+    def from_resource(cls, resource: str, **kwargs: Any) -> "SocketResource":
+        """Opens a ``TCPIP[board]::host::port::SOCKET`` resource string."""
+        m = _SOCKET_RESOURCE.match(resource.strip())
+        if not m:
+            raise ValueError(f"Not a raw socket resource: {resource}")
+        return cls(m.group(1), int(m.group(2)), **kwargs)
+
+    def open(self) -> None:
+        try:
+            self.sock = socket.create_connection((self.host, self.port), timeout=self._seconds())
+        except OSError as e:
+            from .exceptions import ConnectionLost
+            raise ConnectionLost(f"Cannot connect to {self.resource_name}: {e}")
+        # Small commands go out at once instead of waiting for Nagle coalescing
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._start = self._end = 0
+
+    def close(self) -> None:
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        self._start = self._end = 0
+
+    def __enter__(self) -> "SocketResource":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _seconds(self) -> Optional[float]:
+        return None if self._timeout is None else self._timeout / 1000.0
+
+    @property
+    def timeout(self) -> Optional[int]:
+        """I/O timeout in milliseconds (``None`` waits forever)."""
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, value: Optional[int]) -> None:
+        self._timeout = value
+        if self.sock is not None:
+            self.sock.settimeout(self._seconds())
+
+    # --- Receiving ---
+    def _recv_into(self, dest: memoryview) -> int:
+        if self.sock is None:
+            from .exceptions import ConnectionLost
+            raise ConnectionLost(f"{self.resource_name} is not open")
+        try:
+            count = self.sock.recv_into(dest)
+        except socket.timeout:
+            from pyvisa import constants, errors
+            raise errors.VisaIOError(constants.StatusCode.error_timeout)
+        if count == 0:
+            from .exceptions import ConnectionLost
+            raise ConnectionLost(f"{self.resource_name} closed the connection")
+        return count
+
+    def _fill(self) -> None:
+        """Receives more bytes, making room in the buffer first."""
+        if self._start == self._end:
+            self._start = self._end = 0
+        elif self._end == len(self._buf):
+            pending = self._end - self._start
+            if self._start:
+                self._view[:pending] = self._view[self._start:self._end]
+            else:
+                grown = bytearray(2 * len(self._buf))
+                grown[:pending] = self._view[:pending]
+                self._view.release()
+                self._buf = grown
+                self._view = memoryview(grown)
+            self._start, self._end = 0, pending
+        self._end += self._recv_into(self._view[self._end:])
+
+    def _need(self, count: int) -> None:
+        while self._end - self._start < count:
+            self._fill()
+
+    def _block_end(self, offset: int) -> int:
+        """Offset just past the definite-length block starting at ``offset``."""
+        self._need(offset + 2)
+        digits = self._buf[self._start + offset + 1] - 0x30
+        self._need(offset + 2 + digits)
+        header = self._start + offset + 2
+        return offset + 2 + digits + int(self._buf[header:header + digits])
+
+    def _message_length(self) -> int:
+        """Length of the first complete message (terminator included).
+
+        Binary blocks are skipped by their declared length, so a terminator
+        byte inside a payload does not end the message. A ``#`` is a block
+        header only at the start of a response unit (after ``;`` or ``,``)
+        and when followed by a non-zero digit.
+        """
+        term = self.read_termination.encode(self.encoding)
+        offset = 0
+        while True:
+            pending = self._end - self._start
+            if offset >= pending:
+                self._fill()
+                continue
+            base = self._start
+            buf = self._buf
+            if buf[base + offset] == 0x23 and (offset == 0 or buf[base + offset - 1] in b";,"):
+                self._need(offset + 2)
+                if 0x31 <= self._buf[self._start + offset + 1] <= 0x39:
+                    offset = self._block_end(offset)
+                    continue
+                base = self._start
+                buf = self._buf
+            stop = buf.find(term, base + offset, self._end)
+            mark = buf.find(b"#", base + offset + 1, self._end if stop < 0 else stop)
+            if mark >= 0:
+                offset = mark - base
+            elif stop >= 0:
+                return stop - base + len(term)
+            else:
+                # Keep a partial multi-byte terminator in view for the next scan
+                offset = max(offset, pending - len(term))
+                self._fill()
+
+    def read_raw(self, size: Optional[int] = None) -> bytes:
+        """Reads one complete message, terminator included."""
+        length = self._message_length()
+        data = bytes(self._view[self._start:self._start + length])
+        self._start += length
+        return data
+
+    def read(self, encoding: Optional[str] = None) -> str:
+        text = self.read_raw().decode(encoding or self.encoding)
+        if self.read_termination and text.endswith(self.read_termination):
+            text = text[:-len(self.read_termination)]
+        return text
+
+    def clear(self) -> None:
+        """Discards buffered and in-flight reply bytes."""
+        self._start = self._end = 0
+        if self.sock is None:
+            return
+        self.sock.setblocking(False)
+        try:
+            while self.sock.recv_into(self._view):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+        finally:
+            self.sock.settimeout(self._seconds())
+
+    # --- Sending ---
+    def write_raw(self, message: bytes) -> int:
+        if self.sock is None:
+            from .exceptions import ConnectionLost
+            raise ConnectionLost(f"{self.resource_name} is not open")
+        self.sock.sendall(message)
+        return len(message)
+
+    def write(self, message: str, termination: Optional[str] = None, encoding: Optional[str] = None) -> int:
+        term = self.write_termination if termination is None else termination
+        if term and not message.endswith(term):
+            message += term
+        return self.write_raw(message.encode(encoding or self.encoding))
+
+    # --- Queries ---
+    def query(self, message: str, delay: Optional[float] = None) -> str:
+        self.write(message)
+        if delay:
+            time.sleep(delay)
+        return self.read()
+
+    def query_ascii_values(self, message: str, converter: Any = "f", separator: str = ",",
+                           container: Any = list, delay: Optional[float] = None) -> Any:
+        convert = float if converter == "f" else int if converter in ("d", "i") else converter
+        values = [convert(v) for v in self.query(message, delay).split(separator) if v.strip()]
+        return np.asarray(values) if container is np.ndarray else container(values)
+
+    def read_binary_values(self, datatype: str = "f", is_big_endian: bool = False,
+                           container: Any = list) -> Any:
+        """Reads one IEEE-488.2 definite-length block reply.
+
+        The header is parsed in the receive buffer and the payload is
+        received directly into the result array; only bytes that arrived
+        together with the header are copied.
+        """
+        if datatype not in _BINARY_DTYPES:
+            raise ValueError(f"Unsupported datatype '{datatype}'")
+        dtype = np.dtype((">" if is_big_endian else "<") + _BINARY_DTYPES[datatype])
+        # Skip whitespace left ahead of the block
+        while True:
+            self._need(1)
+            if self._buf[self._start] not in b" \r\n\t":
+                break
+            self._start += 1
+        self._need(2)
+        if self._buf[self._start] != 0x23 or not 0x31 <= self._buf[self._start + 1] <= 0x39:
+            raise ValueError(f"Expected an IEEE definite-length block from {self.resource_name}")
+        payload_end = self._block_end(0)
+        digits = self._buf[self._start + 1] - 0x30
+        length = payload_end - 2 - digits
+        if length % dtype.itemsize:
+            raise ValueError(f"Block of {length} bytes is not a whole number of '{datatype}' values")
+        self._start += 2 + digits
+
+        values = np.empty(length // dtype.itemsize, dtype=dtype)
+        dest = memoryview(values).cast("B")
+        have = min(length, self._end - self._start)
+        dest[:have] = self._view[self._start:self._start + have]
+        self._start += have
+        while have < length:
+            have += self._recv_into(dest[have:])
+        # Drop the rest of the message (terminator); receiving may move _start
+        rest = self._message_length()
+        self._start += rest
+        if container is np.ndarray:
+            return values
+        return container(values.tolist())
+
+    def query_binary_values(self, message: str, datatype: str = "f", is_big_endian: bool = False,
+                            container: Any = list, delay: Optional[float] = None) -> Any:
+        self.write(message)
+        if delay:
+            time.sleep(delay)
+        return self.read_binary_values(datatype, is_big_endian, container)
+
+
 # ── Transport utilities ────────────────────────────────────
 
 def detect_line_termination(instrument: Any, query: str = "*IDN?") -> str:
@@ -513,4 +1112,52 @@ def batch_query(
                 raise
             results[write_cmd] = f"ERROR: {e}"
 
-    return results
\ No newline at end of file
+    return results
+
+def split_ieee_blocks(raw: bytes) -> List[bytes]:
+    """Split a response holding one or more IEEE-488.2 binary blocks.
+
+    A compound query such as ``"A?;:B?"`` whose units each return a
+    definite-length block (``#<n><length><payload>``) comes back as one
+    message with the blocks separated by ``;``. This returns the payloads in
+    order, so several binary fetches can share a single round trip. An
+    indefinite-length block (``#0<payload>``) must be the last one.
+
+    Parameters
+    ----------
+    raw : bytes
+        The complete response, as returned by ``read_raw()``.
+
+    Returns
+    -------
+    list of bytes
+        One payload per block.
+
+    Raises
+    ------
+    ValueError
+        If the response is not a sequence of IEEE blocks.
+    """
+    blocks = []
+    pos = 0
+    end = len(raw)
+    while pos < end:
+        # Skip separators and the trailing terminator between blocks
+        if raw[pos:pos + 1] in (b";", b",", b"\n", b"\r", b" "):
+            pos += 1
+            continue
+        if raw[pos:pos + 1] != b"#" or pos + 2 > end:
+            raise ValueError(f"Expected an IEEE block at byte {pos}")
+        digits = int(raw[pos + 1:pos + 2])
+        if digits == 0:
+            # Indefinite-length block (e.g. Keithley "#0"): runs to the terminator
+            payload = raw[pos + 2:]
+            blocks.append(payload[:-1] if payload.endswith(b"\n") else payload)
+            break
+        length = int(raw[pos + 2:pos + 2 + digits])
+        start = pos + 2 + digits
+        if start + length > end:
+            raise ValueError(f"IEEE block at byte {pos} is truncated")
+        blocks.append(raw[start:start + length])
+        pos = start + length
+    return blocks
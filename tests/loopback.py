@@ -0,0 +1,64 @@
+from unittest.mock import patch
+
+
+class LoopbackResource:
+    """pyvisa-like resource answering from an in-process emulator personality.
+
+    Replies to written commands queue up like a socket's receive buffer.
+    ``read_raw()`` returns up to and including the next read termination
+    character, as a termchar-enabled VISA read does, so a binary payload that
+    holds 0x0A comes back in pieces; ``read_bytes()`` reads an exact count.
+    """
+
+    def __init__(self, personality, read_termination="\n"):
+        self.personality = personality
+        self.read_termination = read_termination
+        self.timeout = 5000
+        self.messages = []   # writes and queries, in order
+        self.writes = []
+        self.queries = []
+        self.replies = 0     # replies queued by written queries (round trips)
+        self._pending = b""
+
+    def write(self, command):
+        self.messages.append(command)
+        self.writes.append(command)
+        reply = self.personality.process(command) or b""
+        self.replies += bool(reply)
+        self._pending += reply
+
+    def read_raw(self):
+        cut = len(self._pending)
+        if self.read_termination:
+            term = self.read_termination.encode()
+            stop = self._pending.find(term)
+            if stop >= 0:
+                cut = stop + len(term)
+        data, self._pending = self._pending[:cut], self._pending[cut:]
+        return data
+
+    def read_bytes(self, count):
+        data, self._pending = self._pending[:count], self._pending[count:]
+        return data
+
+    def query(self, command):
+        self.messages.append(command)
+        self.queries.append(command)
+        return self.personality.process(command).decode().strip()
+
+    def close(self):
+        pass
+
+
+def fake_driver(cls, inst):
+    """An instance of driver ``cls`` talking to the fake resource ``inst``."""
+    with patch('pyvisa.ResourceManager'):
+        driver = cls("TCPIP::127.0.0.1::5025::SOCKET")
+    driver.inst = inst
+    driver.connected = True
+    return driver
+
+
+def loopback_driver(cls, personality):
+    """An instance of driver ``cls`` wired to an emulator personality."""
+    return fake_driver(cls, LoopbackResource(personality))
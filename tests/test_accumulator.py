@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from instrumation.analysis import TraceAccumulator
+from instrumation.drivers.simulated import SimulatedNetworkAnalyzer, SimulatedSpectrumAnalyzer
+from instrumation.results import MeasurementResult
+
+
+def test_power_mean_for_db_traces():
+    acc = TraceAccumulator()
+    acc.update(MeasurementResult([-10.0, -20.0], "dBm"))
+    acc.update(MeasurementResult([-20.0, -20.0], "dBm"))
+    expected = 10 * np.log10((0.1 + 0.01) / 2)
+    assert acc.mean[0] == pytest.approx(expected)
+    assert acc.mean[1] == pytest.approx(-20.0)
+    assert acc.result("mean").unit == "dBm"
+
+
+def test_log_average_mode():
+    acc = TraceAccumulator(average="log")
+    acc.update(MeasurementResult([-10.0], "dBm"))
+    acc.update(MeasurementResult([-20.0], "dBm"))
+    assert acc.mean[0] == pytest.approx(-15.0)
+
+
+def test_holds_and_batch_update():
+    acc = TraceAccumulator(history=4)
+    batch = np.array([[1.0, 5.0], [3.0, 2.0], [2.0, 9.0]])
+    acc.update(batch)
+    assert acc.count == 3
+    assert acc.max_hold.tolist() == [3.0, 9.0]
+    assert acc.min_hold.tolist() == [1.0, 2.0]
+    assert acc.mean.tolist() == pytest.approx([2.0, 16.0 / 3])
+
+
+def test_ring_buffer_is_bounded_and_ordered():
+    acc = TraceAccumulator(history=3)
+    for i in range(7):
+        acc.update([float(i), float(i)], timestamp=float(i))
+    assert len(acc) == 3
+    assert acc.spectrogram()[:, 0].tolist() == [4.0, 5.0, 6.0]
+    assert acc.timestamps().tolist() == [4.0, 5.0, 6.0]
+    assert acc.percentile(50).tolist() == [5.0, 5.0]
+    assert acc.count == 7
+    assert acc.max_hold.tolist() == [6.0, 6.0]
+
+
+def test_large_batch_keeps_newest_rows():
+    acc = TraceAccumulator(history=2)
+    acc.update(np.arange(10.0).reshape(5, 2))
+    assert acc.spectrogram().tolist() == [[6.0, 7.0], [8.0, 9.0]]
+
+
+def test_point_count_mismatch_rejected():
+    acc = TraceAccumulator()
+    acc.update([1.0, 2.0, 3.0])
+    with pytest.raises(ValueError):
+        acc.update([1.0, 2.0])
+
+
+def test_complex_vna_traces_vector_averaged():
+    acc = TraceAccumulator()
+    acc.update(MeasurementResult([1 + 1j, 0.5j], "IQ"))
+    acc.update(MeasurementResult([1 - 1j, 0.5j], "IQ"))
+    assert acc.mean.tolist() == [1 + 0j, 0.5j]
+    assert acc.max_hold[0] == pytest.approx(np.sqrt(2))
+    with pytest.raises(ValueError):
+        TraceAccumulator(average="power").update([1j])
+
+
+def test_feed_from_acquisition_with_broadcast(capsys):
+    sa = SimulatedSpectrumAnalyzer("SIM::SA")
+    broadcaster = MagicMock()
+    acc = TraceAccumulator(history=5)
+    with sa.acquisition() as acq:
+        acc.feed(acq, limit=6, broadcaster=broadcaster, every=3)
+    assert acc.count == 6
+    assert broadcaster.send.call_count == 2
+    packet = broadcaster.send.call_args.args[0]
+    assert packet["count"] == 6 and len(packet["max"]) == 1001
+
+
+def test_vna_traces_accumulate():
+    vna = SimulatedNetworkAnalyzer("SIM::VNA")
+    acc = TraceAccumulator()
+    acc.feed(vna.get_trace_data() for _ in range(4))
+    assert acc.result("max").metadata["count"] == 4
+    assert len(acc.mean) == 201
+
+
+def test_empty_and_invalid_arguments():
+    with pytest.raises(ValueError):
+        TraceAccumulator().mean
+    with pytest.raises(ValueError):
+        TraceAccumulator(average="rms")
+    with pytest.raises(ValueError):
+        TraceAccumulator(history=0)
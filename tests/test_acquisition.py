@@ -0,0 +1,95 @@
+import pytest
+from unittest.mock import MagicMock
+
+from instrumation.drivers.keysight import KeysightMXA
+from instrumation.drivers.rs import RohdeSchwarzSA
+from instrumation.drivers.simulated import SimulatedSpectrumAnalyzer
+
+from loopback import fake_driver
+
+
+def _mock(driver_cls):
+    driver = fake_driver(driver_cls, MagicMock())
+    driver.inst.query_binary_values.return_value = [-50.0, -20.0, -50.0]
+    return driver
+
+
+def _writes(driver):
+    return [c.args[0] for c in driver.inst.write.call_args_list]
+
+
+def test_setup_sent_once_per_session():
+    sa = _mock(KeysightMXA)
+    with sa.acquisition() as acq:
+        traces = acq.take(5)
+    writes = _writes(sa)
+    assert writes.count(":FORM:DATA REAL,32") == 1
+    assert writes.count(":INIT:CONT OFF") == 1
+    assert writes.count(":INIT:CONT ON") == 1
+    assert [t.metadata["sweep"] for t in traces] == [1, 2, 3, 4, 5]
+    assert traces[0].value == [-50.0, -20.0, -50.0]
+
+
+def test_next_sweep_triggered_before_fetch():
+    sa = _mock(KeysightMXA)
+    order = []
+    sa.inst.write.side_effect = lambda cmd: order.append(cmd)
+    sa.inst.query_binary_values.side_effect = lambda cmd, **kw: order.append(cmd) or [0.0]
+    with sa.acquisition() as acq:
+        acq.next_trace()
+    assert order[-5:] == [
+        "*WAI;:TRAC:COPY TRACE1,TRACE2;:INIT:IMM",
+        ":TRAC? TRACE2",
+        ":ABOR", ":TRAC2:UPD ON", ":INIT:CONT ON",
+    ]
+    sa.inst.query.assert_not_called()  # no *OPC? polling
+
+
+def test_counted_iterator_stops_without_extra_sweep():
+    sa = _mock(KeysightMXA)
+    with sa.acquisition(count=3) as acq:
+        traces = list(acq)
+    assert len(traces) == 3
+    advances = [w for w in _writes(sa) if w.startswith("*WAI")]
+    assert advances[-1] == "*WAI;:TRAC:COPY TRACE1,TRACE2"
+    assert all(a.endswith(":INIT:IMM") for a in advances[:-1])
+
+
+def test_rs_uses_view_trace_buffer():
+    sa = _mock(RohdeSchwarzSA)
+    with sa.acquisition(count=1) as acq:
+        list(acq)
+    assert ":DISP:TRAC2:MODE VIEW" in _writes(sa)
+    sa.inst.query_binary_values.assert_called_with(":TRAC:DATA? TRACE2", datatype='f', is_big_endian=False)
+
+
+def test_teardown_runs_when_loop_raises():
+    sa = _mock(KeysightMXA)
+    with pytest.raises(KeyError):
+        with sa.acquisition() as acq:
+            for _ in acq:
+                raise KeyError("consumer failed")
+    assert _writes(sa)[-1] == ":INIT:CONT ON"
+
+
+def test_session_clears_profile_sweep_mode():
+    sa = _mock(KeysightMXA)
+    sa.applied_profile = {"continuous": True, "span": 1e6}
+    with sa.acquisition(count=1) as acq:
+        list(acq)
+    assert sa.applied_profile == {"span": 1e6}
+
+
+def test_simulated_analyzer_falls_back_to_get_trace_data():
+    sa = SimulatedSpectrumAnalyzer("SIM::SA")
+    with sa.acquisition(count=2) as acq:
+        traces = list(acq)
+    assert len(traces) == 2
+    assert len(traces[1].value) == 1001
+    assert traces[1].metadata["sweep"] == 2
+
+
+def test_trace_outside_context_rejected():
+    sa = _mock(KeysightMXA)
+    with pytest.raises(RuntimeError):
+        sa.acquisition().next_trace()
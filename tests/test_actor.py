@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from instrumation.actor import PRIORITY_HIGH, PRIORITY_LOW, InstrumentActor
+from instrumation.drivers.real import RealDriver
+
+from loopback import fake_driver
+
+
+class OneSlotInstrument:
+    """Instrument with a single output slot: a new query overwrites an unread reply."""
+
+    def __init__(self, delay=0.002):
+        self.delay = delay
+        self.output = None
+        self.log = []
+
+    def write(self, command):
+        self.log.append(command)
+        time.sleep(self.delay)
+        self.output = '+0,"No error"' if command == "SYST:ERR?" else f"reply:{command}"
+
+    def read(self):
+        time.sleep(self.delay)
+        out, self.output = self.output, None
+        return out or ""
+
+    def query(self, command):
+        self.write(command)
+        return self.read()
+
+
+def _driver(delay=0.002):
+    return fake_driver(RealDriver, OneSlotInstrument(delay))
+
+
+def test_concurrent_thread_queries_are_not_interleaved():
+    driver = _driver()
+    with InstrumentActor(driver) as actor:
+        results = {}
+
+        def worker(n):
+            results[n] = [actor.query(f"Q{n}:{i}?") for i in range(5)]
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    for n, replies in results.items():
+        assert replies == [f"reply:Q{n}:{i}?" for i in range(5)]
+    assert actor.calls_executed == 30
+
+
+def test_priority_queue_order():
+    driver = _driver(delay=0)
+    with InstrumentActor(driver) as actor:
+        with actor.transaction():
+            futures = [actor.submit("write", "low", priority=PRIORITY_LOW),
+                       actor.submit("write", "normal"),
+                       actor.submit("write", "high", priority=PRIORITY_HIGH),
+                       actor.submit("write", "normal2")]
+            assert actor.pending() == 4
+        for f in futures:
+            f.result(1)
+    assert driver.inst.log == ["high", "normal", "normal2", "low"]
+
+
+def test_transaction_is_atomic_against_other_threads():
+    driver = _driver()
+    with InstrumentActor(driver) as actor:
+        started = threading.Event()
+
+        def other():
+            started.wait()
+            actor.write("OTHER")
+
+        t = threading.Thread(target=other)
+        t.start()
+        with actor.transaction() as drv:
+            drv.write("A1")
+            started.set()
+            time.sleep(0.02)
+            actor.write("A2")          # through the actor: runs here, no deadlock
+            drv.write("A3")
+        t.join()
+    assert driver.inst.log == ["A1", "A2", "A3", "OTHER"]
+
+
+def test_transaction_fence_drains_errors_once():
+    driver = _driver(delay=0)
+    events = []
+
+    @contextmanager
+    def deferred():
+        events.append("enter")
+        yield driver
+        events.append("fence")
+
+    driver.deferred_errors = deferred
+    with InstrumentActor(driver) as actor:
+        with actor.transaction(fence=True) as drv:
+            drv.write("A")
+            drv.write("B")
+    assert events == ["enter", "fence"]
+
+
+def test_async_shim_routes_through_actor():
+    driver = _driver()
+    actor = driver.actor()
+    assert driver.actor() is actor
+
+    async def main():
+        replies = await asyncio.gather(*[driver.async_query(f"Q{i}?") for i in range(10)])
+        async with actor.atransaction() as drv:
+            await actor.async_write("T1")
+            await actor.acall("write", "T2")
+        return replies
+
+    replies = asyncio.run(main())
+    actor.close()
+    assert replies == [f"reply:Q{i}?" for i in range(10)]
+    assert driver.inst.log[-2:] == ["T1", "T2"]
+    assert driver.__dict__.get("_actor") is None
+
+
+def test_exceptions_propagate_and_closed_actor_rejects_calls():
+    driver = _driver(delay=0)
+    actor = InstrumentActor(driver)
+    with pytest.raises(ZeroDivisionError):
+        actor.call(lambda: 1 / 0)
+    assert actor.get_id() == "reply:*IDN?"
+    assert actor.resource == driver.resource
+    actor.close()
+    with pytest.raises(RuntimeError, match="not running"):
+        actor.submit("write", "x")
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+from instrumation.burst import ReadingBurst
+from instrumation.drivers.keithley import Keithley2000, Keithley2400
+from instrumation.drivers.keysight import Keysight34461A
+from instrumation.drivers.simulated import SimulatedMultimeter
+from instrumation.emulator import VirtualMultimeter
+from instrumation.exceptions import InstrumentTimeout
+from instrumation.transport import split_ieee_blocks
+
+from loopback import fake_driver, loopback_driver
+
+
+def test_burst_drains_binary_memory():
+    dmm = VirtualMultimeter()
+    meter = loopback_driver(Keysight34461A, dmm)
+    with meter.burst("VOLT:DC", samples=500, nplc=0.02) as burst:
+        result = burst.read()
+    assert isinstance(result.value, np.ndarray)
+    assert result.value.size == 500
+    assert result.unit == "V"
+    assert meter.inst.replies == 1
+    assert dmm.errors == type(dmm.errors)()  # configuration accepted
+    assert dmm._setting("[SENSe]:VOLTage[:DC]:NPLC") == "0.02"
+    assert dmm.binary_format == "ASCII"  # restored on exit
+
+
+def test_stream_chunks_and_timestamps():
+    meter = loopback_driver(Keysight34461A, VirtualMultimeter())
+    with meter.burst("CURR", samples=250, triggers=2) as burst:
+        chunks = list(burst.stream(chunk=100))
+    assert [c.value.size for c in chunks] == [100, 100, 100, 100, 100]
+    assert [c.metadata["first"] for c in chunks] == [0, 100, 200, 300, 400]
+    assert chunks[0].unit == "A"
+    stamps = np.concatenate([c.metadata["timestamps"] for c in chunks])
+    assert np.all(np.diff(stamps) >= 0)
+
+
+def test_aperture_converted_to_nplc_at_line_frequency():
+    dmm = VirtualMultimeter()
+    meter = loopback_driver(Keysight34461A, dmm)
+    with meter.burst("VOLT:DC", samples=10, aperture=0.02) as burst:
+        burst.read()
+    assert dmm._setting("[SENSe]:VOLTage[:DC]:NPLC") == "1.2"
+
+
+def test_keithley_waits_for_full_buffer():
+    inst = MagicMock()
+    inst.query.side_effect = lambda cmd: {":TRAC:POIN:ACT?": "4"}.get(cmd, "0")
+    inst.read_raw.return_value = b"#0" + np.array([1, 2, 3, 4], dtype="<f4").tobytes() + b"\n"
+    meter = fake_driver(Keithley2000, inst)
+    with meter.burst("VOLT:DC", samples=2, triggers=2) as burst:
+        values = burst.read().value
+    assert values.tolist() == [1.0, 2.0, 3.0, 4.0]
+    writes = [c.args[0] for c in inst.write.call_args_list]
+    assert ":TRAC:POIN 4" in writes
+    assert ":FORM:DATA SRE" in writes
+    assert ":TRAC:DATA?" in writes
+
+
+def test_stalled_burst_times_out():
+    inst = MagicMock()
+    inst.query.return_value = "0"
+    inst.read_raw.return_value = b"#10\n"
+    meter = fake_driver(Keysight34461A, inst)
+    with pytest.raises(InstrumentTimeout):
+        with meter.burst(samples=10) as burst:
+            burst.read(timeout=0.0)
+    assert inst.write.call_args_list[-1].args[0] == ":FORM:DATA ASC"
+
+
+def test_unbuffered_meters_fall_back_to_single_readings():
+    with patch('builtins.print'):
+        sim = SimulatedMultimeter("SIM::DMM")
+    sim.latency = 0.0
+    with sim.burst("RES", samples=5) as burst:
+        result = burst.read()
+    assert result.value.size == 5
+    assert result.unit == "Ohm"
+    assert not ReadingBurst(fake_driver(Keithley2400, MagicMock())).buffered
+
+
+def test_indefinite_length_block():
+    raw = b"#0" + b"\x00\x0a\x00\x00" + b"\n"
+    assert split_ieee_blocks(raw) == [b"\x00\x0a\x00\x00"]
+
+
+def test_invalid_burst_arguments():
+    meter = fake_driver(Keysight34461A, MagicMock())
+    with pytest.raises(ValueError):
+        meter.burst(samples=0)
+    with pytest.raises(ValueError):
+        meter.burst(nplc=1, aperture=0.02)
+    with pytest.raises(RuntimeError):
+        next(meter.burst().stream())
@@ -0,0 +1,119 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+from instrumation.drivers.keysight import KeysightPXA, KeysightSG
+from instrumation.drivers.rs import RohdeSchwarzSA
+from instrumation.emulator import VirtualSignalGenerator, VirtualSpectrumAnalyzer
+from instrumation.exceptions import ConfigurationError
+
+from loopback import loopback_driver
+
+
+def test_safe_send_checks_every_command_by_default():
+    sg = loopback_driver(KeysightSG, VirtualSignalGenerator())
+    sg.safe_send(":FREQ 1 GHz")
+    sg.safe_send(":POW -10")
+    assert sg.inst.queries.count("SYST:ERR?") == 2
+
+
+def test_deferred_block_checks_once():
+    sg = loopback_driver(KeysightSG, VirtualSignalGenerator())
+    with sg.deferred_errors():
+        for hz in (1e9, 2e9, 3e9):
+            sg.safe_send(f":FREQ {hz}")
+        sg.safe_send(":POW -10")
+    assert sg.inst.queries == ["*ESR?"]
+
+
+def test_deferred_error_attributed_to_command():
+    sg = loopback_driver(KeysightSG, VirtualSignalGenerator())
+    with pytest.raises(ConfigurationError) as exc:
+        with sg.deferred_errors():
+            sg.safe_send(":FREQ 1 GHz")
+            sg.write(":BOGUS:HEADER 1")
+            sg.safe_send(":POW -10")
+    assert "-113" in str(exc.value)
+    assert sg.error_stack == ['-113,"Undefined header"']
+
+
+def test_single_command_window_is_blamed():
+    sg = loopback_driver(KeysightSG, VirtualSignalGenerator())
+    with pytest.raises(ConfigurationError) as exc:
+        with sg.deferred_errors():
+            sg.safe_send(":FREQ 100 GHz")
+    assert ":FREQ 100 GHz" in str(exc.value)
+    assert f"#{sg.command_seq}" in str(exc.value)
+
+
+def test_multiple_errors_report_sequence_window():
+    sg = loopback_driver(KeysightSG, VirtualSignalGenerator())
+    with pytest.raises(ConfigurationError) as exc:
+        with sg.deferred_errors():
+            sg.safe_send(":FREQ 100 GHz")
+            sg.safe_send(":POW 99")
+    assert str(exc.value).count("-222") == 2
+    assert "one of #" in str(exc.value)
+
+
+def test_rejected_setting_is_not_served_from_cache():
+    sa = loopback_driver(KeysightPXA, VirtualSpectrumAnalyzer())
+    sa.enable_state_cache()
+    sa.set_span(10e6)
+    with pytest.raises(ConfigurationError, match="-222"):
+        with sa.deferred_errors():
+            sa.set_span(5e12)
+    assert sa.get_span() == 10e6
+
+
+def test_error_queue_all_query_used_when_declared():
+    sa = loopback_driver(RohdeSchwarzSA, VirtualSpectrumAnalyzer())
+    with pytest.raises(ConfigurationError):
+        with sa.deferred_errors():
+            sa.write(":NOPE 1")
+            sa.write(":NOPE 2")
+    assert sa.inst.queries == ["*ESR?", ":SYST:ERR:ALL?"]
+    assert len(sa.error_stack) == 2
+
+
+def test_explicit_fence_inside_block():
+    sg = loopback_driver(KeysightSG, VirtualSignalGenerator())
+    with sg.deferred_errors():
+        sg.safe_send(":FREQ 1 GHz")
+        sg.fence()
+        sg.safe_send(":POW -5")
+    assert sg.inst.queries == ["*ESR?", "*ESR?"]
+
+
+def test_nested_blocks_fence_at_outermost_exit():
+    sg = loopback_driver(KeysightSG, VirtualSignalGenerator())
+    with sg.deferred_errors():
+        with sg.deferred_errors():
+            sg.safe_send(":FREQ 1 GHz")
+        assert sg.inst.queries == []
+    assert sg.inst.queries == ["*ESR?"]
+
+
+def test_cls_inside_block_collects_errors_first():
+    sg = loopback_driver(KeysightSG, VirtualSignalGenerator())
+    with pytest.raises(ConfigurationError):
+        with sg.deferred_errors():
+            sg.write(":NOPE")
+            sg.clear_status()
+
+
+def test_block_exception_not_masked_by_queued_errors():
+    sg = loopback_driver(KeysightSG, VirtualSignalGenerator())
+    with pytest.raises(KeyError):
+        with sg.deferred_errors():
+            sg.write(":NOPE")
+            raise KeyError("user code")
+    assert sg.error_stack == ['-113,"Undefined header"']
+
+
+def test_mock_resources_skip_fence():
+    with patch('pyvisa.ResourceManager'):
+        sg = KeysightSG("TCPIP::1.2.3.4::INSTR")
+    sg.inst = MagicMock()
+    with sg.deferred_errors():
+        sg.safe_send(":FREQ 1 GHz")
+    sg.inst.query.assert_not_called()
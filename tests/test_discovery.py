@@ -0,0 +1,179 @@
+import os
+import socket
+import struct
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from instrumation import discovery
+from instrumation.discovery import (
+    DiscoveredInstrument,
+    advertised,
+    browse_mdns,
+    discover,
+    remember,
+    vxi11_broadcast,
+)
+from instrumation.factory import get_instrument
+
+HISLIP = "_hislip._tcp.local"
+RAW = "_scpi-raw._tcp.local"
+
+
+def _name(name):
+    return b"".join(bytes([len(label)]) + label.encode() for label in name.split(".")) + b"\x00"
+
+
+def _rr(name, rtype, rdata):
+    return name + struct.pack(">HHIH", rtype, 0x8001, 120, len(rdata)) + rdata
+
+
+def _txt(fields):
+    return b"".join(bytes([len(f)]) + f for f in (f"{k}={v}".encode() for k, v in fields.items()))
+
+
+def _response(records, ancount):
+    return struct.pack(">6H", 0, 0x8400, 0, ancount, 0, len(records) - ancount) + b"".join(records)
+
+
+LXI_TXT = {"txtvers": "1", "Manufacturer": "Keysight Technologies", "Model": "N9030B",
+           "SerialNumber": "MY5512", "FirmwareVersion": "A.33.03"}
+
+
+def _full_answer(service, label, port, address="10.0.0.5"):
+    """PTR answer plus SRV/TXT/A additionals; the instance name points back at the PTR name."""
+    instance = bytes([len(label)]) + label.encode() + b"\xc0\x0c"
+    return _response([
+        _rr(_name(service), 12, instance),
+        _rr(instance, 33, struct.pack(">HHH", 0, 0, port) + _name("a-n9030b-5512.local")),
+        _rr(instance, 16, _txt(LXI_TXT)),
+        _rr(_name("a-n9030b-5512.local"), 1, socket.inet_aton(address)),
+    ], ancount=1)
+
+
+class _Responder:
+    """UDP responder on localhost answering each datagram via ``reply(data)``."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.queries = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.1)
+        self.address = self.sock.getsockname()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            try:
+                data, source = self.sock.recvfrom(9000)
+            except socket.timeout:
+                continue
+            self.queries.append(data)
+            for packet in self.reply(data):
+                self.sock.sendto(packet, source)
+
+    def close(self):
+        self._running = False
+        self._thread.join()
+        self.sock.close()
+
+
+@pytest.fixture
+def responder():
+    started = []
+
+    def start(reply):
+        started.append(_Responder(reply))
+        return started[-1]
+
+    yield start
+    for r in started:
+        r.close()
+
+
+def _portmapper(port, stale=False):
+    def reply(data):
+        xid = struct.unpack_from(">I", data)[0]
+        packets = [b"\x00garbage"]
+        if stale:
+            packets.append(struct.pack(">6I", xid ^ 1, 1, 0, 0, 0, 0) + struct.pack(">I", 1234))
+        packets.append(struct.pack(">6I", xid, 1, 0, 0, 0, 0) + struct.pack(">I", port))
+        return packets
+    return reply
+
+
+def test_browse_reads_lxi_txt_record(responder):
+    def reply(data):
+        return [b"\x00\x01", _full_answer(HISLIP, "Keysight N9030B (10.0.0.5)", 4880),
+                _full_answer(RAW, "Keysight N9030B (10.0.0.5)", 5025)]
+    mdns = responder(reply)
+    found = {d.service: d for d in browse_mdns(timeout=0.3, address=mdns.address)}
+    hislip, raw = found["_hislip._tcp"], found["_scpi-raw._tcp"]
+    assert hislip.resource == "TCPIP::10.0.0.5::hislip0::INSTR"
+    assert raw.resource == "TCPIP::10.0.0.5::5025::SOCKET"
+    assert hislip.name == "Keysight N9030B (10.0.0.5)"
+    assert hislip.idn == "Keysight Technologies,N9030B,MY5512,A.33.03"
+    assert hislip.host == "a-n9030b-5512.local"
+
+
+def test_browse_resolves_bare_ptr_answers(responder):
+    def reply(data):
+        if len(responder_ref[0].queries) == 1:
+            # PTR only, pointing at the sender; SRV/TXT must be asked for
+            instance = b"\x04scpi\xc0\x0c"
+            return [_response([_rr(_name(RAW), 12, instance)], ancount=1)]
+        return [_full_answer(RAW, "scpi", 5555, address="127.0.0.1")]
+    responder_ref = [responder(reply)]
+    found = browse_mdns(services=(RAW,), timeout=0.4, address=responder_ref[0].address)
+    assert len(responder_ref[0].queries) == 2
+    assert [d.resource for d in found] == ["TCPIP::127.0.0.1::5555::SOCKET"]
+    assert found[0].model == "N9030B"
+
+
+def test_vxi11_broadcast_collects_getport_replies(responder):
+    pmap = responder(_portmapper(1024, stale=True))
+    found = vxi11_broadcast(timeout=0.3, broadcast="127.0.0.1", port=pmap.address[1])
+    assert [(d.resource, d.port) for d in found] == [("TCPIP::127.0.0.1::INSTR", 1024)]
+    call = pmap.queries[0]
+    assert struct.unpack(">4I", call[40:56]) == (0x0607AF, 1, 6, 0)
+
+    unregistered = responder(_portmapper(0))
+    assert vxi11_broadcast(timeout=0.2, broadcast="127.0.0.1", port=unregistered.address[1]) == []
+
+
+def test_discover_runs_both_and_shares_model_info(responder):
+    mdns = responder(lambda data: [_full_answer(HISLIP, "PXA", 4880, address="127.0.0.1")])
+    pmap = responder(_portmapper(1024))
+    start = discovery.time.monotonic()
+    found = discover(timeout=0.3, mdns_address=mdns.address, broadcast="127.0.0.1",
+                     vxi11_port=pmap.address[1])
+    assert discovery.time.monotonic() - start < 0.55  # concurrent, not 2 x timeout
+    assert [d.resource for d in found] == ["TCPIP::127.0.0.1::hislip0::INSTR", "TCPIP::127.0.0.1::INSTR"]
+    assert found[1].service == "vxi11" and found[1].model == "N9030B"
+    assert advertised("TCPIP::127.0.0.1::INSTR").serial == "MY5512"
+
+
+def test_unreachable_targets_return_nothing():
+    assert browse_mdns(timeout=0.1, address=("127.0.0.1", 9)) == []
+    assert vxi11_broadcast(timeout=0.1, broadcast="203.0.113.255.1") == []
+
+
+def test_factory_routes_advertised_model_without_idn():
+    os.environ["INSTRUMATION_MODE"] = "REAL"
+    try:
+        rm = MagicMock()
+        rm.open_resource.return_value.query.return_value = "ACME,WIDGET,1,1"
+        rm.open_resource.return_value.timeout = 0
+        remember([DiscoveredInstrument("TCPIP::10.0.0.8::INSTR", "10.0.0.8", "_lxi._tcp",
+                                       manufacturer="KEITHLEY INSTRUMENTS", model="MODEL 2000")])
+        with patch("instrumation.factory.get_rm", return_value=rm):
+            drv = get_instrument("TCPIP::10.0.0.8::INSTR", "DMM")
+        assert type(drv).__name__ == "Keithley2000"
+        # Only the routed driver opened the resource: no identification pass
+        assert rm.open_resource.call_count == 1
+    finally:
+        os.environ["INSTRUMATION_MODE"] = "SIM"
@@ -0,0 +1,149 @@
+import socket
+import struct
+import threading
+
+import numpy as np
+import pytest
+
+from instrumation.emulator import (
+    EmulatorFarm,
+    VirtualMultimeter,
+    VirtualOscilloscope,
+    VirtualSignalGenerator,
+    VirtualSpectrumAnalyzer,
+    ieee_block,
+    parse_number,
+)
+
+
+def _connect(resource):
+    _, host, port, _ = resource.split("::")
+    sock = socket.create_connection((host, int(port)), timeout=5)
+    return sock, sock.makefile("rb")
+
+
+def _ask(sock, stream, message):
+    sock.sendall(message.encode() + b"\n")
+    return stream.readline().decode().strip()
+
+
+@pytest.fixture(scope="module")
+def farm():
+    with EmulatorFarm({"SA": 2, "SG": 1, "DMM": 4, "PSU": 1, "SCOPE": 1, "VNA": 1, "COUNTER": 1}) as f:
+        yield f
+
+
+def test_parse_number_units():
+    assert parse_number("2.4 GHz") == pytest.approx(2.4e9)
+    assert parse_number("-10dBm") == -10.0
+    assert parse_number("100 mV") == pytest.approx(0.1)
+    with pytest.raises(ValueError):
+        parse_number("MAX")
+
+
+def test_ieee_block_header():
+    assert ieee_block(b"abc") == b"#13abc"
+    assert ieee_block(b"x" * 1000) == b"#41000" + b"x" * 1000
+
+
+def test_short_and_long_forms():
+    sa = VirtualSpectrumAnalyzer()
+    sa.process(":SENSE:FREQUENCY:CENTER 1 GHz")
+    assert sa.process(":FREQ:CENT?") == b"1000000000\n"
+    sa.process("sens:freq:span 10e6")
+    assert sa.process("FREQuency:SPAN?") == b"10000000\n"
+
+
+def test_compound_message_and_error_queue():
+    sa = VirtualSpectrumAnalyzer()
+    assert sa.process("*IDN?;:BOGUS:CMD 1;*OPC?").endswith(b";1\n")
+    assert sa.process("*ESR?") == b"32\n"
+    assert sa.process("SYST:ERR?") == b'-113,"Undefined header"\n'
+    assert sa.process("SYST:ERR?") == b'+0,"No error"\n'
+
+
+def test_out_of_range_pushes_execution_error():
+    sg = VirtualSignalGenerator()
+    sg.process(":FREQ 100 GHz")
+    assert sg.process(":FREQ?") == b"1000000000\n"
+    assert sg.process(":SYST:ERR:ALL?") == b'-222,"Data out of range"\n'
+
+
+def test_rst_restores_defaults():
+    dmm = VirtualMultimeter()
+    dmm.process("CONF:RES;TRIG:COUN 10")
+    dmm.process("*RST")
+    assert dmm.process("TRIG:COUN?") == b"1\n"
+    assert dmm.function == "VOLT:DC"
+
+
+def test_trace_binary_block_honours_format():
+    sa = VirtualSpectrumAnalyzer()
+    sa.process(":SWE:POIN 11;:FORM:DATA REAL,32;:FORM:BORD SWAP")
+    response = sa.process(":TRAC? TRACE1")
+    assert response.startswith(b"#244")
+    values = np.frombuffer(response[4:-1], dtype="<f4")
+    assert len(values) == 11
+    assert np.all(values < 0)
+
+
+def test_scope_word_waveform_matches_preamble():
+    scope = VirtualOscilloscope()
+    scope.process(":WAV:FORM WORD")
+    pre = scope.process(":WAV:PRE?").decode().strip().split(",")
+    raw = scope.process(":WAV:DATA?")
+    n = int(raw[1:2])
+    codes = np.frombuffer(raw[2 + n:-1], dtype="<u2")
+    volts = (codes.astype(float) - float(pre[9])) * float(pre[7])
+    assert len(codes) == int(pre[2])
+    assert volts.max() == pytest.approx(0.75)
+    assert float(scope.process(":MEAS:FREQ? CHAN1")) == pytest.approx(1000.0, rel=0.01)
+
+
+def test_farm_serves_each_personality(farm):
+    models = []
+    for resource in farm.resources:
+        sock, stream = _connect(resource)
+        with sock:
+            models.append(_ask(sock, stream, "*IDN?").split(",")[1])
+    assert models.count("N9030B") == 2
+    assert models.count("34461A") == 4
+    assert {"N5183B", "Z60-14", "DS1054Z", "N5232A", "53230A"} <= set(models)
+
+
+def test_farm_binary_transfer_over_socket(farm):
+    sock, stream = _connect(farm.resources[0])
+    with sock:
+        sock.sendall(b":SWE:POIN 101;:FORM:DATA REAL,32\n:TRAC? TRACE1\n")
+        assert stream.read(1) == b"#"
+        digits = int(stream.read(1))
+        length = int(stream.read(digits))
+        payload = stream.read(length)
+        assert stream.read(1) == b"\n"
+        assert len(struct.unpack(f">{length // 4}f", payload)) == 101
+
+
+def test_farm_concurrent_clients(farm):
+    dmms = [r for r, inst in farm.resource_map().items() if inst.kind == "DMM"]
+    errors = []
+
+    def worker(resource):
+        try:
+            sock, stream = _connect(resource)
+            with sock:
+                for _ in range(50):
+                    assert float(_ask(sock, stream, "MEAS:VOLT:DC?")) == pytest.approx(4.95, rel=0.01)
+        except Exception as e:  # pragma: no cover - surfaced below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(r,)) for r in dmms for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+
+
+def test_unknown_personality_rejected():
+    with pytest.raises(ValueError):
+        EmulatorFarm(["WIDGET"])
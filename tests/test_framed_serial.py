@@ -0,0 +1,176 @@
+"""Tests for the thread-backed FramedSerial transport."""
+
+import struct
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+from instrumation.exceptions import InstrumentTimeout
+from instrumation.transport import FramedSerial, SerialDriver
+
+
+class FakePort:
+    """pyserial-like port; ``respond`` maps a written frame to the bytes sent back."""
+
+    def __init__(self, respond=None):
+        self.respond = respond
+        self.written = []
+        self._rx = bytearray()
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def feed(self, data):
+        with self._lock:
+            self._rx += data
+
+    @property
+    def in_waiting(self):
+        return len(self._rx)
+
+    def read(self, size=1):
+        with self._lock:
+            out = bytes(self._rx[:size])
+            del self._rx[:size]
+        if not out:
+            time.sleep(0.002)
+        return out
+
+    def write(self, data):
+        self.written.append(data)
+        if self.respond:
+            reply = self.respond(data)
+            if reply:
+                self.feed(reply)
+
+    def close(self):
+        self.closed = True
+
+
+class SlowPort(FakePort):
+    """Device that answers in order, ``latency`` after each command, at 1 ms per byte."""
+
+    def __init__(self, respond, latency=0.005):
+        super().__init__()
+        self.answer = respond
+        self.latency = latency
+        self._busy = threading.Lock()
+
+    def write(self, data):
+        self.written.append(data)
+        reply = self.answer(data)
+        if reply:
+            threading.Thread(target=self._send, args=(time.monotonic() + self.latency, reply), daemon=True).start()
+
+    def _send(self, due, reply):
+        with self._busy:
+            time.sleep(max(due - time.monotonic(), 0))
+            for byte in reply:
+                self.feed(bytes([byte]))
+                time.sleep(0.001)
+
+
+def _fixture(data):
+    return {b"*IDN?\n": b"ACME,FIXTURE,SN1234,build5678-release\n", b"MEAS?\n": b"V=3.30\n"}.get(data)
+
+
+def _open(port, **kwargs):
+    fx = FramedSerial("/dev/ttyFAKE", ser=port, **kwargs)
+    fx.open()
+    return fx
+
+
+def test_frames_reassembled_across_reads():
+    port = FakePort()
+    with _open(port) as fx:
+        port.feed(b"12.5")
+        assert fx.expect(timeout=0) is None
+        port.feed(b"\n3.0\n4.")
+        assert fx.expect() == b"12.5"
+        assert fx.expect() == b"3.0"
+        assert fx.pending() == 0
+    assert port.closed
+
+
+def test_multiple_terminators_drop_split_crlf():
+    port = FakePort()
+    with _open(port, terminator=(b"\r\n", b"\n", b"\r")) as fx:
+        port.feed(b"A\r")
+        assert fx.expect() == b"A"
+        port.feed(b"\nB\nC\r\n")
+        assert fx.expect() == b"B"
+        assert fx.expect() == b"C"
+
+
+def test_length_prefixed_frames():
+    port = FakePort(lambda data: struct.pack(">H", 4) + b"\x00\n\r\x01")
+    with _open(port, length_prefix=">H") as fx:
+        fx.send(b"\x10\x20")
+        assert port.written == [b"\x00\x02\x10\x20"]
+        assert fx.expect() == b"\x00\n\r\x01"
+
+
+def test_query_skips_unsolicited_frames():
+    port = FakePort(lambda data: b"STATUS OK\nV=3.30\n" if data == b"MEAS?\n" else None)
+    with _open(port) as fx:
+        assert fx.query("MEAS?", pattern=rb"V=") == "V=3.30"
+
+
+def test_timeout_reports_unterminated_data():
+    port = FakePort(lambda data: b"3.30\r")   # device ends lines with CR only
+    with _open(port) as fx:
+        start = time.monotonic()
+        with pytest.raises(InstrumentTimeout, match=r"unterminated data b'3.30\\r'"):
+            fx.query("MEAS?", timeout=0.1)
+        assert time.monotonic() - start < 0.5
+
+
+def test_open_probes_until_device_answers():
+    probes = []
+
+    def boot(data):
+        probes.append(data)
+        return b"FIXTURE,1.0\n" if len(probes) >= 4 else None
+
+    port = FakePort(boot)
+    fx = FramedSerial("/dev/ttyFAKE", ser=port)
+    start = time.monotonic()
+    assert fx.open(probe="*IDN?", probe_interval=0.02) == b"FIXTURE,1.0"
+    assert time.monotonic() - start < 1.0
+    assert len(probes) == 4
+    fx.close()
+
+
+def test_slow_reply_is_not_cut_off_by_reprobing():
+    port = SlowPort(_fixture)
+    fx = FramedSerial("/dev/ttyFAKE", ser=port)
+    # The IDN reply takes longer to arrive than the probe interval
+    assert fx.open(probe="*IDN?", probe_interval=0.02) == b"ACME,FIXTURE,SN1234,build5678-release"
+    assert port.written == [b"*IDN?\n"]
+    assert fx.query("MEAS?") == "V=3.30"
+    fx.close()
+
+
+def test_replies_to_extra_probes_are_drained():
+    port = SlowPort(_fixture, latency=0.03)
+    fx = FramedSerial("/dev/ttyFAKE", ser=port)
+    assert fx.open(probe="*IDN?", probe_interval=0.02) == b"ACME,FIXTURE,SN1234,build5678-release"
+    assert len(port.written) == 2
+    assert fx.pending() == 0
+    assert fx.query("MEAS?") == "V=3.30"
+    fx.close()
+
+
+def test_wait_ready_times_out():
+    with _open(FakePort()) as fx:
+        with pytest.raises(InstrumentTimeout, match="did not answer"):
+            fx.wait_ready("*IDN?", timeout=0.1, interval=0.02)
+
+
+def test_serial_driver_settle_is_optional():
+    with patch("instrumation.transport.serial.Serial"), patch("instrumation.transport.time.sleep") as sleep:
+        SerialDriver("/dev/ttyFAKE", settle=0)
+        sleep.assert_not_called()
+        SerialDriver("/dev/ttyFAKE")
+        sleep.assert_called_once_with(2)
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+from instrumation.drivers.keithley import Keithley2400
+from instrumation.drivers.simulated import SimulatedKeithley2400
+from instrumation.exceptions import ConfigurationError, OverloadError
+from instrumation.sweep import sweep_values
+
+from loopback import fake_driver
+
+
+def _buffer(volts, amps):
+    data = np.column_stack([volts, amps, np.arange(len(volts)) * 0.01]).astype("<f4")
+    return b"#0" + data.tobytes() + b"\n"
+
+
+def _smu():
+    smu = fake_driver(Keithley2400, MagicMock())
+    smu.inst.timeout = 2000
+    smu.inst.query.return_value = "1"
+    return smu
+
+
+def _writes(smu):
+    return [c.args[0] for c in smu.inst.write.call_args_list]
+
+
+def test_linear_sweep_runs_from_trigger_model():
+    smu = _smu()
+    smu.inst.read_raw.return_value = _buffer([0.0, 1.0, 2.0], [0.0, 1e-3, 2e-3])
+    result = smu.sweep_voltage(0.0, 2.0, 3, compliance=0.01, nplc=0.1)
+    writes = _writes(smu)
+    assert result.unit == "A"
+    np.testing.assert_allclose(result.value, [0.0, 1e-3, 2e-3], rtol=1e-6)
+    np.testing.assert_allclose(result.metadata["voltage"], [0.0, 1.0, 2.0])
+    assert len(result.metadata["time"]) == 3
+    for command in (":SOUR:VOLT:MODE SWE", ":SOUR:SWE:POIN 3", ":SENS:CURR:PROT 0.01",
+                    ":TRIG:COUN 3", ":TRAC:POIN 3", ":FORM:DATA SRE"):
+        assert command in writes
+    assert writes.count(":INIT") == 1
+    assert writes[-1] == ":TRAC:DATA?"
+    assert smu.inst.timeout == 2000  # restored after the sweep
+
+
+def test_long_list_split_into_source_lists():
+    smu = _smu()
+    values = np.linspace(-1, 1, 150)
+    smu.inst.read_raw.side_effect = [_buffer(values[:100], values[:100] / 1e3),
+                                     _buffer(values[100:], values[100:] / 1e3)]
+    result = smu.sweep_current(values=values, compliance=5.0)
+    assert result.unit == "V"
+    assert result.value.size == 150
+    lists = [w for w in _writes(smu) if w.startswith(":SOUR:LIST:CURR")]
+    assert [len(w.split(",")) for w in lists] == [100, 50]
+    assert _writes(smu).count(":INIT") == 2
+
+
+def test_sweep_rejects_unsafe_or_short_data():
+    smu = _smu()
+    with pytest.raises(OverloadError):
+        smu.sweep_voltage(0, 500, 11)
+    smu.inst.read_raw.return_value = _buffer([0.0], [0.0])
+    with pytest.raises(ConfigurationError):
+        smu.sweep_voltage(0, 1, 5)
+
+
+def test_sweep_values():
+    np.testing.assert_allclose(sweep_values(1e-3, 1.0, 4, "LOG"), [1e-3, 1e-2, 1e-1, 1.0])
+    assert sweep_values(values=[3, 1, 2]).tolist() == [3.0, 1.0, 2.0]
+    with pytest.raises(ValueError):
+        sweep_values(-1, 1, 5, "LOG")
+    with pytest.raises(ValueError):
+        sweep_values(0, 1, 5, "SQUARE")
+    with pytest.raises(ValueError):
+        sweep_values(0, 1)
+
+
+def test_simulated_resistive_iv_curve():
+    with patch('builtins.print'):
+        smu = SimulatedKeithley2400("SIM::K2400")
+        result = smu.sweep_voltage(-5, 5, 500, compliance=1.0)
+    assert result.value.shape == (500,)
+    np.testing.assert_allclose(result.value, result.metadata["voltage"] / 1000.0, rtol=1e-3, atol=1e-8)
+
+
+def test_simulated_compliance_and_diode():
+    with patch('builtins.print'):
+        smu = SimulatedKeithley2400("SIM::K2400")
+        smu.diode_saturation = 1e-12
+        forward = smu.sweep_voltage(0, 1.0, 101, compliance=0.01)
+        assert np.abs(forward.value).max() <= 0.01 * 1.001
+        # The voltage stops rising once the diode hits the current limit
+        assert forward.metadata["voltage"][-1] < 1.0
+        back = smu.sweep_current(values=forward.value[:50], compliance=10.0)
+    np.testing.assert_allclose(back.value, forward.metadata["voltage"][:50], atol=1e-3)
+
+
+def test_simulated_sweep_honours_voltage_guard():
+    smu = SimulatedKeithley2400("SIM::K2400")
+    with pytest.raises(OverloadError):
+        smu.sweep_voltage(0, 500, 11)
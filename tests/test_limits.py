@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from instrumation.analysis import LimitLine, LimitMask
+from instrumation.results import MeasurementResult, TraceAxis
+
+AXIS = TraceAxis(0.0, 100.0, 101)
+
+# -50 outside 40..60, -20 inside (a simple spectral mask with vertical steps)
+MASK = LimitMask("tx", [LimitLine([(0, -50), (40, -50), (40, -20), (60, -20), (60, -50), (100, -50)])])
+
+
+def _trace(values):
+    return MeasurementResult(list(values), "dBm", axis=AXIS)
+
+
+def test_limit_line_interpolates_and_steps():
+    line = LimitLine([(0, 0), (10, 10), (10, 20), (20, 20)])
+    levels = line.sample(np.array([5.0, 10.0, 15.0, 25.0]))
+    assert levels[0] == 5.0
+    assert levels[1] == 10.0  # stricter side of the step
+    assert levels[2] == 20.0
+    assert np.isnan(levels[3])
+
+
+def test_passing_trace():
+    y = np.full(101, -60.0)
+    y[45:55] = -25.0
+    verdict = MASK.evaluate(_trace(y))
+    assert verdict.passed
+    assert verdict.worst_margin == pytest.approx(5.0)
+    assert verdict.failures == []
+
+
+def test_failing_segments_reported():
+    y = np.full(101, -60.0)
+    y[20:23] = -45.0
+    y[70] = -40.0
+    verdict = MASK.evaluate(_trace(y))
+    assert not verdict.passed
+    assert verdict.worst_margin == pytest.approx(-10.0)
+    assert verdict.worst_x == 70.0
+    assert verdict.failures == [(20.0, 22.0, -5.0), (70.0, 70.0, -10.0)]
+
+
+def test_batch_evaluation_vectorised():
+    batch = np.full((3, 101), -60.0)
+    batch[1, 10] = -10.0
+    verdict = MASK.evaluate(batch, axis=AXIS)
+    assert verdict.passed.tolist() == [True, False, True]
+    assert verdict.margins.shape == (3, 101)
+    assert verdict.status == ["PASS", "FAIL", "PASS"]
+    assert verdict.failures[1] == [(10.0, 10.0, -40.0)]
+
+
+def test_compiled_once_per_axis():
+    mask = LimitMask("m", [LimitLine([(0, 0), (100, 0)])])
+    mask.evaluate(_trace(np.zeros(101)))
+    mask.evaluate(_trace(np.zeros(101)))
+    assert len(mask._compiled) == 1
+
+
+def test_compiled_axes_are_bounded():
+    mask = LimitMask("m", [LimitLine([(0, 0), (1000, 0)])])
+    for span in range(2 * LimitMask.MAX_COMPILED):
+        mask.compile(TraceAxis(0.0, 100.0 + span, 11))
+    mask.compile(TraceAxis(0.0, 100.0 + LimitMask.MAX_COMPILED, 11))
+    assert len(mask._compiled) == LimitMask.MAX_COMPILED
+    assert next(iter(mask._compiled)) == TraceAxis(0.0, 100.0 + LimitMask.MAX_COMPILED + 1, 11)
+
+
+def test_lower_limit_and_uncovered_points():
+    mask = LimitMask.from_dict("flatness", {"upper": [[20, 1], [80, 1]], "lower": [[20, -1], [80, -1]]})
+    y = np.zeros(101)
+    y[0] = 50.0     # outside the mask, ignored
+    y[30] = -3.0
+    verdict = mask.evaluate(_trace(y))
+    assert verdict.worst_margin == pytest.approx(-2.0)
+    assert np.isnan(verdict.margins[0])
+
+
+def test_nan_samples_under_the_mask_fail():
+    mask = LimitMask.from_dict("flatness", {"upper": [[20, 1], [80, 1]], "lower": [[20, -1], [80, -1]]})
+    batch = np.zeros((3, 101))
+    batch[0, 0] = np.nan        # outside the mask, ignored
+    batch[1, 50:52] = np.nan
+    batch[2, :] = np.nan
+    verdict = mask.evaluate(batch, axis=AXIS)
+    assert verdict.passed.tolist() == [True, False, False]
+    assert verdict.worst_margin[1] == -np.inf and verdict.worst_x[1] == 50.0
+    assert verdict.failures[1] == [(50.0, 51.0, -np.inf)]
+    assert verdict.failures[2] == [(20.0, 80.0, -np.inf)]
+
+
+def test_relative_mask_offset_per_trace():
+    mask = LimitMask("rel", [LimitLine([(0, -30), (100, -30)])])
+    batch = np.array([np.full(101, -35.0), np.full(101, -35.0)])
+    verdict = mask.evaluate(batch, axis=AXIS, offset=[0.0, -10.0])
+    assert verdict.passed.tolist() == [True, False]
+
+
+def test_check_sets_status_and_logs():
+    y = np.full(101, -60.0)
+    y[5] = -30.0
+    result = _trace(y)
+    verdict = MASK.check(result)
+    assert result.status == "FAIL"
+    assert result.metadata["limit"]["worst_margin"] == pytest.approx(-20.0)
+    logger = MagicMock()
+    verdict.log(logger, "spectral_mask")
+    logger.log.assert_called_once_with("spectral_mask", "-20.00", "FAIL")
+
+
+def test_invalid_masks_rejected():
+    with pytest.raises(ValueError):
+        LimitLine([(0, 0)])
+    with pytest.raises(ValueError):
+        LimitLine([(10, 0), (0, 0)])
+    with pytest.raises(ValueError):
+        LimitLine([(0, 0), (1, 0)], kind="sideways")
+    with pytest.raises(ValueError):
+        MASK.evaluate(np.zeros(101))  # no axis
+    with pytest.raises(ValueError):
+        LimitMask("far", [LimitLine([(1e3, 0), (2e3, 0)])]).evaluate(_trace(np.zeros(101)))
@@ -0,0 +1,137 @@
+import time
+
+import numpy as np
+import pytest
+
+from instrumation.analysis import acpr, band_power, find_peaks, marker, occupied_bandwidth, spur_table
+from instrumation.drivers.simulated import SimulatedSpectrumAnalyzer
+from instrumation.results import MeasurementResult, TraceAxis
+
+AXIS = TraceAxis(0.0, 1000.0, 1001)
+
+
+def _tones(*tones, floor=-100.0):
+    """Noise-free trace with parabolic (in dB) tones at (freq, level, width)."""
+    x = AXIS.values()
+    y = np.full(x.size, floor)
+    for freq, level, width in tones:
+        y = np.maximum(y, level - ((x - freq) / width) ** 2)
+    return MeasurementResult(y.tolist(), "dBm", axis=AXIS)
+
+
+def test_peaks_sorted_and_limited():
+    trace = _tones((100.0, -20.0, 3), (500.0, -10.0, 3), (800.0, -40.0, 3))
+    peaks = find_peaks(trace, n=2)
+    assert [round(p.frequency) for p in peaks] == [500, 100]
+
+
+def test_interpolation_between_points():
+    trace = _tones((250.3, -10.0, 2))
+    peak = find_peaks(trace, n=1)[0]
+    assert peak.index == 250
+    assert peak.frequency == pytest.approx(250.3, abs=1e-6)
+    assert peak.amplitude == pytest.approx(-10.0, abs=1e-6)
+
+
+def test_threshold_and_excursion_rules():
+    trace = _tones((100.0, -20.0, 3), (500.0, -70.0, 3), (510.0, -72.0, 10))
+    assert len(find_peaks(trace, threshold=-50)) == 1
+    small = find_peaks(trace, excursion=6)
+    assert all(p.excursion >= 6 for p in small)
+    assert -72.0 not in [round(p.amplitude) for p in small]
+
+
+def test_prominence_rule():
+    x = np.arange(11, dtype=float)
+    y = np.array([0, 5, 4, 9, 8.5, 8.8, 0, 0, 3, 0, 0], dtype=float)
+    peaks = find_peaks(y, prominence=1.0, interpolate=False, axis=x)
+    assert [p.index for p in peaks] == [3, 1, 8]
+
+
+def test_min_distance_drops_shoulders():
+    y = np.zeros(50)
+    y[[10, 13, 40]] = [5.0, 4.0, 3.0]
+    peaks = find_peaks(y, min_distance=5, interpolate=False)
+    assert [p.index for p in peaks] == [10, 40]
+
+
+def test_prominence_matches_definition():
+    y = np.random.default_rng(3).normal(size=(3, 400))
+    for row, peaks in zip(y, find_peaks(y, interpolate=False)):
+        for p in peaks:
+            i = p.index
+            higher = np.flatnonzero(row[:i] > row[i])
+            left = row[higher[-1] if higher.size else 0:i + 1].min()
+            higher = np.flatnonzero(row[i + 1:] > row[i])
+            right = row[i:i + 1 + higher[0] + 1 if higher.size else row.size].min()
+            assert p.prominence == pytest.approx(row[i] - max(left, right))
+
+
+def test_long_noisy_trace_is_fast():
+    # A -90 dBm noise floor of 100 001 points holds about 33 000 local maxima
+    y = -90.0 + np.random.default_rng(4).normal(size=100001)
+    start = time.perf_counter()
+    peaks = find_peaks(y, n=20, prominence=3.0, min_distance=10)
+    assert time.perf_counter() - start < 1.0
+    assert len(peaks) == 20
+    assert min(abs(a.index - b.index) for a in peaks for b in peaks if a is not b) >= 10
+
+
+def test_batch_returns_list_per_trace():
+    batch = np.stack([
+        np.asarray(_tones((100.0, -20.0, 3)).value),
+        np.asarray(_tones((300.0, -30.0, 3), (600.0, -25.0, 3)).value),
+    ])
+    result = find_peaks(batch, n=5, threshold=-60, axis=AXIS)
+    assert [len(r) for r in result] == [1, 2]
+    assert result[1][0].frequency == pytest.approx(600.0)
+
+
+def test_marker_interpolates():
+    trace = MeasurementResult([0.0, 10.0, 20.0], "dBm", axis=TraceAxis(0.0, 2.0, 3))
+    assert marker(trace, [0.5, 1.5]).tolist() == [5.0, 15.0]
+    assert marker(np.array([[0.0, 10.0], [10.0, 0.0]]), 0.5).shape == (2, 1)
+
+
+def test_band_power_sums_tones():
+    y = np.full(101, -200.0)
+    y[[10, 20]] = -10.0
+    assert band_power(y, 0, 100) == pytest.approx(10 * np.log10(0.2))
+    assert band_power(y, 15, 100) == pytest.approx(-10.0)
+
+
+def test_channel_power_integrates_density():
+    # Flat -50 dBm in a 1 Hz RBW across 1000 Hz -> -20 dBm
+    trace = MeasurementResult([-50.0] * 1001, "dBm", axis=AXIS)
+    assert band_power(trace, 0.0, 1000.0, rbw=1.0) == pytest.approx(-20.0, abs=0.01)
+
+
+def test_acpr_relative_to_main_channel():
+    x = AXIS.values()
+    y = np.where(np.abs(x - 500) <= 50, -30.0, -60.0)
+    result = acpr(MeasurementResult(y.tolist(), "dBm", axis=AXIS), channel_bw=100, spacing=200)
+    assert result["lower"][0] == pytest.approx(-30.0, abs=0.5)
+    assert result["upper"][0] == pytest.approx(-30.0, abs=0.5)
+
+
+def test_occupied_bandwidth_of_flat_block():
+    x = AXIS.values()
+    y = np.where(np.abs(x - 500) <= 100, -20.0, -200.0)
+    low, high, bw = occupied_bandwidth(MeasurementResult(y.tolist(), "dBm", axis=AXIS), 99.0)
+    assert bw == pytest.approx(198.0, abs=2.0)
+    assert (low + high) / 2 == pytest.approx(500.0, abs=1.0)
+    with pytest.raises(ValueError):
+        occupied_bandwidth(y, 100.0)
+
+
+def test_spur_table_and_driver_shortcut(capsys):
+    assert spur_table(_tones((100.0, -20.0, 3)), n=1)[0]["frequency"] == pytest.approx(100.0)
+    sa = SimulatedSpectrumAnalyzer("SIM::SA")
+    peaks = sa.find_peaks(n=3)
+    assert len(peaks) == 3
+    assert sa.get_trace_axis().start <= peaks[0].frequency <= sa.get_trace_axis().stop
+
+
+def test_axis_length_mismatch_rejected():
+    with pytest.raises(ValueError):
+        find_peaks([1.0, 2.0, 1.0], axis=[0.0, 1.0])
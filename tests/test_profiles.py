@@ -0,0 +1,194 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+from instrumation.drivers.keysight import KeysightPXA, KeysightSG
+from instrumation.drivers.rigol import RigolDS1054Z
+from instrumation.drivers.simulated import SimulatedSpectrumAnalyzer
+from instrumation.emulator import VirtualSignalGenerator, VirtualSpectrumAnalyzer
+from instrumation.exceptions import ConfigurationError
+from instrumation.profiles import InstrumentProfile, compile_profile
+from instrumation.station import Station
+
+from loopback import loopback_driver
+
+
+WIFI_CH1 = {"center_freq": 2.412e9, "span": 40e6, "rbw": 100e3, "ref_level": 0.0}
+WIFI_CH6 = {"center_freq": 2.437e9, "span": 40e6, "rbw": 100e3, "ref_level": 0.0}
+
+
+def test_profile_is_one_round_trip():
+    pxa = loopback_driver(KeysightPXA, VirtualSpectrumAnalyzer())
+    sent = pxa.apply_profile(WIFI_CH1)
+    assert len(sent) == 4
+    assert pxa.inst.messages == [
+        ":SENS:FREQ:CENT 2412000000;:SENS:FREQ:SPAN 40000000;:SENS:BAND 100000;"
+        ":DISP:WIND:TRAC:Y:RLEV 0;*OPC?;:SYST:ERR?"
+    ]
+    assert pxa.inst.personality.model._center_freq == 2.412e9
+
+
+def test_switching_profiles_sends_only_diff():
+    pxa = loopback_driver(KeysightPXA, VirtualSpectrumAnalyzer())
+    pxa.apply_profile(WIFI_CH1)
+    sent = pxa.apply_profile(WIFI_CH6)
+    assert sent == [":SENS:FREQ:CENT 2437000000"]
+    assert pxa.apply_profile(WIFI_CH6) == []
+
+
+def test_reset_forgets_applied_profile():
+    pxa = loopback_driver(KeysightPXA, VirtualSpectrumAnalyzer())
+    pxa.apply_profile(WIFI_CH6)
+    pxa.write("*RST")
+    assert len(pxa.apply_profile(WIFI_CH6)) == 4
+
+
+def test_setter_after_apply_is_resent():
+    pxa = loopback_driver(KeysightPXA, VirtualSpectrumAnalyzer())
+    pxa.apply_profile(WIFI_CH6)
+    pxa.set_center_freq(1e9)
+    assert pxa.apply_profile(WIFI_CH6) == [":SENS:FREQ:CENT 2437000000"]
+    assert pxa.inst.personality.model._center_freq == 2.437e9
+    pxa.write(":SENS:BAND 1e6;:DISP:WIND:TRAC:Y:RLEV?")
+    assert pxa.apply_profile(WIFI_CH6) == [":SENS:BAND 100000"]
+
+
+def test_channel_write_forgets_only_that_channel():
+    with patch('pyvisa.ResourceManager'):
+        scope = RigolDS1054Z("USB0::0x1AB1::0x04CE::DS1054Z::INSTR")
+    scope.applied_profile = {"channel_scale": {1: 0.5, 2: 1.0}, "timebase_scale": 1e-3}
+    scope.inst = MagicMock()
+    scope.write(":CHAN2:SCAL 2")
+    assert scope.applied_profile == {"channel_scale": {1: 0.5}, "timebase_scale": 1e-3}
+
+
+def test_setting_inside_compound_query_is_resent():
+    pxa = loopback_driver(KeysightPXA, VirtualSpectrumAnalyzer())
+    pxa.apply_profile({"continuous": "ON", "span": 1e6})
+    pxa.enable_state_cache()
+    pxa.get_sweep_time()
+    pxa.query(":INIT:CONT OFF;:INIT:IMM;*OPC?")
+    queries = len(pxa.inst.queries)
+    pxa.get_sweep_time()
+    assert len(pxa.inst.queries) == queries + 1
+    assert pxa.applied_profile == {"span": 1e6}
+    assert pxa.apply_profile({"continuous": "ON", "span": 1e6}) == [":INIT:CONT ON"]
+
+
+def test_profile_drops_coupled_and_derived_cache_entries():
+    pxa = loopback_driver(KeysightPXA, VirtualSpectrumAnalyzer())
+    pxa.enable_state_cache()
+    pxa.set_center_freq(1e9)
+    pxa.set_span(1e6)
+    pxa.get_sweep_time()
+    pxa.apply_profile({"start_freq": 999.9e6})
+    queries = len(pxa.inst.queries)
+    center, span = pxa.get_center_freq(), pxa.get_span()
+    assert center - span / 2 == pytest.approx(999.9e6)
+    assert center != 1e9 and span != 1e6
+    pxa.get_sweep_time()
+    assert len(pxa.inst.queries) == queries + 3
+
+
+def test_force_resends_everything():
+    pxa = loopback_driver(KeysightPXA, VirtualSpectrumAnalyzer())
+    pxa.apply_profile(WIFI_CH6)
+    assert len(pxa.apply_profile(WIFI_CH6, force=True)) == 4
+
+
+def test_units_follow_driver_order():
+    pxa = loopback_driver(KeysightPXA, VirtualSpectrumAnalyzer())
+    units = compile_profile(pxa, {"rbw": 1e3, "span": 1e6, "continuous": False})
+    assert units == [":SENS:FREQ:SPAN 1000000", ":SENS:BAND 1000", ":INIT:CONT OFF"]
+
+
+def test_unknown_setting_rejected():
+    pxa = loopback_driver(KeysightPXA, VirtualSpectrumAnalyzer())
+    with pytest.raises(ValueError, match="flux_capacitor"):
+        pxa.apply_profile({"flux_capacitor": 1.21e9})
+
+
+def test_safety_guard_blocks_profile():
+    sg = loopback_driver(KeysightSG, VirtualSignalGenerator())
+    with pytest.raises(ConfigurationError):
+        sg.apply_profile({"frequency": 100e9})
+    assert sg.inst.messages == []
+
+
+def test_instrument_error_raised_and_memory_cleared():
+    sg = loopback_driver(KeysightSG, VirtualSignalGenerator())
+    sg.max_frequency = 1e12  # bypass the software guard to reach the instrument
+    with pytest.raises(ConfigurationError, match="-222"):
+        sg.apply_profile({"frequency": 100e9, "amplitude": -10.0})
+    assert sg.applied_profile == {}
+
+
+def test_rigol_uses_separate_writes_with_single_fence():
+    with patch('pyvisa.ResourceManager'):
+        scope = RigolDS1054Z("USB0::0x1AB1::0x04CE::DS1054Z::INSTR")
+    scope.inst = MagicMock()
+    scope.inst.query.side_effect = ["1", '0,"No error"']
+    scope.apply_profile({"channel_scale": {1: 0.5, 2: 1.0}, "channel_probe": {1: 10}})
+    writes = [c.args[0] for c in scope.inst.write.call_args_list]
+    assert writes == [":CHANnel1:PROBe 10", ":CHANnel1:SCALe 0.5", ":CHANnel2:SCALe 1"]
+    assert scope.inst.query.call_count == 2
+
+
+def test_missing_opc_reply_raises_and_clears_memory():
+    with patch('pyvisa.ResourceManager'):
+        scope = RigolDS1054Z("USB0::0x1AB1::0x04CE::DS1054Z::INSTR")
+    scope.inst = MagicMock()
+    scope.inst.query.side_effect = ["", '0,"No error"']
+    scope.applied_profile = {"channel_probe": {1: 1}}
+    with pytest.raises(ConfigurationError, match="did not complete"):
+        scope.apply_profile({"channel_scale": {1: 0.5}})
+    assert scope.applied_profile == {}
+
+
+def test_channel_tables_diff_per_channel():
+    profile = InstrumentProfile.from_dict("p", {"channel_scale": {"1": 0.5, "2": 1.0}})
+    assert profile.diff({"channel_scale": {1: 0.5, 2: 2.0}}) == {"channel_scale": {2: 1.0}}
+
+
+def test_simulated_driver_falls_back_to_setters(capsys):
+    sa = SimulatedSpectrumAnalyzer("SIM::SA")
+    sa.apply_profile({"center_freq": 1e9, "span": 10e6})
+    assert sa.get_center_freq() == 1e9
+    assert sa.apply_profile({"center_freq": 1e9, "span": 10e6}) == []
+
+
+@patch('os.path.exists', return_value=True)
+@patch('toml.load')
+@patch('instrumation.station.get_instrument')
+def test_station_loads_and_applies_profiles(mock_get_inst, mock_toml_load, mock_exists):
+    mock_toml_load.return_value = {
+        "instruments": {"sa": {"driver": "SA", "address": "SIM::SA"}},
+        "profiles": {"ch6": {"sa": {"center_freq": 2.437e9, "span": 40e6}}},
+    }
+    mock_get_inst.return_value = SimulatedSpectrumAnalyzer("SIM::SA")
+    station = Station("station.toml")
+    assert station.apply_profile("ch6") == {"sa": ["center_freq", "span"]}
+    assert station.instr.sa.get_center_freq() == 2.437e9
+    with pytest.raises(KeyError):
+        station.apply_profile("missing")
+
+
+@patch('os.path.exists', return_value=True)
+@patch('toml.load')
+@patch('instrumation.station.get_instrument')
+def test_station_profile_for_unknown_instrument(mock_get_inst, mock_toml_load, mock_exists):
+    mock_toml_load.return_value = {"instruments": {}, "profiles": {"ch6": {"ghost": {"span": 1}}}}
+    with pytest.raises(ValueError):
+        Station("station.toml")
+
+
+@patch('os.path.exists', return_value=True)
+@patch('toml.load')
+@patch('instrumation.station.get_instrument', side_effect=RuntimeError("no route to host"))
+def test_station_profile_for_uninitialized_instrument(mock_get_inst, mock_toml_load, mock_exists):
+    mock_toml_load.return_value = {
+        "instruments": {"sa": {"driver": "SA", "address": "TCPIP::10.0.0.9::INSTR"}},
+        "profiles": {"ch6": {"sa": {"span": 40e6}}},
+    }
+    station = Station("station.toml")
+    with pytest.raises(ConfigurationError, match="'ch6'.*'sa'"):
+        station.apply_profile("ch6")
@@ -0,0 +1,156 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+from instrumation.drivers.keithley import Keithley2000
+from instrumation.drivers.prologix import PrologixBus
+from instrumation.emulator import ieee_block
+
+
+class FakeSerial:
+    """Prologix controller on a serial port: answers ``++read`` from the addressed instrument."""
+
+    def __init__(self, replies=None):
+        self.replies = replies or {}
+        self.writes = []
+        self.addr = None
+        self.timeout = 2000
+        self._rx = b""
+
+    def write(self, command):
+        self.writes.append(command)
+        if command.startswith("++addr"):
+            self.addr = int(command.split()[1])
+        elif command == "++read eoi":
+            reply = self.replies.get(self.addr, b"0\n")
+            self._rx += reply(self.writes) if callable(reply) else reply
+
+    def read_bytes(self, count):
+        out, self._rx = self._rx[:count], self._rx[count:]
+        return out
+
+    def read_raw(self):
+        end = self._rx.find(b"\n") + 1 or len(self._rx)
+        out, self._rx = self._rx[:end], self._rx[end:]
+        return out
+
+    def close(self):
+        pass
+
+
+def _bus(replies=None):
+    serial = FakeSerial(replies)
+    rm = MagicMock()
+    rm.open_resource.return_value = serial
+    bus = PrologixBus("ASRL/dev/ttyUSB0::INSTR", rm=rm)
+    bus.open()
+    return bus, serial
+
+
+def test_open_configures_controller():
+    bus, serial = _bus()
+    assert serial.writes == ["++mode 1", "++auto 0", "++eoi 1", "++read_tmo_ms 500"]
+
+
+def test_addr_sent_only_when_target_changes():
+    bus, serial = _bus()
+    dmm, smu = bus.session(16), bus.session(24)
+    for session, command in [(dmm, ":CONF:VOLT"), (dmm, ":INIT"), (smu, ":OUTP ON"),
+                             (smu, ":READ?"), (dmm, ":FETC?")]:
+        session.write(command)
+    assert [w for w in serial.writes if w.startswith("++addr")] == ["++addr 16", "++addr 24", "++addr 16"]
+    assert bus.address_switches == 3
+
+
+def test_session_query_reads_from_addressed_instrument():
+    bus, serial = _bus({16: b"1.25\n", 24: b"-3.0E-3\n"})
+    assert bus.session(16).query(":READ?").strip() == "1.25"
+    assert bus.session(24).query(":READ?").strip() == "-3.0E-3"
+    assert serial.writes[-3:] == ["++addr 24", ":READ?", "++read eoi"]
+
+
+def test_binary_reply_containing_newlines_is_read_whole():
+    values = np.array([10.0, 1.0, 2.5], dtype="<f4")
+    payload = np.frombuffer(b"\n\n\n\n" + np.float32(1.0).tobytes(), dtype="<f4")
+    bus, _ = _bus({5: ieee_block(payload.tobytes()) + b";" + ieee_block(values.tobytes()) + b"\n"})
+    raw = bus.session(5).query_binary_values(":TRAC:DATA?")
+    assert raw == pytest.approx(payload.tolist(), nan_ok=True)
+    bus.session(5).write(":TRAC:DATA?")
+    reply = bus.session(5).read_raw()
+    assert reply.endswith(ieee_block(values.tobytes()) + b"\n")
+
+
+def test_driver_runs_over_bus_session():
+    idn = b"KEITHLEY INSTRUMENTS INC.,MODEL 2000,1234567,A19\n"
+    bus, serial = _bus({16: lambda writes: idn if writes[-2] == "*IDN?" else b"0\n"})
+    dmm = bus.instrument(Keithley2000, 16)
+    assert dmm.identity["model"] == "MODEL 2000"
+    assert dmm.inst.address == 16
+    assert serial.writes.count("++addr 16") == 1
+
+
+def test_shared_returns_one_bus_per_port():
+    rm = MagicMock()
+    rm.open_resource.return_value = FakeSerial()
+    a = PrologixBus.shared("ASRL9::INSTR", rm=rm)
+    b = PrologixBus.shared("ASRL9::INSTR", rm=rm)
+    try:
+        assert a is b
+        rm.open_resource.assert_called_once_with("ASRL9::INSTR")
+    finally:
+        a.close()
+    assert PrologixBus.shared("ASRL9::INSTR", rm=rm) is not a
+    PrologixBus.shared("ASRL9::INSTR", rm=rm).close()
+
+
+def _queue_behind(bus, jobs):
+    """Starts one thread per (address, command) while the bus is held; returns them."""
+    threads = []
+    for address, command in jobs:
+        t = threading.Thread(target=bus.session(address).write, args=(command,))
+        t.start()
+        threads.append(t)
+        deadline = time.time() + 2
+        while len(bus._waiting) < len(threads) and time.time() < deadline:
+            time.sleep(0.001)
+    return threads
+
+
+def test_queued_operations_grouped_by_address():
+    bus, serial = _bus()
+    with bus.exclusive(5):
+        bus.session(5).write("hold")
+        threads = _queue_behind(bus, [(7, "a1"), (5, "b1"), (7, "a2"), (5, "b2")])
+    for t in threads:
+        t.join()
+    # The selected address drains first, then the others in arrival order
+    assert serial.writes[-5:] == ["b1", "b2", "++addr 7", "a1", "a2"]
+    assert bus.address_switches == 2
+
+
+def test_batch_limit_prevents_starvation():
+    bus, serial = _bus()
+    bus.MAX_BATCH = 2
+    with bus.exclusive(5):
+        bus.session(5).write("hold")
+        threads = _queue_behind(bus, [(7, "a1"), (5, "b1"), (5, "b2")])
+    for t in threads:
+        t.join()
+    # After MAX_BATCH grants to address 5 the older request for 7 goes first
+    assert serial.writes[-5:] == ["b1", "++addr 7", "a1", "++addr 5", "b2"]
+
+
+def test_exclusive_is_reentrant_and_resource_names_parse():
+    bus, serial = _bus()
+    with bus.exclusive(3):
+        bus.session(3).write("one")
+        bus.session(4).write("two")
+    assert bus.open_resource("GPIB0::12::INSTR").address == 12
+    session = bus.open_resource("GPIB::9::2::INSTR")
+    session.write("x")
+    assert "++addr 9 98" in serial.writes
+    with pytest.raises(ValueError):
+        bus.open_resource("TCPIP::1.2.3.4::INSTR")
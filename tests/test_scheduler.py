@@ -0,0 +1,147 @@
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+from instrumation.drivers.simulated import SimulatedMultimeter, SimulatedSpectrumAnalyzer
+from instrumation.scheduler import LatencyModel, TestStep
+from instrumation.station import Station
+
+
+class FakeInstrument:
+    """Records how many calls are in flight on its session at once."""
+
+    def __init__(self, resource):
+        self.resource = resource
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def work(self, seconds=0.05, value=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(seconds)
+        with self._lock:
+            self.active -= 1
+        return value
+
+
+def test_independent_instruments_run_concurrently():
+    a, b = FakeInstrument("A"), FakeInstrument("B")
+    step = TestStep("parallel")
+    step.add("a", a.work, 0.1, instrument=a)
+    step.add("b", b.work, 0.1, instrument=b)
+    report = step.run()
+    assert report.elapsed < 0.18
+
+
+def test_same_session_is_serialized():
+    a = FakeInstrument("A")
+    twin = FakeInstrument("A")  # second driver object on the same resource
+    step = TestStep("serial")
+    step.add("one", a.work, 0.05, instrument=a)
+    step.add("two", twin.work, 0.05, instrument=twin)
+    step.add("three", a.work, 0.05, instrument=a)
+    report = step.run()
+    assert a.max_active == 1
+    assert report.elapsed >= 0.15
+
+
+def test_inputs_are_passed_and_order_respected():
+    a = FakeInstrument("A")
+    step = TestStep("pipeline")
+    step.add("fetch", a.work, 0.0, [1.0, 5.0, 3.0], instrument=a, kind="fetch")
+    step.add("scale", lambda k, trace: [k * v for v in trace], 2.0, kind="analyse", inputs=["fetch"])
+    step.add("peak", max, kind="analyse", inputs=["scale"])
+    report = step.run()
+    assert report.results["peak"] == 10.0
+    assert report.critical_path == ["fetch", "scale", "peak"]
+
+
+def test_critical_path_includes_session_contention():
+    sa, psu = FakeInstrument("SA"), FakeInstrument("PSU")
+    step = TestStep("contention")
+    step.add("psu_on", psu.work, 0.01, instrument=psu, kind="configure")
+    step.add("sa_cfg", sa.work, 0.08, instrument=sa, kind="configure")
+    step.add("sa_fetch", sa.work, 0.01, instrument=sa, kind="fetch", after=["psu_on"])
+    report = step.run()
+    assert report.critical_path == ["sa_cfg", "sa_fetch"]
+    assert "*" in report.summary()
+
+
+def test_invalid_graphs_rejected():
+    step = TestStep("bad")
+    step.add("a", print, after=["b"])
+    step.add("b", print, after=["a"])
+    with pytest.raises(ValueError, match="cycle"):
+        step.ordered()
+    with pytest.raises(ValueError):
+        step.add("a", print)
+    with pytest.raises(ValueError):
+        step.add("c", print, instrument="ghost")
+    dangling = TestStep("dangling")
+    dangling.add("a", print, after=["missing"])
+    with pytest.raises(ValueError, match="missing"):
+        dangling.run()
+
+
+def test_failure_skips_dependents_but_finishes_other_branches():
+    a, b = FakeInstrument("A"), FakeInstrument("B")
+    ran = []
+
+    def boom():
+        raise RuntimeError("trigger failed")
+
+    step = TestStep("failing")
+    step.add("trigger", boom, instrument=a)
+    step.add("fetch", lambda: ran.append("fetch"), instrument=a, after=["trigger"])
+    step.add("other", lambda: (time.sleep(0.02), ran.append("other")), instrument=b)
+    with pytest.raises(RuntimeError, match="trigger failed"):
+        step.run()
+    assert ran == ["other"]
+
+
+def test_latency_model_estimates_next_run():
+    a, b = FakeInstrument("A"), FakeInstrument("B")
+    model = LatencyModel()
+    step = TestStep("estimate", latency_model=model)
+    step.add("a1", a.work, 0.05, instrument=a)
+    step.add("a2", a.work, 0.05, instrument=a)
+    step.add("b1", b.work, 0.02, instrument=b)
+    first = step.run()
+    assert first.estimated is None
+    seconds, path = step.estimate()
+    assert seconds == pytest.approx(0.1, abs=0.04)
+    assert path == ["a1", "a2"]
+    assert step.run().estimated == pytest.approx(seconds)
+
+
+def test_latency_model_ewma_and_persistence(tmp_path):
+    model = LatencyModel(alpha=0.5)
+    model.record("sa:fetch", 1.0)
+    model.record("sa:fetch", 2.0)
+    assert model.latencies["sa:fetch"] == 1.5
+    path = tmp_path / "latency.json"
+    model.save(str(path))
+    assert LatencyModel.load(str(path)).latencies == {"sa:fetch": 1.5}
+    assert LatencyModel.load(str(tmp_path / "none.json")).latencies == {}
+
+
+@patch('os.path.exists', return_value=True)
+@patch('toml.load')
+@patch('instrumation.station.get_instrument')
+def test_station_step_resolves_instrument_names(mock_get_inst, mock_toml_load, mock_exists, capsys):
+    mock_toml_load.return_value = {"instruments": {
+        "sa": {"driver": "SA", "address": "SIM::SA"},
+        "dmm": {"driver": "DMM", "address": "SIM::DMM"},
+    }}
+    mock_get_inst.side_effect = [SimulatedSpectrumAnalyzer("SIM::SA"), SimulatedMultimeter("SIM::DMM")]
+    station = Station("station.toml")
+    step = station.step("bench")
+    step.add("center", station.instr.sa.set_center_freq, 1e9, instrument="sa", kind="configure")
+    step.add("volts", station.instr.dmm.measure_voltage, instrument="dmm", kind="fetch")
+    report = step.run()
+    assert report.results["volts"].unit == "V"
+    assert station.latency_model.latencies
@@ -46,8 +46,22 @@ class TestSiglentSDS(unittest.TestCase):
         self.mock_resource.read_raw.return_value = header + data + footer
         
         res = self.driver.get_waveform(1)
-        self.assertEqual(res.value, [0.0, 1.0, 2.0, 3.0])
+        # Every setting query answers "1": 1 V/div, 1 V offset, 1 Sa/s
+        self.assertEqual(res.value, [-1.0, -0.96, -0.92, -0.88])
         self.assertEqual(res.unit, "V")
+        self.assertEqual(res.axis.step, 1.0)
+        self.assertEqual(res.axis.start, -8.0)
+
+    def test_get_waveform_block_and_units(self):
+        replies = {"C2:VDIV?": "C2:VDIV 5.00E-01V", "C2:OFST?": "C2:OFST -1.00E+00V",
+                   "SARA?": "SARA 1.00GSa/s", "TDIV?": "TDIV 1.00E-06S", "TRDL?": "TRDL -0.00E+00S",
+                   "SYST:ERR?": '+0,"No error"'}
+        self.mock_resource.query.side_effect = lambda cmd: replies.get(cmd, "1")
+        self.mock_resource.read_raw.return_value = b"C2:WF DAT2,#9000000003" + bytes([25, 0, 206]) + b"\n\n"
+        res = self.driver.get_waveform(2)
+        self.assertEqual(res.value, [1.5, 1.0, 0.0])
+        self.assertAlmostEqual(res.axis.step, 1e-9)
+        self.assertAlmostEqual(res.axis.start, -7e-6)
 
     def test_factory_registration(self):
         # Testing get_instrument for real hardware path
@@ -0,0 +1,115 @@
+import socket
+import threading
+import time
+
+import numpy as np
+import pytest
+import pyvisa
+
+from instrumation.drivers.real import RealDriver
+from instrumation.emulator import EmulatorFarm, ieee_block
+from instrumation.exceptions import ConfigurationError, ConnectionLost
+from instrumation.transport import SocketResource, split_ieee_blocks
+
+
+@pytest.fixture(scope="module")
+def farm():
+    with EmulatorFarm({"SA": 1}) as f:
+        yield f
+
+
+def _canned_server(chunks, delay=0.01):
+    """Listens once; after the first command, sends ``chunks`` ``delay`` apart."""
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def run():
+        conn, _ = server.accept()
+        with conn:
+            conn.recv(4096)
+            for chunk in chunks:
+                time.sleep(delay)
+                conn.sendall(chunk)
+            time.sleep(0.2)
+        server.close()
+
+    threading.Thread(target=run, daemon=True).start()
+    return f"TCPIP::127.0.0.1::{server.getsockname()[1]}::SOCKET"
+
+
+def test_query_over_raw_socket(farm):
+    with SocketResource.from_resource(farm.resources[0]) as sa:
+        assert sa.query("*IDN?").split(",")[1] == "N9030B"
+        sa.write(":FREQ:CENT 1.5 GHz")
+        assert float(sa.query(":FREQ:CENT?")) == pytest.approx(1.5e9)
+
+
+def test_binary_values_match_ascii_trace(farm):
+    with SocketResource.from_resource(farm.resources[0], buffer_size=256) as sa:
+        sa.write(":SWE:POIN 401;:FORM:DATA REAL,32")
+        for _ in range(3):
+            trace = sa.query_binary_values(":TRAC? TRACE1", is_big_endian=True, container=np.ndarray)
+        as_list = sa.query_binary_values(":TRAC? TRACE1", is_big_endian=True)
+        sa.write(":FORM:DATA ASC")
+        ascii_trace = sa.query_ascii_values(":TRAC? TRACE1")
+        assert sa.query("*IDN?").startswith("Keysight")  # nothing left unread
+    assert trace.dtype == np.dtype(">f4") and trace.size == 401
+    assert np.allclose(trace, ascii_trace, rtol=1e-6)
+    assert as_list == pytest.approx(trace.tolist())
+
+
+def test_block_payload_split_across_reads_with_newlines():
+    payload = np.arange(64, dtype="<f4")
+    payload[5] = np.frombuffer(b"\n\n\n\n", dtype="<f4")[0]
+    reply = ieee_block(payload.tobytes()) + b"\n"
+    resource = _canned_server([reply[:3], reply[3:40], reply[40:]])
+    with SocketResource.from_resource(resource, buffer_size=16) as res:
+        values = res.query_binary_values("TRAC?", container=np.ndarray)
+    assert values.tobytes() == payload.tobytes()
+
+
+def test_read_raw_frames_compound_blocks():
+    first, second = b"\n;\n" * 10, b"#1\n"
+    reply = ieee_block(first) + b";" + ieee_block(second) + b"\n"
+    resource = _canned_server([reply[:7], reply[7:]] + [b"+1.0E+00\n"])
+    with SocketResource.from_resource(resource, buffer_size=8) as res:
+        res.write("A?;:B?")
+        assert split_ieee_blocks(res.read_raw()) == [first, second]
+        assert res.read() == "+1.0E+00"
+
+
+def test_timeout_and_closed_connection():
+    resource = _canned_server([b"+1\n"], delay=0.3)
+    with SocketResource.from_resource(resource, timeout=100) as res:
+        res.write("MEAS?")
+        with pytest.raises(pyvisa.VisaIOError) as excinfo:
+            res.read_binary_values()
+        assert excinfo.value.error_code == pyvisa.constants.StatusCode.error_timeout
+        res.timeout = 2000
+        assert res.read() == "+1"
+        with pytest.raises(ConnectionLost):
+            res.read()
+
+
+def test_from_resource_rejects_other_resources():
+    with pytest.raises(ValueError):
+        SocketResource.from_resource("TCPIP::10.0.0.5::INSTR")
+    with pytest.raises(ConnectionLost):
+        SocketResource("127.0.0.1", 1, timeout=200)
+
+
+def test_real_driver_selects_raw_socket(farm):
+    drv = RealDriver(farm.resources[0], rm=object())
+    drv.raw_socket = True
+    drv.connect()
+    try:
+        assert isinstance(drv.inst, SocketResource)
+        assert drv.identity["model"] == "N9030B"
+        drv.write(":SWE:POIN 101;:FORM:DATA REAL,64;:FORM:BORD SWAP")
+        assert len(drv.query_binary_values(":TRAC? TRACE1", datatype="d")) == 101
+        blocks = drv.query_binary_blocks(":TRAC? TRACE1;:TRAC? TRACE1", dtype="<f8")
+        assert [b.size for b in blocks] == [101, 101]
+    finally:
+        drv.disconnect()
+
+    with pytest.raises(ConfigurationError):
+        RealDriver("TCPIP::10.0.0.5::INSTR", rm=object()).use_raw_socket()
@@ -0,0 +1,132 @@
+import io
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+from instrumation.drivers.keysight import KeysightPNA
+from instrumation.drivers.simulated import SimulatedNetworkAnalyzer
+from instrumation.emulator import VirtualNetworkAnalyzer, ieee_block
+from instrumation.exceptions import ConfigurationError
+from instrumation.results import MeasurementResult, TraceAxis
+from instrumation.touchstone import TouchstoneData, read_touchstone, write_touchstone
+from instrumation.transport import split_ieee_blocks
+
+from loopback import fake_driver, loopback_driver
+
+
+def _block(values):
+    return ieee_block(np.asarray(values, dtype="<f4").tobytes())
+
+
+def test_split_ieee_blocks():
+    raw = _block([1.0, 2.0]) + b";" + _block([3.0]) + b"\n"
+    blocks = split_ieee_blocks(raw)
+    assert [np.frombuffer(b, "<f4").tolist() for b in blocks] == [[1.0, 2.0], [3.0]]
+    with pytest.raises(ValueError):
+        split_ieee_blocks(b"#3100abc")
+    with pytest.raises(ValueError):
+        split_ieee_blocks(b"1.0,2.0")
+
+
+def test_pna_bulk_fetch_is_one_transfer():
+    vna = VirtualNetworkAnalyzer()
+    for param in ("S21", "S12", "S22"):
+        vna.process(f"CALC:PAR:DEF:EXT 'CH1_{param}_1','{param}'")
+    pna = loopback_driver(KeysightPNA, vna)
+    result = pna.get_sparameters(ports=(1, 2), measurements={
+        "S11": "CH1_S11_1", "S21": "CH1_S21_1", "S12": "CH1_S12_1", "S22": "CH1_S22_1"})
+    assert pna.inst.replies == 1
+    assert result.axis.points == 201
+    assert result.value.shape == (201, 2, 2)
+    assert np.iscomplexobj(result.value)
+    assert result.unit == "S"
+
+
+def test_pna_matrix_layout_and_catalog_lookup():
+    inst = MagicMock()
+    inst.query.return_value = '"m11,S11,m21,S21,m12,S12,m22,S22,extra,S21"'
+    # SDATA blocks in row order S11, S12, S21, S22 (re, im per point)
+    inst.read_raw.return_value = b";".join(
+        _block([k, -k, k + 0.5, 0.0]) for k in (1.0, 2.0, 3.0, 4.0)) + b"\n"
+    pna = fake_driver(KeysightPNA, inst)
+    s = pna.get_sparameters().value
+    assert s.shape == (2, 2, 2)
+    assert s[0, 0, 1] == 2.0 - 2.0j   # S12
+    assert s[0, 1, 0] == 3.0 - 3.0j   # S21
+    assert s[1, 1, 1] == 4.5
+    fetch = inst.write.call_args_list[-1].args[0]
+    assert fetch.count("CALC:DATA? SDATA") == 4
+    assert fetch.index("'m12'") < fetch.index("'m21'")
+    assert inst.write.call_args_list[0].args[0] == "FORM:BORD SWAP;:FORM:DATA REAL,32"
+
+
+def test_pna_missing_measurement_raises():
+    inst = MagicMock()
+    inst.query.return_value = '"CH1_S11_1,S11"'
+    with pytest.raises(ConfigurationError, match="S21"):
+        fake_driver(KeysightPNA, inst).get_sparameters()
+
+
+def test_simulated_vna_generic_fetch():
+    with patch('builtins.print'):
+        vna = SimulatedNetworkAnalyzer("SIM::VNA")
+    s = vna.get_sparameters(ports=(1, 2, 3)).value
+    assert s.shape == (201, 3, 3)
+
+
+def _random_s(points, ports, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(points, ports, ports)) + 1j * rng.normal(size=(points, ports, ports))
+
+
+@pytest.mark.parametrize("ports", [1, 2, 4])
+def test_touchstone_round_trip(tmp_path, ports):
+    freqs = np.linspace(1e9, 2e9, 11)
+    s = _random_s(11, ports)
+    path = tmp_path / f"dut.s{ports}p"
+    write_touchstone(path, s, frequencies=freqs, comments=["DUT 42"])
+    net = read_touchstone(path)
+    assert net.ports == ports
+    assert net.comments == ["DUT 42"]
+    np.testing.assert_allclose(net.frequencies, freqs)
+    np.testing.assert_allclose(net.s, s, rtol=1e-7)
+
+
+def test_touchstone_two_port_order_and_four_port_wrapping():
+    s = np.array([[[11, 12], [21, 22]]], dtype=complex)
+    buf = io.StringIO()
+    write_touchstone(buf, s, frequencies=[1e9])
+    assert buf.getvalue().splitlines()[-1] == "1000000000 11 0 21 0 12 0 22 0"
+
+    buf = io.StringIO()
+    write_touchstone(buf, _random_s(3, 4), frequencies=[1, 2, 3])
+    data_lines = [line for line in buf.getvalue().splitlines() if not line.startswith(("!", "#"))]
+    assert len(data_lines) == 3 * 4
+    assert data_lines[1].startswith("  ")
+
+
+def test_touchstone_db_format_from_result_axis():
+    axis = TraceAxis(1e9, 3e9, 3)
+    result = MeasurementResult(np.full((3, 2, 2), 0.1 + 0j), "S", axis=axis)
+    buf = io.StringIO()
+    write_touchstone(buf, result, data_format="DB", freq_unit="GHz", z0=75)
+    text = buf.getvalue()
+    assert "# GHZ S DB R 75" in text
+    assert text.splitlines()[1].split()[:3] == ["1", "-20", "0"]
+    net = read_touchstone(io.StringIO(text), ports=2)
+    assert net.z0 == 75.0
+    np.testing.assert_allclose(net.frequencies, axis.values())
+    np.testing.assert_allclose(net.s, 0.1)
+
+
+def test_touchstone_input_errors():
+    with pytest.raises(ValueError):
+        write_touchstone(io.StringIO(), np.zeros((3, 2, 2)))  # no frequencies
+    with pytest.raises(ValueError):
+        write_touchstone(io.StringIO(), np.zeros((3, 2, 2)), frequencies=[1, 2, 3], data_format="XY")
+    with pytest.raises(ValueError):
+        read_touchstone(io.StringIO("# HZ S RI\n1 0 0\n"))  # port count unknown
+    with pytest.raises(ValueError):
+        read_touchstone(io.StringIO("# HZ S RI\n1 0 0 0\n"), ports=1)
+    assert isinstance(read_touchstone(io.StringIO("1 1 0\n"), ports=1), TouchstoneData)
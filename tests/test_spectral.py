@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+from instrumation.analysis import SpectrumStream, TraceAccumulator, band_power, find_peaks, get_window, welch
+from instrumation.drivers.rigol import RigolDS1054Z
+from instrumation.drivers.simulated import SimulatedOscilloscope
+from instrumation.emulator import ieee_block
+from instrumation.exceptions import InstrumentError
+from instrumation.results import MeasurementResult, TraceAxis
+
+FS = 1e9
+
+
+def _tone(n=200000, freq=123.4e6, amplitude=0.5, noise=1e-3, seed=0):
+    t = np.arange(n) / FS
+    rng = np.random.default_rng(seed)
+    return (amplitude * np.sin(2 * np.pi * freq * t) + rng.normal(0.0, noise, n)).astype(np.float32)
+
+
+def test_tone_reads_its_power_in_dbm():
+    spectrum = welch(_tone(), sample_rate=FS, nperseg=4096, window="flattop")
+    assert spectrum.unit == "dBm" and spectrum.value.dtype == np.float32
+    assert spectrum.axis == TraceAxis(0.0, FS / 2, 2049)
+    peak = find_peaks(spectrum, n=1, interpolate=False)[0]
+    assert peak.frequency == pytest.approx(123.4e6, abs=FS / 4096)
+    # 0.5 V peak into 50 ohm = 2.5 mW; the flat-top bin reads it without scalloping loss
+    assert peak.amplitude == pytest.approx(10 * np.log10(2.5), abs=0.05)
+
+
+def test_noise_density_and_band_power():
+    noise = np.random.default_rng(1).normal(0.0, 1e-2, 400000)
+    density = welch(noise, sample_rate=FS, scaling="density", unit="V^2")
+    assert density.unit == "V^2/Hz"
+    assert np.mean(density.value[1:-1]) == pytest.approx(1e-4 / (FS / 2), rel=0.02)
+    # Integrating the per-bin spectrum over its noise bandwidth recovers the total power
+    spectrum = welch(noise, sample_rate=FS)
+    total = band_power(spectrum, 0.0, FS / 2, rbw=spectrum.metadata["rbw"])
+    assert total == pytest.approx(10 * np.log10(1e-4 / 50 / 1e-3), abs=0.1)
+
+
+def test_stream_in_chunks_equals_contiguous_record():
+    record = _tone()
+    whole = welch(record, sample_rate=FS, nperseg=2048, overlap=0.75)
+    stream = SpectrumStream(FS, nperseg=2048, overlap=0.75)
+    fed = [stream.feed(chunk) for chunk in np.array_split(record, 13)]
+    assert sum(fed) == stream.segments == whole.metadata["segments"] == (record.size - 2048) // 512 + 1
+    np.testing.assert_array_equal(stream.result().value, whole.value)
+
+
+def test_channel_batch_with_workers():
+    batch = np.stack([_tone(freq=f, seed=i) for i, f in enumerate((50e6, 100e6, 150e6))])
+    single = welch(batch, sample_rate=FS, nperseg=1024)
+    threaded = welch(batch, sample_rate=FS, nperseg=1024, workers=3)
+    assert single.value.shape == (3, 513)
+    np.testing.assert_array_equal(single.value, threaded.value)
+    peaks = [find_peaks(row, n=1, axis=single.axis)[0].frequency for row in single.value]
+    assert peaks == pytest.approx([50e6, 100e6, 150e6], abs=FS / 1024)
+
+
+def test_waveform_results_supply_sample_rate():
+    tone = _tone(n=8192)
+    axis = TraceAxis(-4e-6, -4e-6 + 8191 / FS, 8192, unit="s")
+    rigol_style = MeasurementResult((axis.values(), tone), "V", channel=2, axis=axis)
+    spectrum = welch(rigol_style, nperseg=1024)
+    assert spectrum.metadata["sample_rate"] == pytest.approx(FS)
+    assert spectrum.channel == 2
+
+    scope = SimulatedOscilloscope("SIM::SCOPE")
+    trace = scope.get_spectrum(1, nperseg=256, window="hann")
+    assert find_peaks(trace, n=1)[0].frequency == pytest.approx(1000.0, rel=0.05)
+    acc = TraceAccumulator()
+    acc.update(trace)
+    assert acc.mean.shape == (129,)
+
+
+def test_rigol_chunks_stream_into_welch():
+    with patch('pyvisa.ResourceManager'):
+        scope = RigolDS1054Z("USB0::0x1AB1::0x04CE::DS1054Z::INSTR")
+    scope.inst = MagicMock()
+    scope.connected = True
+    scope.inst.query.return_value = f"0,2,20000,1,{1 / FS},0.0,0,0.01,0.0,128"
+    codes = np.clip(np.round(_tone(n=20000, amplitude=1.0) / 0.01) + 128, 0, 255).astype(np.uint8)
+    reads = iter(ieee_block(codes[i:i + 8000].tobytes()) + b"\n" for i in range(0, 20000, 8000))
+    scope.inst.read_raw.side_effect = lambda: next(reads)
+
+    chunks = list(scope.iter_waveform_chunks(1, chunk=8000))
+    assert [c.metadata["offset"] for c in chunks] == [0, 8000, 16000]
+    assert chunks[1].axis.start == pytest.approx(8000 / FS)
+    scope.inst.write.assert_any_call(":WAVeform:MODE RAW")
+    scope.inst.write.assert_any_call(":WAVeform:STARt 16001")
+    scope.inst.write.assert_any_call(":WAVeform:STOP 20000")
+
+    spectrum = welch(iter(chunks), nperseg=2048)
+    assert find_peaks(spectrum, n=1)[0].frequency == pytest.approx(123.4e6, abs=FS / 2048)
+    with pytest.raises(ValueError):
+        next(scope.iter_waveform_chunks(1, chunk=300000))
+
+
+def test_rigol_chunks_read_newline_codes_and_name_missing_window():
+    with patch('pyvisa.ResourceManager'):
+        scope = RigolDS1054Z("TCPIP::192.168.1.50::5555::SOCKET")
+    scope.inst = MagicMock()
+    scope.connected = True
+    scope.inst.query.return_value = f"0,2,3000,1,{1 / FS},0.0,0,0.01,0.0,128"
+    # Code 10 is 0x0A: a newline-terminated read_raw() stops on every sample
+    stream = bytearray(ieee_block(bytes([10]) * 2000) + b"\n" + b"\n")
+
+    def read_raw():
+        cut = stream.find(b"\n") + 1
+        data = bytes(stream[:cut])
+        del stream[:cut]
+        return data
+
+    def read_bytes(count):
+        data = bytes(stream[:count])
+        del stream[:count]
+        return data
+
+    scope.inst.read_raw.side_effect = read_raw
+    scope.inst.read_bytes.side_effect = read_bytes
+    chunks = scope.iter_waveform_chunks(1, chunk=2000)
+    assert next(chunks).value.tolist() == pytest.approx([(10 - 128) * 0.01] * 2000)
+    with pytest.raises(InstrumentError, match="window 2001-3000"):
+        next(chunks)
+
+
+def test_windows_and_validation():
+    hann = get_window("hann", 8)
+    assert hann.dtype == np.float32 and hann[0] == 0.0 and hann[4] == pytest.approx(1.0)
+    with pytest.raises(ValueError):
+        get_window("kaiser", 8)
+    with pytest.raises(ValueError):
+        SpectrumStream(FS, overlap=1.0)
+    with pytest.raises(ValueError):
+        SpectrumStream(FS, unit="W")
+    stream = SpectrumStream(FS, nperseg=1024)
+    stream.feed(np.zeros(100))
+    with pytest.raises(ValueError):
+        stream.result()
+    with pytest.raises(ValueError):
+        welch(np.zeros(4096))   # no sample rate
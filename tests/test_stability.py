@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from instrumation.analysis import (allan_deviation, drift_fit, fractional_frequency, histogram,
+                                   modified_allan_deviation)
+from instrumation.drivers.keysight import Keysight53230A
+from instrumation.drivers.simulated import SimulatedFrequencyCounter
+from instrumation.emulator import ieee_block
+from instrumation.results import MeasurementResult
+
+from loopback import fake_driver
+
+
+def _counter(inst):
+    return fake_driver(Keysight53230A, inst)
+
+
+def test_53230a_streams_gap_free_readings():
+    inst = MagicMock()
+    readings = 10e6 + np.arange(6, dtype="<f8")
+    inst.read_raw.side_effect = [ieee_block(readings[:3].tobytes()) + b"\n",
+                                 ieee_block(readings[3:].tobytes()) + b"\n"]
+    counter = _counter(inst)
+    chunks = list(counter.stream_frequency(gate_time=1e-3, count=6, chunk=3, channel=2))
+
+    written = [c.args[0] for c in inst.write.call_args_list]
+    assert ":CONF:FREQ (@2)" in written
+    assert ":SENS:FREQ:MODE CONT" in written
+    assert ":SENS:FREQ:GATE:TIME 0.001" in written
+    assert ":R? 3" in written
+    assert written[-2:] == [":ABOR", ":FORM ASC"]
+
+    values = np.concatenate([c.value for c in chunks])
+    np.testing.assert_array_equal(values, readings)
+    assert chunks[1].unit == "Hz"
+    assert chunks[1].metadata["interval"] == 1e-3
+    stamps = np.concatenate([c.metadata["timestamps"] for c in chunks])
+    np.testing.assert_allclose(np.diff(stamps), 1e-3, atol=1e-6)
+
+
+def test_allan_deviation_of_white_fm():
+    rng = np.random.default_rng(1)
+    y = rng.normal(0.0, 1e-9, 100000)
+    taus, adev = allan_deviation(10e6 * (1 + y), tau0=1.0, nominal=10e6)
+    assert taus[0] == 1.0
+    assert adev[0] == pytest.approx(1e-9, rel=0.02)
+    # White FM falls as tau^-1/2
+    slope = np.polyfit(np.log10(taus[:8]), np.log10(adev[:8]), 1)[0]
+    assert slope == pytest.approx(-0.5, abs=0.05)
+
+
+def test_allan_deviation_matches_direct_formula():
+    rng = np.random.default_rng(2)
+    y = rng.normal(0.0, 1.0, 200)
+    taus, adev = allan_deviation(1.0 + y, tau0=0.5, taus=[1.0], nominal=1.0)
+    # Overlapping ADEV at m = 2 from averaged fractional frequencies
+    avg = np.convolve(y, np.ones(2) / 2, mode="valid")
+    expected = np.sqrt(0.5 * np.mean((avg[2:] - avg[:-2]) ** 2))
+    assert taus.tolist() == [1.0]
+    assert adev[0] == pytest.approx(expected)
+
+
+def test_modified_allan_deviation_of_white_pm_falls_faster():
+    rng = np.random.default_rng(3)
+    x = rng.normal(0.0, 1e-9, 50001)       # white phase noise, seconds
+    y = np.diff(x)                          # tau0 = 1 s
+    taus, adev = allan_deviation(1.0 + y, tau0=1.0, nominal=1.0)
+    mtaus, mdev = modified_allan_deviation(1.0 + y, tau0=1.0, nominal=1.0)
+    assert mtaus[-1] <= 50000 // 3
+    adev_slope = np.polyfit(np.log10(taus[2:10]), np.log10(adev[2:10]), 1)[0]
+    mdev_slope = np.polyfit(np.log10(mtaus[2:10]), np.log10(mdev[2:10]), 1)[0]
+    assert adev_slope == pytest.approx(-1.0, abs=0.1)
+    assert mdev_slope == pytest.approx(-1.5, abs=0.1)
+
+
+def test_simulated_counter_stream_and_drift_fit():
+    counter = SimulatedFrequencyCounter("SIM::COUNTER")
+    counter.connect()
+    counter.white_fm, counter.random_walk_fm, counter.drift_rate = 1e-11, 0.0, 1e-9
+    chunks = list(counter.stream_frequency(gate_time=1e-2, count=20000, chunk=5000))
+    assert [c.metadata["first"] for c in chunks] == [0, 5000, 10000, 15000]
+    result = MeasurementResult(np.concatenate([c.value for c in chunks]), "Hz",
+                               metadata={"interval": 1e-2})
+
+    taus, adev = allan_deviation(result)
+    assert adev[0] == pytest.approx(1e-11 / np.sqrt(1e-2), rel=0.1)
+    fit = drift_fit(result)
+    assert fit["fractional_rate"] == pytest.approx(1e-9, rel=0.05)
+    assert fit["slope"] == pytest.approx(1e-9 * 10e6, rel=0.05)
+
+
+def test_histogram_and_fractional_frequency():
+    freqs = 10e6 + np.array([-1.0, 0.0, 0.0, 1.0])
+    np.testing.assert_allclose(fractional_frequency(freqs), [-1e-7, 0, 0, 1e-7])
+    hist = histogram(freqs, bins=3)
+    assert hist["counts"].tolist() == [1, 2, 1]
+    assert hist["mean"] == pytest.approx(10e6)
+    assert histogram(freqs, bins=3, fractional=True)["max"] == pytest.approx(1e-7)
+
+
+def test_stability_argument_errors():
+    with pytest.raises(ValueError, match="tau0"):
+        allan_deviation(np.ones(100))
+    with pytest.raises(ValueError, match="spacing"):
+        allan_deviation(np.ones(100), tau0=1.0, taus="weekly")
+    with pytest.raises(ValueError, match="order"):
+        drift_fit(np.ones(100), tau0=1.0, order=0)
+    taus, _ = allan_deviation(np.ones(100), tau0=1.0, taus="decade")
+    assert taus.tolist() == [1.0, 2.0, 5.0, 10.0, 20.0, 50.0]
@@ -0,0 +1,144 @@
+import pytest
+from unittest.mock import MagicMock
+
+from instrumation.drivers.cache import StateCache
+from instrumation.drivers.keysight import KeysightMXA, KeysightSG
+from instrumation.drivers.rigol import RigolDS1054Z
+
+from loopback import fake_driver
+
+
+def _mock(driver_cls):
+    driver = fake_driver(driver_cls, MagicMock())
+    driver.inst.query.return_value = "1"
+    return driver
+
+
+@pytest.fixture
+def mxa():
+    driver = _mock(KeysightMXA)
+    driver.enable_state_cache()
+    return driver
+
+
+@pytest.fixture
+def scope():
+    driver = _mock(RigolDS1054Z)
+    driver.enable_state_cache()
+    return driver
+
+
+def test_cache_disabled_by_default():
+    driver = _mock(KeysightMXA)
+    assert driver.state_cache is None
+    driver.set_center_freq(1e9)
+    driver.set_center_freq(1e9)
+    assert driver.inst.write.call_count == 2
+
+
+def test_getter_answered_from_setter(mxa):
+    mxa.set_center_freq(2.4e9)
+    assert mxa.get_center_freq() == 2.4e9
+    mxa.inst.query.assert_not_called()
+    assert mxa.state_cache.hits == 1
+
+
+def test_redundant_write_skipped(mxa):
+    mxa.set_ref_level(-10)
+    mxa.set_ref_level(-10)
+    mxa.set_ref_level(-20)
+    assert mxa.inst.write.call_count == 2
+    assert mxa.state_cache.skipped_writes == 1
+
+
+def test_coerced_setting_read_back_not_assumed(scope):
+    scope.set_channel_scale(1, 0.3)
+    scope.inst.query.return_value = "0.5"
+    assert scope.get_channel_scale(1) == 0.5
+    assert scope.get_channel_scale(1) == 0.5
+    assert scope.inst.query.call_count == 1
+    scope.set_channel_scale(1, 0.5)
+    assert scope.state_cache.skipped_writes == 1
+
+
+def test_getter_miss_reads_once(mxa):
+    mxa.inst.query.return_value = "1000000"
+    assert mxa.get_span() == 1e6
+    assert mxa.get_span() == 1e6
+    assert mxa.inst.query.call_count == 1
+
+
+def test_preset_invalidates(mxa):
+    mxa.set_center_freq(1e9)
+    mxa.preset()
+    mxa.inst.query.return_value = "5000000000"
+    assert mxa.get_center_freq() == 5e9
+    mxa.set_center_freq(1e9)
+    mxa.inst.write.assert_called_with(":SENS:FREQ:CENT 1000000000.0")
+
+
+def test_load_state_and_local_invalidate(scope):
+    scope.set_channel_coupling(1, "DC")
+    scope.write("*RCL 1")
+    assert len(scope.state_cache) == 0
+    scope.set_timebase_offset(1e-3)
+    scope.write(":SYST:LOC")
+    assert len(scope.state_cache) == 0
+
+
+def test_channel_qualifies_key(scope):
+    scope.set_channel_coupling(1, "ac")
+    scope.set_channel_coupling(2, "AC")
+    assert scope.get_channel_coupling(1) == "AC"
+    scope.set_channel_coupling(1, "AC")
+    assert scope.state_cache.skipped_writes == 1
+
+
+def test_derived_value_dropped_on_any_write(scope):
+    scope.inst.query.return_value = "1000000000"
+    assert scope.get_sample_rate() == 1e9
+    assert scope.get_sample_rate() == 1e9
+    assert scope.inst.query.call_count == 1
+    scope.set_timebase_scale(1e-6)
+    scope.get_sample_rate()
+    assert scope.inst.query.call_count == 2
+
+
+def test_probe_change_invalidates_scale(scope):
+    scope.set_channel_scale(1, 1.0)
+    scope.set_channel_probe(1, 10.0)
+    scope.inst.query.return_value = "10"
+    assert scope.get_channel_scale(1) == 10.0
+
+
+def test_failed_write_not_cached(mxa):
+    mxa.inst.write.side_effect = [RuntimeError("bus error"), None]
+    with pytest.raises(RuntimeError):
+        mxa.set_ref_level(-10)
+    mxa.set_ref_level(-10)
+    assert mxa.inst.write.call_count == 2
+
+
+def test_sg_shutdown_bypasses_cache():
+    sg = _mock(KeysightSG)
+    sg.enable_state_cache()
+    sg.set_amplitude(-130.0)
+    sg.inst.write.reset_mock()
+    sg.shutdown_safety()
+    assert any(":POW" in c.args[0] for c in sg.inst.write.call_args_list)
+
+
+def test_max_age_expires_entries():
+    cache = StateCache(max_age=0.0)
+    cache.store(("span",), 1.0)
+    assert cache.get(("span",)) is None
+
+
+def test_compound_message_invalidates():
+    cache = StateCache()
+    cache.store(("span",), 1.0)
+    cache.observe_write(":INIT:CONT OFF;*RST")
+    assert len(cache) == 0
+    cache.store(("span",), 1.0)
+    cache.observe_write(":SENS:BAND:AUTO ON")
+    assert len(cache) == 1
@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock
+
+from instrumation.drivers.keysight import KeysightMXA, KeysightSG
+from instrumation.drivers.simulated import SimulatedSignalGenerator, SimulatedSpectrumAnalyzer
+from instrumation.exceptions import ConfigurationError
+from instrumation.sweep import frequency_response, is_uniform, linear_frequencies
+
+from loopback import fake_driver
+
+
+def _mock(driver_cls):
+    driver = fake_driver(driver_cls, MagicMock())
+    driver.inst.query.return_value = "1"
+    return driver
+
+
+class TrackingSource:
+    """Generator stand-in that records its current frequency."""
+
+    def __init__(self):
+        self.frequency = None
+        self.threads = set()
+
+    def set_frequency(self, hz):
+        time.sleep(0.002)
+        self.threads.add(threading.current_thread().name)
+        self.frequency = hz
+
+    def set_amplitude(self, dbm):
+        pass
+
+
+class TrackingAnalyzer:
+    """Analyzer stand-in whose reading is the source frequency at capture time."""
+
+    def __init__(self, source):
+        self.source = source
+        self.captured = None
+
+    def set_center_freq(self, hz):
+        pass
+
+    def trigger_sweep(self):
+        self.captured = self.source.frequency
+
+    def read_peak(self):
+        time.sleep(0.002)
+        return self.captured
+
+
+def test_linear_frequencies_and_uniformity():
+    freqs = linear_frequencies(1e9, 2e9, 11)
+    assert freqs[0] == 1e9 and freqs[-1] == 2e9
+    assert is_uniform(freqs)
+    assert not is_uniform([1e9, 1.1e9, 1.5e9])
+    with pytest.raises(ValueError):
+        linear_frequencies(1e9, 2e9, 1)
+
+
+def test_software_overlap_keeps_points_aligned():
+    sg = TrackingSource()
+    sa = TrackingAnalyzer(sg)
+    freqs = linear_frequencies(1e9, 1.1e9, 20)
+    result = frequency_response(sg, sa, freqs)
+    assert result.value == freqs
+    assert result.metadata["mode"] == "software"
+    assert any(name.startswith("sweep-sg") for name in sg.threads)
+
+
+def test_software_sweep_restores_analyzer_state():
+    sg = TrackingSource()
+    sa = _mock(KeysightMXA)
+    sa.inst.query.side_effect = lambda cmd: {":SENS:FREQ:CENT?": "2400000000", ":INIT:CONT?": "1"}.get(cmd, "-30")
+    frequency_response(sg, sa, [1e9, 1.5e9, 2e9], mode="software")
+    sa_writes = [c.args[0] for c in sa.inst.write.call_args_list]
+    assert sa_writes[-2:] == [":SENS:FREQ:CENT 2400000000.0", ":INIT:CONT ON"]
+
+
+def test_simulated_pair_uses_software_path(capsys):
+    sg = SimulatedSignalGenerator("SIM::SG")
+    sa = SimulatedSpectrumAnalyzer("SIM::SA")
+    result = frequency_response(sg, sa, [1e9, 1.5e9, 2e9], power_dbm=-10, trigger_link=True)
+    assert len(result) == 3
+    assert result.unit == "dBm"
+    assert result.metadata["mode"] == "software"
+
+
+def test_hardware_sweep_is_one_trace_transfer():
+    sg = _mock(KeysightSG)
+    sa = _mock(KeysightMXA)
+    freqs = linear_frequencies(1e9, 2e9, 101)
+    sa.inst.query_binary_values.return_value = [-20.0] * 101
+    result = frequency_response(sg, sa, freqs, power_dbm=-10, dwell=1e-3, trigger_link=True)
+
+    assert result.metadata["mode"] == "hardware"
+    assert result.value == [-20.0] * 101
+    sa.inst.query_binary_values.assert_called_once()
+    sg_writes = [c.args[0] for c in sg.inst.write.call_args_list]
+    assert ":FREQ:MODE LIST" in sg_writes
+    assert sg_writes[-3:] == [":INIT", ":FREQ:MODE CW", ":POW:MODE FIX"]
+    sa_writes = [c.args[0] for c in sa.inst.write.call_args_list]
+    assert ":TRIG:SOUR EXT1" in sa_writes
+    assert ":SENS:SWE:POIN 101" in sa_writes
+
+
+def test_hardware_mode_requires_trigger_link():
+    sg = _mock(KeysightSG)
+    sa = _mock(KeysightMXA)
+    with pytest.raises(ConfigurationError):
+        frequency_response(sg, sa, linear_frequencies(1e9, 2e9, 11), mode="hardware")
+
+
+def test_non_uniform_list_falls_back_to_software():
+    sg = TrackingSource()
+    sa = TrackingAnalyzer(sg)
+    sg.arm_list_sweep = sg.trigger_list_sweep = sg.stop_list_sweep = MagicMock()
+    sa.arm_external_sweep = sa.read_external_sweep = MagicMock()
+    result = frequency_response(sg, sa, [1e9, 1.2e9, 1.3e9], trigger_link=True)
+    assert result.metadata["mode"] == "software"
+    sg.arm_list_sweep.assert_not_called()
+
+
+def test_list_sweep_guard_runs_before_any_write():
+    sg = _mock(KeysightSG)
+    with pytest.raises(ConfigurationError):
+        sg.arm_list_sweep([1e9, 100e9], [-10.0, -10.0])
+    sg.inst.write.assert_not_called()
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        frequency_response(TrackingSource(), None, [1e9], mode="turbo")
@@ -0,0 +1,143 @@
+import time
+
+import pytest
+from unittest.mock import MagicMock
+
+from instrumation.drivers.tdk import TDKChain, TDKChainSupply, wait_selected
+from instrumation.emulator import VirtualPowerSupply
+
+
+class ChainPort:
+    """Serial port with several Z+ emulators on it; INST:NSEL picks the listener."""
+
+    def __init__(self, addresses):
+        self.units = {a: VirtualPowerSupply(serial=f"Z{a:02d}") for a in addresses}
+        self.selected = None
+        self.writes = []
+        self.queries = []
+        self.timeout = 5000
+
+    def write(self, command):
+        self.writes.append(command)
+        if command.upper().startswith("INST:NSEL "):
+            self.selected = int(command.split()[1])
+        else:
+            self.units[self.selected].process(command)
+
+    def query(self, command):
+        self.queries.append((self.selected, command))
+        return self.units[self.selected].process(command).decode().strip()
+
+    def close(self):
+        pass
+
+
+def _chain(addresses=(1, 2, 3), **kwargs):
+    port = ChainPort(addresses)
+    rm = MagicMock()
+    rm.open_resource.return_value = port
+    chain = TDKChain("ASRL/dev/ttyUSB0::INSTR", addresses, rm=rm, **kwargs)
+    chain.open()
+    return chain, port
+
+
+def test_open_connects_one_supply_per_address():
+    chain, port = _chain()
+    assert sorted(chain.units) == [1, 2, 3]
+    assert all(isinstance(u, TDKChainSupply) for u in chain)
+    assert chain[2].identity["manufacturer"] == "TDK-LAMBDA"
+    assert chain[2].max_voltage == 60.0
+    # Each unit selected once during discovery
+    assert port.writes.count("INST:NSEL 2") == 1
+
+
+def test_nsel_only_sent_when_address_changes():
+    chain, port = _chain()
+    port.writes.clear()
+    chain[1].set_voltage(5.0)
+    chain[1].set_current(1.0)
+    chain[3].set_voltage(12.0)
+    chain[3].set_output(True)
+    chain[1].set_output(True)
+    assert [w for w in port.writes if w.startswith("INST:NSEL")] == ["INST:NSEL 1", "INST:NSEL 3", "INST:NSEL 1"]
+    assert port.units[3].model._voltage == 12.0
+    assert port.units[1].model._voltage == 5.0
+
+
+def test_poll_batches_readbacks_into_one_query():
+    chain, port = _chain()
+    chain[2].set_voltage(7.5)
+    chain[2].set_output(True)
+    port.queries.clear()
+    rb = chain.poll(2)
+    assert port.queries == [(2, TDKChain.READBACK_QUERY)]
+    assert rb.voltage == pytest.approx(7.5, rel=0.05)
+    assert rb.mode in ("CV", "CC")
+
+
+def test_poll_all_starts_at_selected_unit():
+    chain, port = _chain()
+    chain[2].set_voltage(1.0)
+    port.queries.clear()
+    port.writes.clear()
+    readings = chain.poll_all()
+    assert sorted(readings) == [1, 2, 3]
+    assert [a for a, _ in port.queries] == [2, 3, 1]
+    assert port.writes == ["INST:NSEL 3", "INST:NSEL 1"]
+
+
+def test_measurements_served_from_fresh_poll():
+    chain, port = _chain(max_age=10.0)
+    chain.poll_all()
+    port.queries.clear()
+    result = chain[3].measure_voltage()
+    assert result.unit == "V"
+    assert result.metadata["age_s"] < 10.0
+    assert port.queries == []
+
+
+def test_stale_or_invalidated_readback_polls_again():
+    chain, port = _chain(max_age=0.05)
+    chain.poll_all()
+    time.sleep(0.06)
+    port.queries.clear()
+    chain[1].measure_current()
+    assert port.queries == [(1, TDKChain.READBACK_QUERY)]
+    # A setting write drops the cached readback of that unit only
+    chain.poll_all()
+    chain[1].set_voltage(3.0)
+    port.queries.clear()
+    chain[1].measure_voltage()
+    assert port.queries == [(1, TDKChain.READBACK_QUERY)]
+
+
+def test_background_polling_cadence():
+    chain, port = _chain(poll_interval=0.02)
+    port.queries.clear()
+    chain.start()
+    time.sleep(0.15)
+    chain.stop()
+    cycles = sum(1 for _, q in port.queries if q == TDKChain.READBACK_QUERY) / 3
+    assert 3 <= cycles <= 10
+    assert all(rb.age < 1.0 for rb in chain.readings().values())
+
+
+def test_failed_unit_does_not_stop_the_cycle():
+    chain, port = _chain()
+    original = port.query
+    port.query = lambda cmd: (_ for _ in ()).throw(OSError("timeout")) if port.selected == 2 else original(cmd)
+    readings = chain.poll_all()
+    assert sorted(readings) == [1, 3]
+
+
+def test_chain_argument_errors_and_wait_selected():
+    with pytest.raises(ValueError):
+        TDKChain("ASRL1::INSTR", [])
+    with pytest.raises(ValueError):
+        TDKChain("ASRL1::INSTR", [1, 1])
+    inst = MagicMock()
+    inst.timeout = 5000
+    inst.query.side_effect = [OSError("no reply"), "6"]
+    wait_selected(inst)
+    assert inst.query.call_count == 2
+    assert inst.timeout == 5000
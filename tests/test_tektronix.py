@@ -17,6 +17,12 @@ class TestTektronixTDS(unittest.TestCase):
                 return "0"
             if "WFMPRE:YZERO?" in cmd:
                 return "0"
+            if "WFMPRE:XINCR?" in cmd:
+                return "1e-6"
+            if "WFMPRE:XZERO?" in cmd:
+                return "-2e-6"
+            if "WFMPRE:PT_OFF?" in cmd:
+                return "0"
             return ""
 
         self.mock_inst.query.side_effect = mock_query
@@ -46,6 +52,9 @@ class TestTektronixTDS(unittest.TestCase):
         data = self.driver.get_waveform(1)
         self.assertEqual(data.value, [1.0, 2.0, 3.0, 4.0])
         self.assertEqual(data.unit, "V")
+        self.assertAlmostEqual(data.axis.start, -2e-6)
+        self.assertAlmostEqual(data.axis.step, 1e-6)
+        self.assertEqual(data.axis.unit, "s")
 
 if __name__ == "__main__":
     unittest.main()
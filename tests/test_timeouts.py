@@ -0,0 +1,146 @@
+import pyvisa
+import pytest
+
+from instrumation.drivers.real import RealDriver
+from instrumation.timeouts import AdaptiveTimeouts, command_pattern
+
+from loopback import fake_driver
+
+
+class TimedInstrument:
+    """Resource that records the timeout in force for each query."""
+
+    def __init__(self, fail=()):
+        self.timeout = None
+        self.seen = []
+        self.fail = set(fail)
+
+    def query(self, command):
+        self.seen.append((command, self.timeout))
+        if command in self.fail:
+            raise pyvisa.VisaIOError(pyvisa.constants.StatusCode.error_timeout)
+        return "1"
+
+    def close(self):
+        pass
+
+
+def _driver(inst, manager):
+    driver = fake_driver(RealDriver, inst)
+    inst.timeout = driver._base_timeout = RealDriver.DEFAULT_TIMEOUT_MS
+    driver.identity["model"] = "N9030A"
+    driver.enable_adaptive_timeouts(manager)
+    return driver
+
+
+def test_command_pattern_drops_arguments_and_suffixes():
+    assert command_pattern(":SENS:FREQ:CENT 1e9") == ":SENS:FREQ:CENT"
+    assert command_pattern(":inp2:lev 0.5") == ":INP#:LEV"
+    assert command_pattern("CALC1:DATA? SDATA;:INIT") == "CALC#:DATA?;:INIT"
+    assert command_pattern("*IDN?") == "*IDN?"
+
+
+def test_default_until_learned_then_fast_fail():
+    timeouts = AdaptiveTimeouts(min_samples=3)
+    for _ in range(2):
+        timeouts.record("DMM", "*IDN?", 0.004)
+    assert timeouts.timeout_for("DMM", "*IDN?", default=5000) == 5000
+    timeouts.record("DMM", "*IDN?", 0.005)
+    assert timeouts.timeout_for("DMM", "*IDN?", default=5000) == 100   # floor
+    assert timeouts.timeout_for("OTHER", "*IDN?", default=2000) == 2000
+
+
+def test_slow_command_gets_long_timeout():
+    timeouts = AdaptiveTimeouts(safety=3.0)
+    for latency in (8.0, 9.0, 8.5, 10.0, 9.5, 9.0):
+        timeouts.record("PNA", ":INIT:IMM;*OPC?", latency)
+    limit = timeouts.timeout_for("PNA", ":INIT:IMM;*OPC?", default=5000)
+    assert 30000 <= limit <= 60000
+
+
+def test_timeout_escalates_until_success():
+    timeouts = AdaptiveTimeouts(min_samples=3)
+    for _ in range(3):
+        timeouts.record("SA", ":TRAC? TRACE1", 0.01)
+    fast = timeouts.timeout_for("SA", ":TRAC? TRACE1")
+    timeouts.record_timeout("SA", ":TRAC? TRACE1", fast)
+    assert timeouts.timeout_for("SA", ":TRAC? TRACE1") == 2 * fast
+    timeouts.record("SA", ":TRAC? TRACE1", 0.01)
+    assert timeouts.timeout_for("SA", ":TRAC? TRACE1") == fast
+
+
+def test_acquisition_setting_forgets_acquisition_latency():
+    timeouts = AdaptiveTimeouts(min_samples=3)
+    for _ in range(3):
+        timeouts.record("DMM", ":READ?", 0.02)
+        timeouts.record("DMM", "*IDN?", 0.005)
+    timeouts.observe_write("DMM", ":SENS:VOLT:DC:NPLC?")
+    timeouts.observe_write("DMM", ":SENS:FUNC 'VOLT:DC'")
+    assert timeouts.timeout_for("DMM", ":READ?", default=5000) == 100
+    timeouts.observe_write("DMM", ":SENS:VOLT:DC:NPLC 10")
+    assert timeouts.timeout_for("DMM", ":READ?", default=5000) == 5000
+    assert timeouts.timeout_for("DMM", "*IDN?", default=5000) == 100
+
+
+def test_profile_round_trip(tmp_path):
+    path = str(tmp_path / "latency.json")
+    timeouts = AdaptiveTimeouts.load(path)
+    for _ in range(6):
+        timeouts.record("DMM", ":READ?", 0.2)
+    timeouts.save()
+    loaded = AdaptiveTimeouts.load(path)
+    assert loaded.path == path
+    assert list(loaded.patterns("DMM")) == [":READ?"]
+    assert loaded.timeout_for("DMM", ":READ?") == timeouts.timeout_for("DMM", ":READ?")
+
+
+def test_driver_sets_and_restores_learned_timeout():
+    inst = TimedInstrument()
+    driver = _driver(inst, AdaptiveTimeouts(min_samples=3))
+    for _ in range(4):
+        driver.query("*IDN?")
+    assert [t for _, t in inst.seen] == [5000, 5000, 5000, 100]
+    assert inst.timeout == 5000
+    # A method that stretched the timeout on purpose keeps it
+    inst.timeout = 30000
+    driver.query("*IDN?")
+    assert inst.seen[-1] == ("*IDN?", 30000)
+
+
+def test_driver_records_visa_timeouts_and_saves_on_disconnect(tmp_path):
+    inst = TimedInstrument(fail={":CAL?"})
+    manager = AdaptiveTimeouts(path=str(tmp_path / "profile.json"))
+    driver = _driver(inst, manager)
+    with pytest.raises(pyvisa.VisaIOError):
+        driver.query(":CAL?")
+    assert manager.timeout_for("N9030A", ":CAL?", default=5000) == 10000
+    driver.disconnect()
+    assert AdaptiveTimeouts.load(manager.path).stats["N9030A"][":CAL?"].timeouts == 1
+
+
+def test_driver_forgets_sweep_latency_after_span_change():
+    inst = TimedInstrument()
+    driver = _driver(inst, AdaptiveTimeouts(min_samples=3))
+    for _ in range(4):
+        driver.query(":INIT:IMM;*OPC?")
+    assert inst.seen[-1][1] == 100
+    driver.query(":SENS:FREQ:SPAN 1e9;*OPC?")
+    driver.query(":INIT:IMM;*OPC?")
+    assert inst.seen[-1][1] == 5000
+
+
+class PrologixInstrument(TimedInstrument):
+    def write(self, command):
+        self.seen.append((command, self.timeout))
+
+    def read(self):
+        return "1"
+
+
+def test_prologix_queries_are_timed():
+    inst = PrologixInstrument()
+    manager = AdaptiveTimeouts()
+    driver = _driver(inst, manager)
+    driver.bridge_config = {"type": "prologix"}
+    driver.query("*IDN?")
+    assert manager.stats["N9030A"]["*IDN?"].count == 1
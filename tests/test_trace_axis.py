@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+from instrumation.drivers.keysight import KeysightMXA, KeysightPNA
+from instrumation.drivers.simulated import SimulatedSpectrumAnalyzer
+from instrumation.emulator import VirtualNetworkAnalyzer, VirtualSpectrumAnalyzer
+from instrumation.results import MeasurementResult, TraceAxis
+
+from loopback import loopback_driver
+
+
+def test_axis_values_built_lazily_and_once():
+    axis = TraceAxis(1e9, 2e9, 11)
+    assert axis._values is None
+    values = axis.values()
+    assert values[1] == pytest.approx(1.1e9)
+    assert axis.values() is values
+    assert not values.flags.writeable
+    assert axis.step == pytest.approx(1e8)
+    assert len(axis) == 11
+
+
+def test_log_axis_and_validation():
+    axis = TraceAxis(10e6, 10e9, 4, scale="log")
+    assert axis.values()[1] == pytest.approx(100e6)
+    with pytest.raises(ValueError):
+        TraceAxis(0.0, 1e9, 4, scale="log")
+    with pytest.raises(ValueError):
+        TraceAxis(1e9, 2e9, 0)
+
+
+def test_axis_from_scpi_fields():
+    axis = TraceAxis.from_scpi(["+1.0E+09", "+2.0E+09", "+201", "LOG"])
+    assert axis == TraceAxis(1e9, 2e9, 201, scale="log")
+
+
+def test_axis_in_result_dict():
+    result = MeasurementResult([0.0] * 3, "dBm", axis=TraceAxis(1.0, 3.0, 3))
+    assert result.to_dict()["axis"]["points"] == 3
+    assert "axis" not in MeasurementResult(1.0, "V").to_dict()
+
+
+def test_axis_read_with_one_pipelined_query_and_shared():
+    mxa = loopback_driver(KeysightMXA, VirtualSpectrumAnalyzer())
+    mxa.write(":SENS:FREQ:STAR 1e9;:SENS:FREQ:STOP 2e9;:SENS:SWE:POIN 101")
+    first = mxa.get_trace_axis()
+    second = mxa.get_trace_axis()
+    assert first is second
+    assert first == TraceAxis(1e9, 2e9, 101)
+    assert mxa.inst.queries == [KeysightMXA.AXIS_QUERY]
+
+
+def test_axis_invalidated_by_setting_changes_only():
+    mxa = loopback_driver(KeysightMXA, VirtualSpectrumAnalyzer())
+    axis = mxa.get_trace_axis()
+    mxa.write(":INIT:IMM")
+    mxa.query(":SENS:FREQ:SPAN?")
+    assert mxa.get_trace_axis() is axis
+    mxa.set_span(10e6)
+    assert mxa.get_trace_axis() is not axis
+    axis = mxa.get_trace_axis()
+    mxa.write("*RST")
+    assert mxa._trace_axis is None
+
+
+def test_pna_log_sweep_axis():
+    pna = loopback_driver(KeysightPNA, VirtualNetworkAnalyzer())
+    pna.write(":SENS:FREQ:STAR 10e6;:SENS:FREQ:STOP 10e9;:SENS:SWE:POIN 4;:SENS:SWE:TYPE LOG")
+    axis = pna.get_trace_axis()
+    assert axis.scale == "log"
+    assert axis.points == 4
+
+
+def test_simulated_traces_share_axis():
+    sa = SimulatedSpectrumAnalyzer("SIM::SA")
+    a, b = sa.get_trace_data(), sa.get_trace_data()
+    assert a.axis is b.axis
+    assert a.axis.center == sa.get_center_freq()
+    assert len(a.axis.values()) == len(a.value)
+    sa.set_span(1e6)
+    assert sa.get_trace_data().axis.span == 1e6
+
+
+def test_acquisition_traces_carry_axis():
+    mxa = loopback_driver(KeysightMXA, VirtualSpectrumAnalyzer())
+    with patch.object(KeysightMXA, "get_trace_axis", return_value=TraceAxis(1e9, 2e9, 3)) as get_axis:
+        with patch.object(mxa, "query_binary_values", return_value=[1.0, 2.0, 3.0]), \
+                patch.object(mxa, "check_errors"):
+            with mxa.acquisition(count=3) as acq:
+                traces = list(acq)
+    get_axis.assert_called_once()
+    assert all(t.axis is traces[0].axis for t in traces)
+    assert np.asarray(traces[0].axis.values()).shape == (3,)
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from instrumation.drivers.anritsu import AnritsuSA, AnritsuShockLineVNA
+from instrumation.drivers.rigol import RigolDSA
+from instrumation.emulator import VirtualSpectrumAnalyzer, _ScpiError, ieee_block
+from instrumation.results import TraceAxis
+
+from loopback import loopback_driver
+
+
+class CannedReply:
+    """Personality answering every query with the same reply."""
+
+    def __init__(self, reply):
+        self.reply = reply
+
+    def process(self, command):
+        return self.reply if "?" in command else b""
+
+
+class LegacyAnalyzer(VirtualSpectrumAnalyzer):
+    """Firmware without FORMat: every trace comes back as ASCII."""
+
+    def _cmd_form_data(self, query, arg):
+        raise _ScpiError(-113, "Undefined header")
+
+    def _cmd_form_bord(self, query, arg):
+        raise _ScpiError(-113, "Undefined header")
+
+
+def _reference_trace(personality):
+    personality.process(":FORM:DATA ASC")
+    return np.array(personality.process(":TRAC? TRACE1").decode().split(","), dtype=float)
+
+
+def test_rigol_dsa_negotiates_binary_trace():
+    sa = VirtualSpectrumAnalyzer()
+    sa.process(":SENS:FREQ:STAR 1 GHZ;:SENS:FREQ:STOP 2 GHZ;:SENS:SWE:POIN 601")
+    drv = loopback_driver(RigolDSA, sa)
+    result = drv.get_trace_data()
+    assert drv.trace_transfer == "binary"
+    assert isinstance(result.value, np.ndarray) and result.value.dtype == np.float64
+    assert result.value.size == 601
+    assert result.axis == TraceAxis(1e9, 2e9, 601)
+    assert drv.inst.writes[:3] == [":FORM:TRAC:DATA REAL,32", ":FORM:BORD SWAP", ":TRAC:DATA? TRACE1"]
+    # Binary float32 readings match the instrument's own ASCII rendering
+    assert np.allclose(result.value, _reference_trace(sa), atol=1e-4)
+
+
+def test_legacy_firmware_falls_back_to_ascii_once():
+    sa = LegacyAnalyzer()
+    drv = loopback_driver(AnritsuSA, sa)
+    first = drv.get_trace_data().value
+    assert drv.trace_transfer == "ascii"
+    assert sa.process("SYST:ERR?").startswith(b"+0")  # probing errors were drained
+    drv.inst.writes.clear()
+    second = drv.get_trace_data().value
+    assert drv.inst.writes == [":FORM:DATA ASC", ":TRAC:DATA? TRACE1"]
+    assert np.allclose(first, second) and first.size == sa.points
+
+
+def test_ascii_payload_inside_block_is_parsed():
+    drv = loopback_driver(RigolDSA, VirtualSpectrumAnalyzer())
+    drv.inst.read_raw = lambda: ieee_block(b"-7.25e+01, -6.5e+01,-80.0") + b"\n"
+    assert drv.fetch_trace_values(":TRAC:DATA? TRACE1").tolist() == [-72.5, -65.0, -80.0]
+    assert drv.trace_transfer == "ascii"
+
+
+def test_byte_order_follows_trace_dtype():
+    values = np.array([-10.0, -20.5, 3.25], dtype=">f4")
+    drv = loopback_driver(AnritsuSA, VirtualSpectrumAnalyzer())
+    drv.TRACE_DTYPE = ">f4"
+    drv.inst.read_raw = lambda: ieee_block(values.tobytes()) + b"\n"
+    assert drv.fetch_trace_values(":TRAC:DATA? TRACE1").tolist() == [-10.0, -20.5, 3.25]
+
+
+def test_shockline_complex_trace_from_interleaved_binary():
+    pairs = np.array([1.0, -1.0, 0.5, 0.25], dtype="<f4")
+    drv = loopback_driver(AnritsuShockLineVNA, VirtualSpectrumAnalyzer())
+    drv.wait_ready = lambda timeout=30.0: None
+    drv.inst.read_raw = lambda: ieee_block(pairs.tobytes()) + b"\n"
+    result = drv.get_complex_trace("S21")
+    assert result.value.tolist() == [1 - 1j, 0.5 + 0.25j]
+    assert ":FORMat:BORDer SWAPped" in drv.inst.writes
+
+
+def test_blocks_holding_newline_bytes_are_read_by_length():
+    # Both floats carry 0x0A bytes, which a termchar-enabled read_raw() stops at
+    values = np.frombuffer(bytes([0x0A, 0, 0x80, 0x3F, 0, 0x0A, 0x20, 0x41]), dtype="<f4")
+    drv = loopback_driver(RigolDSA, CannedReply(ieee_block(values.tobytes()) + b";" + ieee_block(values[::-1].tobytes()) + b"\n"))
+    first, second = drv.query_binary_blocks(":TRAC? TRACE1;:TRAC? TRACE2")
+    assert first.tolist() == values.tolist() and second.tolist() == values[::-1].tolist()
+    assert drv.inst._pending == b""
+
+    drv.inst.personality.reply = ieee_block(values.tobytes()) + b"\n"
+    assert drv.fetch_trace_values(":TRAC:DATA? TRACE1").tolist() == values.tolist()
+    assert drv.trace_transfer == "binary" and drv.inst._pending == b""
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+from instrumation.analysis import WAVEFORM_PARAMETERS, measure_waveform
+from instrumation.drivers.rigol import RigolDS1054Z
+from instrumation.drivers.simulated import SimulatedOscilloscope
+from instrumation.results import MeasurementResult, TraceAxis
+
+DT = 1e-8
+
+
+def _pulse_train(n=100000, period=8e-6, duty=0.25, ramp=20, amplitude=3.3, noise=0.0, seed=0):
+    """Pulse train with linear edges of ``ramp`` samples and optional noise."""
+    t = np.arange(n) * DT
+    square = ((t % period) < duty * period).astype(float) * amplitude
+    edges = np.convolve(square, np.ones(ramp) / ramp)[:n]
+    return edges + np.random.default_rng(seed).normal(0.0, noise, n)
+
+
+def test_pulse_parameters_match_definitions():
+    m = measure_waveform(_pulse_train(), x_increment=DT)
+    assert set(m.parameters) == set(WAVEFORM_PARAMETERS)
+    assert m["frequency"] == pytest.approx(125e3, rel=1e-6)
+    assert m["period"] == pytest.approx(8e-6, rel=1e-6)
+    assert m["duty_cycle"] == pytest.approx(25.0, abs=0.01)
+    assert m["vtop"] == pytest.approx(3.3) and m["vbase"] == pytest.approx(0.0)
+    assert m["vpp"] == pytest.approx(3.3)
+    # 10-90 % of a 20-sample linear ramp
+    assert m["rise_time"] == pytest.approx(16 * DT, rel=1e-6)
+    assert m["fall_time"] == pytest.approx(16 * DT, rel=1e-6)
+    assert m["vrms"] == pytest.approx(np.sqrt(np.mean(_pulse_train() ** 2)))
+    assert m.units["frequency"] == "Hz" and m.units["vpp"] == "V"
+
+
+def test_edge_timestamps_are_interpolated_mid_crossings():
+    m = measure_waveform(_pulse_train(n=20000), x_increment=DT, x_origin=-1e-6)
+    # The 20-sample ramp starting at sample 0 is at 50 % on sample 9
+    assert m.rising_edges[:3] == pytest.approx(-1e-6 + DT * (9 + np.array([0, 800, 1600])), abs=1e-12)
+    assert m.falling_edges[0] == pytest.approx(-1e-6 + DT * (200 + 9), abs=1e-12)
+    assert len(m.rising_edges) == 25 and len(m.falling_edges) == 25
+
+
+def test_hysteresis_ignores_noise_at_mid_level():
+    noisy = _pulse_train(ramp=200, noise=0.05)
+    m = measure_waveform(noisy, x_increment=DT)
+    assert len(m.rising_edges) == len(measure_waveform(_pulse_train(ramp=200), x_increment=DT).rising_edges)
+    assert m["frequency"] == pytest.approx(125e3, rel=1e-3)
+
+
+def test_overshoot_and_sine_levels():
+    wave = _pulse_train()
+    wave[np.arange(20, wave.size, 800)] += 0.33    # ringing right after each rising edge
+    m = measure_waveform(wave, x_increment=DT)
+    assert m["overshoot"] == pytest.approx(10.0, abs=0.5)
+
+    t = np.arange(10000) * DT
+    sine = measure_waveform(np.sin(2 * np.pi * 1e6 * t), x_increment=DT)
+    # No flat top: top/base fall back towards the extremes
+    assert sine["vamp"] == pytest.approx(2.0, abs=0.01)
+    assert sine["duty_cycle"] == pytest.approx(50.0, abs=0.1)
+    assert sine["vrms"] == pytest.approx(1 / np.sqrt(2), rel=1e-3)
+
+
+def test_batch_of_captures_and_channels():
+    t = np.arange(50000) * DT
+    batch = np.empty((3, 2, t.size))
+    for capture in range(3):
+        batch[capture, 0] = _pulse_train(n=t.size, duty=0.25 + 0.1 * capture)
+        batch[capture, 1] = np.sin(2 * np.pi * (1e6 + 1e5 * capture) * t)
+    m = measure_waveform(batch, x_increment=DT)
+    assert m["duty_cycle"].shape == (3, 2)
+    assert m["duty_cycle"][:, 0] == pytest.approx([25.0, 35.0, 45.0], abs=0.01)
+    assert m["frequency"][:, 1] == pytest.approx([1e6, 1.1e6, 1.2e6], rel=1e-4)
+    assert len(m.rising_edges) == 6 and len(m.table()) == 6
+
+
+def test_flat_and_edgeless_records():
+    m = measure_waveform(np.full(100, 1.2), x_increment=DT)
+    assert m["vpp"] == 0.0 and m["vavg"] == pytest.approx(1.2)
+    assert np.isnan(m["frequency"]) and np.isnan(m["rise_time"]) and np.isnan(m["overshoot"])
+    assert m.rising_edges.size == 0
+    with pytest.raises(ValueError):
+        measure_waveform(np.zeros(100))
+    with pytest.raises(ValueError):
+        measure_waveform(np.zeros(100), x_increment=DT, thresholds=(90, 50, 10))
+
+
+def test_results_supply_interval_and_channels():
+    axis = TraceAxis(0.0, 999 * DT, 1000, unit="s")
+    waves = [MeasurementResult(_pulse_train(n=1000).tolist(), "V", channel=ch, axis=axis) for ch in (1, 2)]
+    m = measure_waveform(waves)
+    assert m.channels == [1, 2]
+    assert m["period"] == pytest.approx([8e-6, 8e-6])
+    assert [row["channel"] for row in m.table()] == [1, 2]
+    with pytest.raises(ValueError):
+        measure_waveform([waves[0], MeasurementResult([0.0] * 1000, "V", axis=TraceAxis(0.0, 1.0, 1000, unit="s"))])
+
+
+def test_rigol_fetches_each_channel_once_without_measure_queries():
+    with patch('pyvisa.ResourceManager'):
+        scope = RigolDS1054Z("USB0::0x1AB1::0x04CE::DS1054Z::INSTR")
+    scope.inst = MagicMock()
+    scope.connected = True
+    scope.inst.query.return_value = f"0,0,1000,1,{DT},-5e-06,0,0.1,0.0,0"
+    scope.inst.query_binary_values.return_value = (_pulse_train(n=1000) * 10).round().astype(int).tolist()
+    m = scope.measure_waveform([1, 2, 3])
+    assert m["frequency"] == pytest.approx([125e3] * 3, rel=1e-6)
+    assert m.rising_edges[0][0] == pytest.approx(-5e-6 + 9 * DT, abs=DT)
+    assert scope.inst.query_binary_values.call_count == 3
+    assert not any("MEAS" in str(c) for c in scope.inst.query.call_args_list)
+
+
+def test_simulated_scope_matches_its_measurements():
+    scope = SimulatedOscilloscope("SIM::SCOPE")
+    m = scope.measure_waveform(1)
+    assert m["frequency"] == pytest.approx(scope.measure_frequency().value, rel=2e-3)
+    assert m["duty_cycle"] == pytest.approx(scope.measure_duty_cycle().value, abs=0.5)
+    assert m.result("vpp").value == pytest.approx(1.5) and m.result("vpp").channel == 1